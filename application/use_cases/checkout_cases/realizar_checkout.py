@@ -0,0 +1,89 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+from domain.entities.checkout import Checkout, LineaCheckout
+from domain.entities.orden import Orden
+from domain.entities.orden_producto import OrdenProducto
+from domain.entities.venta import Venta
+from domain.repositories.orden_repository import OrdenRepository
+from domain.repositories.orden_producto_repository import OrdenProductoRepository
+from domain.repositories.producto_repository import ProductoRepository
+from domain.repositories.venta_repository import VentaRepository
+from infrastructure.cache.versiones import registrar_escritura
+from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.database.retry import con_reintentos
+
+
+class RealizarCheckoutUseCase:
+    """Crea orden, líneas y venta, y descuenta el stock, en una sola transacción.
+
+    Reemplaza la secuencia POST /ordenes/ + N x POST /orden-producto/ + POST /ventas/.
+    """
+
+    def __init__(self, orden_repository: OrdenRepository,
+                 orden_producto_repository: OrdenProductoRepository,
+                 producto_repository: ProductoRepository,
+                 venta_repository: VentaRepository):
+        self.orden_repository = orden_repository
+        self.orden_producto_repository = orden_producto_repository
+        self.producto_repository = producto_repository
+        self.venta_repository = venta_repository
+
+    def execute(self, orden: Orden, lineas: List[LineaCheckout], metodo_pago: str) -> Checkout:
+        if not lineas:
+            raise ValueError("El checkout debe incluir al menos una línea")
+        if any(linea.cantidad <= 0 for linea in lineas):
+            raise ValueError("Las cantidades deben ser mayores que cero")
+
+        # Un mismo producto puede venir en varias líneas: descontar la suma
+        cantidades = defaultdict(int)
+        for linea in lineas:
+            cantidades[linea.id_producto] += linea.cantidad
+
+        return con_reintentos(self._realizar, orden, lineas, dict(cantidades), metodo_pago)
+
+    def _realizar(self, orden: Orden, lineas: List[LineaCheckout], cantidades: Dict[int, int], metodo_pago: str) -> Checkout:
+        conn = None
+        try:
+            conn = get_db_connection()
+            precios = self.producto_repository.reservar_stock(cantidades, conn)
+
+            items = [
+                OrdenProducto(
+                    id_producto=linea.id_producto,
+                    cantidad=linea.cantidad,
+                    precio_unitario=linea.precio_unitario if linea.precio_unitario is not None
+                    else float(precios[linea.id_producto])
+                )
+                for linea in lineas
+            ]
+            subtotal = sum(item.cantidad * item.precio_unitario for item in items)
+            if orden.fecha_orden is None:
+                orden.fecha_orden = datetime.utcnow()
+            orden.total_orden = round(subtotal + (orden.costo_envio or 0.0), 2)
+
+            creada = self.orden_repository.crear(orden, conn=conn)
+            for item in items:
+                item.id_orden = creada.id_orden
+            lineas_creadas = self.orden_producto_repository.insertar_lote(items, conn)
+            venta = self.venta_repository.crear(
+                Venta(
+                    id_orden=creada.id_orden,
+                    fecha_venta=creada.fecha_orden,
+                    total_venta=creada.total_orden,
+                    metodo_pago=metodo_pago
+                ),
+                conn=conn
+            )
+
+            conn.commit()
+            registrar_escritura("orden", "orden_producto", "ventas", "productos")
+            return Checkout(orden=creada, lineas=lineas_creadas, venta=venta)
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            raise e
+        finally:
+            if conn:
+                conn.close()
@@ -1,10 +1,11 @@
-from typing import List
+from typing import Optional, Sequence
 from domain.entities.cliente import Cliente
+from domain.entities.pagina import Pagina
 from domain.repositories.cliente_repository import ClienteRepository
 
 class ListarClientesUseCase:
     def __init__(self, cliente_repository: ClienteRepository):
         self.cliente_repository = cliente_repository
 
-    def execute(self) -> List[Cliente]:
-        return self.cliente_repository.listar_todos()
\ No newline at end of file
+    def execute(self, limit: Optional[int] = None, after: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Cliente]:
+        return self.cliente_repository.listar_pagina(limit=limit, after=after, campos=campos)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Sequence
 from domain.entities.cliente import Cliente
 from domain.repositories.cliente_repository import ClienteRepository
 
@@ -6,5 +6,5 @@ class ObtenerClienteUseCase:
     def __init__(self, cliente_repository: ClienteRepository):
         self.cliente_repository = cliente_repository
 
-    def execute(self, id_cliente: int) -> Optional[Cliente]:
-        return self.cliente_repository.obtener_por_id(id_cliente)
\ No newline at end of file
+    def execute(self, id_cliente: int, campos: Optional[Sequence[str]] = None) -> Optional[Cliente]:
+        return self.cliente_repository.obtener_por_id(id_cliente, campos=campos)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from typing import List
+from domain.entities.cliente import Cliente
+from domain.entities.resultado_por_ids import ResultadoPorIds
+from domain.repositories.cliente_repository import ClienteRepository
+
+
+class ObtenerClientesPorIdsUseCase:
+    def __init__(self, cliente_repository: ClienteRepository):
+        self.cliente_repository = cliente_repository
+
+    def execute(self, ids: List[int]) -> ResultadoPorIds[Cliente]:
+        unicos = list(dict.fromkeys(ids))
+        if not unicos:
+            return ResultadoPorIds()
+        entidades = self.cliente_repository.obtener_por_ids(unicos)
+        return ResultadoPorIds.ordenar(unicos, entidades, lambda e: e.id_cliente)
@@ -0,0 +1,12 @@
+from typing import Iterator, List, Tuple
+from domain.repositories.export_repository import ExportRepository
+
+
+class ExportarEntidadUseCase:
+    def __init__(self, export_repository: ExportRepository):
+        self.export_repository = export_repository
+
+    def execute(self, entidad: str, itersize: int) -> Tuple[List[str], Iterator[Tuple]]:
+        if entidad not in self.export_repository.entidades():
+            raise ValueError(f"Entidad no exportable: {entidad}")
+        return self.export_repository.columnas(entidad), self.export_repository.iterar_filas(entidad, itersize)
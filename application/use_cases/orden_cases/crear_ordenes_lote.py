@@ -0,0 +1,12 @@
+from typing import List
+from domain.entities.orden import Orden
+from domain.entities.resultado_lote import ResultadoLote
+from domain.repositories.orden_repository import OrdenRepository
+
+
+class CrearOrdenesLoteUseCase:
+    def __init__(self, orden_repository: OrdenRepository):
+        self.orden_repository = orden_repository
+
+    def execute(self, ordenes: List[Orden], partial: bool = False) -> ResultadoLote[Orden]:
+        return self.orden_repository.crear_many(ordenes, partial=partial)
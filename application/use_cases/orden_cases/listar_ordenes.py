@@ -1,11 +1,29 @@
 from domain.entities.orden import Orden
+from domain.entities.pagina import Pagina
 from domain.repositories.orden_repository import OrdenRepository
-from typing import List
+from typing import Optional, Sequence
 
 
 class ListarOrdenesUseCase:
     def __init__(self, orden_repository: OrdenRepository):
         self.orden_repository = orden_repository
 
-    def execute(self) -> List[Orden]:
-        return self.orden_repository.listar_todos()
+    def execute(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        estado_orden: Optional[str] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None,
+        campos: Optional[Sequence[str]] = None
+    ) -> Pagina[Orden]:
+        return self.orden_repository.listar_pagina(
+            limit=limit,
+            after=after,
+            estado_orden=estado_orden,
+            id_cliente=id_cliente,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            campos=campos
+        )
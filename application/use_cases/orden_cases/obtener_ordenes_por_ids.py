@@ -0,0 +1,16 @@
+from typing import List
+from domain.entities.orden import Orden
+from domain.entities.resultado_por_ids import ResultadoPorIds
+from domain.repositories.orden_repository import OrdenRepository
+
+
+class ObtenerOrdenesPorIdsUseCase:
+    def __init__(self, orden_repository: OrdenRepository):
+        self.orden_repository = orden_repository
+
+    def execute(self, ids: List[int]) -> ResultadoPorIds[Orden]:
+        unicos = list(dict.fromkeys(ids))
+        if not unicos:
+            return ResultadoPorIds()
+        entidades = self.orden_repository.obtener_por_ids(unicos)
+        return ResultadoPorIds.ordenar(unicos, entidades, lambda e: e.id_orden)
@@ -0,0 +1,30 @@
+from domain.entities.reporte_ordenes import AGRUPACIONES_REPORTE, PERIODOS_REPORTE, FilaReporteOrdenes
+from domain.repositories.orden_repository import OrdenRepository
+from typing import List, Optional
+
+
+class ReporteOrdenesAgregadoUseCase:
+    def __init__(self, orden_repository: OrdenRepository):
+        self.orden_repository = orden_repository
+
+    def execute(
+        self,
+        fecha_inicio,
+        fecha_fin,
+        periodo: Optional[str] = None,
+        agrupar_por: Optional[str] = None,
+        rellenar: bool = False
+    ) -> List[FilaReporteOrdenes]:
+        if fecha_inicio > fecha_fin:
+            raise ValueError("fecha_inicio debe ser anterior o igual a fecha_fin")
+        if periodo is not None and periodo not in PERIODOS_REPORTE:
+            raise ValueError(f"periodo debe ser uno de: {', '.join(PERIODOS_REPORTE)}")
+        if agrupar_por is not None and agrupar_por not in AGRUPACIONES_REPORTE:
+            raise ValueError(f"agrupar_por debe ser uno de: {', '.join(AGRUPACIONES_REPORTE)}")
+        return self.orden_repository.reporte_agregado(
+            fecha_inicio,
+            fecha_fin,
+            periodo=periodo,
+            agrupar_por=agrupar_por,
+            rellenar=rellenar
+        )
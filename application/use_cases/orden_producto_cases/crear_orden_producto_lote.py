@@ -0,0 +1,11 @@
+from typing import List
+from domain.entities.orden_producto import OrdenProducto
+from domain.entities.resultado_lote import ResultadoLote
+from domain.repositories.orden_producto_repository import OrdenProductoRepository
+
+class CrearOrdenProductoLoteUseCase:
+    def __init__(self, orden_producto_repository: OrdenProductoRepository):
+        self.orden_producto_repository = orden_producto_repository
+
+    def execute(self, items: List[OrdenProducto], partial: bool = False) -> ResultadoLote[OrdenProducto]:
+        return self.orden_producto_repository.crear_many(items, partial=partial)
@@ -1,10 +1,24 @@
-from typing import List
+from typing import Optional
 from domain.entities.orden_producto import OrdenProducto
+from domain.entities.pagina import Pagina
 from domain.repositories.orden_producto_repository import OrdenProductoRepository
 
 class ListarTodosOrdenProductoUseCase:
     def __init__(self, orden_producto_repository: OrdenProductoRepository):
         self.orden_producto_repository = orden_producto_repository
 
-    def execute(self) -> List[OrdenProducto]:
-        return self.orden_producto_repository.listar_todos()
+    def execute(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_producto: Optional[int] = None,
+        id_categoria: Optional[int] = None
+    ) -> Pagina[OrdenProducto]:
+        return self.orden_producto_repository.listar_pagina(
+            limit=limit,
+            after=after,
+            id_orden=id_orden,
+            id_producto=id_producto,
+            id_categoria=id_categoria
+        )
@@ -1,4 +1,5 @@
-from typing import List
+from typing import Optional, Sequence
+from domain.entities.pagina import Pagina
 from domain.entities.producto import Producto
 from domain.repositories.producto_repository import ProductoRepository
 
@@ -6,5 +7,5 @@ class ListarProductosUseCase:
     def __init__(self, producto_repository: ProductoRepository):
         self.producto_repository = producto_repository
 
-    def execute(self) -> List[Producto]:
-        return self.producto_repository.listar_todos()
\ No newline at end of file
+    def execute(self, limit: Optional[int] = None, after: Optional[int] = None, id_categoria: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Producto]:
+        return self.producto_repository.listar_pagina(limit=limit, after=after, id_categoria=id_categoria, campos=campos)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Sequence
 from domain.entities.producto import Producto   
 from domain.repositories.producto_repository import ProductoRepository
 
@@ -6,5 +6,5 @@ class ObtenerProductoUseCase:
     def __init__(self, producto_repository: ProductoRepository):
         self.producto_repository = producto_repository
 
-    def execute(self, id_producto: int) -> Optional[Producto]:
-        return self.producto_repository.obtener_por_id(id_producto)
\ No newline at end of file
+    def execute(self, id_producto: int, campos: Optional[Sequence[str]] = None) -> Optional[Producto]:
+        return self.producto_repository.obtener_por_id(id_producto, campos=campos)
\ No newline at end of file
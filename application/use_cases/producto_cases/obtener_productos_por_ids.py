@@ -0,0 +1,16 @@
+from typing import List
+from domain.entities.producto import Producto
+from domain.entities.resultado_por_ids import ResultadoPorIds
+from domain.repositories.producto_repository import ProductoRepository
+
+
+class ObtenerProductosPorIdsUseCase:
+    def __init__(self, producto_repository: ProductoRepository):
+        self.producto_repository = producto_repository
+
+    def execute(self, ids: List[int]) -> ResultadoPorIds[Producto]:
+        unicos = list(dict.fromkeys(ids))
+        if not unicos:
+            return ResultadoPorIds()
+        entidades = self.producto_repository.obtener_por_ids(unicos)
+        return ResultadoPorIds.ordenar(unicos, entidades, lambda e: e.id_producto)
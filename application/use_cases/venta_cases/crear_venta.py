@@ -3,7 +3,9 @@ from domain.entities.venta import Venta
 from domain.repositories.venta_repository import VentaRepository
 from domain.repositories.orden_producto_repository import OrdenProductoRepository
 from domain.repositories.producto_repository import ProductoRepository
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.database.retry import con_reintentos
 
 class CrearVentaUseCase:
 	def __init__(self, venta_repository: VentaRepository,
@@ -14,37 +16,43 @@ class CrearVentaUseCase:
 		self.producto_repository = producto_repository
 
 	def execute(self, id_orden: int, fecha_venta, total_venta: float, metodo_pago: str) -> Venta:
+		# Reintentar la transacción completa si PostgreSQL la aborta por deadlock o serialización
+		return con_reintentos(self._crear, id_orden, fecha_venta, total_venta, metodo_pago)
+
+	def _crear(self, id_orden: int, fecha_venta, total_venta: float, metodo_pago: str) -> Venta:
 		conn = None
 		try:
 			conn = get_db_connection()
 			cursor = conn.cursor()
 
-			# Obtener líneas de la orden usando la misma conexión
-			cursor.execute('SELECT id_producto, cantidad FROM orden_producto WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE);', (id_orden,))
+			# Cantidades por producto de la orden (agrupadas) usando la misma conexión
+			cursor.execute(
+				'SELECT id_producto, SUM(cantidad) AS cantidad FROM orden_producto '
+				'WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE) GROUP BY id_producto;',
+				(id_orden,)
+			)
 			rows = cursor.fetchall()
 
 			if not rows:
 				raise Exception(f"La orden {id_orden} no tiene items o no existe")
 
-			# Disminuir stock por cada item usando la misma conexión
+			# row puede ser dict o tuple según cursor_factory; normalizar
+			cantidades = {}
 			for row in rows:
-				# row puede ser dict o tuple según cursor_factory; normalizar
 				if isinstance(row, dict):
-					id_producto = row.get('id_producto')
-					cantidad = row.get('cantidad')
+					cantidades[row['id_producto']] = int(row['cantidad'])
 				else:
-					id_producto = row[0]
-					cantidad = row[1]
+					cantidades[row[0]] = int(row[1])
 
-				ok = self.producto_repository.disminuir_stock(id_producto, cantidad, conn=conn)
-				if not ok:
-					raise Exception(f"Stock insuficiente para producto {id_producto}")
+			# Descontar todo el stock en una sola operación (lanza StockInsuficienteError)
+			self.producto_repository.reservar_stock(cantidades, conn)
 
 			# Crear la venta usando la misma conexión
 			venta = Venta(id_orden=id_orden, fecha_venta=fecha_venta, total_venta=total_venta, metodo_pago=metodo_pago)
 			created = self.venta_repository.crear(venta, conn=conn)
 
 			conn.commit()
+			registrar_escritura("ventas", "productos")
 			return created
 		except Exception as e:
 			if conn:
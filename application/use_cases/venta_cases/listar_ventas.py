@@ -1,4 +1,5 @@
-from typing import List
+from typing import Optional
+from domain.entities.pagina import Pagina
 from domain.entities.venta import Venta
 from domain.repositories.venta_repository import VentaRepository
 
@@ -6,5 +7,20 @@ class ListarVentasUseCase:
     def __init__(self, venta_repository: VentaRepository):
         self.venta_repository = venta_repository
 
-    def execute(self) -> List[Venta]:
-        return self.venta_repository.listar_todos()
+    def execute(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None
+    ) -> Pagina[Venta]:
+        return self.venta_repository.listar_pagina(
+            limit=limit,
+            after=after,
+            id_orden=id_orden,
+            id_cliente=id_cliente,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta
+        )
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Categoria:
     id_categoria: Optional[int] = None
     nombre_categoria: str = ""
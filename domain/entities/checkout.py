@@ -0,0 +1,21 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+from domain.entities.orden import Orden
+from domain.entities.orden_producto import OrdenProducto
+from domain.entities.venta import Venta
+
+
+@dataclass
+class LineaCheckout:
+    id_producto: int
+    cantidad: int
+    # Si no se indica, se usa el precio actual del producto
+    precio_unitario: Optional[float] = None
+
+
+@dataclass
+class Checkout:
+    """Agregado resultante de un checkout: la orden, sus líneas y la venta."""
+    orden: Orden
+    lineas: List[OrdenProducto] = field(default_factory=list)
+    venta: Optional[Venta] = None
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Cliente:
     id_cliente: Optional[int] = None
     nombre: str = ""
@@ -3,7 +3,7 @@ from typing import Optional
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class Orden:
     id_orden: Optional[int] = None
     id_cliente: int = 0
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class OrdenProducto:
     id_ordenProd: Optional[int] = None
     id_producto: int = 0
@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Pagina(Generic[T]):
+    """Resultado de un listado paginado por clave (keyset).
+
+    `siguiente` es la clave del último elemento devuelto cuando hay más filas
+    después de esta página; se pasa como `after` para pedir la siguiente.
+    """
+    items: List[T] = field(default_factory=list)
+    siguiente: Optional[int] = None
+
+    @classmethod
+    def desde_filas(cls, items: List[T], limit: Optional[int], clave: Callable[[T], int]) -> "Pagina[T]":
+        """Construye la página a partir de hasta `limit + 1` filas leídas de la base de datos."""
+        if limit is None or len(items) <= limit:
+            return cls(items=items)
+        items = items[:limit]
+        return cls(items=items, siguiente=clave(items[-1]))
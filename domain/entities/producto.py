@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class Producto:
     id_producto: Optional[int] = None
     nombre_producto: str = ""
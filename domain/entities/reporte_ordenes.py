@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# Periodos y dimensiones admitidos por el reporte agregado de órdenes
+PERIODOS_REPORTE = ("dia", "semana", "mes")
+AGRUPACIONES_REPORTE = ("estado_orden", "pais_envio", "metodo_envio")
+
+
+@dataclass(slots=True)
+class FilaReporteOrdenes:
+    """Agregado de órdenes de un periodo (inicio del día/semana/mes) y/o de un grupo."""
+    periodo: Optional[datetime] = None
+    grupo: Optional[str] = None
+    ordenes: int = 0
+    total_ventas: float = 0.0
+    total_envio: float = 0.0
+    ticket_promedio: Optional[float] = None
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class ResultadoLote(Generic[T]):
+    """Resultado de una inserción masiva.
+
+    `creados` está alineado con la entrada: la posición `i` contiene la entidad
+    creada para la fila `i`, o None si esa fila fue rechazada. `errores` mapea
+    el índice de cada fila rechazada al motivo.
+    """
+    creados: List[Optional[T]] = field(default_factory=list)
+    errores: Dict[int, str] = field(default_factory=dict)
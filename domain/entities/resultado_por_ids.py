@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import Callable, Generic, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class ResultadoPorIds(Generic[T]):
+    """Entidades pedidas por id, en el orden de la petición, y los ids que no existen."""
+    encontrados: List[T] = field(default_factory=list)
+    faltantes: List[int] = field(default_factory=list)
+
+    @classmethod
+    def ordenar(cls, ids: Iterable[int], entidades: Iterable[T], clave: Callable[[T], int]) -> "ResultadoPorIds[T]":
+        """Reordena `entidades` (en cualquier orden) según `ids`; los ids repetidos cuentan una vez."""
+        por_id = {clave(entidad): entidad for entidad in entidades}
+        resultado = cls()
+        for id_entidad in dict.fromkeys(ids):
+            entidad = por_id.get(id_entidad)
+            if entidad is None:
+                resultado.faltantes.append(id_entidad)
+            else:
+                resultado.encontrados.append(entidad)
+        return resultado
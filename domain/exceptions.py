@@ -0,0 +1,14 @@
+from typing import Dict, Optional
+
+
+class StockInsuficienteError(Exception):
+    """Uno o más productos no tienen stock suficiente para la operación.
+
+    `faltantes` mapea id_producto -> {"solicitado": int, "disponible": int | None};
+    `disponible` es None cuando el producto no existe o está eliminado.
+    """
+
+    def __init__(self, faltantes: Dict[int, Dict[str, Optional[int]]]):
+        self.faltantes = faltantes
+        ids = ", ".join(str(i) for i in sorted(faltantes))
+        super().__init__(f"Stock insuficiente para producto(s): {ids}")
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from domain.entities.cliente import Cliente
+from domain.entities.pagina import Pagina
 
 class ClienteRepository(ABC):
     @abstractmethod
@@ -8,13 +9,25 @@ class ClienteRepository(ABC):
         pass
 
     @abstractmethod
-    def obtener_por_id(self, id_cliente: int) -> Optional[Cliente]:
+    def obtener_por_id(self, id_cliente: int, campos: Optional[Sequence[str]] = None) -> Optional[Cliente]:
+        """Con `campos` solo se leen esas columnas (más la clave); el resto queda por defecto."""
         pass
 
+    def obtener_por_ids(self, ids: List[int]) -> List[Cliente]:
+        """Retorna las entidades existentes de `ids`, en cualquier orden.
+        Por defecto hace una consulta por id; los repositorios SQL lo resuelven en una sola.
+        """
+        return [e for e in (self.obtener_por_id(i) for i in ids) if e is not None]
+
     @abstractmethod
     def listar_todos(self) -> List[Cliente]:
         pass
 
+    @abstractmethod
+    def listar_pagina(self, limit: Optional[int] = None, after: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Cliente]:
+        """Lista clientes ordenados por id_cliente a partir de `after`."""
+        pass
+
     @abstractmethod
     def actualizar(self, id_cliente: int, cliente: Cliente) -> Optional[Cliente]:
         pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Tuple
+
+
+class ExportRepository(ABC):
+    @abstractmethod
+    def entidades(self) -> List[str]:
+        """Nombres de las entidades que se pueden exportar."""
+        pass
+
+    @abstractmethod
+    def columnas(self, entidad: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def iterar_filas(self, entidad: str, itersize: int) -> Iterator[Tuple]:
+        """Recorre todas las filas de `entidad` sin materializarlas en memoria."""
+        pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import List
 from domain.entities.orden_producto import OrdenProducto
+from domain.entities.pagina import Pagina
+from domain.entities.resultado_lote import ResultadoLote
 
 from typing import Optional
 
@@ -9,9 +11,31 @@ class OrdenProductoRepository(ABC):
     def listar_todos(self) -> List[OrdenProducto]:
         pass
     @abstractmethod
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_producto: Optional[int] = None,
+        id_categoria: Optional[int] = None,
+    ) -> Pagina[OrdenProducto]:
+        """Lista líneas de orden ordenadas por id_ordenProd a partir de `after`, con filtros opcionales."""
+        pass
+
+    @abstractmethod
     def crear(self, orden_producto: OrdenProducto) -> OrdenProducto:
         pass
 
+    @abstractmethod
+    def crear_many(self, items: List[OrdenProducto], partial: bool = False) -> ResultadoLote[OrdenProducto]:
+        """Inserta varias líneas en una sola transacción (ver `OrdenRepository.crear_many`)."""
+        pass
+
+    @abstractmethod
+    def insertar_lote(self, items: List[OrdenProducto], conn) -> List[OrdenProducto]:
+        """Inserta las líneas usando `conn` sin hacer commit (para transacciones compuestas)."""
+        pass
+
     @abstractmethod
     def obtener_por_id(self, id_ordenProd: int) -> Optional[OrdenProducto]:
         pass
@@ -1,21 +1,54 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from domain.entities.orden import Orden
+from domain.entities.pagina import Pagina
+from domain.entities.reporte_ordenes import FilaReporteOrdenes
+from domain.entities.resultado_lote import ResultadoLote
 
 
 class OrdenRepository(ABC):
     @abstractmethod
-    def crear(self, orden: Orden) -> Orden:
+    def crear(self, orden: Orden, conn=None) -> Orden:
         pass
 
     @abstractmethod
-    def obtener_por_id(self, id_orden: int) -> Optional[Orden]:
+    def crear_many(self, ordenes: List[Orden], partial: bool = False) -> ResultadoLote[Orden]:
+        """Inserta varias órdenes en una sola transacción.
+
+        Las filas con referencias inexistentes se reportan en `errores`; con
+        `partial=False` basta una para que no se inserte ninguna.
+        """
         pass
 
+    @abstractmethod
+    def obtener_por_id(self, id_orden: int, campos: Optional[Sequence[str]] = None) -> Optional[Orden]:
+        """Con `campos` solo se leen esas columnas (más la clave); el resto queda por defecto."""
+        pass
+
+    def obtener_por_ids(self, ids: List[int]) -> List[Orden]:
+        """Retorna las entidades existentes de `ids`, en cualquier orden.
+        Por defecto hace una consulta por id; los repositorios SQL lo resuelven en una sola.
+        """
+        return [e for e in (self.obtener_por_id(i) for i in ids) if e is not None]
+
     @abstractmethod
     def listar_todos(self) -> List[Orden]:
         pass
 
+    @abstractmethod
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        estado_orden: Optional[str] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None,
+        campos: Optional[Sequence[str]] = None,
+    ) -> Pagina[Orden]:
+        """Lista órdenes ordenadas por id_orden a partir de `after`, con filtros opcionales."""
+        pass
+
     @abstractmethod
     def listar_por_cliente(self, id_cliente: int) -> List[Orden]:
         pass
@@ -24,6 +57,20 @@ class OrdenRepository(ABC):
     def listar_por_fecha(self, fecha_inicio, fecha_fin) -> List[Orden]:
         pass
 
+    def reporte_agregado(
+        self,
+        fecha_inicio,
+        fecha_fin,
+        periodo: Optional[str] = None,
+        agrupar_por: Optional[str] = None,
+        rellenar: bool = False,
+    ) -> List[FilaReporteOrdenes]:
+        """Cantidad de órdenes, suma de total_orden y costo_envio y ticket promedio entre
+        dos fechas (inclusive), por `periodo` (dia/semana/mes) y/o `agrupar_por`.
+        Con `rellenar`, los periodos sin órdenes aparecen con ceros.
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def actualizar(self, id_orden: int, orden: Orden) -> Optional[Orden]:
         pass
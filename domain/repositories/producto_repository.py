@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence
 from domain.entities.producto import Producto
+from domain.entities.pagina import Pagina
 
 class ProductoRepository(ABC):
     @abstractmethod
@@ -8,13 +9,31 @@ class ProductoRepository(ABC):
         pass
 
     @abstractmethod
-    def obtener_por_id(self, id_producto: int) -> Optional[Producto]:
+    def obtener_por_id(self, id_producto: int, campos: Optional[Sequence[str]] = None) -> Optional[Producto]:
+        """Con `campos` solo se leen esas columnas (más la clave); el resto queda por defecto."""
         pass
 
+    def obtener_por_ids(self, ids: List[int]) -> List[Producto]:
+        """Retorna las entidades existentes de `ids`, en cualquier orden.
+        Por defecto hace una consulta por id; los repositorios SQL lo resuelven en una sola.
+        """
+        return [e for e in (self.obtener_por_id(i) for i in ids) if e is not None]
+
     @abstractmethod
     def listar_todos(self) -> List[Producto]:
         pass
 
+    @abstractmethod
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_categoria: Optional[int] = None,
+        campos: Optional[Sequence[str]] = None,
+    ) -> Pagina[Producto]:
+        """Lista productos ordenados por id_producto a partir de `after`, con filtros opcionales."""
+        pass
+
     @abstractmethod
     def actualizar(self, id_producto: int, producto: Producto) -> Optional[Producto]:
         pass
@@ -29,4 +48,12 @@ class ProductoRepository(ABC):
         si no, abrirá su propia conexión y la manejará.
         Retorna True si se actualizó el stock (suficiente stock), False si no.
         """
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+    def reservar_stock(self, cantidades: Dict[int, int], conn) -> Dict[int, float]:
+        """Descuenta el stock de varios productos de forma atómica usando `conn`
+        (sin commit/rollback). Bloquea las filas en orden de id para evitar deadlocks
+        y retorna el precio de cada producto. Si alguno no alcanza, lanza
+        `StockInsuficienteError` con todos los faltantes y no modifica nada.
+        """
+        raise NotImplementedError()
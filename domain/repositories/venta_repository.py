@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 from domain.entities.venta import Venta
+from domain.entities.pagina import Pagina
 
 class VentaRepository(ABC):
     @abstractmethod
@@ -15,6 +16,19 @@ class VentaRepository(ABC):
     def listar_todos(self) -> List[Venta]:
         pass
 
+    @abstractmethod
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None,
+    ) -> Pagina[Venta]:
+        """Lista ventas ordenadas por id_venta a partir de `after`, con filtros opcionales."""
+        pass
+
     @abstractmethod
     def actualizar(self, id_venta: int, venta: Venta) -> Optional[Venta]:
         pass
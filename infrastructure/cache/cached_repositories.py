@@ -0,0 +1,131 @@
+"""Repositorios de catálogo con caché de lectura (read-through).
+
+Envuelven al repositorio PostgreSQL: las lecturas pasan por la caché y las
+escrituras se delegan e invalidan las entradas afectadas. Las entidades
+cacheadas se comparten entre peticiones y deben tratarse como de solo lectura.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from domain.entities.categoria import Categoria
+from domain.entities.pagina import Pagina
+from domain.entities.producto import Producto
+from domain.repositories.categoria_repository import CategoriaRepository
+from domain.repositories.producto_repository import ProductoRepository
+from infrastructure.cache.ttl_cache import TTLCache
+
+_SIN_CACHE = object()
+
+
+def _es_lista(clave) -> bool:
+    # Claves: ("id", id) para entidades sueltas y ("lista", ...) para listados
+    return clave[0] == "lista"
+
+
+def invalidar_entidad(cache: TTLCache, id_entidad: Optional[int]) -> None:
+    """Invalida una entidad y todos los listados (que pueden contenerla)."""
+    if id_entidad is not None:
+        cache.invalidate(("id", id_entidad))
+    cache.invalidate_where(_es_lista)
+
+
+class CachedProductoRepository(ProductoRepository):
+    def __init__(self, inner: ProductoRepository, cache: TTLCache):
+        self.inner = inner
+        self.cache = cache
+
+    def crear(self, producto: Producto) -> Producto:
+        creado = self.inner.crear(producto)
+        invalidar_entidad(self.cache, creado.id_producto)
+        return creado
+
+    def obtener_por_id(self, id_producto: int, campos: Optional[Sequence[str]] = None) -> Optional[Producto]:
+        if campos:
+            # Las proyecciones no se cachean: se sirve la entidad completa si ya está, si no se lee parcial
+            producto = self.cache.get(("id", id_producto), _SIN_CACHE)
+            return self.inner.obtener_por_id(id_producto, campos=campos) if producto is _SIN_CACHE else producto
+        return self.cache.get_or_load(("id", id_producto), lambda: self.inner.obtener_por_id(id_producto))
+
+    def obtener_por_ids(self, ids: List[int]) -> List[Producto]:
+        encontrados: List[Producto] = []
+        pendientes: List[int] = []
+        for id_producto in ids:
+            producto = self.cache.get(("id", id_producto), _SIN_CACHE)
+            if producto is _SIN_CACHE:
+                pendientes.append(id_producto)
+            elif producto is not None:
+                encontrados.append(producto)
+        if pendientes:
+            # Los que faltan se piden en una sola consulta y se guardan como entradas sueltas
+            generacion = self.cache.generacion_actual()
+            cargados = {p.id_producto: p for p in self.inner.obtener_por_ids(pendientes)}
+            for id_producto in pendientes:
+                self.cache.set(("id", id_producto), cargados.get(id_producto), generacion=generacion)
+            encontrados.extend(cargados.values())
+        return encontrados
+
+    def listar_todos(self) -> List[Producto]:
+        return self.listar_pagina().items
+
+    def listar_pagina(self, limit: Optional[int] = None, after: Optional[int] = None, id_categoria: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Producto]:
+        campos = tuple(sorted(campos)) if campos else None
+        return self.cache.get_or_load(
+            ("lista", limit, after, id_categoria, campos),
+            lambda: self.inner.listar_pagina(limit=limit, after=after, id_categoria=id_categoria, campos=campos)
+        )
+
+    def actualizar(self, id_producto: int, producto: Producto) -> Optional[Producto]:
+        try:
+            return self.inner.actualizar(id_producto, producto)
+        finally:
+            invalidar_entidad(self.cache, id_producto)
+
+    def eliminar(self, id_producto: int) -> bool:
+        try:
+            return self.inner.eliminar(id_producto)
+        finally:
+            invalidar_entidad(self.cache, id_producto)
+
+    def disminuir_stock(self, id_producto: int, cantidad: int, conn=None) -> bool:
+        try:
+            return self.inner.disminuir_stock(id_producto, cantidad, conn=conn)
+        finally:
+            invalidar_entidad(self.cache, id_producto)
+
+    def reservar_stock(self, cantidades: Dict[int, int], conn) -> Dict[int, float]:
+        # El commit lo hace el llamador; el NOTIFY posterior al commit vuelve a invalidar
+        try:
+            return self.inner.reservar_stock(cantidades, conn)
+        finally:
+            for id_producto in cantidades:
+                self.cache.invalidate(("id", id_producto))
+            self.cache.invalidate_where(_es_lista)
+
+
+class CachedCategoriaRepository(CategoriaRepository):
+    def __init__(self, inner: CategoriaRepository, cache: TTLCache):
+        self.inner = inner
+        self.cache = cache
+
+    def crear(self, categoria: Categoria) -> Categoria:
+        creada = self.inner.crear(categoria)
+        invalidar_entidad(self.cache, creada.id_categoria)
+        return creada
+
+    def obtener_por_id(self, id_categoria: int) -> Optional[Categoria]:
+        return self.cache.get_or_load(("id", id_categoria), lambda: self.inner.obtener_por_id(id_categoria))
+
+    def listar_todas(self) -> List[Categoria]:
+        return self.cache.get_or_load(("lista",), self.inner.listar_todas)
+
+    def actualizar(self, id_categoria: int, categoria: Categoria) -> Optional[Categoria]:
+        try:
+            return self.inner.actualizar(id_categoria, categoria)
+        finally:
+            invalidar_entidad(self.cache, id_categoria)
+
+    def eliminar(self, id_categoria: int) -> bool:
+        try:
+            return self.inner.eliminar(id_categoria)
+        finally:
+            invalidar_entidad(self.cache, id_categoria)
@@ -0,0 +1,163 @@
+"""Cachés del catálogo (productos y categorías) e invalidación por LISTEN/NOTIFY.
+
+La base OLTP emite `productos_sync` y `categoria_sync` con payload "op:id" en
+cada escritura (las mismas notificaciones que consume `worker_sync.py`). Un hilo
+con una conexión dedicada escucha esos canales e invalida la entidad y los
+listados afectados apenas se confirma la transacción. El mismo hilo escucha
+los canales `*_sync` de todas las tablas para mantener las versiones de cambio
+que usan los ETags (ver `versiones.py`).
+"""
+
+import logging
+import os
+import select
+import threading
+from typing import Dict, Optional
+
+from psycopg2 import extensions
+
+from domain.repositories.categoria_repository import CategoriaRepository
+from domain.repositories.producto_repository import ProductoRepository
+from infrastructure.cache.cached_repositories import (
+    CachedCategoriaRepository,
+    CachedProductoRepository,
+    invalidar_entidad,
+)
+from infrastructure.cache.ttl_cache import TTLCache
+from infrastructure.cache.versiones import TABLAS, etag_habilitado, versiones
+from infrastructure.database.postgres_connection import get_dedicated_connection
+
+logger = logging.getLogger(__name__)
+
+
+def cache_habilitada() -> bool:
+    return os.getenv("CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def _nueva_cache(nombre: str) -> TTLCache:
+    return TTLCache(
+        max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("CACHE_TTL", "60")),
+        nombre=nombre,
+    )
+
+
+producto_cache = _nueva_cache("productos")
+categoria_cache = _nueva_cache("categoria")
+
+CANALES: Dict[str, TTLCache] = {
+    "productos_sync": producto_cache,
+    "categoria_sync": categoria_cache,
+}
+
+
+def con_cache_productos(repo: ProductoRepository) -> ProductoRepository:
+    return CachedProductoRepository(repo, producto_cache) if cache_habilitada() else repo
+
+
+def con_cache_categorias(repo: CategoriaRepository) -> CategoriaRepository:
+    return CachedCategoriaRepository(repo, categoria_cache) if cache_habilitada() else repo
+
+
+def procesar_notificacion(canal: str, payload: Optional[str]) -> None:
+    """Invalida según una notificación "op:id"; sin id válido se vacía la caché del canal."""
+    tabla = canal[:-len("_sync")] if canal.endswith("_sync") else canal
+    versiones.incrementar(tabla)
+    cache = CANALES.get(canal)
+    if cache is None:
+        return
+    _, _, id_registro = (payload or "").rpartition(":")
+    try:
+        invalidar_entidad(cache, int(id_registro))
+    except ValueError:
+        cache.clear()
+
+
+class InvalidadorNotify(threading.Thread):
+    """Hilo que escucha los canales de `CANALES` y se reconecta si pierde la conexión."""
+
+    def __init__(self, intervalo: float = 5.0, espera_reconexion: float = 2.0):
+        super().__init__(name="cache-invalidador", daemon=True)
+        self.intervalo = intervalo
+        self.espera_reconexion = espera_reconexion
+        self._detener = threading.Event()
+        self.conectado = threading.Event()
+        self.notificaciones = 0
+        self.reconexiones = 0
+
+    def detener(self) -> None:
+        self._detener.set()
+
+    def run(self) -> None:
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = get_dedicated_connection()
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    for tabla in TABLAS:
+                        cur.execute(f"LISTEN {tabla}_sync;")
+                # Mientras no escuchábamos pudo haber escrituras: descartar lo cacheado
+                for cache in CANALES.values():
+                    cache.clear()
+                versiones.incrementar_todas()
+                versiones.marcar_confiable(True)
+                self.conectado.set()
+                self._escuchar(conn)
+            except Exception as e:
+                logger.warning("Invalidador de caché desconectado: %s", e)
+            finally:
+                versiones.marcar_confiable(False)
+                self.conectado.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            if self._detener.wait(self.espera_reconexion):
+                break
+            self.reconexiones += 1
+
+    def _escuchar(self, conn) -> None:
+        while not self._detener.is_set():
+            if select.select([conn], [], [], self.intervalo) == ([], [], []):
+                continue
+            conn.poll()
+            while conn.notifies:
+                notify = conn.notifies.pop(0)
+                self.notificaciones += 1
+                procesar_notificacion(notify.channel, notify.payload)
+
+
+_invalidador: Optional[InvalidadorNotify] = None
+
+
+def iniciar_invalidacion() -> None:
+    """Arranca el hilo LISTEN (idempotente). No hace nada si la caché y los ETags están deshabilitados."""
+    global _invalidador
+    if not (cache_habilitada() or etag_habilitado()) or (_invalidador is not None and _invalidador.is_alive()):
+        return
+    _invalidador = InvalidadorNotify()
+    _invalidador.start()
+
+
+def detener_invalidacion() -> None:
+    global _invalidador
+    invalidador, _invalidador = _invalidador, None
+    if invalidador is not None:
+        invalidador.detener()
+
+
+def estadisticas_cache() -> dict:
+    """Hit/miss por caché, estado del listener de invalidación y versiones de tablas."""
+    data = {nombre: cache.stats() for nombre, cache in
+            (("productos", producto_cache), ("categoria", categoria_cache))}
+    data["habilitada"] = cache_habilitada()
+    data["invalidador"] = {
+        "activo": _invalidador is not None and _invalidador.is_alive(),
+        "conectado": _invalidador is not None and _invalidador.conectado.is_set(),
+        "notificaciones": _invalidador.notificaciones if _invalidador else 0,
+        "reconexiones": _invalidador.reconexiones if _invalidador else 0,
+    }
+    data["versiones"] = versiones.stats()
+    return data
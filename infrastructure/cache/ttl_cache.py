@@ -0,0 +1,152 @@
+"""Caché en memoria LRU con expiración (TTL) y protección contra estampidas.
+
+Cuando varias peticiones piden la misma clave ausente, solo una ejecuta el
+`loader` (single-flight); las demás esperan su resultado. Una invalidación que
+llega mientras se carga una clave impide guardar ese valor, que podría ser
+anterior a la escritura que originó la invalidación.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_AUSENTE = object()
+
+
+class _Carga:
+    """Carga en curso de una clave, compartida por todos los que la esperan."""
+
+    __slots__ = ("evento", "valor", "error")
+
+    def __init__(self) -> None:
+        self.evento = threading.Event()
+        self.valor: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, nombre: str = "cache") -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries debe ser >= 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._cargas: Dict[Hashable, _Carga] = {}
+        # Se incrementa en cada invalidación; una carga solo se guarda si no cambió
+        self._generacion = 0
+        self._stats = {"hits": 0, "misses": 0, "loads": 0, "coalesced": 0,
+                       "evictions": 0, "expirations": 0, "invalidations": 0, "load_errors": 0}
+
+    def get(self, clave: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            valor = self._leer_locked(clave)
+            if valor is _AUSENTE:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return valor
+
+    def get_or_load(self, clave: Hashable, loader: Callable[[], Any]) -> Any:
+        """Retorna el valor cacheado o lo carga con `loader` una sola vez por clave."""
+        with self._lock:
+            valor = self._leer_locked(clave)
+            if valor is not _AUSENTE:
+                self._stats["hits"] += 1
+                return valor
+            self._stats["misses"] += 1
+            carga = self._cargas.get(clave)
+            propia = carga is None
+            if propia:
+                carga = _Carga()
+                self._cargas[clave] = carga
+                generacion = self._generacion
+            else:
+                self._stats["coalesced"] += 1
+
+        if not propia:
+            carga.evento.wait()
+            if carga.error is not None:
+                raise carga.error
+            return carga.valor
+
+        try:
+            carga.valor = loader()
+        except BaseException as e:
+            carga.error = e
+            with self._lock:
+                self._stats["load_errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._cargas.pop(clave, None)
+                if carga.error is None:
+                    self._stats["loads"] += 1
+                    if generacion == self._generacion:
+                        self._guardar_locked(clave, carga.valor)
+            carga.evento.set()
+        return carga.valor
+
+    def set(self, clave: Hashable, valor: Any, generacion: Optional[int] = None) -> bool:
+        """Guarda `valor`. Con `generacion` (ver `generacion_actual`) no guarda nada si
+        hubo una invalidación desde entonces; retorna si lo guardó."""
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return False
+            self._guardar_locked(clave, valor)
+            return True
+
+    def generacion_actual(self) -> int:
+        with self._lock:
+            return self._generacion
+
+    def invalidate(self, clave: Hashable) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._stats["invalidations"] += 1
+            self._datos.pop(clave, None)
+
+    def invalidate_where(self, predicado: Callable[[Hashable], bool]) -> int:
+        """Elimina todas las claves que cumplan `predicado`. Retorna cuántas eliminó."""
+        with self._lock:
+            self._generacion += 1
+            self._stats["invalidations"] += 1
+            claves = [c for c in self._datos if predicado(c)]
+            for c in claves:
+                del self._datos[c]
+            return len(claves)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._stats["invalidations"] += 1
+            self._datos.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            data = dict(self._stats)
+            data.update(entries=len(self._datos), max_entries=self.max_entries, ttl=self.ttl)
+        consultas = data["hits"] + data["misses"]
+        data["hit_ratio"] = data["hits"] / consultas if consultas else 0.0
+        return data
+
+    def _leer_locked(self, clave: Hashable) -> Any:
+        item = self._datos.get(clave)
+        if item is None:
+            return _AUSENTE
+        valor, expira = item
+        if expira <= time.monotonic():
+            del self._datos[clave]
+            self._stats["expirations"] += 1
+            return _AUSENTE
+        self._datos.move_to_end(clave)
+        return valor
+
+    def _guardar_locked(self, clave: Hashable, valor: Any) -> None:
+        self._datos[clave] = (valor, time.monotonic() + self.ttl)
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_entries:
+            self._datos.popitem(last=False)
+            self._stats["evictions"] += 1
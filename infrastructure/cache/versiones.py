@@ -0,0 +1,68 @@
+"""Versiones de cambio por tabla para ETags y GET condicionales.
+
+Cada tabla OLTP tiene un contador que se incrementa al confirmar una escritura
+desde los repositorios y al recibir su notificación `<tabla>_sync` (escrituras
+de otros procesos o externas a la API). La versión lleva además una época
+aleatoria por proceso, de modo que un reinicio nunca reutiliza una versión
+anterior.
+
+Las versiones solo son confiables mientras el listener de notificaciones está
+conectado: sin él no nos enteraríamos de escrituras hechas fuera de este
+proceso, así que `version()` retorna None y los endpoints responden sin ETag.
+"""
+
+import os
+import threading
+import uuid
+from typing import Dict, Optional
+
+TABLAS = ("ventas", "productos", "clientes", "categoria", "orden", "orden_producto")
+
+
+def etag_habilitado() -> bool:
+    return os.getenv("ETAG_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+class VersionesTablas:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._epoca = uuid.uuid4().hex[:8]
+        self._versiones: Dict[str, int] = {tabla: 0 for tabla in TABLAS}
+        self._confiable = threading.Event()
+
+    def incrementar(self, *tablas: str) -> None:
+        with self._lock:
+            for tabla in tablas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    def incrementar_todas(self) -> None:
+        with self._lock:
+            for tabla in self._versiones:
+                self._versiones[tabla] += 1
+
+    def marcar_confiable(self, confiable: bool) -> None:
+        if confiable:
+            self._confiable.set()
+        else:
+            self._confiable.clear()
+
+    def version(self, *tablas: str) -> Optional[str]:
+        """Versión combinada de `tablas` (p. ej. "3f9a01bc-12.4") o None si no es confiable."""
+        if not self._confiable.is_set():
+            return None
+        with self._lock:
+            contadores = ".".join(str(self._versiones.get(tabla, 0)) for tabla in tablas)
+        return f"{self._epoca}-{contadores}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._versiones)
+        return {"epoca": self._epoca, "confiable": self._confiable.is_set(), "versiones": data}
+
+
+versiones = VersionesTablas()
+
+
+def registrar_escritura(*tablas: str) -> None:
+    """Llamar tras un commit que modificó `tablas`."""
+    versiones.incrementar(*tablas)
@@ -0,0 +1,22 @@
+"""Utilidades compartidas por las inserciones masivas de los repositorios."""
+
+import os
+from typing import Iterable, Set
+
+# Filas por sentencia INSERT ... VALUES generada por execute_values
+BULK_PAGE_SIZE = int(os.getenv("DB_BULK_PAGE_SIZE", "1000"))
+
+
+def ids_existentes(cursor, tabla: str, columna: str, ids: Iterable[int]) -> Set[int]:
+    """Retorna cuáles de `ids` existen (y no están eliminados) en `tabla` con una sola consulta.
+
+    `tabla` y `columna` son constantes del repositorio, nunca entrada del cliente.
+    """
+    ids = sorted({i for i in ids if i is not None})
+    if not ids:
+        return set()
+    cursor.execute(
+        f"SELECT {columna} AS id FROM {tabla} WHERE {columna} = ANY(%s) AND (eliminado IS NULL OR eliminado = FALSE);",
+        (ids,),
+    )
+    return {row['id'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()}
@@ -0,0 +1,361 @@
+"""Pool de conexiones PostgreSQL compartido por todo el proceso.
+
+Los repositorios siguen llamando a `get_db_connection()` y `conn.close()`;
+la conexión que reciben es un `PooledConnection` cuyo `close()` la devuelve
+al pool en lugar de cerrar el socket.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ConnectionPool", "PooledConnection", "PoolTimeoutError"]
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión libre dentro del tiempo de espera configurado."""
+
+
+class _PoolEntry:
+    """Conexión física más los metadatos que el pool necesita para reciclarla."""
+
+    __slots__ = ("raw", "created_at", "last_used")
+
+    def __init__(self, raw) -> None:
+        now = time.monotonic()
+        self.raw = raw
+        self.created_at = now
+        self.last_used = now
+
+
+class PooledConnection:
+    """Envoltorio de una conexión del pool.
+
+    Delega todo en la conexión psycopg2 real salvo `close()`, que la devuelve
+    al pool. Después de cerrarla, cualquier uso lanza `psycopg2.InterfaceError`.
+    """
+
+    def __init__(self, pool: "ConnectionPool", entry: _PoolEntry) -> None:
+        self._pool = pool
+        self._entry: Optional[_PoolEntry] = entry
+
+    @property
+    def raw(self):
+        if self._entry is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return self._entry.raw
+
+    @property
+    def closed(self) -> int:
+        if self._entry is None:
+            return 1
+        return self._entry.raw.closed
+
+    def close(self) -> None:
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.raw, name)
+
+    def __enter__(self):
+        return self.raw.__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        return self.raw.__exit__(exc_type, exc, tb)
+
+    def __del__(self):
+        # Red de seguridad: si alguien olvida close(), no perder la conexión
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Pool de conexiones con tamaño mínimo/máximo, timeout de espera y reciclado.
+
+    - `min_size`: conexiones que se mantienen abiertas aunque estén ociosas.
+    - `max_size`: límite de conexiones simultáneas (en uso + libres).
+    - `acquire_timeout`: segundos máximos esperando una conexión libre.
+    - `max_idle`: segundos ociosa antes de cerrarse (por encima de `min_size`).
+    - `max_lifetime`: segundos de vida máxima de una conexión física.
+    - `health_check_after`: si la conexión estuvo ociosa más que esto, se valida
+      con `SELECT 1` antes de entregarla.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 10.0,
+        max_idle: float = 300.0,
+        max_lifetime: float = 3600.0,
+        health_check_after: float = 30.0,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size debe ser >= 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size debe estar entre 0 y max_size")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        self._idle: Deque[_PoolEntry] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Estadísticas acumuladas
+        self._stats = {
+            "checkouts": 0,
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "health_check_failures": 0,
+            "resets": 0,
+            "timeouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "checkout_time_total": 0.0,
+            "checkout_time_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+
+    def getconn(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Entrega una conexión sana del pool, abriendo una nueva si hace falta."""
+        started = time.monotonic()
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = started + timeout
+        waited = 0.0
+
+        while True:
+            entry = None
+            must_open = False
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("connection pool is closed")
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"No hay conexiones libres tras {timeout:.1f}s "
+                            f"(en uso={self._in_use}, max={self.max_size})"
+                        )
+                    self._waiting += 1
+                    wait_started = time.monotonic()
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                        waited += time.monotonic() - wait_started
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    # Reservar el hueco antes de conectar fuera del lock
+                    self._size += 1
+                    must_open = True
+                self._in_use += 1
+
+            if must_open:
+                try:
+                    entry = self._open_entry()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(entry):
+                # Conexión caducada o rota: descartarla y probar con otra
+                self._discard(entry, in_use=True)
+                continue
+
+            self._record_checkout(started, waited)
+            return PooledConnection(self, entry)
+
+    def prewarm(self) -> int:
+        """Abre conexiones hasta alcanzar `min_size`. Retorna cuántas abrió."""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return opened
+                self._size += 1
+            try:
+                entry = self._open_entry()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+            opened += 1
+
+    def close_all(self) -> None:
+        """Cierra las conexiones libres y marca el pool como cerrado."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_raw(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        """Instantánea de uso del pool y de los tiempos de espera/checkout."""
+        with self._cond:
+            data = dict(self._stats)
+            data.update(
+                size=self._size,
+                in_use=self._in_use,
+                idle=len(self._idle),
+                waiting=self._waiting,
+                min_size=self.min_size,
+                max_size=self.max_size,
+            )
+        checkouts = data["checkouts"] or 1
+        data["wait_time_avg"] = data["wait_time_total"] / max(data["waits"], 1)
+        data["checkout_time_avg"] = data["checkout_time_total"] / checkouts
+        return data
+
+    # ------------------------------------------------------------------
+    # Utilidades internas
+    # ------------------------------------------------------------------
+
+    def _open_entry(self) -> _PoolEntry:
+        raw = self._connect()
+        with self._cond:
+            self._stats["connections_opened"] += 1
+        return _PoolEntry(raw)
+
+    def _is_usable(self, entry: _PoolEntry) -> bool:
+        if entry.raw.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - entry.created_at > self.max_lifetime:
+            return False
+        if now - entry.last_used > self.health_check_after:
+            try:
+                with entry.raw.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                entry.raw.rollback()
+            except Exception:
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                logger.warning("Conexión del pool descartada: falló el health check")
+                return False
+        return True
+
+    def _release(self, entry: _PoolEntry) -> None:
+        raw = entry.raw
+        healthy = not raw.closed
+        if healthy:
+            try:
+                status = raw.get_transaction_status()
+                if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                    healthy = False
+                elif status != extensions.TRANSACTION_STATUS_IDLE:
+                    # Transacción abierta o abortada (lecturas sin commit, errores): limpiar
+                    raw.rollback()
+                    with self._cond:
+                        self._stats["resets"] += 1
+            except Exception:
+                healthy = False
+
+        if not healthy:
+            self._discard(entry, in_use=True)
+            return
+
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if self._closed:
+                self._size -= 1
+                close_now = True
+            else:
+                self._idle.append(entry)
+                close_now = False
+                self._prune_idle_locked()
+            self._cond.notify()
+        if close_now:
+            self._close_raw(entry)
+
+    def _prune_idle_locked(self) -> None:
+        """Cierra conexiones ociosas por encima de `min_size` (llamar con el lock)."""
+        if not self.max_idle:
+            return
+        now = time.monotonic()
+        # Las más antiguas están al principio de la deque
+        while self._idle and self._size > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used <= self.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            threading.Thread(target=self._close_raw, args=(oldest,), daemon=True).start()
+
+    def _discard(self, entry: _PoolEntry, *, in_use: bool) -> None:
+        with self._cond:
+            self._size -= 1
+            if in_use:
+                self._in_use -= 1
+            self._cond.notify()
+        self._close_raw(entry)
+
+    def _close_raw(self, entry: _PoolEntry) -> None:
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["connections_closed"] += 1
+
+    def _record_checkout(self, started: float, waited: float) -> None:
+        elapsed = time.monotonic() - started
+        with self._cond:
+            stats = self._stats
+            stats["checkouts"] += 1
+            stats["checkout_time_total"] += elapsed
+            stats["checkout_time_max"] = max(stats["checkout_time_max"], elapsed)
+            if waited > 0:
+                stats["waits"] += 1
+                stats["wait_time_total"] += waited
+                stats["wait_time_max"] = max(stats["wait_time_max"], waited)
+
+
+def pool_settings_from_env() -> Dict[str, Any]:
+    """Lee la configuración del pool desde variables de entorno (DB_POOL_*)."""
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX", "10")),
+        "acquire_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        "health_check_after": float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", "30")),
+    }
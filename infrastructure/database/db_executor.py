@@ -0,0 +1,58 @@
+"""Executor acotado para ejecutar el acceso a datos (psycopg2, bloqueante) fuera del event loop.
+
+Los controllers son `async def`; si llaman a los repositorios directamente, una
+consulta lenta bloquea el loop de uvicorn y serializa todas las peticiones del
+worker. `run_in_db_executor` ejecuta el caso de uso completo en un hilo de un
+pool acotado, de modo que las peticiones concurrentes solapan sus round-trips
+a la base de datos. El tamaño por defecto coincide con `DB_POOL_MAX` para que
+ningún hilo quede esperando una conexión del pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _default_workers() -> int:
+    explicit = os.getenv("DB_EXECUTOR_WORKERS")
+    if explicit:
+        return max(1, int(explicit))
+    return max(1, int(os.getenv("DB_POOL_MAX", "10")))
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Retorna el executor del proceso, creándolo la primera vez."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_default_workers(), thread_name_prefix="db")
+    return _executor
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+async def run_in_db_executor(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta `fn(*args, **kwargs)` en el executor de base de datos y espera su resultado.
+
+    Propaga las `contextvars` de la petición al hilo de trabajo.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_db_executor(), call)
@@ -1,11 +1,19 @@
+import logging
 import os
+import threading
 import psycopg2
 from config import DB_CONFIG
-from psycopg2.extras import RealDictCursor
+from infrastructure.database.connection_pool import ConnectionPool, pool_settings_from_env
+from infrastructure.metricas.consultas import RealDictCursorMedido, registrar_conexion
 
+logger = logging.getLogger(__name__)
 
-def get_db_connection():
-    """Establece y retorna una conexión a PostgreSQL.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connect():
+    """Abre una conexión física nueva a PostgreSQL.
 
     Prioriza (en este orden): RAILWAY_DATABASE_URL, DATABASE_URL, y luego
     la configuración por componentes definida en `DB_CONFIG`.
@@ -17,14 +25,80 @@ def get_db_connection():
         database_url = database_url.replace('[', '').replace(']', '')
         sslmode = os.getenv('DB_SSLMODE', 'require')
         try:
-            # Asegurar que el cursor devuelva diccionarios como el fallback
-            return psycopg2.connect(database_url, sslmode=sslmode, cursor_factory=RealDictCursor)
+            # Asegurar que el cursor devuelva diccionarios como el fallback (con execute medido)
+            conn = psycopg2.connect(database_url, sslmode=sslmode, cursor_factory=RealDictCursorMedido)
+            registrar_conexion()
+            return conn
         except Exception as e:
             raise Exception(f"Error al conectar a PostgreSQL usando DATABASE_URL: {e}")
 
     # Fallback: usar configuración por componentes (host, user, ...)
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
+        conn = psycopg2.connect(**{**DB_CONFIG, "cursor_factory": RealDictCursorMedido})
+        registrar_conexion()
         return conn
     except Exception as e:
-        raise Exception(f"Error al conectar a PostgreSQL (DB_CONFIG): {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error al conectar a PostgreSQL (DB_CONFIG): {str(e)}")
+
+
+def get_pool() -> ConnectionPool:
+    """Retorna el pool de conexiones del proceso, creándolo la primera vez."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect, **pool_settings_from_env())
+    return _pool
+
+
+def close_pool() -> None:
+    """Cierra el pool del proceso (p. ej. en el shutdown de la API)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
+
+
+def get_pool_stats() -> dict:
+    """Estadísticas en vivo del pool (en uso, esperas, latencia de checkout)."""
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+
+def pool_habilitado() -> bool:
+    return os.getenv('DB_POOL_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+
+def precalentar_pool() -> int:
+    """Abre las `DB_POOL_MIN` conexiones iniciales. Pensado para correr en segundo plano
+    durante el arranque: si la base no responde, solo se registra y la API sigue."""
+    if not pool_habilitado():
+        return 0
+    try:
+        abiertas = get_pool().prewarm()
+        logger.info("Pool precalentado: %d conexiones abiertas", abiertas)
+        return abiertas
+    except Exception as e:
+        logger.warning("No se pudo precalentar el pool de conexiones: %s", e)
+        return 0
+
+
+def get_dedicated_connection():
+    """Abre una conexión física propia, fuera del pool (LISTEN u otras de larga duración).
+
+    El llamador es responsable de cerrarla.
+    """
+    return _connect()
+
+
+def get_db_connection():
+    """Retorna una conexión a PostgreSQL tomada del pool compartido.
+
+    Se usa igual que una conexión psycopg2: `conn.close()` la devuelve al pool.
+    Con DB_POOL_ENABLED=false se abre una conexión física por llamada.
+    """
+    if not pool_habilitado():
+        return _connect()
+    return get_pool().getconn()
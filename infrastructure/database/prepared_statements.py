@@ -0,0 +1,113 @@
+"""Registro de sentencias preparadas del lado del servidor para las consultas calientes.
+
+Cada repositorio registra sus consultas más frecuentes con `registrar()`. La
+primera vez que una conexión física ejecuta una sentencia se envía
+`PREPARE nombre AS ...`; las siguientes usan `EXECUTE nombre(...)`, con lo que
+PostgreSQL reutiliza el análisis y el plan en lugar de recalcularlos.
+
+Qué sentencias tiene preparadas cada conexión se guarda por conexión física
+(referencia débil): cuando el pool recicla una conexión, la nueva empieza sin
+sentencias y se preparan de nuevo. Si el servidor perdió una sentencia (p. ej.
+`DISCARD ALL` o un pooler externo), se vuelve a preparar de forma transparente.
+Con DB_PREPARED_STATEMENTS=false se ejecuta el SQL normal.
+"""
+
+import os
+import re
+import threading
+import weakref
+from typing import Any, Dict, Sequence, Set
+
+from psycopg2 import errors, extensions
+
+_PARAMETRO = re.compile(r"\$(\d+)")
+
+
+class SentenciaPreparada:
+    __slots__ = ("nombre", "sql", "sql_directo", "sql_prepare", "sql_execute")
+
+    def __init__(self, nombre: str, sql: str) -> None:
+        n_params = max((int(n) for n in _PARAMETRO.findall(sql)), default=0)
+        self.nombre = nombre
+        self.sql = sql
+        # Misma consulta con marcadores nombrados de psycopg2 (admite repetir $n), para el modo sin preparar
+        self.sql_directo = _PARAMETRO.sub(r"%(p\1)s", sql.replace("%", "%%"))
+        self.sql_prepare = f"PREPARE {nombre} AS {sql}"
+        marcadores = ", ".join(["%s"] * n_params)
+        self.sql_execute = f"EXECUTE {nombre}({marcadores})" if n_params else f"EXECUTE {nombre}"
+
+
+_registro: Dict[str, SentenciaPreparada] = {}
+_preparadas: "weakref.WeakKeyDictionary[Any, Set[str]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+_stats = {"prepares": 0, "hits": 0, "reprepares": 0, "directas": 0}
+_por_sentencia: Dict[str, Dict[str, int]] = {}
+
+
+def habilitadas() -> bool:
+    return os.getenv("DB_PREPARED_STATEMENTS", "true").lower() not in ("0", "false", "no")
+
+
+def registrar(nombre: str, sql: str) -> SentenciaPreparada:
+    """Registra una sentencia con parámetros `$1..$n`. El nombre debe ser único."""
+    sentencia = SentenciaPreparada(nombre, sql.strip().rstrip(";"))
+    with _lock:
+        existente = _registro.get(nombre)
+        if existente is not None and existente.sql != sentencia.sql:
+            raise ValueError(f"Sentencia preparada '{nombre}' registrada con SQL distinto")
+        _registro[nombre] = sentencia
+        _por_sentencia.setdefault(nombre, {"prepares": 0, "hits": 0})
+    return sentencia
+
+
+def _contar(clave: str, nombre: str = None) -> None:
+    with _lock:
+        _stats[clave] += 1
+        if nombre is not None and clave in ("prepares", "hits"):
+            _por_sentencia[nombre][clave] += 1
+
+
+def ejecutar(cursor, sentencia: SentenciaPreparada, params: Sequence[Any] = ()) -> None:
+    """Ejecuta `sentencia` en `cursor`; el resultado se lee del cursor como siempre."""
+    if not habilitadas():
+        _contar("directas")
+        cursor.execute(sentencia.sql_directo, {f"p{i}": v for i, v in enumerate(params, 1)})
+        return
+
+    conn = cursor.connection
+    with _lock:
+        preparadas = _preparadas.setdefault(conn, set())
+    if sentencia.nombre not in preparadas:
+        cursor.execute(sentencia.sql_prepare)
+        preparadas.add(sentencia.nombre)
+        _contar("prepares", sentencia.nombre)
+        cursor.execute(sentencia.sql_execute, params)
+        return
+
+    # Solo es seguro reintentar si el EXECUTE abre la transacción (no hay trabajo previo que perder)
+    al_inicio = conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+    try:
+        cursor.execute(sentencia.sql_execute, params)
+        _contar("hits", sentencia.nombre)
+    except errors.InvalidSqlStatementName:
+        preparadas.discard(sentencia.nombre)
+        if not al_inicio:
+            raise
+        conn.rollback()
+        _contar("reprepares")
+        cursor.execute(sentencia.sql_prepare)
+        preparadas.add(sentencia.nombre)
+        _contar("prepares", sentencia.nombre)
+        cursor.execute(sentencia.sql_execute, params)
+
+
+def estadisticas() -> Dict[str, Any]:
+    """Contadores globales y por sentencia; `hit_ratio` = ejecuciones con plan ya preparado."""
+    with _lock:
+        data: Dict[str, Any] = dict(_stats)
+        data["por_sentencia"] = {nombre: dict(c) for nombre, c in _por_sentencia.items()}
+        data["conexiones"] = len(_preparadas)
+    total = data["prepares"] + data["hits"]
+    data["hit_ratio"] = data["hits"] / total if total else 0.0
+    data["habilitadas"] = habilitadas()
+    return data
@@ -0,0 +1,36 @@
+"""Reintento de transacciones que PostgreSQL aborta por conflictos de concurrencia."""
+
+import logging
+import random
+import time
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# serialization_failure y deadlock_detected: la transacción se puede repetir completa
+SQLSTATE_REINTENTABLES = frozenset({"40001", "40P01"})
+
+
+def es_reintentable(error: BaseException) -> bool:
+    return getattr(error, "pgcode", None) in SQLSTATE_REINTENTABLES
+
+
+def con_reintentos(fn: Callable[..., T], *args: Any, intentos: int = 3, espera_base: float = 0.05, **kwargs: Any) -> T:
+    """Ejecuta `fn` y la repite si falla por serialización o deadlock.
+
+    `fn` debe abrir y cerrar su propia transacción, porque cada intento empieza de cero.
+    La espera crece exponencialmente con algo de aleatoriedad para desincronizar a los
+    competidores.
+    """
+    for intento in range(1, intentos + 1):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            if intento >= intentos or not es_reintentable(e):
+                raise
+            espera = espera_base * (2 ** (intento - 1)) * (0.5 + random.random())
+            logger.warning("Transacción abortada (%s), reintento %d/%d en %.3fs", e.pgcode, intento, intentos - 1, espera)
+            time.sleep(espera)
+    raise AssertionError("inalcanzable")
@@ -0,0 +1,89 @@
+"""Instrumentación del acceso a datos: consultas, tiempo en `execute` y conexiones.
+
+Las conexiones se abren con cursores medidos (`CursorMedido`,
+`RealDictCursorMedido`), de modo que todo `execute`/`executemany` de los
+repositorios queda contado sin tocarlos. Los totales globales van al registro
+de métricas; además, si la petición HTTP en curso abrió un `EstadoPeticion`
+(el middleware lo hace), se acumulan ahí para atribuirlos a su ruta. El estado
+viaja en una contextvar, que `run_in_db_executor` propaga al hilo de trabajo.
+"""
+
+import contextvars
+import time
+from typing import Optional
+
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+from infrastructure.metricas.registro import registro
+
+BUCKETS_CONSULTA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+consultas_total = registro.contador("db_queries_total", "Sentencias ejecutadas con cursor.execute/executemany.")
+duracion_consulta = registro.histograma(
+    "db_query_duration_seconds", "Tiempo de pared dentro de cursor.execute.", buckets=BUCKETS_CONSULTA
+)
+errores_consulta = registro.contador("db_query_errors_total", "Sentencias que lanzaron una excepción.")
+conexiones_abiertas = registro.contador("db_connections_opened_total", "Conexiones físicas abiertas a PostgreSQL.")
+
+
+class EstadoPeticion:
+    __slots__ = ("consultas", "segundos_db", "conexiones")
+
+    def __init__(self) -> None:
+        self.consultas = 0
+        self.segundos_db = 0.0
+        self.conexiones = 0
+
+
+_estado: contextvars.ContextVar[Optional[EstadoPeticion]] = contextvars.ContextVar("estado_peticion_db", default=None)
+
+
+def iniciar_peticion() -> contextvars.Token:
+    return _estado.set(EstadoPeticion())
+
+
+def terminar_peticion(token: contextvars.Token) -> Optional[EstadoPeticion]:
+    estado = _estado.get()
+    _estado.reset(token)
+    return estado
+
+
+def registrar_conexion() -> None:
+    conexiones_abiertas.inc()
+    estado = _estado.get()
+    if estado is not None:
+        estado.conexiones += 1
+
+
+def _medir(execute, cursor, query, vars):
+    inicio = time.perf_counter()
+    try:
+        return execute(cursor, query, vars)
+    except Exception:
+        errores_consulta.inc()
+        raise
+    finally:
+        transcurrido = time.perf_counter() - inicio
+        consultas_total.inc()
+        duracion_consulta.observar(transcurrido)
+        estado = _estado.get()
+        if estado is not None:
+            estado.consultas += 1
+            estado.segundos_db += transcurrido
+
+
+class CursorMedido(extensions.cursor):
+    def execute(self, query, vars=None):
+        return _medir(extensions.cursor.execute, self, query, vars)
+
+    def executemany(self, query, vars_list):
+        return _medir(extensions.cursor.executemany, self, query, vars_list)
+
+
+class RealDictCursorMedido(RealDictCursor):
+    def execute(self, query, vars=None):
+        return _medir(RealDictCursor.execute, self, query, vars)
+
+    def executemany(self, query, vars_list):
+        return _medir(RealDictCursor.executemany, self, query, vars_list)
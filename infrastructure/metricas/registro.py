@@ -0,0 +1,184 @@
+"""Registro de métricas en memoria con salida en formato de texto de Prometheus.
+
+Contadores, gauges e histogramas con etiquetas, sin dependencias externas.
+Los valores viven en el proceso: con varios workers de uvicorn, Prometheus
+debe raspar cada uno (o agregarlos por instancia).
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+Etiquetas = Tuple[str, ...]
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escapar(valor: str) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatear_etiquetas(nombres: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(nombres, valores)]
+    if extra:
+        partes.append(extra)
+    return "{" + ",".join(partes) + "}" if partes else ""
+
+
+def _numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> None:
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def _clave(self, valores: Sequence[str]) -> Etiquetas:
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre}: se esperaban etiquetas {self.etiquetas}")
+        return tuple(str(v) for v in valores)
+
+    def cabecera(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Sin etiquetas la serie existe desde el inicio (se expone en 0)
+        self._valores: Dict[Etiquetas, float] = {} if self.etiquetas else {(): 0}
+
+    def inc(self, *etiquetas: str, valor: float = 1) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valor(self, *etiquetas: str) -> float:
+        with self._lock:
+            return self._valores.get(self._clave(etiquetas), 0)
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._valores.items())
+        return self.cabecera() + [
+            f"{self.nombre}{_formatear_etiquetas(self.etiquetas, k)} {_numero(v)}" for k, v in items
+        ]
+
+
+class Gauge(Contador):
+    tipo = "gauge"
+
+    def dec(self, *etiquetas: str, valor: float = 1) -> None:
+        self.inc(*etiquetas, valor=-valor)
+
+    def set(self, *etiquetas: str, valor: float) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                 buckets: Sequence[float] = BUCKETS_LATENCIA) -> None:
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # Por etiquetas: [conteos por bucket (no acumulados)..., +Inf], suma
+        self._series: Dict[Etiquetas, Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valor: float, *etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][indice] += 1
+            serie[1][0] += valor
+
+    def conteo(self, *etiquetas: str) -> int:
+        with self._lock:
+            serie = self._series.get(self._clave(etiquetas))
+            return sum(serie[0]) if serie else 0
+
+    def exponer(self) -> List[str]:
+        with self._lock:
+            series = sorted((k, (list(c), s[0])) for k, (c, s) in self._series.items())
+        lineas = self.cabecera()
+        for clave, (conteos, suma) in series:
+            acumulado = 0
+            for limite, conteo in zip(self.buckets + (float("inf"),), conteos):
+                acumulado += conteo
+                le = f'le="{_numero(limite)}"'
+                lineas.append(f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, clave, le)} {acumulado}")
+            lineas.append(f"{self.nombre}_sum{_formatear_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+            lineas.append(f"{self.nombre}_count{_formatear_etiquetas(self.etiquetas, clave)} {acumulado}")
+        return lineas
+
+
+class Registro:
+    """Conjunto de métricas más colectores que leen gauges en el momento de exponer."""
+
+    def __init__(self) -> None:
+        self._metricas: Dict[str, _Metrica] = {}
+        self._colectores: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        with self._lock:
+            existente = self._metricas.get(metrica.nombre)
+            if existente is not None:
+                return existente
+            self._metricas[metrica.nombre] = metrica
+            return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def gauge(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()) -> Gauge:
+        return self._registrar(Gauge(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (),
+                   buckets: Sequence[float] = BUCKETS_LATENCIA) -> Histograma:
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def colector(self, fn: Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]):
+        """Registra `fn`, que retorna tuplas (nombre, tipo, ayuda, etiquetas, valor) al exponer."""
+        with self._lock:
+            self._colectores.append(fn)
+        return fn
+
+    def exponer(self) -> str:
+        with self._lock:
+            metricas = list(self._metricas.values())
+            colectores = list(self._colectores)
+        lineas: List[str] = []
+        for metrica in metricas:
+            lineas.extend(metrica.exponer())
+        vistos: Dict[str, bool] = {}
+        for colector in colectores:
+            try:
+                muestras = list(colector())
+            except Exception:
+                # Un colector roto (p. ej. pool sin inicializar) no debe tumbar /metrics
+                continue
+            for nombre, tipo, ayuda, etiquetas, valor in muestras:
+                if nombre not in vistos:
+                    vistos[nombre] = True
+                    lineas.append(f"# HELP {nombre} {ayuda}")
+                    lineas.append(f"# TYPE {nombre} {tipo}")
+                lineas.append(f"{nombre}{_formatear_etiquetas(list(etiquetas), list(etiquetas.values()))} {_numero(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
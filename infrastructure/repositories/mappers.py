@@ -0,0 +1,110 @@
+"""Mapeo compacto fila -> entidad para los repositorios PostgreSQL.
+
+Cada entidad declara sus columnas en el mismo orden que los campos del
+dataclass. Las consultas seleccionan exactamente esas columnas con un cursor de
+tuplas, y la entidad se construye de forma posicional (`Entidad(*fila)`): no se
+crea un dict por fila ni se busca cada campo por nombre.
+"""
+
+from dataclasses import fields
+from itertools import starmap
+from typing import Callable, Dict, Generic, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from infrastructure.metricas.consultas import CursorMedido
+
+from domain.entities.categoria import Categoria
+from domain.entities.cliente import Cliente
+from domain.entities.orden import Orden
+from domain.entities.orden_producto import OrdenProducto
+from domain.entities.producto import Producto
+from domain.entities.venta import Venta
+
+T = TypeVar("T")
+
+
+def cursor_tuplas(conn):
+    """Cursor que devuelve tuplas aunque la conexión use RealDictCursor por defecto."""
+    return conn.cursor(cursor_factory=CursorMedido)
+
+
+class MapeoFila(Generic[T]):
+    """Columnas explícitas de una entidad y su constructor posicional.
+
+    - `expresiones`: SQL a usar para una columna cuyo nombre en la tabla difiere
+      del campo (p. ej. identificadores con mayúsculas).
+    - `ajustar`: corrección opcional sobre la entidad ya construida.
+
+    `proyeccion(campos)` retorna el mapeo de un subconjunto de columnas para
+    empujar `?fields=` al SELECT; la primera columna (la clave) siempre se incluye.
+    """
+
+    __slots__ = ("entidad", "columnas", "select", "_ajustar", "_expresiones", "_crear", "_proyecciones")
+
+    def __init__(
+        self,
+        entidad: Type[T],
+        expresiones: Optional[Dict[str, str]] = None,
+        ajustar: Optional[Callable[[T], None]] = None,
+    ) -> None:
+        expresiones = expresiones or {}
+        self.entidad = entidad
+        self.columnas = tuple(f.name for f in fields(entidad))
+        self.select = ", ".join(expresiones.get(c, c) for c in self.columnas)
+        self._ajustar = ajustar
+        self._expresiones = expresiones
+        self._crear: Callable[..., T] = entidad
+        self._proyecciones: Dict[Tuple[str, ...], "MapeoFila[T]"] = {}
+
+    def proyeccion(self, campos: Optional[Iterable[str]]) -> "MapeoFila[T]":
+        """Mapeo que solo lee `campos`; los demás campos de la entidad quedan con su
+        valor por defecto. Sin `campos` (o con todos) retorna el mapeo completo."""
+        if not campos:
+            return self
+        pedidos = set(campos)
+        desconocidos = pedidos.difference(self.columnas)
+        if desconocidos:
+            raise ValueError(f"Campos desconocidos para {self.entidad.__name__}: {sorted(desconocidos)}")
+        columnas = tuple(c for i, c in enumerate(self.columnas) if i == 0 or c in pedidos)
+        if columnas == self.columnas:
+            return self
+        mapeo = self._proyecciones.get(columnas)
+        if mapeo is None:
+            mapeo = MapeoFila(self.entidad, self._expresiones, self._ajustar)
+            mapeo.columnas = columnas
+            mapeo.select = ", ".join(self._expresiones.get(c, c) for c in columnas)
+            entidad = self.entidad
+            mapeo._crear = lambda *fila: entidad(**dict(zip(columnas, fila)))
+            mapeo = self._proyecciones.setdefault(columnas, mapeo)
+        return mapeo
+
+    def uno(self, fila: Optional[Sequence]) -> Optional[T]:
+        if fila is None:
+            return None
+        entidad = self._crear(*fila)
+        if self._ajustar is not None:
+            self._ajustar(entidad)
+        return entidad
+
+    def todos(self, filas: Iterable[Sequence]) -> List[T]:
+        entidades = list(starmap(self._crear, filas))
+        if self._ajustar is not None:
+            for entidad in entidades:
+                self._ajustar(entidad)
+        return entidades
+
+
+# estado_orden puede estar guardado como código numérico; normalizar al texto del dominio
+ESTADOS_ORDEN_DB = {1: 'pendiente', 2: 'completada', 3: 'cancelada', 4: 'enviada'}
+
+
+def _ajustar_orden(orden: Orden) -> None:
+    if isinstance(orden.estado_orden, int):
+        orden.estado_orden = ESTADOS_ORDEN_DB.get(orden.estado_orden, str(orden.estado_orden))
+
+
+CATEGORIA = MapeoFila(Categoria)
+CLIENTE = MapeoFila(Cliente)
+PRODUCTO = MapeoFila(Producto)
+ORDEN = MapeoFila(Orden, ajustar=_ajustar_orden)
+ORDEN_PRODUCTO = MapeoFila(OrdenProducto, expresiones={"id_ordenProd": '"id_ordenProd"'})
+VENTA = MapeoFila(Venta)
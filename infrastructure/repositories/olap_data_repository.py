@@ -10,10 +10,6 @@ from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 import psycopg2
-from dotenv import load_dotenv
-
-load_dotenv()
-
 logger = logging.getLogger("OLAP_REPOSITORY")
 if not logger.handlers:
     handler = logging.StreamHandler()
@@ -216,6 +212,10 @@ class OlapDataRepository:
 
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    # Solo al correr el módulo suelto: importarlo no debe tocar el entorno
+    load_dotenv()
     repository = OlapDataRepository()
     datasets = repository.get_all_olap_data()
     for table_name, df in datasets.items():
@@ -1,30 +1,35 @@
 from domain.repositories.categoria_repository import CategoriaRepository
 from domain.entities.categoria import Categoria
+from infrastructure.database import prepared_statements
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.repositories.mappers import CATEGORIA, cursor_tuplas
 from typing import List, Optional
 
+_POR_ID = prepared_statements.registrar(
+    "categoria_por_id",
+    f"SELECT {CATEGORIA.select} FROM categoria WHERE id_categoria = $1 AND (eliminado IS NULL OR eliminado = FALSE)",
+)
+
 class PostgresCategoriaRepository(CategoriaRepository):
     def crear(self, categoria: Categoria) -> Categoria:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             
-            query = """
+            query = f"""
                 INSERT INTO categoria (nombre_categoria, descripcion)
                 VALUES (%s, %s)
-                RETURNING id_categoria, nombre_categoria, descripcion;
+                RETURNING {CATEGORIA.select};
             """
             cursor.execute(query, (categoria.nombre_categoria, categoria.descripcion))
             
             result = cursor.fetchone()
             conn.commit()
+            registrar_escritura("categoria")
             
-            return Categoria(
-                id_categoria=result['id_categoria'],
-                nombre_categoria=result['nombre_categoria'],
-                descripcion=result['descripcion']
-            )
+            return CATEGORIA.uno(result)
             
         except Exception as e:
             if conn:
@@ -38,20 +43,11 @@ class PostgresCategoriaRepository(CategoriaRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             
-            query = "SELECT * FROM categoria WHERE id_categoria = %s AND (eliminado IS NULL OR eliminado = FALSE);"
-            cursor.execute(query, (id_categoria,))
+            prepared_statements.ejecutar(cursor, _POR_ID, (id_categoria,))
             
-            result = cursor.fetchone()
-            if not result:
-                return None
-                
-            return Categoria(
-                id_categoria=result['id_categoria'],
-                nombre_categoria=result['nombre_categoria'],
-                descripcion=result['descripcion']
-            )
+            return CATEGORIA.uno(cursor.fetchone())
             
         except Exception as e:
             raise e
@@ -63,19 +59,12 @@ class PostgresCategoriaRepository(CategoriaRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             
-            query = "SELECT * FROM categoria WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_categoria;"
+            query = f"SELECT {CATEGORIA.select} FROM categoria WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_categoria;"
             cursor.execute(query)
             
-            results = cursor.fetchall()
-            return [
-                Categoria(
-                    id_categoria=row['id_categoria'],
-                    nombre_categoria=row['nombre_categoria'],
-                    descripcion=row['descripcion']
-                ) for row in results
-            ]
+            return CATEGORIA.todos(cursor.fetchall())
             
         except Exception as e:
             raise e
@@ -87,13 +76,13 @@ class PostgresCategoriaRepository(CategoriaRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
+            cursor = cursor_tuplas(conn)
             
-            query = """
+            query = f"""
                 UPDATE categoria 
                 SET nombre_categoria = %s, descripcion = %s
                 WHERE id_categoria = %s
-                RETURNING *;
+                RETURNING {CATEGORIA.select};
             """
             cursor.execute(query, (
                 categoria.nombre_categoria,
@@ -103,15 +92,9 @@ class PostgresCategoriaRepository(CategoriaRepository):
             
             result = cursor.fetchone()
             conn.commit()
+            registrar_escritura("categoria")
             
-            if not result:
-                return None
-                
-            return Categoria(
-                id_categoria=result['id_categoria'],
-                nombre_categoria=result['nombre_categoria'],
-                descripcion=result['descripcion']
-            )
+            return CATEGORIA.uno(result)
             
         except Exception as e:
             if conn:
@@ -132,6 +115,7 @@ class PostgresCategoriaRepository(CategoriaRepository):
             cursor.execute(query, (id_categoria,))
 
             conn.commit()
+            registrar_escritura("categoria")
             actualizado = cursor.rowcount > 0
 
             return actualizado
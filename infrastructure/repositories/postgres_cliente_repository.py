@@ -1,8 +1,20 @@
 from domain.repositories.cliente_repository import ClienteRepository
 from domain.entities.cliente import Cliente
+from domain.entities.pagina import Pagina
+from infrastructure.database import prepared_statements
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
-from typing import List, Optional
-import psycopg2.extras
+from infrastructure.repositories.mappers import CLIENTE, cursor_tuplas
+from typing import List, Optional, Sequence
+
+_POR_ID = prepared_statements.registrar(
+    "clientes_por_id",
+    f"SELECT {CLIENTE.select} FROM clientes WHERE id_cliente = $1 AND (eliminado IS NULL OR eliminado = FALSE)",
+)
+_POR_IDS = prepared_statements.registrar(
+    "clientes_por_ids",
+    f"SELECT {CLIENTE.select} FROM clientes WHERE id_cliente = ANY($1) AND (eliminado IS NULL OR eliminado = FALSE)",
+)
 
 
 class PostgresClienteRepository(ClienteRepository):
@@ -10,13 +22,12 @@ class PostgresClienteRepository(ClienteRepository):
         conn = None
         try:
             conn = get_db_connection()
-            # usar cursor que devuelva dicts para mantener compatibilidad con otros repos
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor = cursor_tuplas(conn)
 
-            query = """
+            query = f"""
                 INSERT INTO clientes (nombre, apellido, edad, email, telefono, direccion)
                 VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id_cliente, nombre, apellido, edad, email, telefono, direccion;
+                RETURNING {CLIENTE.select};
             """
             cursor.execute(query, (
                 cliente.nombre,
@@ -29,16 +40,9 @@ class PostgresClienteRepository(ClienteRepository):
 
             result = cursor.fetchone()
             conn.commit()
+            registrar_escritura("clientes")
 
-            return Cliente(
-                id_cliente=result['id_cliente'],
-                nombre=result['nombre'],
-                apellido=result['apellido'],
-                edad=result['edad'],
-                email=result['email'],
-                telefono=result['telefono'],
-                direccion=result['direccion']
-            )
+            return CLIENTE.uno(result)
 
         except Exception as e:
             if conn:
@@ -48,27 +52,20 @@ class PostgresClienteRepository(ClienteRepository):
             if conn:
                 conn.close()
 
-    def obtener_por_id(self, id_cliente: int) -> Optional[Cliente]:
+    def obtener_por_id(self, id_cliente: int, campos: Optional[Sequence[str]] = None) -> Optional[Cliente]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = "SELECT * FROM clientes WHERE id_cliente = %s AND (eliminado IS NULL OR eliminado = FALSE);"
-            cursor.execute(query, (id_cliente,))
+            cursor = cursor_tuplas(conn)
+            mapeo = CLIENTE.proyeccion(campos)
+            if mapeo is CLIENTE:
+                prepared_statements.ejecutar(cursor, _POR_ID, (id_cliente,))
+            else:
+                query = f"SELECT {mapeo.select} FROM clientes WHERE id_cliente = %s AND (eliminado IS NULL OR eliminado = FALSE);"
+                cursor.execute(query, (id_cliente,))
 
             result = cursor.fetchone()
-            if not result:
-                return None
-
-            return Cliente(
-                id_cliente=result['id_cliente'],
-                nombre=result['nombre'],
-                apellido=result['apellido'],
-                edad=result['edad'],
-                email=result['email'],
-                telefono=result['telefono'],
-                direccion=result['direccion']
-            )
+            return mapeo.uno(result)
 
         except Exception as e:
             raise e
@@ -76,26 +73,44 @@ class PostgresClienteRepository(ClienteRepository):
             if conn:
                 conn.close()
 
+    def obtener_por_ids(self, ids: List[int]) -> List[Cliente]:
+        if not ids:
+            return []
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+            # Una sola consulta para todo el lote; el orden lo reconstruye el caso de uso
+            prepared_statements.ejecutar(cursor, _POR_IDS, (list(ids),))
+            return CLIENTE.todos(cursor.fetchall())
+        except Exception as e:
+            raise e
+        finally:
+            if conn:
+                conn.close()
+
     def listar_todos(self) -> List[Cliente]:
+        return self.listar_pagina().items
+
+    def listar_pagina(self, limit: Optional[int] = None, after: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Cliente]:
+        mapeo = CLIENTE.proyeccion(campos)
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            query = "SELECT * FROM clientes WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_cliente;"
-            cursor.execute(query)
-
-            results = cursor.fetchall()
-            return [
-                Cliente(
-                    id_cliente=row['id_cliente'],
-                    nombre=row['nombre'],
-                    apellido=row['apellido'],
-                    edad=row['edad'],
-                    email=row['email'],
-                    telefono=row['telefono'],
-                    direccion=row['direccion']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+            condiciones = ["(eliminado IS NULL OR eliminado = FALSE)"]
+            params = []
+            if after is not None:
+                condiciones.append("id_cliente > %s")
+                params.append(after)
+            query = f"SELECT {mapeo.select} FROM clientes WHERE " + " AND ".join(condiciones) + " ORDER BY id_cliente"
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(query + ";", params)
+
+            clientes = mapeo.todos(cursor.fetchall())
+            return Pagina.desde_filas(clientes, limit, lambda cliente: cliente.id_cliente)
 
         except Exception as e:
             raise e
@@ -107,13 +122,13 @@ class PostgresClienteRepository(ClienteRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor = cursor_tuplas(conn)
 
-            query = """
+            query = f"""
                 UPDATE clientes
                 SET nombre = %s, apellido = %s, edad = %s, email = %s, telefono = %s, direccion = %s
                 WHERE id_cliente = %s
-                RETURNING *;
+                RETURNING {CLIENTE.select};
             """
             cursor.execute(query, (
                 cliente.nombre,
@@ -127,19 +142,9 @@ class PostgresClienteRepository(ClienteRepository):
 
             result = cursor.fetchone()
             conn.commit()
+            registrar_escritura("clientes")
 
-            if not result:
-                return None
-
-            return Cliente(
-                id_cliente=result['id_cliente'],
-                nombre=result['nombre'],
-                apellido=result['apellido'],
-                edad=result['edad'],
-                email=result['email'],
-                telefono=result['telefono'],
-                direccion=result['direccion']
-            )
+            return CLIENTE.uno(result)
 
         except Exception as e:
             if conn:
@@ -165,6 +170,7 @@ class PostgresClienteRepository(ClienteRepository):
             cursor.execute(query, (id_cliente,))
 
             conn.commit()
+            registrar_escritura("clientes")
             actualizado = cursor.rowcount > 0
 
             # Si no se actualizó ninguna fila, el cliente no existe
@@ -0,0 +1,60 @@
+import uuid
+from typing import Dict, Iterator, List, Tuple
+
+from domain.repositories.export_repository import ExportRepository
+from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.metricas.consultas import CursorMedido
+from infrastructure.repositories.mappers import ORDEN, ORDEN_PRODUCTO, VENTA, MapeoFila
+
+# Tablas exportables: mapeo de columnas (en orden de salida) y clave de orden.
+# Los nombres nunca vienen del cliente, así que se pueden interpolar en el SQL.
+_ENTIDADES: Dict[str, Tuple[str, MapeoFila, str]] = {
+    "orden": ("orden", ORDEN, "id_orden"),
+    "orden_producto": ("orden_producto", ORDEN_PRODUCTO, '"id_ordenProd"'),
+    "ventas": ("ventas", VENTA, "id_venta"),
+}
+
+
+class PostgresExportRepository(ExportRepository):
+    """Exportación masiva con cursores con nombre (del lado del servidor).
+
+    PostgreSQL envía las filas en lotes de `itersize`, de modo que la memoria del
+    proceso no crece con el tamaño de la tabla y el primer lote llega antes de que
+    termine la consulta.
+    """
+
+    def entidades(self) -> List[str]:
+        return list(_ENTIDADES)
+
+    def columnas(self, entidad: str) -> List[str]:
+        return list(_ENTIDADES[entidad][1].columnas)
+
+    def iterar_filas(self, entidad: str, itersize: int) -> Iterator[Tuple]:
+        tabla, mapeo, clave = _ENTIDADES[entidad]
+        query = (
+            f"SELECT {mapeo.select} FROM {tabla} "
+            f"WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY {clave};"
+        )
+        conn = None
+        cursor = None
+        try:
+            conn = get_db_connection()
+            # Cursor de tuplas: evita construir un dict por fila
+            cursor = conn.cursor(name=f"export_{entidad}_{uuid.uuid4().hex[:8]}", cursor_factory=CursorMedido)
+            cursor.itersize = itersize
+            cursor.execute(query)
+            for row in cursor:
+                yield row
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            if conn:
+                # Solo lectura: cerrar la transacción del cursor antes de devolver la conexión
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                conn.close()
@@ -1,47 +1,67 @@
 from domain.repositories.orden_producto_repository import OrdenProductoRepository
 from domain.entities.orden_producto import OrdenProducto
+from domain.entities.pagina import Pagina
+from domain.entities.resultado_lote import ResultadoLote
+from infrastructure.database.bulk import BULK_PAGE_SIZE, ids_existentes
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.repositories.mappers import ORDEN_PRODUCTO, cursor_tuplas
 from typing import List, Optional
+import psycopg2.extras
 
 class PostgresOrdenProductoRepository(OrdenProductoRepository):
 
     def listar_todos(self) -> List[OrdenProducto]:
+        return self.listar_pagina().items
+
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_producto: Optional[int] = None,
+        id_categoria: Optional[int] = None,
+    ) -> Pagina[OrdenProducto]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = 'SELECT * FROM orden_producto WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY "id_ordenProd";'
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            desc = [d[0] for d in cursor.description]
-            result_list = []
-            for row in rows:
-                if isinstance(row, dict):
-                    result = row
-                else:
-                    result = dict(zip(desc, row))
-                result_list.append(OrdenProducto(
-                    id_ordenProd=result['id_ordenprod'] if 'id_ordenprod' in result else result['id_ordenProd'],
-                    id_producto=result['id_producto'],
-                    cantidad=result['cantidad'],
-                    precio_unitario=result['precio_unitario'],
-                    id_orden=result['id_orden']
-                ))
-            return result_list
+            cursor = cursor_tuplas(conn)
+            condiciones = ["(eliminado IS NULL OR eliminado = FALSE)"]
+            params = []
+            if after is not None:
+                condiciones.append('"id_ordenProd" > %s')
+                params.append(after)
+            if id_orden is not None:
+                condiciones.append("id_orden = %s")
+                params.append(id_orden)
+            if id_producto is not None:
+                condiciones.append("id_producto = %s")
+                params.append(id_producto)
+            if id_categoria is not None:
+                condiciones.append("id_producto IN (SELECT id_producto FROM productos WHERE id_categoria = %s)")
+                params.append(id_categoria)
+            query = f"SELECT {ORDEN_PRODUCTO.select} FROM orden_producto WHERE " + " AND ".join(condiciones) + ' ORDER BY "id_ordenProd"'
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(query + ";", params)
+            result_list = ORDEN_PRODUCTO.todos(cursor.fetchall())
+            return Pagina.desde_filas(result_list, limit, lambda linea: linea.id_ordenProd)
         except Exception as e:
             raise e
         finally:
             if conn:
                 conn.close()
+
     def crear(self, orden_producto: OrdenProducto) -> OrdenProducto:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 INSERT INTO orden_producto (id_producto, cantidad, precio_unitario, id_orden)
                 VALUES (%s, %s, %s, %s)
-                RETURNING "id_ordenProd" AS id_ordenprod, id_producto, cantidad, precio_unitario, id_orden;
+                RETURNING {ORDEN_PRODUCTO.select};
             """
             cursor.execute(query, (
                 orden_producto.id_producto,
@@ -51,21 +71,10 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
             ))
             row = cursor.fetchone()
             conn.commit()
+            registrar_escritura("orden_producto")
             if not row:
                 raise Exception("No se pudo crear el registro de orden_producto.")
-            # Adaptar a dict si es necesario
-            if isinstance(row, dict):
-                result = row
-            else:
-                desc = [d[0] for d in cursor.description]
-                result = dict(zip(desc, row))
-            return OrdenProducto(
-                id_ordenProd=result['id_ordenprod'] if 'id_ordenprod' in result else result['id_ordenProd'],
-                id_producto=result['id_producto'],
-                cantidad=result['cantidad'],
-                precio_unitario=result['precio_unitario'],
-                id_orden=result['id_orden']
-            )
+            return ORDEN_PRODUCTO.uno(row)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -74,28 +83,65 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
             if conn:
                 conn.close()
 
+    def crear_many(self, items: List[OrdenProducto], partial: bool = False) -> ResultadoLote[OrdenProducto]:
+        resultado = ResultadoLote(creados=[None] * len(items))
+        if not items:
+            return resultado
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+
+            ordenes = ids_existentes(cursor, "orden", "id_orden", (i.id_orden for i in items))
+            productos = ids_existentes(cursor, "productos", "id_producto", (i.id_producto for i in items))
+            for indice, item in enumerate(items):
+                if item.id_orden not in ordenes:
+                    resultado.errores[indice] = f"La orden {item.id_orden} no existe"
+                elif item.id_producto not in productos:
+                    resultado.errores[indice] = f"El producto {item.id_producto} no existe"
+            validos = [i for i in range(len(items)) if i not in resultado.errores]
+            if not validos or (resultado.errores and not partial):
+                conn.rollback()
+                return resultado
+
+            creados = self.insertar_lote([items[i] for i in validos], conn)
+            conn.commit()
+            registrar_escritura("orden_producto")
+            for indice, creado in zip(validos, creados):
+                resultado.creados[indice] = creado
+            return resultado
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            raise e
+        finally:
+            if conn:
+                conn.close()
+
+    def insertar_lote(self, items: List[OrdenProducto], conn) -> List[OrdenProducto]:
+        """Inserta las líneas con INSERT multi-fila usando `conn` (sin commit ni validaciones)."""
+        if not items:
+            return []
+        cursor = cursor_tuplas(conn)
+        query = f"""
+            INSERT INTO orden_producto (id_producto, cantidad, precio_unitario, id_orden)
+            VALUES %s
+            RETURNING {ORDEN_PRODUCTO.select};
+        """
+        valores = [(item.id_producto, item.cantidad, item.precio_unitario, item.id_orden) for item in items]
+        # RETURNING respeta el orden de VALUES, así que los ids se asignan por posición
+        filas = psycopg2.extras.execute_values(cursor, query, valores, page_size=BULK_PAGE_SIZE, fetch=True)
+        return ORDEN_PRODUCTO.todos(filas)
+
     def obtener_por_id(self, id_ordenProd: int) -> Optional[OrdenProducto]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = 'SELECT * FROM orden_producto WHERE "id_ordenProd" = %s AND (eliminado IS NULL OR eliminado = FALSE);'
+            cursor = cursor_tuplas(conn)
+            query = f'SELECT {ORDEN_PRODUCTO.select} FROM orden_producto WHERE "id_ordenProd" = %s AND (eliminado IS NULL OR eliminado = FALSE);'
             cursor.execute(query, (id_ordenProd,))
             row = cursor.fetchone()
-            if not row:
-                return None
-            if isinstance(row, dict):
-                result = row
-            else:
-                desc = [d[0] for d in cursor.description]
-                result = dict(zip(desc, row))
-            return OrdenProducto(
-                id_ordenProd=result['id_ordenprod'] if 'id_ordenprod' in result else result['id_ordenProd'],
-                id_producto=result['id_producto'],
-                cantidad=result['cantidad'],
-                precio_unitario=result['precio_unitario'],
-                id_orden=result['id_orden']
-            )
+            return ORDEN_PRODUCTO.uno(row)
         except Exception as e:
             raise e
         finally:
@@ -106,25 +152,10 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = 'SELECT * FROM orden_producto WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY "id_ordenProd";'
+            cursor = cursor_tuplas(conn)
+            query = f'SELECT {ORDEN_PRODUCTO.select} FROM orden_producto WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY "id_ordenProd";'
             cursor.execute(query, (id_orden,))
-            rows = cursor.fetchall()
-            desc = [d[0] for d in cursor.description]
-            result_list = []
-            for row in rows:
-                if isinstance(row, dict):
-                    result = row
-                else:
-                    result = dict(zip(desc, row))
-                result_list.append(OrdenProducto(
-                    id_ordenProd=result['id_ordenprod'] if 'id_ordenprod' in result else result['id_ordenProd'],
-                    id_producto=result['id_producto'],
-                    cantidad=result['cantidad'],
-                    precio_unitario=result['precio_unitario'],
-                    id_orden=result['id_orden']
-                ))
-            return result_list
+            return ORDEN_PRODUCTO.todos(cursor.fetchall())
         except Exception as e:
             raise e
         finally:
@@ -135,12 +166,12 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 UPDATE orden_producto
                 SET id_producto = %s, cantidad = %s, precio_unitario = %s, id_orden = %s
                 WHERE "id_ordenProd" = %s
-                RETURNING *;
+                RETURNING {ORDEN_PRODUCTO.select};
             """
             cursor.execute(query, (
                 orden_producto.id_producto,
@@ -151,20 +182,8 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
             ))
             row = cursor.fetchone()
             conn.commit()
-            if not row:
-                return None
-            if isinstance(row, dict):
-                result = row
-            else:
-                desc = [d[0] for d in cursor.description]
-                result = dict(zip(desc, row))
-            return OrdenProducto(
-                id_ordenProd=result['id_ordenprod'] if 'id_ordenprod' in result else result['id_ordenProd'],
-                id_producto=result['id_producto'],
-                cantidad=result['cantidad'],
-                precio_unitario=result['precio_unitario'],
-                id_orden=result['id_orden']
-            )
+            registrar_escritura("orden_producto")
+            return ORDEN_PRODUCTO.uno(row)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -185,6 +204,7 @@ class PostgresOrdenProductoRepository(OrdenProductoRepository):
             cursor.execute(query, (id_ordenProd,))
             actualizado = cursor.rowcount > 0
             conn.commit()
+            registrar_escritura("orden_producto")
             return actualizado
         except Exception as e:
             if conn:
@@ -1,32 +1,126 @@
 from domain.repositories.orden_repository import OrdenRepository
 from domain.entities.orden import Orden
+from domain.entities.pagina import Pagina
+from domain.entities.reporte_ordenes import AGRUPACIONES_REPORTE, FilaReporteOrdenes
+from domain.entities.resultado_lote import ResultadoLote
+from infrastructure.database.bulk import BULK_PAGE_SIZE, ids_existentes
+from infrastructure.database import prepared_statements
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
-from typing import List, Optional
+from infrastructure.metricas.consultas import RealDictCursorMedido
+from infrastructure.repositories.mappers import ESTADOS_ORDEN_DB, ORDEN, cursor_tuplas
+from typing import List, Optional, Sequence
 import psycopg2.extras
 
+_POR_ID = prepared_statements.registrar(
+    "orden_por_id",
+    f"SELECT {ORDEN.select} FROM orden WHERE id_orden = $1 AND (eliminado IS NULL OR eliminado = FALSE)",
+)
+_POR_IDS = prepared_statements.registrar(
+    "orden_por_ids",
+    f"SELECT {ORDEN.select} FROM orden WHERE id_orden = ANY($1) AND (eliminado IS NULL OR eliminado = FALSE)",
+)
+_POR_CLIENTE = prepared_statements.registrar(
+    "orden_por_cliente",
+    f"SELECT {ORDEN.select} FROM orden WHERE id_cliente = $1 AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY fecha_orden DESC",
+)
+_POR_FECHA = prepared_statements.registrar(
+    "orden_por_fecha",
+    f"SELECT {ORDEN.select} FROM orden WHERE fecha_orden BETWEEN $1 AND $2 AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY fecha_orden DESC",
+)
+
+_UNIDAD_PERIODO = {"dia": "day", "semana": "week", "mes": "month"}
+
+
+def _expresion_grupo(agrupar_por: str) -> str:
+    if agrupar_por not in AGRUPACIONES_REPORTE:
+        raise ValueError(f"Agrupación no soportada: {agrupar_por}")
+    if agrupar_por == "estado_orden":
+        # Normalizar en SQL los códigos numéricos para que no queden dos grupos por estado
+        casos = " ".join(f"WHEN '{codigo}' THEN '{texto}'" for codigo, texto in ESTADOS_ORDEN_DB.items())
+        return f"CASE estado_orden::text {casos} ELSE estado_orden::text END"
+    return agrupar_por
+
+
+def sql_reporte_ordenes(periodo: Optional[str], agrupar_por: Optional[str], rellenar: bool) -> str:
+    """Consulta del reporte agregado. Periodo y agrupación salen de listas cerradas, así que
+    se pueden interpolar; las fechas van como parámetros `desde`/`hasta`."""
+    if periodo is not None and periodo not in _UNIDAD_PERIODO:
+        raise ValueError(f"Periodo no soportado: {periodo}")
+    unidad = _UNIDAD_PERIODO.get(periodo)
+    expr_periodo = f"date_trunc('{unidad}', fecha_orden)" if unidad else "NULL::timestamp"
+    expr_grupo = _expresion_grupo(agrupar_por) if agrupar_por else "NULL::text"
+    datos = f"""
+        SELECT {expr_periodo} AS periodo, {expr_grupo} AS grupo,
+               COUNT(*) AS ordenes,
+               COALESCE(SUM(total_orden), 0) AS total_ventas,
+               COALESCE(SUM(costo_envio), 0) AS total_envio
+        FROM orden
+        WHERE fecha_orden BETWEEN %(desde)s AND %(hasta)s AND (eliminado IS NULL OR eliminado = FALSE)
+        GROUP BY 1, 2
+    """
+    if not (rellenar and unidad):
+        return f"""
+            WITH datos AS ({datos})
+            SELECT periodo, grupo, ordenes, total_ventas, total_envio,
+                   total_ventas / NULLIF(ordenes, 0) AS ticket_promedio
+            FROM datos
+            ORDER BY periodo, grupo;
+        """
+    # Relleno de huecos: un periodo por paso de la serie (y por cada grupo con datos)
+    grupos = "SELECT DISTINCT grupo FROM datos" if agrupar_por else "SELECT NULL::text AS grupo"
+    return f"""
+        WITH datos AS ({datos})
+        SELECT s.periodo, g.grupo,
+               COALESCE(d.ordenes, 0) AS ordenes,
+               COALESCE(d.total_ventas, 0) AS total_ventas,
+               COALESCE(d.total_envio, 0) AS total_envio,
+               d.total_ventas / NULLIF(d.ordenes, 0) AS ticket_promedio
+        FROM generate_series(
+            date_trunc('{unidad}', %(desde)s::timestamp),
+            date_trunc('{unidad}', %(hasta)s::timestamp),
+            interval '1 {unidad}'
+        ) AS s(periodo)
+        CROSS JOIN ({grupos}) AS g
+        LEFT JOIN datos d ON d.periodo = s.periodo AND d.grupo IS NOT DISTINCT FROM g.grupo
+        ORDER BY s.periodo, g.grupo;
+    """
+
+
+def _fila_reporte(fila) -> FilaReporteOrdenes:
+    periodo, grupo, ordenes, total_ventas, total_envio, ticket = fila
+    return FilaReporteOrdenes(
+        periodo=periodo,
+        grupo=grupo,
+        ordenes=int(ordenes),
+        total_ventas=float(total_ventas),
+        total_envio=float(total_envio),
+        ticket_promedio=float(ticket) if ticket is not None else None,
+    )
+
 
 class PostgresOrdenRepository(OrdenRepository):
-    def _map_estado_db(self, value):
-        # Si la base de datos devuelve enteros, mapearlos a los strings esperados
-        if value is None:
-            return value
-        if isinstance(value, int):
-            mapping = {1: 'pendiente', 2: 'completada', 3: 'cancelada', 4: 'enviada'}
-            return mapping.get(value, str(value))
-        # si ya es string, devolver tal cual
-        return value
-
-    def crear(self, orden: Orden) -> Orden:
-        conn = None
+    _ESTADOS_DB = ESTADOS_ORDEN_DB
+
+    def _valores_estado_db(self, estado: str) -> List[str]:
+        # El estado puede estar guardado como texto o como código numérico; filtrar por ambos
+        valores = [estado]
+        valores.extend(str(codigo) for codigo, nombre in self._ESTADOS_DB.items() if nombre == estado)
+        return valores
+
+    def crear(self, orden: Orden, conn=None) -> Orden:
+        """Crea una orden. Si se pasa `conn`, usa esa conexión (no hace commit/close)."""
+        own_conn = conn is None
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            if own_conn:
+                conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
 
-            query = """
+            query = f"""
                 INSERT INTO orden (
                     id_cliente, fecha_orden, estado_orden, direccion_envio, total_orden, ciudad_envio, codigo_postal_envio, pais_envio, metodo_envio, costo_envio, estado_envio
                 ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id_orden, id_cliente, fecha_orden, estado_orden, direccion_envio, total_orden, ciudad_envio, codigo_postal_envio, pais_envio, metodo_envio, costo_envio, estado_envio;
+                RETURNING {ORDEN.select};
             """
             cursor.execute(query, (
                 orden.id_cliente,
@@ -43,23 +137,58 @@ class PostgresOrdenRepository(OrdenRepository):
             ))
 
             result = cursor.fetchone()
-            conn.commit()
+            if own_conn:
+                conn.commit()
+                registrar_escritura("orden")
 
-            return Orden(
-                id_orden=result['id_orden'],
-                id_cliente=result['id_cliente'],
-                fecha_orden=result['fecha_orden'],
-                estado_orden=self._map_estado_db(result['estado_orden']),
-                direccion_envio=result['direccion_envio'],
-                total_orden=result['total_orden'],
-                ciudad_envio=result['ciudad_envio'],
-                codigo_postal_envio=result['codigo_postal_envio'],
-                pais_envio=result['pais_envio'],
-                metodo_envio=result['metodo_envio'],
-                costo_envio=result['costo_envio'],
-                estado_envio=result['estado_envio']
-            )
+            return ORDEN.uno(result)
 
+        except Exception as e:
+            if own_conn and conn:
+                conn.rollback()
+            raise e
+        finally:
+            if own_conn and conn:
+                conn.close()
+
+    def crear_many(self, ordenes: List[Orden], partial: bool = False) -> ResultadoLote[Orden]:
+        resultado = ResultadoLote(creados=[None] * len(ordenes))
+        if not ordenes:
+            return resultado
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+
+            clientes = ids_existentes(cursor, "clientes", "id_cliente", (o.id_cliente for o in ordenes))
+            for indice, orden in enumerate(ordenes):
+                if orden.id_cliente not in clientes:
+                    resultado.errores[indice] = f"El cliente {orden.id_cliente} no existe"
+            validos = [i for i in range(len(ordenes)) if i not in resultado.errores]
+            if not validos or (resultado.errores and not partial):
+                conn.rollback()
+                return resultado
+
+            query = f"""
+                INSERT INTO orden (
+                    id_cliente, fecha_orden, estado_orden, direccion_envio, total_orden, ciudad_envio, codigo_postal_envio, pais_envio, metodo_envio, costo_envio, estado_envio
+                ) VALUES %s
+                RETURNING {ORDEN.select};
+            """
+            valores = [
+                (
+                    o.id_cliente, o.fecha_orden, o.estado_orden, o.direccion_envio, o.total_orden, o.ciudad_envio,
+                    o.codigo_postal_envio, o.pais_envio, o.metodo_envio, o.costo_envio, o.estado_envio
+                )
+                for o in (ordenes[i] for i in validos)
+            ]
+            # RETURNING respeta el orden de VALUES, así que los ids se asignan por posición
+            filas = psycopg2.extras.execute_values(cursor, query, valores, page_size=BULK_PAGE_SIZE, fetch=True)
+            conn.commit()
+            registrar_escritura("orden")
+            for indice, creada in zip(validos, ORDEN.todos(filas)):
+                resultado.creados[indice] = creada
+            return resultado
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -68,34 +197,38 @@ class PostgresOrdenRepository(OrdenRepository):
             if conn:
                 conn.close()
 
-    def obtener_por_id(self, id_orden: int) -> Optional[Orden]:
+    def obtener_por_id(self, id_orden: int, campos: Optional[Sequence[str]] = None) -> Optional[Orden]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor = cursor_tuplas(conn)
 
-            query = "SELECT * FROM orden WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE);"
-            cursor.execute(query, (id_orden,))
+            mapeo = ORDEN.proyeccion(campos)
+            if mapeo is ORDEN:
+                prepared_statements.ejecutar(cursor, _POR_ID, (id_orden,))
+            else:
+                query = f"SELECT {mapeo.select} FROM orden WHERE id_orden = %s AND (eliminado IS NULL OR eliminado = FALSE);"
+                cursor.execute(query, (id_orden,))
 
             result = cursor.fetchone()
-            if not result:
-                return None
+            return mapeo.uno(result)
 
-            return Orden(
-                id_orden=result['id_orden'],
-                id_cliente=result['id_cliente'],
-                fecha_orden=result['fecha_orden'],
-                estado_orden=self._map_estado_db(result['estado_orden']),
-                direccion_envio=result['direccion_envio'],
-                total_orden=result['total_orden'],
-                ciudad_envio=result['ciudad_envio'],
-                codigo_postal_envio=result['codigo_postal_envio'],
-                pais_envio=result['pais_envio'],
-                metodo_envio=result['metodo_envio'],
-                costo_envio=result['costo_envio'],
-                estado_envio=result['estado_envio']
-            )
+        except Exception as e:
+            raise e
+        finally:
+            if conn:
+                conn.close()
 
+    def obtener_por_ids(self, ids: List[int]) -> List[Orden]:
+        if not ids:
+            return []
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+            # Una sola consulta para todo el lote; el orden lo reconstruye el caso de uso
+            prepared_statements.ejecutar(cursor, _POR_IDS, (list(ids),))
+            return ORDEN.todos(cursor.fetchall())
         except Exception as e:
             raise e
         finally:
@@ -103,31 +236,52 @@ class PostgresOrdenRepository(OrdenRepository):
                 conn.close()
 
     def listar_todos(self) -> List[Orden]:
+        return self.listar_pagina().items
+
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        estado_orden: Optional[str] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None,
+        campos: Optional[Sequence[str]] = None,
+    ) -> Pagina[Orden]:
+        mapeo = ORDEN.proyeccion(campos)
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-            query = "SELECT * FROM orden WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_orden;"
-            cursor.execute(query)
-
-            results = cursor.fetchall()
-            return [
-                Orden(
-                    id_orden=row['id_orden'],
-                    id_cliente=row['id_cliente'],
-                    fecha_orden=row['fecha_orden'],
-                    estado_orden=self._map_estado_db(row['estado_orden']),
-                    direccion_envio=row['direccion_envio'],
-                    total_orden=row['total_orden'],
-                    ciudad_envio=row['ciudad_envio'],
-                    codigo_postal_envio=row['codigo_postal_envio'],
-                    pais_envio=row['pais_envio'],
-                    metodo_envio=row['metodo_envio'],
-                    costo_envio=row['costo_envio'],
-                    estado_envio=row['estado_envio']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+
+            # Paginación por clave: WHERE id_orden > after ORDER BY id_orden usa el índice de la PK
+            condiciones = ["(eliminado IS NULL OR eliminado = FALSE)"]
+            params = []
+            if after is not None:
+                condiciones.append("id_orden > %s")
+                params.append(after)
+            if estado_orden is not None:
+                condiciones.append("estado_orden::text = ANY(%s)")
+                params.append(self._valores_estado_db(estado_orden))
+            if id_cliente is not None:
+                condiciones.append("id_cliente = %s")
+                params.append(id_cliente)
+            if fecha_desde is not None:
+                condiciones.append("fecha_orden >= %s")
+                params.append(fecha_desde)
+            if fecha_hasta is not None:
+                condiciones.append("fecha_orden <= %s")
+                params.append(fecha_hasta)
+
+            query = f"SELECT {mapeo.select} FROM orden WHERE " + " AND ".join(condiciones) + " ORDER BY id_orden"
+            if limit is not None:
+                # Una fila extra indica si existe una página siguiente
+                query += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(query + ";", params)
+
+            ordenes = mapeo.todos(cursor.fetchall())
+            return Pagina.desde_filas(ordenes, limit, lambda orden: orden.id_orden)
 
         except Exception as e:
             raise e
@@ -139,28 +293,11 @@ class PostgresOrdenRepository(OrdenRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-            query = "SELECT * FROM orden WHERE id_cliente = %s AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY fecha_orden DESC;"
-            cursor.execute(query, (id_cliente,))
-
-            results = cursor.fetchall()
-            return [
-                Orden(
-                    id_orden=row['id_orden'],
-                    id_cliente=row['id_cliente'],
-                    fecha_orden=row['fecha_orden'],
-                    estado_orden=self._map_estado_db(row['estado_orden']),
-                    direccion_envio=row['direccion_envio'],
-                    total_orden=row['total_orden'],
-                    ciudad_envio=row['ciudad_envio'],
-                    codigo_postal_envio=row['codigo_postal_envio'],
-                    pais_envio=row['pais_envio'],
-                    metodo_envio=row['metodo_envio'],
-                    costo_envio=row['costo_envio'],
-                    estado_envio=row['estado_envio']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+
+            prepared_statements.ejecutar(cursor, _POR_CLIENTE, (id_cliente,))
+
+            return ORDEN.todos(cursor.fetchall())
 
         except Exception as e:
             raise e
@@ -172,29 +309,33 @@ class PostgresOrdenRepository(OrdenRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-            query = "SELECT * FROM orden WHERE fecha_orden BETWEEN %s AND %s AND (eliminado IS NULL OR eliminado = FALSE) ORDER BY fecha_orden DESC;"
-            cursor.execute(query, (fecha_inicio, fecha_fin))
-
-            results = cursor.fetchall()
-            return [
-                Orden(
-                    id_orden=row['id_orden'],
-                    id_cliente=row['id_cliente'],
-                    fecha_orden=row['fecha_orden'],
-                    estado_orden=self._map_estado_db(row['estado_orden']),
-                    direccion_envio=row['direccion_envio'],
-                    total_orden=row['total_orden'],
-                    ciudad_envio=row['ciudad_envio'],
-                    codigo_postal_envio=row['codigo_postal_envio'],
-                    pais_envio=row['pais_envio'],
-                    metodo_envio=row['metodo_envio'],
-                    costo_envio=row['costo_envio'],
-                    estado_envio=row['estado_envio']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+
+            prepared_statements.ejecutar(cursor, _POR_FECHA, (fecha_inicio, fecha_fin))
 
+            return ORDEN.todos(cursor.fetchall())
+
+        except Exception as e:
+            raise e
+        finally:
+            if conn:
+                conn.close()
+
+    def reporte_agregado(
+        self,
+        fecha_inicio,
+        fecha_fin,
+        periodo: Optional[str] = None,
+        agrupar_por: Optional[str] = None,
+        rellenar: bool = False,
+    ) -> List[FilaReporteOrdenes]:
+        query = sql_reporte_ordenes(periodo, agrupar_por, rellenar)
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+            cursor.execute(query, {"desde": fecha_inicio, "hasta": fecha_fin})
+            return [_fila_reporte(fila) for fila in cursor.fetchall()]
         except Exception as e:
             raise e
         finally:
@@ -205,7 +346,7 @@ class PostgresOrdenRepository(OrdenRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor = conn.cursor(cursor_factory=RealDictCursorMedido)
 
             # Obtener la orden actual
             cursor.execute("SELECT * FROM orden WHERE id_orden = %s;", (id_orden,))
@@ -228,12 +369,13 @@ class PostgresOrdenRepository(OrdenRepository):
                 'estado_envio': orden.estado_envio if orden.estado_envio is not None else actual['estado_envio'],
             }
 
-            query = """
+            query = f"""
                 UPDATE orden
                 SET id_cliente = %s, fecha_orden = %s, estado_orden = %s, direccion_envio = %s, total_orden = %s, ciudad_envio = %s, codigo_postal_envio = %s, pais_envio = %s, metodo_envio = %s, costo_envio = %s, estado_envio = %s
                 WHERE id_orden = %s
-                RETURNING *;
+                RETURNING {ORDEN.select};
             """
+            cursor = cursor_tuplas(conn)
             cursor.execute(query, (
                 merged['id_cliente'],
                 merged['fecha_orden'],
@@ -251,24 +393,9 @@ class PostgresOrdenRepository(OrdenRepository):
 
             result = cursor.fetchone()
             conn.commit()
+            registrar_escritura("orden")
 
-            if not result:
-                return None
-
-            return Orden(
-                id_orden=result['id_orden'],
-                id_cliente=result['id_cliente'],
-                fecha_orden=result['fecha_orden'],
-                estado_orden=self._map_estado_db(result['estado_orden']),
-                direccion_envio=result['direccion_envio'],
-                total_orden=result['total_orden'],
-                ciudad_envio=result['ciudad_envio'],
-                codigo_postal_envio=result['codigo_postal_envio'],
-                pais_envio=result['pais_envio'],
-                metodo_envio=result['metodo_envio'],
-                costo_envio=result['costo_envio'],
-                estado_envio=result['estado_envio']
-            )
+            return ORDEN.uno(result)
 
         except Exception as e:
             if conn:
@@ -290,6 +417,7 @@ class PostgresOrdenRepository(OrdenRepository):
             cursor.execute(query, (3, id_orden))
 
             conn.commit()
+            registrar_escritura("orden")
             return cursor.rowcount > 0
 
         except Exception as e:
@@ -1,18 +1,33 @@
 from domain.repositories.producto_repository import ProductoRepository
 from domain.entities.producto import Producto
+from domain.entities.pagina import Pagina
+from domain.exceptions import StockInsuficienteError
+from infrastructure.database import prepared_statements
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
-from typing import List, Optional
+from infrastructure.repositories.mappers import PRODUCTO, cursor_tuplas
+from typing import Dict, List, Optional, Sequence
+import psycopg2.extras
+
+_POR_ID = prepared_statements.registrar(
+    "productos_por_id",
+    f"SELECT {PRODUCTO.select} FROM productos WHERE id_producto = $1 AND (eliminado IS NULL OR eliminado = FALSE)",
+)
+_POR_IDS = prepared_statements.registrar(
+    "productos_por_ids",
+    f"SELECT {PRODUCTO.select} FROM productos WHERE id_producto = ANY($1) AND (eliminado IS NULL OR eliminado = FALSE)",
+)
 
 class PostgresProductoRepository(ProductoRepository):
     def crear(self, producto: Producto) -> Producto:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 INSERT INTO productos (nombre_producto, precio, costo, id_categoria, descripcion, stock, imagen_url)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id_producto, nombre_producto, precio, costo, id_categoria, descripcion, stock, imagen_url;
+                RETURNING {PRODUCTO.select};
             """
             cursor.execute(query, (
                 producto.nombre_producto,
@@ -25,16 +40,8 @@ class PostgresProductoRepository(ProductoRepository):
             ))
             result = cursor.fetchone()
             conn.commit()
-            return Producto(
-                id_producto=result['id_producto'],
-                nombre_producto=result['nombre_producto'],
-                precio=result['precio'],
-                costo=result['costo'],
-                id_categoria=result['id_categoria'],
-                descripcion=result['descripcion'],
-                stock=result['stock'],
-                imagen_url=result['imagen_url']
-            )
+            registrar_escritura("productos")
+            return PRODUCTO.uno(result)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -43,26 +50,35 @@ class PostgresProductoRepository(ProductoRepository):
             if conn:
                 conn.close()
 
-    def obtener_por_id(self, id_producto: int) -> Optional[Producto]:
+    def obtener_por_id(self, id_producto: int, campos: Optional[Sequence[str]] = None) -> Optional[Producto]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = "SELECT * FROM productos WHERE id_producto = %s AND (eliminado IS NULL OR eliminado = FALSE);"
-            cursor.execute(query, (id_producto,))
+            cursor = cursor_tuplas(conn)
+            mapeo = PRODUCTO.proyeccion(campos)
+            if mapeo is PRODUCTO:
+                prepared_statements.ejecutar(cursor, _POR_ID, (id_producto,))
+            else:
+                query = f"SELECT {mapeo.select} FROM productos WHERE id_producto = %s AND (eliminado IS NULL OR eliminado = FALSE);"
+                cursor.execute(query, (id_producto,))
             result = cursor.fetchone()
-            if not result:
-                return None
-            return Producto(
-                id_producto=result['id_producto'],
-                nombre_producto=result['nombre_producto'],
-                precio=result['precio'],
-                costo=result['costo'],
-                id_categoria=result['id_categoria'],
-                descripcion=result['descripcion'],
-                stock=result['stock'],
-                imagen_url=result['imagen_url']
-            )
+            return mapeo.uno(result)
+        except Exception as e:
+            raise e
+        finally:
+            if conn:
+                conn.close()
+
+    def obtener_por_ids(self, ids: List[int]) -> List[Producto]:
+        if not ids:
+            return []
+        conn = None
+        try:
+            conn = get_db_connection()
+            cursor = cursor_tuplas(conn)
+            # Una sola consulta para todo el lote; el orden lo reconstruye el caso de uso
+            prepared_statements.ejecutar(cursor, _POR_IDS, (list(ids),))
+            return PRODUCTO.todos(cursor.fetchall())
         except Exception as e:
             raise e
         finally:
@@ -70,25 +86,29 @@ class PostgresProductoRepository(ProductoRepository):
                 conn.close()
 
     def listar_todos(self) -> List[Producto]:
+        return self.listar_pagina().items
+
+    def listar_pagina(self, limit: Optional[int] = None, after: Optional[int] = None, id_categoria: Optional[int] = None, campos: Optional[Sequence[str]] = None) -> Pagina[Producto]:
+        mapeo = PRODUCTO.proyeccion(campos)
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = "SELECT * FROM productos WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_producto;"
-            cursor.execute(query)
-            results = cursor.fetchall()
-            return [
-                Producto(
-                    id_producto=row['id_producto'],
-                    nombre_producto=row['nombre_producto'],
-                    precio=row['precio'],
-                    costo=row['costo'],
-                    id_categoria=row['id_categoria'],
-                    descripcion=row['descripcion'],
-                    stock=row['stock'],
-                    imagen_url=row['imagen_url']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+            condiciones = ["(eliminado IS NULL OR eliminado = FALSE)"]
+            params = []
+            if after is not None:
+                condiciones.append("id_producto > %s")
+                params.append(after)
+            if id_categoria is not None:
+                condiciones.append("id_categoria = %s")
+                params.append(id_categoria)
+            query = f"SELECT {mapeo.select} FROM productos WHERE " + " AND ".join(condiciones) + " ORDER BY id_producto"
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(query + ";", params)
+            productos = mapeo.todos(cursor.fetchall())
+            return Pagina.desde_filas(productos, limit, lambda producto: producto.id_producto)
         except Exception as e:
             raise e
         finally:
@@ -99,12 +119,12 @@ class PostgresProductoRepository(ProductoRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 UPDATE productos
                 SET nombre_producto = %s, precio = %s, costo = %s, id_categoria = %s, descripcion = %s, stock = %s, imagen_url = %s
                 WHERE id_producto = %s
-                RETURNING *;
+                RETURNING {PRODUCTO.select};
             """
             cursor.execute(query, (
                 producto.nombre_producto,
@@ -118,18 +138,8 @@ class PostgresProductoRepository(ProductoRepository):
             ))
             result = cursor.fetchone()
             conn.commit()
-            if not result:
-                return None
-            return Producto(
-                id_producto=result['id_producto'],
-                nombre_producto=result['nombre_producto'],
-                precio=result['precio'],
-                costo=result['costo'],
-                id_categoria=result['id_categoria'],
-                descripcion=result['descripcion'],
-                stock=result['stock'],
-                imagen_url=result['imagen_url']
-            )
+            registrar_escritura("productos")
+            return PRODUCTO.uno(result)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -158,6 +168,7 @@ class PostgresProductoRepository(ProductoRepository):
             cursor.execute(query, (id_producto,))
 
             conn.commit()
+            registrar_escritura("productos")
             actualizado = cursor.rowcount > 0
 
             return actualizado
@@ -198,6 +209,7 @@ class PostgresProductoRepository(ProductoRepository):
             cursor.execute(query, (cantidad, id_producto, cantidad))
             if own_conn:
                 conn.commit()
+                registrar_escritura("productos")
             return cursor.rowcount > 0
         except Exception:
             if own_conn and conn:
@@ -213,4 +225,55 @@ class PostgresProductoRepository(ProductoRepository):
                 try:
                     conn.close()
                 except Exception:
-                    pass
\ No newline at end of file
+                    pass
+
+    def reservar_stock(self, cantidades: Dict[int, int], conn) -> Dict[int, float]:
+        if not cantidades:
+            return {}
+        cursor = conn.cursor()
+        try:
+            ids = sorted(cantidades)
+            # Bloquear en orden de id: dos ventas concurrentes toman los locks en la
+            # misma secuencia y no pueden quedar esperándose mutuamente
+            cursor.execute(
+                """
+                SELECT id_producto, stock, precio FROM productos
+                WHERE id_producto = ANY(%s) AND (eliminado IS NULL OR eliminado = FALSE)
+                ORDER BY id_producto
+                FOR UPDATE
+                """,
+                (ids,)
+            )
+            actuales = {}
+            for row in cursor.fetchall():
+                if isinstance(row, dict):
+                    actuales[row['id_producto']] = (row['stock'], row['precio'])
+                else:
+                    actuales[row[0]] = (row[1], row[2])
+
+            faltantes = {}
+            for id_producto in ids:
+                disponible = actuales[id_producto][0] if id_producto in actuales else None
+                if disponible is None or disponible < cantidades[id_producto]:
+                    faltantes[id_producto] = {"solicitado": cantidades[id_producto], "disponible": disponible}
+            if faltantes:
+                raise StockInsuficienteError(faltantes)
+
+            psycopg2.extras.execute_values(
+                cursor,
+                """
+                UPDATE productos AS p
+                SET stock = p.stock - v.cantidad
+                FROM (VALUES %s) AS v(id_producto, cantidad)
+                WHERE p.id_producto = v.id_producto
+                """,
+                [(id_producto, cantidades[id_producto]) for id_producto in ids],
+                template="(%s::int, %s::int)",
+                page_size=len(ids)
+            )
+            return {id_producto: actuales[id_producto][1] for id_producto in ids}
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
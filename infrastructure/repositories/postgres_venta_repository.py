@@ -1,6 +1,9 @@
 from domain.repositories.venta_repository import VentaRepository
 from domain.entities.venta import Venta
+from domain.entities.pagina import Pagina
+from infrastructure.cache.versiones import registrar_escritura
 from infrastructure.database.postgres_connection import get_db_connection
+from infrastructure.repositories.mappers import VENTA, cursor_tuplas
 from typing import List, Optional
 
 class PostgresVentaRepository(VentaRepository):
@@ -14,11 +17,11 @@ class PostgresVentaRepository(VentaRepository):
             if conn is None:
                 conn = get_db_connection()
                 own_conn = True
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 INSERT INTO ventas (id_orden, fecha_venta, total_venta, metodo_pago)
                 VALUES (%s, %s, %s, %s)
-                RETURNING id_venta, id_orden, fecha_venta, total_venta, metodo_pago;
+                RETURNING {VENTA.select};
             """
             cursor.execute(query, (
                 venta.id_orden,
@@ -29,13 +32,8 @@ class PostgresVentaRepository(VentaRepository):
             result = cursor.fetchone()
             if own_conn:
                 conn.commit()
-            return Venta(
-                id_venta=result['id_venta'],
-                id_orden=result['id_orden'],
-                fecha_venta=result['fecha_venta'],
-                total_venta=result['total_venta'],
-                metodo_pago=result['metodo_pago']
-            )
+                registrar_escritura("ventas")
+            return VENTA.uno(result)
         except Exception as e:
             if own_conn and conn:
                 conn.rollback()
@@ -56,19 +54,11 @@ class PostgresVentaRepository(VentaRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = "SELECT * FROM ventas WHERE id_venta = %s AND (eliminado IS NULL OR eliminado = FALSE);"
+            cursor = cursor_tuplas(conn)
+            query = f"SELECT {VENTA.select} FROM ventas WHERE id_venta = %s AND (eliminado IS NULL OR eliminado = FALSE);"
             cursor.execute(query, (id_venta,))
             result = cursor.fetchone()
-            if not result:
-                return None
-            return Venta(
-                id_venta=result['id_venta'],
-                id_orden=result['id_orden'],
-                fecha_venta=result['fecha_venta'],
-                total_venta=result['total_venta'],
-                metodo_pago=result['metodo_pago']
-            )
+            return VENTA.uno(result)
         except Exception as e:
             raise e
         finally:
@@ -76,22 +66,45 @@ class PostgresVentaRepository(VentaRepository):
                 conn.close()
 
     def listar_todos(self) -> List[Venta]:
+        return self.listar_pagina().items
+
+    def listar_pagina(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        id_orden: Optional[int] = None,
+        id_cliente: Optional[int] = None,
+        fecha_desde=None,
+        fecha_hasta=None,
+    ) -> Pagina[Venta]:
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = "SELECT * FROM ventas WHERE (eliminado IS NULL OR eliminado = FALSE) ORDER BY id_venta;"
-            cursor.execute(query)
-            results = cursor.fetchall()
-            return [
-                Venta(
-                    id_venta=row['id_venta'],
-                    id_orden=row['id_orden'],
-                    fecha_venta=row['fecha_venta'],
-                    total_venta=row['total_venta'],
-                    metodo_pago=row['metodo_pago']
-                ) for row in results
-            ]
+            cursor = cursor_tuplas(conn)
+            condiciones = ["(eliminado IS NULL OR eliminado = FALSE)"]
+            params = []
+            if after is not None:
+                condiciones.append("id_venta > %s")
+                params.append(after)
+            if id_orden is not None:
+                condiciones.append("id_orden = %s")
+                params.append(id_orden)
+            if id_cliente is not None:
+                condiciones.append("id_orden IN (SELECT id_orden FROM orden WHERE id_cliente = %s)")
+                params.append(id_cliente)
+            if fecha_desde is not None:
+                condiciones.append("fecha_venta >= %s")
+                params.append(fecha_desde)
+            if fecha_hasta is not None:
+                condiciones.append("fecha_venta <= %s")
+                params.append(fecha_hasta)
+            query = f"SELECT {VENTA.select} FROM ventas WHERE " + " AND ".join(condiciones) + " ORDER BY id_venta"
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(query + ";", params)
+            ventas = VENTA.todos(cursor.fetchall())
+            return Pagina.desde_filas(ventas, limit, lambda venta: venta.id_venta)
         except Exception as e:
             raise e
         finally:
@@ -102,12 +115,12 @@ class PostgresVentaRepository(VentaRepository):
         conn = None
         try:
             conn = get_db_connection()
-            cursor = conn.cursor()
-            query = """
+            cursor = cursor_tuplas(conn)
+            query = f"""
                 UPDATE ventas
                 SET id_orden = %s, fecha_venta = %s, total_venta = %s, metodo_pago = %s
                 WHERE id_venta = %s AND (eliminado IS NULL OR eliminado = FALSE)
-                RETURNING *;
+                RETURNING {VENTA.select};
             """
             # aceptar tanto objeto Venta como dict con las mismas keys
             if isinstance(venta, dict):
@@ -130,15 +143,8 @@ class PostgresVentaRepository(VentaRepository):
             ))
             result = cursor.fetchone()
             conn.commit()
-            if not result:
-                return None
-            return Venta(
-                id_venta=result['id_venta'],
-                id_orden=result['id_orden'],
-                fecha_venta=result['fecha_venta'],
-                total_venta=result['total_venta'],
-                metodo_pago=result['metodo_pago']
-            )
+            registrar_escritura("ventas")
+            return VENTA.uno(result)
         except Exception as e:
             if conn:
                 conn.rollback()
@@ -156,6 +162,7 @@ class PostgresVentaRepository(VentaRepository):
             query = "UPDATE ventas SET eliminado = TRUE WHERE id_venta = %s;"
             cursor.execute(query, (id_venta,))
             conn.commit()
+            registrar_escritura("ventas")
             return cursor.rowcount > 0
         except Exception as e:
             if conn:
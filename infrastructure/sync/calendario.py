@@ -0,0 +1,144 @@
+"""Dimensión calendario (`dim_tiempo`) pregenerada.
+
+`dim_tiempo` se llena de una vez para un rango configurable con un único
+`INSERT ... SELECT FROM generate_series(...)`, incluyendo día de la semana,
+semana ISO, trimestre y banderas de fin de semana y fin de mes. Durante la
+sincronización `fecha → id_tiempo` sale de `MapaCalendario`, cargado una vez
+por corrida: un full sync ya no consulta `dim_tiempo` por fila.
+
+Rango por `SYNC_CALENDARIO_DESDE` (ISO, por defecto 2020-01-01) y
+`SYNC_CALENDARIO_ANIOS_FUTUROS` (por defecto 2: hasta el 31/12 de dentro de dos
+años). Una fecha fuera del rango se inserta sola bajo un SAVEPOINT, así una
+carrera con otra sincronización no deshace lo ya escrito en la transacción.
+"""
+
+import logging
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+from psycopg2 import errors
+
+logger = logging.getLogger('sync')
+
+COLUMNAS_CALENDARIO = (
+    ("dia_semana", "SMALLINT"),      # ISO: 1 = lunes ... 7 = domingo
+    ("semana_iso", "SMALLINT"),
+    ("es_fin_de_semana", "BOOLEAN"),
+    ("es_fin_de_mes", "BOOLEAN"),
+)
+
+# Columnas de dim_tiempo y expresiones que las calculan a partir de una fecha `d`
+COLUMNAS_INSERT = """fecha, anio, mes, dia, trimestre, semana,
+                            dia_semana, semana_iso, es_fin_de_semana, es_fin_de_mes"""
+EXPRESIONES = """
+    d::date, EXTRACT(YEAR FROM d), EXTRACT(MONTH FROM d), EXTRACT(DAY FROM d),
+    EXTRACT(QUARTER FROM d), EXTRACT(WEEK FROM d),
+    EXTRACT(ISODOW FROM d), EXTRACT(WEEK FROM d), EXTRACT(ISODOW FROM d) >= 6,
+    d::date = (date_trunc('month', d) + interval '1 month - 1 day')::date
+"""
+
+SQL_POBLAR = f"""
+    INSERT INTO dim_tiempo ({COLUMNAS_INSERT})
+    SELECT {EXPRESIONES}
+    FROM generate_series(CAST(%s AS date), CAST(%s AS date), interval '1 day') AS d
+    WHERE NOT EXISTS (SELECT 1 FROM dim_tiempo t WHERE t.fecha = d::date);
+"""
+
+# Filas creadas antes de existir las columnas nuevas
+SQL_COMPLETAR = """
+    UPDATE dim_tiempo
+    SET dia_semana = EXTRACT(ISODOW FROM fecha),
+        semana_iso = EXTRACT(WEEK FROM fecha),
+        es_fin_de_semana = EXTRACT(ISODOW FROM fecha) >= 6,
+        es_fin_de_mes = fecha = (date_trunc('month', fecha) + interval '1 month - 1 day')::date
+    WHERE dia_semana IS NULL;
+"""
+
+
+def rango_calendario(hoy: Optional[date] = None) -> Tuple[date, date]:
+    hoy = hoy or date.today()
+    desde = date.fromisoformat(os.getenv('SYNC_CALENDARIO_DESDE', '2020-01-01'))
+    futuros = int(os.getenv('SYNC_CALENDARIO_ANIOS_FUTUROS', '2'))
+    return desde, date(hoy.year + futuros, 12, 31)
+
+
+def _fila(row, clave: str, indice: int):
+    return row[clave] if isinstance(row, dict) else row[indice]
+
+
+def asegurar_columnas(cur) -> None:
+    """Agrega las columnas del calendario a `dim_tiempo` si faltan (ALTER solo cuando hace falta)."""
+    nombres = [nombre for nombre, _ in COLUMNAS_CALENDARIO]
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_name = 'dim_tiempo' AND column_name = ANY(%s);",
+        (nombres,),
+    )
+    existentes = {_fila(row, 'column_name', 0) for row in cur.fetchall()}
+    faltantes = [(n, t) for n, t in COLUMNAS_CALENDARIO if n not in existentes]
+    if faltantes:
+        cur.execute("ALTER TABLE dim_tiempo " + ", ".join(
+            f"ADD COLUMN IF NOT EXISTS {n} {t}" for n, t in faltantes) + ";")
+
+
+def poblar_calendario(cur, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+    """Crea las fechas faltantes de [desde, hasta] en un solo statement. Retorna las insertadas."""
+    if desde is None or hasta is None:
+        por_defecto = rango_calendario()
+        desde, hasta = desde or por_defecto[0], hasta or por_defecto[1]
+    asegurar_columnas(cur)
+    cur.execute(SQL_COMPLETAR)
+    cur.execute(SQL_POBLAR, (desde, hasta))
+    insertadas = max(cur.rowcount, 0)
+    logger.info(f"poblar_calendario: {insertadas} fechas nuevas entre {desde} y {hasta}")
+    return insertadas
+
+
+class MapaCalendario:
+    """`fecha → id_tiempo` en memoria para una corrida de sincronización."""
+
+    def __init__(self, ids: Dict[date, int]) -> None:
+        self._ids = ids
+        self.aciertos = 0
+        self.insertadas = 0
+
+    @classmethod
+    def cargar(cls, cur) -> "MapaCalendario":
+        asegurar_columnas(cur)
+        cur.execute("SELECT fecha, id_tiempo FROM dim_tiempo;")
+        return cls({_fila(row, 'fecha', 0): _fila(row, 'id_tiempo', 1) for row in cur.fetchall()})
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def copia(self) -> "MapaCalendario":
+        """Mapa independiente: lo que se inserte en una transacción que luego falle no contamina el original."""
+        return MapaCalendario(dict(self._ids))
+
+    def id_tiempo(self, cur, fecha: Any) -> Optional[int]:
+        if isinstance(fecha, datetime):
+            fecha = fecha.date()
+        id_tiempo = self._ids.get(fecha)
+        if id_tiempo is not None:
+            self.aciertos += 1
+            return id_tiempo
+        id_tiempo = self._insertar(cur, fecha)
+        if id_tiempo is not None:
+            self._ids[fecha] = id_tiempo
+        return id_tiempo
+
+    def _insertar(self, cur, fecha: date) -> Optional[int]:
+        # El SAVEPOINT acota el rollback a esta fecha si otra sincronización la insertó primero
+        cur.execute("SAVEPOINT calendario_fecha;")
+        try:
+            cur.execute(SQL_POBLAR, (fecha, fecha))
+        except errors.UniqueViolation:
+            cur.execute("ROLLBACK TO SAVEPOINT calendario_fecha;")
+        else:
+            self.insertadas += max(cur.rowcount, 0)
+            cur.execute("RELEASE SAVEPOINT calendario_fecha;")
+        cur.execute("SELECT id_tiempo FROM dim_tiempo WHERE fecha = CAST(%s AS date);", (fecha,))
+        row = cur.fetchone()
+        logger.debug(f"MapaCalendario: fecha fuera del calendario {fecha} -> {row}")
+        return _fila(row, 'id_tiempo', 0) if row else None
@@ -0,0 +1,362 @@
+"""Carga masiva OLTP → OLAP por conjuntos, con tablas de staging.
+
+El modo normal de `sync_oltp_to_olap.py` hace un `cur.execute` por fila de
+dimensión y por hecho: sobre la WAN hacia el host OLAP, una sincronización
+completa son millones de round-trips. Aquí cada tabla se extrae de la OLTP por
+lotes (cursor de servidor), cada lote se envía con `COPY ... FROM STDIN` a una
+tabla temporal en la OLAP y al final se hace un solo `INSERT ... SELECT ...
+ON CONFLICT` por tabla destino:
+
+1. `dim_categoria`, `dim_producto`, `dim_cliente`: staging con los mismos
+   tipos que la dimensión más el número de fila `n`, y merge con
+   `DISTINCT ON (clave) ... ORDER BY clave, n DESC`: gana la última fila
+   leída. La consulta de clientes trae una fila por orden, ordenadas por
+   `id_orden`, así que la ciudad y el país son los de su orden más reciente.
+2. Se pregenera el calendario (`dim_tiempo`, ver `calendario.py`).
+3. Hechos: staging con la fila de venta ya calculada (total y margen salen de
+   la OLTP). Se crean de una vez los `dim_metodo_pago`, `dim_envio` y fechas
+   que falten y los placeholders de categoría/cliente/producto, y
+   `hecho_ventas` se resuelve con JOINs a las dimensiones.
+
+Por etapa (extracción, COPY y merge de cada tabla) se reportan filas, bytes y
+filas por segundo. Todo va en la transacción OLAP del llamador.
+"""
+
+import io
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import psycopg2.extensions
+
+from infrastructure.sync import calendario
+
+logger = logging.getLogger('sync')
+
+
+def tamano_lote_sync() -> int:
+    return max(1, int(os.getenv('SYNC_BATCH_SIZE', '5000')))
+
+
+@dataclass
+class EstadisticaEtapa:
+    etapa: str
+    filas: int = 0
+    bytes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+
+@dataclass
+class ReporteCarga:
+    etapas: List[EstadisticaEtapa] = field(default_factory=list)
+
+    def etapa(self, nombre: str) -> EstadisticaEtapa:
+        for existente in self.etapas:
+            if existente.etapa == nombre:
+                return existente
+        nueva = EstadisticaEtapa(nombre)
+        self.etapas.append(nueva)
+        return nueva
+
+    def sumar(self, otro: "ReporteCarga") -> None:
+        """Acumula las etapas de otro reporte (p. ej. de cada partición en paralelo)."""
+        for e in otro.etapas:
+            propia = self.etapa(e.etapa)
+            propia.filas += e.filas
+            propia.bytes += e.bytes
+            propia.segundos += e.segundos
+
+    def resumen(self) -> str:
+        lineas = [f"{'etapa':<28}{'filas':>10}{'KiB':>12}{'seg':>9}{'filas/s':>12}"]
+        for e in self.etapas:
+            lineas.append(f"{e.etapa:<28}{e.filas:>10}{e.bytes / 1024:>12.1f}{e.segundos:>9.2f}{e.filas_por_segundo:>12.0f}")
+        return "\n".join(lineas)
+
+
+# ---------------------------------------------------------------------------
+# COPY en formato texto
+# ---------------------------------------------------------------------------
+
+_ESCAPES_COPY = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _valor_copy(valor: Any) -> str:
+    if valor is None:
+        return "\\N"
+    if isinstance(valor, bool):
+        return "t" if valor else "f"
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    return str(valor).translate(_ESCAPES_COPY)
+
+
+def serializar_copy(filas: Iterable[Sequence[Any]]) -> bytes:
+    """Filas → payload de `COPY ... FROM STDIN` (formato texto: tabs, `\\N` para NULL)."""
+    return "".join("\t".join(map(_valor_copy, fila)) + "\n" for fila in filas).encode("utf-8")
+
+
+def copiar(cur, staging: str, columnas: Sequence[str], filas: Sequence[Sequence[Any]]) -> int:
+    """Envía `filas` a `staging` con COPY. Retorna los bytes transferidos."""
+    payload = serializar_copy(filas)
+    cur.copy_expert(f"COPY {staging} ({', '.join(columnas)}) FROM STDIN", io.BytesIO(payload))
+    return len(payload)
+
+
+# ---------------------------------------------------------------------------
+# Definición de las tablas destino
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Dimension:
+    tabla: str
+    clave: str
+    columnas: Tuple[str, ...]
+    # Debe retornar exactamente `columnas`, en ese orden
+    consulta_oltp: str
+
+    @property
+    def staging(self) -> str:
+        return f"stg_{self.tabla}"
+
+    @property
+    def columnas_staging(self) -> Tuple[str, ...]:
+        # `n` numera las filas en orden de lectura, como en `stg_ventas`
+        return ("n", *self.columnas)
+
+    def sql_staging(self) -> str:
+        # Mismos tipos que la dimensión pero sin restricciones (los placeholders llevan NULLs)
+        return (f"CREATE TEMP TABLE IF NOT EXISTS {self.staging} ON COMMIT DROP AS "
+                f"SELECT 0::bigint AS n, {', '.join(self.columnas)} FROM {self.tabla} WITH NO DATA; "
+                f"TRUNCATE {self.staging};")
+
+    def sql_merge(self) -> str:
+        columnas = ", ".join(self.columnas)
+        actualizar = ", ".join(f"{c}=EXCLUDED.{c}" for c in self.columnas if c != self.clave)
+        return f"""
+            INSERT INTO {self.tabla} ({columnas})
+            SELECT DISTINCT ON ({self.clave}) {columnas} FROM {self.staging}
+            ORDER BY {self.clave}, n DESC
+            ON CONFLICT ({self.clave}) DO UPDATE SET {actualizar};
+        """
+
+
+DIM_CATEGORIA = Dimension(
+    "dim_categoria", "id_categoria", ("id_categoria", "nombre_categoria", "descripcion"),
+    "SELECT id_categoria, nombre_categoria, descripcion FROM categoria",
+)
+DIM_PRODUCTO = Dimension(
+    "dim_producto", "id_producto",
+    ("id_producto", "nombre_producto", "descripcion", "precio", "costo", "id_categoria"),
+    "SELECT id_producto, nombre_producto, descripcion, precio, costo, id_categoria FROM productos",
+)
+DIM_CLIENTE = Dimension(
+    "dim_cliente", "id_cliente",
+    ("id_cliente", "nombre", "apellido", "edad", "email", "telefono", "direccion", "ciudad", "pais"),
+    """
+    SELECT c.id_cliente, c.nombre, c.apellido, c.edad, c.email, c.telefono, c.direccion,
+           o.ciudad_envio AS ciudad, o.pais_envio AS pais
+    FROM clientes c
+    LEFT JOIN orden o ON c.id_cliente = o.id_cliente
+    ORDER BY c.id_cliente, o.id_orden
+    """,
+)
+DIMENSIONES = (DIM_CATEGORIA, DIM_PRODUCTO, DIM_CLIENTE)
+
+# `n` conserva el orden de lectura: ante hechos con la misma clave gana el último, como en la carga fila a fila
+COLUMNAS_VENTAS = (
+    "n", "fecha", "id_cliente", "id_producto", "id_categoria", "metodo_pago",
+    "estado_envio", "metodo_envio", "cantidad", "total_venta", "costo_envio", "margen",
+)
+CONSULTA_VENTAS = """
+    SELECT v.fecha_venta::date AS fecha, o.id_cliente, op.id_producto, p.id_categoria, v.metodo_pago,
+           o.estado_envio, o.metodo_envio, op.cantidad,
+           op.cantidad * op.precio_unitario AS total_venta,
+           o.costo_envio,
+           (op.precio_unitario - p.costo) * op.cantidad AS margen
+    FROM ventas v
+    JOIN orden o ON v.id_orden = o.id_orden
+    JOIN orden_producto op ON o.id_orden = op.id_orden
+    JOIN productos p ON op.id_producto = p.id_producto
+"""
+
+SQL_STAGING_VENTAS = """
+    CREATE TEMP TABLE IF NOT EXISTS stg_ventas (
+        n bigint, fecha date, id_cliente integer, id_producto integer, id_categoria integer,
+        metodo_pago text, estado_envio text, metodo_envio text,
+        cantidad numeric, total_venta numeric, costo_envio numeric, margen numeric
+    ) ON COMMIT DROP;
+    TRUNCATE stg_ventas;
+"""
+
+# Dimensiones derivadas de los hechos: se crean de una vez las que falten
+SQL_DIMENSIONES_DE_HECHOS = (
+    ("dim_metodo_pago", """
+        INSERT INTO dim_metodo_pago (metodo_pago)
+        SELECT DISTINCT metodo_pago FROM stg_ventas
+        ON CONFLICT (metodo_pago) DO NOTHING;
+    """),
+    ("dim_envio", """
+        INSERT INTO dim_envio (estado_envio, metodo_envio)
+        SELECT DISTINCT estado_envio, metodo_envio FROM stg_ventas
+        ON CONFLICT (estado_envio, metodo_envio) DO NOTHING;
+    """),
+    # Solo fechas fuera del calendario pregenerado (ver calendario.py)
+    ("dim_tiempo", f"""
+        INSERT INTO dim_tiempo ({calendario.COLUMNAS_INSERT})
+        SELECT {calendario.EXPRESIONES}
+        FROM (SELECT DISTINCT fecha AS d FROM stg_ventas WHERE fecha IS NOT NULL) f
+        WHERE NOT EXISTS (SELECT 1 FROM dim_tiempo t WHERE t.fecha = f.d);
+    """),
+    # Placeholders (como en la carga fila a fila) para claves referenciadas que no están en la OLTP
+    ("dim_categoria", """
+        INSERT INTO dim_categoria (id_categoria)
+        SELECT DISTINCT id_categoria FROM stg_ventas WHERE id_categoria IS NOT NULL
+        ON CONFLICT (id_categoria) DO NOTHING;
+    """),
+    ("dim_cliente", """
+        INSERT INTO dim_cliente (id_cliente)
+        SELECT DISTINCT id_cliente FROM stg_ventas WHERE id_cliente IS NOT NULL
+        ON CONFLICT (id_cliente) DO NOTHING;
+    """),
+    ("dim_producto", """
+        INSERT INTO dim_producto (id_producto, id_categoria)
+        SELECT DISTINCT ON (id_producto) id_producto, id_categoria FROM stg_ventas WHERE id_producto IS NOT NULL
+        ORDER BY id_producto
+        ON CONFLICT (id_producto) DO NOTHING;
+    """),
+)
+
+SQL_MERGE_HECHOS = """
+    INSERT INTO hecho_ventas (
+        id_tiempo, id_cliente, id_producto, id_categoria, id_metodo_pago, id_envio,
+        cantidad, total_venta, costo_envio, margen
+    )
+    SELECT DISTINCT ON (t.id_tiempo, s.id_cliente, s.id_producto, s.id_categoria, mp.id_metodo_pago, e.id_envio)
+           t.id_tiempo, s.id_cliente, s.id_producto, s.id_categoria, mp.id_metodo_pago, e.id_envio,
+           s.cantidad, s.total_venta, s.costo_envio, s.margen
+    FROM stg_ventas s
+    JOIN dim_tiempo t ON t.fecha = s.fecha
+    JOIN dim_metodo_pago mp ON mp.metodo_pago = s.metodo_pago
+    JOIN dim_envio e ON e.estado_envio = s.estado_envio AND e.metodo_envio = s.metodo_envio
+    WHERE s.id_cliente IS NOT NULL AND s.id_producto IS NOT NULL AND s.id_categoria IS NOT NULL
+    ORDER BY t.id_tiempo, s.id_cliente, s.id_producto, s.id_categoria, mp.id_metodo_pago, e.id_envio, s.n DESC
+    ON CONFLICT (id_tiempo, id_cliente, id_producto, id_categoria, id_metodo_pago, id_envio)
+    DO UPDATE SET
+        cantidad = EXCLUDED.cantidad,
+        total_venta = EXCLUDED.total_venta,
+        costo_envio = EXCLUDED.costo_envio,
+        margen = EXCLUDED.margen;
+"""
+
+
+# ---------------------------------------------------------------------------
+# Etapas
+# ---------------------------------------------------------------------------
+
+def _lotes(oltp_conn, nombre: str, consulta: str, params: Optional[Sequence[Any]], tamano: int):
+    """Lee `consulta` por lotes de `tamano` con un cursor de servidor (tuplas).
+
+    El cursor no es WITH HOLD: uno con HOLD declarado fuera de una transacción
+    se materializa entero al hacer commit del DECLARE, antes del primer lote.
+    Aquí se lee dentro de una transacción de solo lectura, así los lotes llegan
+    a medida que la consulta avanza y la extracción se solapa con el COPY.
+    """
+    autocommit = oltp_conn.autocommit
+    oltp_conn.autocommit = False
+    cur = None
+    try:
+        oltp_conn.cursor(cursor_factory=psycopg2.extensions.cursor).execute("SET TRANSACTION READ ONLY;")
+        cur = oltp_conn.cursor(name=f"sync_{nombre}", cursor_factory=psycopg2.extensions.cursor)
+        cur.itersize = tamano
+        cur.execute(consulta, params)
+        while True:
+            filas = cur.fetchmany(tamano)
+            if not filas:
+                return
+            yield filas
+    finally:
+        if cur is not None:
+            cur.close()
+        # Solo lectura: no hay nada que confirmar, solo cerrar la transacción
+        oltp_conn.rollback()
+        oltp_conn.autocommit = autocommit
+
+
+def _extraer_y_copiar(oltp_conn, olap_cur, nombre: str, consulta: str, staging: str,
+                      columnas: Sequence[str], reporte: ReporteCarga, tamano: int,
+                      params: Optional[Sequence[Any]] = None, numerar: bool = False) -> int:
+    extraccion = reporte.etapa(f"{nombre}:extraccion")
+    copia = reporte.etapa(f"{nombre}:copy")
+    total = 0
+    inicio = time.perf_counter()
+    for filas in _lotes(oltp_conn, nombre, consulta, params, tamano):
+        extraccion.segundos += time.perf_counter() - inicio
+        extraccion.filas += len(filas)
+        if numerar:
+            filas = [(total + i, *fila) for i, fila in enumerate(filas)]
+        inicio_copia = time.perf_counter()
+        enviados = copiar(olap_cur, staging, columnas, filas)
+        copia.segundos += time.perf_counter() - inicio_copia
+        copia.filas += len(filas)
+        copia.bytes += enviados
+        extraccion.bytes += enviados
+        total += len(filas)
+        logger.debug(f"carga_masiva: {nombre} lote de {len(filas)} filas ({enviados} bytes)")
+        inicio = time.perf_counter()
+    extraccion.segundos += time.perf_counter() - inicio
+    return total
+
+
+def _ejecutar_merge(olap_cur, etapa: EstadisticaEtapa, sql: str) -> None:
+    inicio = time.perf_counter()
+    olap_cur.execute(sql)
+    etapa.segundos += time.perf_counter() - inicio
+    etapa.filas += max(olap_cur.rowcount, 0)
+
+
+def cargar_dimensiones(oltp_conn, olap_cur, reporte: ReporteCarga, tamano: Optional[int] = None,
+                       dimensiones: Sequence[Dimension] = DIMENSIONES) -> None:
+    tamano = tamano or tamano_lote_sync()
+    for dim in dimensiones:
+        olap_cur.execute(dim.sql_staging())
+        _extraer_y_copiar(oltp_conn, olap_cur, dim.tabla, dim.consulta_oltp, dim.staging, dim.columnas_staging,
+                          reporte, tamano, numerar=True)
+        _ejecutar_merge(olap_cur, reporte.etapa(f"{dim.tabla}:merge"), dim.sql_merge())
+
+
+def cargar_hechos(oltp_conn, olap_cur, reporte: ReporteCarga, tamano: Optional[int] = None,
+                  filtro: str = "", params: Optional[Sequence[Any]] = None,
+                  dimensiones_derivadas: bool = True) -> None:
+    """Carga `hecho_ventas`. `filtro` (p. ej. `WHERE v.id_venta BETWEEN %s AND %s`) acota la extracción.
+
+    Con `dimensiones_derivadas=False` no se crean métodos de pago, envíos, fechas
+    ni placeholders: el llamador ya los cargó (ver `sync_paralelo.py`).
+    """
+    tamano = tamano or tamano_lote_sync()
+    olap_cur.execute(SQL_STAGING_VENTAS)
+    _extraer_y_copiar(oltp_conn, olap_cur, "hecho_ventas", CONSULTA_VENTAS + filtro, "stg_ventas",
+                      COLUMNAS_VENTAS, reporte, tamano, params=params, numerar=True)
+    for tabla, sql in (SQL_DIMENSIONES_DE_HECHOS if dimensiones_derivadas else ()):
+        _ejecutar_merge(olap_cur, reporte.etapa(f"{tabla}:desde_hechos"), sql)
+    _ejecutar_merge(olap_cur, reporte.etapa("hecho_ventas:merge"), SQL_MERGE_HECHOS)
+
+
+def cargar_todo(oltp_conn, olap_conn, tamano: Optional[int] = None) -> ReporteCarga:
+    """Sincronización completa por conjuntos: dimensiones y luego hechos, sin commit."""
+    reporte = ReporteCarga()
+    olap_cur = olap_conn.cursor()
+    cargar_dimensiones(oltp_conn, olap_cur, reporte, tamano)
+    etapa = reporte.etapa("dim_tiempo:calendario")
+    inicio = time.perf_counter()
+    etapa.filas += calendario.poblar_calendario(olap_cur)
+    etapa.segundos += time.perf_counter() - inicio
+    cargar_hechos(oltp_conn, olap_cur, reporte, tamano)
+    logger.info("carga_masiva completada\n" + reporte.resumen())
+    return reporte
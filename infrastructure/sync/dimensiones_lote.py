@@ -0,0 +1,143 @@
+"""Dimensiones de `_sync_ventas` resueltas por lote.
+
+Antes, por cada fila de hecho se consultaban en la OLTP la categoría, el
+cliente y el producto (`WHERE id = %s`) y se hacían tres upserts en la OLAP,
+aunque el mismo producto apareciera en miles de filas. Aquí, por cada lote de
+hechos, se juntan las claves distintas que aún no se sincronizaron en la
+corrida, se leen con una consulta `= ANY(%s)` por dimensión y se suben con un
+solo upsert multi-fila. `ContextoSync` recuerda lo ya sincronizado (también
+los ids de `dim_metodo_pago`/`dim_envio` y el mapa del calendario) y cuenta
+los round-trips evitados.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import psycopg2.extras
+
+from infrastructure.sync.calendario import MapaCalendario
+
+logger = logging.getLogger('sync')
+
+
+@dataclass(frozen=True)
+class DimensionLote:
+    nombre: str
+    clave: str
+    consulta_oltp: str
+    tabla_olap: str
+    columnas: Tuple[str, ...]
+    # Columna OLAP -> clave en la fila OLTP (si difiere)
+    origen: Tuple[Tuple[str, str], ...] = ()
+
+    def valores(self, fila: Mapping[str, Any]) -> Tuple[Any, ...]:
+        origen = dict(self.origen)
+        return tuple(fila.get(origen.get(c, c)) for c in self.columnas)
+
+    def sql_upsert(self) -> str:
+        actualizar = ", ".join(f"{c}=EXCLUDED.{c}" for c in self.columnas if c != self.clave)
+        return (f"INSERT INTO {self.tabla_olap} ({', '.join(self.columnas)}) VALUES %s "
+                f"ON CONFLICT ({self.clave}) DO UPDATE SET {actualizar};")
+
+
+# En orden de dependencias: dim_producto referencia a dim_categoria
+CATEGORIA = DimensionLote(
+    "categoria", "id_categoria",
+    "SELECT * FROM categoria WHERE id_categoria = ANY(%s);",
+    "dim_categoria", ("id_categoria", "nombre_categoria", "descripcion"),
+)
+CLIENTE = DimensionLote(
+    "cliente", "id_cliente",
+    "SELECT * FROM clientes WHERE id_cliente = ANY(%s);",
+    "dim_cliente",
+    ("id_cliente", "nombre", "apellido", "edad", "email", "telefono", "direccion", "ciudad", "pais"),
+    (("ciudad", "ciudad_envio"), ("pais", "pais_envio")),
+)
+PRODUCTO = DimensionLote(
+    "producto", "id_producto",
+    "SELECT * FROM productos WHERE id_producto = ANY(%s);",
+    "dim_producto", ("id_producto", "nombre_producto", "descripcion", "precio", "costo", "id_categoria"),
+)
+DIMENSIONES_LOTE = (CATEGORIA, CLIENTE, PRODUCTO)
+
+
+class ContextoSync:
+    """Estado de una corrida de sincronización: dimensiones ya subidas y contadores."""
+
+    def __init__(self) -> None:
+        self.sincronizadas: Dict[str, Set[Any]] = {d.nombre: set() for d in DIMENSIONES_LOTE}
+        self.ids_metodo_pago: Dict[Any, int] = {}
+        self.ids_envio: Dict[Tuple[Any, Any], int] = {}
+        # Se carga una vez por corrida, en el primer lote de hechos
+        self.calendario: Optional[MapaCalendario] = None
+        self.filas = 0
+        self.consultas_oltp = 0
+        self.upserts_olap = 0
+        self.consultas_evitadas = 0
+        self.upserts_evitados = 0
+
+    def marcar(self, dimension: str, claves: Iterable[Any]) -> None:
+        """Registra claves ya subidas a la OLAP (p. ej. por `_sync_clientes`)."""
+        self.sincronizadas[dimension].update(claves)
+
+    def pendientes(self, dimension: str, claves: Iterable[Any]) -> List[Any]:
+        hechas = self.sincronizadas[dimension]
+        return sorted({c for c in claves if c is not None and c not in hechas})
+
+    def id_memorizado(self, cache: Dict[Any, int], clave: Any, crear: Callable[[], Optional[int]]) -> Optional[int]:
+        """Id de una dimensión pequeña (`dim_metodo_pago`, `dim_envio`): un upsert por valor y corrida."""
+        if clave in cache:
+            self.upserts_evitados += 1
+            return cache[clave]
+        valor = crear()
+        self.upserts_olap += 1
+        if valor is not None:
+            cache[clave] = valor
+        return valor
+
+    def resumen(self) -> str:
+        texto = (f"filas={self.filas} consultas_oltp={self.consultas_oltp} upserts_olap={self.upserts_olap} "
+                 f"consultas_evitadas={self.consultas_evitadas} upserts_evitados={self.upserts_evitados}")
+        if self.calendario is not None:
+            texto += (f" calendario_fechas={len(self.calendario)} calendario_aciertos={self.calendario.aciertos}"
+                      f" calendario_insertadas={self.calendario.insertadas}")
+        return texto
+
+
+def asegurar_dimensiones(oltp_cur, olap_cur, filas: List[Mapping[str, Any]], contexto: ContextoSync) -> None:
+    """Sube a la OLAP las categorías, clientes y productos referenciados por `filas`.
+
+    `oltp_cur` no debe ser el cursor del que se están leyendo los hechos. Las
+    claves que no existen en la OLTP se suben como placeholder (todo NULL salvo
+    la clave y, en productos, la categoría de la fila), igual que antes.
+    """
+    contexto.filas += len(filas)
+    for dimension in DIMENSIONES_LOTE:
+        # El camino por fila hacía un SELECT y un upsert por dimensión y por hecho
+        contexto.consultas_evitadas += len(filas)
+        contexto.upserts_evitados += len(filas)
+        claves = contexto.pendientes(dimension.nombre, (f.get(dimension.clave) for f in filas))
+        if not claves:
+            continue
+
+        oltp_cur.execute(dimension.consulta_oltp, (claves,))
+        encontradas = {fila[dimension.clave]: fila for fila in oltp_cur.fetchall()}
+        contexto.consultas_oltp += 1
+        contexto.consultas_evitadas -= 1
+
+        valores = []
+        for clave in claves:
+            fila = encontradas.get(clave)
+            if fila is None:
+                logger.warning(f"asegurar_dimensiones: {dimension.nombre} id={clave} no encontrado en OLTP; creando placeholder")
+                fila = {dimension.clave: clave}
+                if dimension is PRODUCTO:
+                    fila['id_categoria'] = next(
+                        (f.get('id_categoria') for f in filas if f.get('id_producto') == clave), None)
+            valores.append(dimension.valores(fila))
+        psycopg2.extras.execute_values(olap_cur, dimension.sql_upsert(), valores, page_size=len(valores))
+        contexto.upserts_olap += 1
+        contexto.upserts_evitados -= 1
+        contexto.marcar(dimension.nombre, claves)
+
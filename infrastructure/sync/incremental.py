@@ -0,0 +1,195 @@
+"""Sincronización incremental OLTP → OLAP con marcas de agua persistentes.
+
+Para ponerse al día tras una caída del worker, la única opción era el full
+sync, que relee y re-sube toda la historia. Aquí:
+
+- En la OLTP, un trigger por tabla anota cada INSERT/UPDATE/DELETE en
+  `sync_cambios` (secuencia `id`, transacción `xid`, tabla, operación, id
+  del registro). Las tablas no tienen columna de modificación y `xmin` de la
+  fila no ve los borrados, así que el log es la fuente.
+- La secuencia sola no sirve de marca: el `id` se asigna al insertar pero la
+  fila se ve al hacer commit, así que un `id` menor puede aparecer después de
+  haber avanzado la marca por encima. Por eso solo se leen cambios de
+  transacciones ya terminadas (`xid` menor que el xmin del snapshot actual:
+  todas sus filas ya son visibles y no aparecerán otras) y se recorren en
+  orden `(xid, id)`. Una transacción abierta retrasa sus cambios y los
+  posteriores, pero nunca los pierde.
+- En la OLAP, `sync_checkpoint` guarda por tabla el último `(xid, id)` de
+  `sync_cambios` aplicado.
+- `sincronizar_incremental` lee, tabla por tabla (dimensiones primero), los
+  cambios posteriores a la marca en lotes de `SYNC_BATCH_SIZE`, sincroniza
+  cada registro distinto una vez y guarda la marca nueva en la misma
+  transacción OLAP que los datos: commit por lote. Si el proceso muere, se
+  retoma desde el último lote confirmado. Luego se purgan del log los
+  cambios ya aplicados.
+
+La recuperación cuesta lo proporcional a los cambios, no a la historia.
+Instalación: `python infrastructure/sync/sync_oltp_to_olap.py --instalar-cambios`
+y un full sync inicial; a partir de ahí, `--incremental`.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from infrastructure.sync.carga_masiva import tamano_lote_sync
+from infrastructure.sync.dimensiones_lote import ContextoSync
+
+logger = logging.getLogger('sync')
+
+# tabla OLTP -> columna clave; en orden de dependencias (dimensiones antes que hechos)
+TABLAS_INCREMENTAL = (
+    ("categoria", "id_categoria"),
+    ("productos", "id_producto"),
+    ("clientes", "id_cliente"),
+    ("orden", "id_orden"),
+    ("orden_producto", "id_ordenProd"),
+    ("ventas", "id_venta"),
+)
+
+SQL_REGISTRO_CAMBIOS = """
+    CREATE TABLE IF NOT EXISTS sync_cambios (
+        id BIGSERIAL PRIMARY KEY,
+        tabla TEXT NOT NULL,
+        operacion TEXT NOT NULL,
+        id_registro BIGINT,
+        xid BIGINT NOT NULL DEFAULT txid_current(),
+        registrado TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    ALTER TABLE sync_cambios ADD COLUMN IF NOT EXISTS xid BIGINT NOT NULL DEFAULT txid_current();
+    DROP INDEX IF EXISTS idx_sync_cambios_tabla;
+    CREATE INDEX IF NOT EXISTS idx_sync_cambios_tabla_xid ON sync_cambios (tabla, xid, id);
+
+    CREATE OR REPLACE FUNCTION sync_registrar_cambio() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO sync_cambios (tabla, operacion, id_registro)
+        VALUES (
+            TG_TABLE_NAME,
+            lower(TG_OP),
+            (CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE to_jsonb(NEW) END ->> TG_ARGV[0])::bigint
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+"""
+
+SQL_TRIGGER = """
+    DROP TRIGGER IF EXISTS trg_sync_cambios ON {tabla};
+    CREATE TRIGGER trg_sync_cambios AFTER INSERT OR UPDATE OR DELETE ON {tabla}
+        FOR EACH ROW EXECUTE FUNCTION sync_registrar_cambio('{clave}');
+"""
+
+SQL_CHECKPOINTS = """
+    CREATE TABLE IF NOT EXISTS sync_checkpoint (
+        tabla TEXT PRIMARY KEY,
+        marca BIGINT NOT NULL DEFAULT 0,
+        xid BIGINT NOT NULL DEFAULT 0,
+        filas BIGINT NOT NULL DEFAULT 0,
+        actualizado TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    ALTER TABLE sync_checkpoint ADD COLUMN IF NOT EXISTS xid BIGINT NOT NULL DEFAULT 0;
+"""
+
+# Toda transacción con xid menor que este ya terminó (txid_*: bigint con época, comparable con `xid`)
+SQL_XMIN = "SELECT txid_snapshot_xmin(txid_current_snapshot()) AS xmin;"
+
+SQL_CAMBIOS = """
+    SELECT id, xid, id_registro FROM sync_cambios
+    WHERE tabla = %s AND (xid, id) > (%s, %s) AND xid < %s
+    ORDER BY xid, id
+    LIMIT %s;
+"""
+
+SQL_GUARDAR_CHECKPOINT = """
+    INSERT INTO sync_checkpoint (tabla, xid, marca, filas, actualizado)
+    VALUES (%s, %s, %s, %s, now())
+    ON CONFLICT (tabla) DO UPDATE SET
+        xid = EXCLUDED.xid,
+        marca = EXCLUDED.marca,
+        filas = sync_checkpoint.filas + EXCLUDED.filas,
+        actualizado = EXCLUDED.actualizado;
+"""
+
+
+@dataclass
+class AvanceTabla:
+    tabla: str
+    # Marcas (xid, id)
+    desde: Tuple[int, int]
+    hasta: Tuple[int, int]
+    cambios: int = 0
+    registros: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+
+
+def instalar_registro_cambios(oltp_cur, tablas: Sequence = TABLAS_INCREMENTAL) -> None:
+    """Crea `sync_cambios`, la función y un trigger por tabla en la OLTP (idempotente)."""
+    oltp_cur.execute(SQL_REGISTRO_CAMBIOS)
+    for tabla, clave in tablas:
+        oltp_cur.execute(SQL_TRIGGER.format(tabla=tabla, clave=clave))
+
+
+def leer_checkpoint(olap_cur, tabla: str) -> Tuple[int, int]:
+    olap_cur.execute("SELECT xid, marca FROM sync_checkpoint WHERE tabla = %s;", (tabla,))
+    row = olap_cur.fetchone()
+    return (int(row['xid']), int(row['marca'])) if row else (0, 0)
+
+
+def _sincronizar_tabla(oltp_conn, olap_conn, tabla: str, sincronizar: Callable[..., None],
+                       tamano: int, purgar: bool) -> AvanceTabla:
+    oltp_cur = oltp_conn.cursor()
+    olap_cur = olap_conn.cursor()
+    marca = leer_checkpoint(olap_cur, tabla)
+    avance = AvanceTabla(tabla, marca, marca)
+    # Límite fijo para la corrida: lo de transacciones aún abiertas queda para la siguiente
+    oltp_cur.execute(SQL_XMIN)
+    xmin = int(oltp_cur.fetchone()['xmin'])
+    while True:
+        inicio = time.perf_counter()
+        oltp_cur.execute(SQL_CAMBIOS, (tabla, marca[0], marca[1], xmin, tamano))
+        cambios = oltp_cur.fetchall()
+        if not cambios:
+            break
+        # Varios cambios del mismo registro se sincronizan una vez (se lee su estado actual)
+        ids = list(dict.fromkeys(c['id_registro'] for c in cambios if c['id_registro'] is not None))
+        contexto = ContextoSync()
+        for id_registro in ids:
+            sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto)
+        nueva_marca = (int(cambios[-1]['xid']), int(cambios[-1]['id']))
+        olap_cur.execute(SQL_GUARDAR_CHECKPOINT, (tabla, *nueva_marca, len(ids)))
+        olap_conn.commit()
+        if purgar:
+            # Solo lo ya recorrido: un id menor de una transacción posterior sigue en el log
+            oltp_cur.execute("DELETE FROM sync_cambios WHERE tabla = %s AND (xid, id) <= (%s, %s);",
+                             (tabla, *nueva_marca))
+
+        marca = nueva_marca
+        avance.hasta = marca
+        avance.cambios += len(cambios)
+        avance.registros += len(ids)
+        avance.lotes += 1
+        avance.segundos += time.perf_counter() - inicio
+        logger.info(f"incremental: {tabla} lote {avance.lotes} cambios={len(cambios)} "
+                    f"registros={len(ids)} marca={marca}")
+        if len(cambios) < tamano:
+            break
+    return avance
+
+
+def sincronizar_incremental(oltp_conn, olap_conn, sincronizar: Callable[..., None],
+                            tamano: Optional[int] = None, purgar: bool = True,
+                            tablas: Sequence = TABLAS_INCREMENTAL) -> Dict[str, AvanceTabla]:
+    """Aplica los cambios pendientes de cada tabla desde su marca de agua.
+
+    `sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto)` aplica un
+    registro sin commit (`sync_oltp_to_olap.sync_registro`). La OLTP debe ir
+    en autocommit. Hace commit en la OLAP por cada lote.
+    """
+    tamano = tamano or tamano_lote_sync()
+    olap_cur = olap_conn.cursor()
+    olap_cur.execute(SQL_CHECKPOINTS)
+    olap_conn.commit()
+    return {tabla: _sincronizar_tabla(oltp_conn, olap_conn, tabla, sincronizar, tamano, purgar)
+            for tabla, _ in tablas}
@@ -6,9 +6,21 @@ from dotenv import load_dotenv
 import traceback
 import argparse
 import logging
+import sys
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
 
+# Permite ejecutarlo como script (`python infrastructure/sync/sync_oltp_to_olap.py`) o como módulo
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if _project_root not in sys.path:
+    sys.path.append(_project_root)
+
+from infrastructure.sync.carga_masiva import cargar_todo, tamano_lote_sync
+from infrastructure.sync.calendario import MapaCalendario, poblar_calendario
+from infrastructure.sync.dimensiones_lote import ContextoSync, asegurar_dimensiones
+from infrastructure.sync.incremental import instalar_registro_cambios, sincronizar_incremental
+from infrastructure.sync.sync_paralelo import MODOS_PARTICION, sincronizar_paralelo
+
 OLTP_CONFIG = {
     'host': os.getenv('DB_HOST', 'localhost'),
     'user': os.getenv('DB_USER', 'postgres'),
@@ -93,56 +105,11 @@ def upsert_dim_producto(cur, producto):
     return producto['id_producto']
 
 def upsert_dim_tiempo(cur, fecha):
-    # Normaliza fecha a tipo date (evita problemas si recibimos datetime con hora)
-    if isinstance(fecha, datetime):
-        fecha = fecha.date()
-    # Primero intentamos obtener existing row por fecha (reduce secuencias y evita duplicados)
-    try:
-        cur.execute('SELECT id_tiempo, fecha FROM dim_tiempo WHERE fecha = CAST(%s AS date);', (fecha,))
-        existing = cur.fetchone()
-        if existing:
-            logger.debug(f"upsert_dim_tiempo: encontrado existente id_tiempo={existing.get('id_tiempo')} fecha={existing.get('fecha')}")
-            return existing['id_tiempo']
-
-        # Si no existe, construimos campos derivados y tratamos de insertar
-        anio = fecha.year
-        mes = fecha.month
-        dia = fecha.day
-        trimestre = (fecha.month - 1) // 3 + 1
-        semana = fecha.isocalendar()[1]
-        logger.debug(f"upsert_dim_tiempo: intentando insertar fecha={fecha} anio={anio} mes={mes} dia={dia} semana={semana}")
-        try:
-            cur.execute('''
-                INSERT INTO dim_tiempo (fecha, anio, mes, dia, trimestre, semana)
-                VALUES (CAST(%s AS date), %s, %s, %s, %s, %s)
-                RETURNING id_tiempo, fecha;
-            ''', (fecha, anio, mes, dia, trimestre, semana))
-            row = cur.fetchone()
-            if row:
-                logger.debug(f"upsert_dim_tiempo: insert result id_tiempo={row.get('id_tiempo')} fecha_guardada={row.get('fecha')}")
-                return row['id_tiempo']
-        except Exception as e:
-            # Manejo de carreras: si otra transacción insertó la misma fecha, capturamos y hacemos SELECT
-            from psycopg2 import errors
-            if isinstance(e, errors.UniqueViolation) or 'unique' in str(e).lower():
-                # rollback parcial en el cursor/conn y re-SELECT la fila
-                try:
-                    cur.connection.rollback()
-                except Exception:
-                    pass
-                cur.execute('SELECT id_tiempo, fecha FROM dim_tiempo WHERE fecha = CAST(%s AS date);', (fecha,))
-                row = cur.fetchone()
-                if row:
-                    logger.debug(f"upsert_dim_tiempo: race resolved, found id_tiempo={row.get('id_tiempo')}")
-                    return row['id_tiempo']
-            # Si no es unique violation, volver a lanzar para que el caller lo maneje/loguee
-            logger.exception(f"upsert_dim_tiempo: error al insertar fecha={fecha}: {e}")
-            raise
+    """`id_tiempo` de una fecha suelta (crea la fila si no existe, bajo un SAVEPOINT).
 
-    except Exception as ex:
-        # En caso de cualquier fallo, registrar y volver a lanzar para manejo arriba
-        logger.exception(f"upsert_dim_tiempo: fallo inesperado buscando/insertando fecha={fecha}: {ex}")
-        raise
+    La sincronización por lotes usa `ContextoSync.calendario`, cargado una vez por corrida.
+    """
+    return MapaCalendario({}).id_tiempo(cur, fecha)
 
 def upsert_dim_metodo_pago(cur, metodo_pago):
     # UPSERT atómico con RETURNING para obtener el ID tanto en insert como en conflicto
@@ -191,7 +158,7 @@ def upsert_hecho_ventas(cur, hecho):
     ))
 
 
-def _sync_clientes(oltp_cur, olap_cur, id_cliente=None):
+def _sync_clientes(oltp_cur, olap_cur, id_cliente=None, contexto=None):
     logger.info(f"_sync_clientes start id={id_cliente}")
     if id_cliente is None:
         oltp_cur.execute('''
@@ -210,9 +177,11 @@ def _sync_clientes(oltp_cur, olap_cur, id_cliente=None):
     for cliente in clientes:
         logger.debug(f"_sync_clientes: procesando cliente id={cliente.get('id_cliente')}")
         upsert_dim_cliente(olap_cur, cliente)
+    if contexto is not None:
+        contexto.marcar('cliente', (c['id_cliente'] for c in clientes))
 
 
-def _sync_categorias(oltp_cur, olap_cur, id_categoria=None):
+def _sync_categorias(oltp_cur, olap_cur, id_categoria=None, contexto=None):
     logger.info(f"_sync_categorias start id={id_categoria}")
     if id_categoria is None:
         oltp_cur.execute('SELECT * FROM categoria;')
@@ -222,9 +191,11 @@ def _sync_categorias(oltp_cur, olap_cur, id_categoria=None):
     for categoria in categorias:
         logger.debug(f"_sync_categorias: procesando categoria id={categoria.get('id_categoria')}")
         upsert_dim_categoria(olap_cur, categoria)
+    if contexto is not None:
+        contexto.marcar('categoria', (c['id_categoria'] for c in categorias))
 
 
-def _sync_productos(oltp_cur, olap_cur, id_producto=None):
+def _sync_productos(oltp_cur, olap_cur, id_producto=None, contexto=None):
     logger.info(f"_sync_productos start id={id_producto}")
     if id_producto is None:
         oltp_cur.execute('SELECT * FROM productos;')
@@ -234,9 +205,11 @@ def _sync_productos(oltp_cur, olap_cur, id_producto=None):
     for producto in productos:
         logger.debug(f"_sync_productos: procesando producto id={producto.get('id_producto')}")
         upsert_dim_producto(olap_cur, producto)
+    if contexto is not None:
+        contexto.marcar('producto', (p['id_producto'] for p in productos))
 
 
-def _sync_ventas(oltp_cur, olap_cur, id_venta=None, id_orden=None):
+def _sync_ventas(oltp_cur, olap_cur, id_venta=None, id_orden=None, contexto=None):
     logger.info(f"_sync_ventas start id_venta={id_venta} id_orden={id_orden}")
     base_query = '''
         SELECT v.fecha_venta, o.id_cliente, op.id_producto, p.id_categoria, v.metodo_pago,
@@ -256,96 +229,123 @@ def _sync_ventas(oltp_cur, olap_cur, id_venta=None, id_orden=None):
     else:
         query = base_query
 
+    propio = contexto is None
+    if propio:
+        contexto = ContextoSync()
+    # Las dimensiones se leen con otro cursor para no pisar el resultado de los hechos
+    dimensiones_cur = oltp_cur.connection.cursor()
+    if contexto.calendario is None:
+        contexto.calendario = MapaCalendario.cargar(olap_cur)
     oltp_cur.execute(query, params)
-    ventas = oltp_cur.fetchall()
-    for venta in ventas:
-        logger.debug(f"_sync_ventas: procesando venta fecha={venta.get('fecha_venta')} id_producto={venta.get('id_producto')} cantidad={venta.get('cantidad')}")
-        fecha_venta = venta['fecha_venta']
-        if not isinstance(fecha_venta, datetime):
-            fecha_venta = datetime.strptime(str(fecha_venta), "%Y-%m-%d")
-        id_tiempo = upsert_dim_tiempo(olap_cur, fecha_venta)
-        id_cliente = venta['id_cliente']
-        id_producto = venta['id_producto']
-        id_categoria = venta['id_categoria']
-
-        # Asegurar que las dimensiones relacionadas existan en OLAP en el orden correcto
-        try:
-            # Categoria
-            try:
-                oltp_cur.execute('SELECT * FROM categoria WHERE id_categoria = %s;', (id_categoria,))
-                categoria_row = oltp_cur.fetchone()
-                if categoria_row:
-                    logger.debug(f"_sync_ventas: upserting categoria id={id_categoria}")
-                    upsert_dim_categoria(olap_cur, categoria_row)
-                else:
-                    logger.warning(f"_sync_ventas: categoria id={id_categoria} no encontrada en OLTP; creando placeholder")
-                    upsert_dim_categoria(olap_cur, {'id_categoria': id_categoria, 'nombre_categoria': None, 'descripcion': None})
-            except Exception as e:
-                logger.exception(f"_sync_ventas: fallo al asegurar dim_categoria id={id_categoria}: {e}")
-
-            # Cliente
-            try:
-                oltp_cur.execute('SELECT * FROM clientes WHERE id_cliente = %s;', (id_cliente,))
-                cliente_row = oltp_cur.fetchone()
-                if cliente_row:
-                    logger.debug(f"_sync_ventas: upserting cliente id={id_cliente}")
-                    upsert_dim_cliente(olap_cur, cliente_row)
-                else:
-                    logger.warning(f"_sync_ventas: cliente id={id_cliente} no encontrado en OLTP; creando placeholder")
-                    upsert_dim_cliente(olap_cur, {'id_cliente': id_cliente, 'nombre': None, 'apellido': None, 'edad': None, 'email': None, 'telefono': None, 'direccion': None, 'ciudad_envio': None, 'pais_envio': None})
-            except Exception as e:
-                logger.exception(f"_sync_ventas: fallo al asegurar dim_cliente id={id_cliente}: {e}")
-
-            # Producto
-            try:
-                oltp_cur.execute('SELECT * FROM productos WHERE id_producto = %s;', (id_producto,))
-                producto_row = oltp_cur.fetchone()
-                if producto_row:
-                    logger.debug(f"_sync_ventas: upserting producto id={id_producto}")
-                    upsert_dim_producto(olap_cur, producto_row)
-                else:
-                    logger.warning(f"_sync_ventas: producto id={id_producto} no encontrado en OLTP; creando placeholder")
-                    upsert_dim_producto(olap_cur, {'id_producto': id_producto, 'nombre_producto': None, 'descripcion': None, 'precio': None, 'costo': None, 'id_categoria': id_categoria})
-            except Exception as e:
-                logger.exception(f"_sync_ventas: fallo al asegurar dim_producto id={id_producto}: {e}")
-
-        except Exception:
-            # Capturamos cualquier error en la preparación de dimensiones y continuamos para que el flujo lo loguee
-            logger.exception("_sync_ventas: error inesperado asegurando dimensiones relacionadas")
-        id_metodo_pago = upsert_dim_metodo_pago(olap_cur, venta['metodo_pago'])
-        id_envio = upsert_dim_envio(olap_cur, venta['estado_envio'], venta['metodo_envio'])
-        total_venta = venta['cantidad'] * venta['precio_unitario']
-        margen = (venta['precio_unitario'] - venta['costo']) * venta['cantidad']
-        hecho = {
-            'id_tiempo': id_tiempo,
-            'id_cliente': id_cliente,
-            'id_producto': id_producto,
-            'id_categoria': id_categoria,
-            'id_metodo_pago': id_metodo_pago,
-            'id_envio': id_envio,
-            'cantidad': venta['cantidad'],
-            'total_venta': total_venta,
-            'costo_envio': venta['costo_envio'],
-            'margen': margen
-        }
-        if all([id_tiempo, id_cliente, id_producto, id_categoria, id_metodo_pago, id_envio]):
-            upsert_hecho_ventas(olap_cur, hecho)
-        else:
-            logger.warning(f"_sync_ventas: venta omitida por falta de dimensión: {hecho}")
+    tamano = tamano_lote_sync()
+    while True:
+        ventas = oltp_cur.fetchmany(tamano)
+        if not ventas:
+            break
+        # Categorías, clientes y productos del lote: una consulta y un upsert por dimensión
+        asegurar_dimensiones(dimensiones_cur, olap_cur, ventas, contexto)
+        for venta in ventas:
+            _sync_venta(olap_cur, venta, contexto)
+    dimensiones_cur.close()
+    if propio:
+        logger.info(f"_sync_ventas: {contexto.resumen()}")
+
+
+def _sync_venta(olap_cur, venta, contexto):
+    logger.debug(f"_sync_ventas: procesando venta fecha={venta.get('fecha_venta')} id_producto={venta.get('id_producto')} cantidad={venta.get('cantidad')}")
+    fecha_venta = venta['fecha_venta']
+    if not isinstance(fecha_venta, datetime):
+        fecha_venta = datetime.strptime(str(fecha_venta), "%Y-%m-%d")
+    id_tiempo = contexto.calendario.id_tiempo(olap_cur, fecha_venta)
+    id_cliente = venta['id_cliente']
+    id_producto = venta['id_producto']
+    id_categoria = venta['id_categoria']
+    id_metodo_pago = contexto.id_memorizado(
+        contexto.ids_metodo_pago, venta['metodo_pago'],
+        lambda: upsert_dim_metodo_pago(olap_cur, venta['metodo_pago']))
+    id_envio = contexto.id_memorizado(
+        contexto.ids_envio, (venta['estado_envio'], venta['metodo_envio']),
+        lambda: upsert_dim_envio(olap_cur, venta['estado_envio'], venta['metodo_envio']))
+    total_venta = venta['cantidad'] * venta['precio_unitario']
+    margen = (venta['precio_unitario'] - venta['costo']) * venta['cantidad']
+    hecho = {
+        'id_tiempo': id_tiempo,
+        'id_cliente': id_cliente,
+        'id_producto': id_producto,
+        'id_categoria': id_categoria,
+        'id_metodo_pago': id_metodo_pago,
+        'id_envio': id_envio,
+        'cantidad': venta['cantidad'],
+        'total_venta': total_venta,
+        'costo_envio': venta['costo_envio'],
+        'margen': margen
+    }
+    if all([id_tiempo, id_cliente, id_producto, id_categoria, id_metodo_pago, id_envio]):
+        upsert_hecho_ventas(olap_cur, hecho)
+    else:
+        logger.warning(f"_sync_ventas: venta omitida por falta de dimensión: {hecho}")
 
 
 def sync_all(oltp_cur, olap_cur):
+    contexto = ContextoSync()
+    print('Pregenerando calendario (dim_tiempo)...')
+    poblar_calendario(olap_cur)
     print('Sincronizando clientes...')
-    _sync_clientes(oltp_cur, olap_cur)
+    _sync_clientes(oltp_cur, olap_cur, contexto=contexto)
     print('Sincronizando categorias...')
-    _sync_categorias(oltp_cur, olap_cur)
+    _sync_categorias(oltp_cur, olap_cur, contexto=contexto)
     print('Sincronizando productos...')
-    _sync_productos(oltp_cur, olap_cur)
+    _sync_productos(oltp_cur, olap_cur, contexto=contexto)
     print('Sincronizando hechos de ventas...')
-    _sync_ventas(oltp_cur, olap_cur)
+    _sync_ventas(oltp_cur, olap_cur, contexto=contexto)
+    print(f'Round-trips de dimensiones: {contexto.resumen()}')
+
+
+def sync_registro(oltp_cur, olap_cur, table: str, record_id: int | None = None, contexto=None):
+    """Sincroniza lo afectado por un cambio en `table`/`record_id`, sin commit.
+
+    Es lo que ejecuta cada evento del modo incremental, tanto desde la línea
+    de comandos como desde `worker_sync.py` (que comparte `contexto` en un lote).
+    """
+    table = table.lower()
+    if table == 'clientes':
+        _sync_clientes(oltp_cur, olap_cur, record_id, contexto=contexto)
+    elif table == 'categoria':
+        _sync_categorias(oltp_cur, olap_cur, record_id, contexto=contexto)
+    elif table == 'productos':
+        _sync_productos(oltp_cur, olap_cur, record_id, contexto=contexto)
+    elif table == 'ventas':
+        _sync_ventas(oltp_cur, olap_cur, id_venta=record_id, contexto=contexto)
+    elif table == 'orden':
+        # Reprocesa hechos por id_orden
+        _sync_ventas(oltp_cur, olap_cur, id_orden=record_id, contexto=contexto)
+        # Actualiza dimensión cliente relacionada (por si cambió dir. envío)
+        oltp_cur.execute('SELECT id_cliente FROM orden WHERE id_orden = %s;', (record_id,))
+        row = oltp_cur.fetchone()
+        if row:
+            _sync_clientes(oltp_cur, olap_cur, row['id_cliente'], contexto=contexto)
+    elif table == 'orden_producto':
+        # Obtiene id_orden a partir de la línea - usando diferentes posibles nombres de PK
+        row = None
+        for pk_field in ['"id_ordenProd"', 'id_op', 'id_orden_producto', 'id']:
+            try:
+                oltp_cur.execute(f'SELECT id_orden FROM orden_producto WHERE {pk_field} = %s;', (record_id,))
+                row = oltp_cur.fetchone()
+                if row:
+                    break
+            except Exception:
+                # La OLTP va en autocommit: si la columna no existe, se prueba la siguiente
+                continue
+        if row:
+            _sync_ventas(oltp_cur, olap_cur, id_orden=row['id_orden'], contexto=contexto)
+    else:
+        # Si no reconocemos la tabla, hacemos full sync por seguridad
+        sync_all(oltp_cur, olap_cur)
 
 
-def sync_oltp_to_olap(table: str | None = None, operation: str | None = None, record_id: int | None = None):
+def sync_oltp_to_olap(table: str | None = None, operation: str | None = None, record_id: int | None = None, bulk: bool = False,
+                      incremental: bool = False, instalar_cambios: bool = False,
+                      paralelo: int | None = None, particion: str = 'mes'):
     oltp_conn = get_pg_conn(OLTP_CONFIG)
     olap_conn = get_pg_conn(OLAP_CONFIG)
     try:
@@ -354,54 +354,37 @@ def sync_oltp_to_olap(table: str | None = None, operation: str | None = None, re
         
         # Usar autocommit en OLTP para evitar transacciones abortadas
         oltp_conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-        if table is None:
+        if instalar_cambios:
+            # Registro de cambios (tabla + triggers) en la OLTP para el modo incremental
+            print('Instalando sync_cambios y triggers en la OLTP...')
+            instalar_registro_cambios(oltp_cur)
+        elif table is None and incremental:
+            # Solo lo cambiado desde la última marca de agua, con commit por lote
+            print('Sincronización incremental por marca de agua (sync_cambios → sync_checkpoint)...')
+            avances = sincronizar_incremental(oltp_conn, olap_conn, sync_registro)
+            for avance in avances.values():
+                print(f"  {avance.tabla}: marca {avance.desde} → {avance.hasta} | cambios={avance.cambios} "
+                      f"registros={avance.registros} lotes={avance.lotes} ({avance.segundos:.2f}s)")
+        elif table is None and paralelo:
+            # Fase 1 dimensiones aquí; fase 2 hechos por partición en un pool de procesos
+            print(f'Sincronización completa en paralelo ({paralelo} procesos, particiones por {particion})...')
+            reporte, fallidas = sincronizar_paralelo(oltp_conn, olap_conn, OLTP_CONFIG, OLAP_CONFIG,
+                                                     procesos=paralelo, por=particion)
+            print(reporte.resumen())
+            if fallidas:
+                raise Exception(f"Particiones fallidas: {', '.join(fallidas)}")
+        elif table is None and bulk:
+            # Modo completo por conjuntos: COPY a staging + un INSERT ... ON CONFLICT por tabla
+            print('Sincronización completa por carga masiva (COPY + merge)...')
+            reporte = cargar_todo(oltp_conn, olap_conn)
+            print(reporte.resumen())
+        elif table is None:
             # Modo completo
-            print('Sincronizando clientes...')
-            _sync_clientes(oltp_cur, olap_cur)
-            print('Sincronizando categorias...')
-            _sync_categorias(oltp_cur, olap_cur)
-            print('Sincronizando productos...')
-            _sync_productos(oltp_cur, olap_cur)
-            print('Sincronizando hechos de ventas...')
-            _sync_ventas(oltp_cur, olap_cur)
+            sync_all(oltp_cur, olap_cur)
         else:
             # Modo incremental por tabla/registro
-            table = table.lower()
             print(f"Sincronización incremental | Tabla: {table} | Operación: {operation} | ID: {record_id}")
-            if table == 'clientes':
-                _sync_clientes(oltp_cur, olap_cur, record_id)
-            elif table == 'categoria':
-                _sync_categorias(oltp_cur, olap_cur, record_id)
-            elif table == 'productos':
-                _sync_productos(oltp_cur, olap_cur, record_id)
-            elif table == 'ventas':
-                _sync_ventas(oltp_cur, olap_cur, id_venta=record_id)
-            elif table == 'orden':
-                # Reprocesa hechos por id_orden
-                _sync_ventas(oltp_cur, olap_cur, id_orden=record_id)
-                # Actualiza dimensión cliente relacionada (por si cambió dir. envío)
-                oltp_cur.execute('SELECT id_cliente FROM orden WHERE id_orden = %s;', (record_id,))
-                row = oltp_cur.fetchone()
-                if row:
-                    _sync_clientes(oltp_cur, olap_cur, row['id_cliente'])
-            elif table == 'orden_producto':
-                # Obtiene id_orden a partir de la línea - usando diferentes posibles nombres de PK
-                row = None
-                for pk_field in ['id_op', 'id_orden_producto', 'id']:
-                    try:
-                        oltp_cur.execute(f'SELECT id_orden FROM orden_producto WHERE {pk_field} = %s;', (record_id,))
-                        row = oltp_cur.fetchone()
-                        if row:
-                            break
-                    except Exception as e:
-                        # Si falla una consulta, continúa con el siguiente campo
-                        olap_conn.rollback()  # Reset de transacción
-                        continue
-                if row:
-                    _sync_ventas(oltp_cur, olap_cur, id_orden=row['id_orden'])
-            else:
-                # Si no reconocemos la tabla, hacemos full sync por seguridad
-                sync_all(oltp_cur, olap_cur)
+            sync_registro(oltp_cur, olap_cur, table, record_id)
 
         olap_conn.commit()
         print("Sincronización OLTP → OLAP completada con éxito.")
@@ -418,6 +401,13 @@ if __name__ == "__main__":
     parser.add_argument('--table', type=str, default=None, help='Tabla afectada (clientes, categoria, productos, orden, orden_producto, ventas)')
     parser.add_argument('--op', type=str, default=None, help='Operación (insert, update, delete)')
     parser.add_argument('--id', type=int, default=None, help='ID del registro afectado')
+    parser.add_argument('--bulk', action='store_true', help='Full sync por carga masiva (COPY a staging + merge por tabla)')
+    parser.add_argument('--incremental', action='store_true', help='Solo los cambios desde la última marca de agua (sync_checkpoint)')
+    parser.add_argument('--instalar-cambios', action='store_true', help='Crea sync_cambios y sus triggers en la OLTP')
+    parser.add_argument('--paralelo', type=int, default=None, metavar='N', help='Full sync con N procesos (dimensiones primero, luego hechos por partición)')
+    parser.add_argument('--particion', choices=MODOS_PARTICION, default='mes', help='Partición de ventas para --paralelo')
     args = parser.parse_args()
 
-    sync_oltp_to_olap(table=args.table, operation=args.op, record_id=args.id)
\ No newline at end of file
+    sync_oltp_to_olap(table=args.table, operation=args.op, record_id=args.id, bulk=args.bulk,
+                      incremental=args.incremental, instalar_cambios=args.instalar_cambios,
+                      paralelo=args.paralelo, particion=args.particion)
\ No newline at end of file
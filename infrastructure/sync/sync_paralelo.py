@@ -0,0 +1,209 @@
+"""Full sync OLTP → OLAP en paralelo, por particiones de `ventas`.
+
+El full sync corría en un proceso, con una conexión y una sola transacción
+OLAP gigante. Aquí se hace en dos fases:
+
+1. Dimensiones (proceso principal, un commit): categorías, productos y
+   clientes por carga masiva, el calendario cubriendo todas las fechas de
+   venta, métodos de pago, envíos y placeholders de claves huérfanas. Así los
+   procesos de hechos nunca compiten insertando en `dim_*`.
+2. Hechos: `ventas` se parte por mes (`fecha_venta`, por defecto) o por
+   rangos de `id_venta`, y cada partición se carga en un pool de procesos
+   (`SYNC_PROCESOS`, por defecto uno por núcleo) con sus propias conexiones y
+   su propio commit.
+
+Por mes, dos particiones nunca comparten clave de `hecho_ventas` (la fecha es
+parte de la clave). Por id sí pueden compartirla: el merge ordena por clave,
+pero si aun así hay deadlock la partición se reintenta.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.extras
+from psycopg2 import errors
+
+from infrastructure.sync import calendario
+from infrastructure.sync.carga_masiva import ReporteCarga, cargar_dimensiones, cargar_hechos, tamano_lote_sync
+
+logger = logging.getLogger('sync')
+
+MODOS_PARTICION = ("mes", "id")
+_REINTENTOS = 3
+
+# Dimensiones que en la carga masiva salen de los hechos: aquí se leen directo de la OLTP
+_DERIVADAS = (
+    ("dim_metodo_pago",
+     "SELECT DISTINCT metodo_pago FROM ventas",
+     "INSERT INTO dim_metodo_pago (metodo_pago) VALUES %s ON CONFLICT (metodo_pago) DO NOTHING;"),
+    ("dim_envio",
+     "SELECT DISTINCT estado_envio, metodo_envio FROM orden",
+     "INSERT INTO dim_envio (estado_envio, metodo_envio) VALUES %s "
+     "ON CONFLICT (estado_envio, metodo_envio) DO NOTHING;"),
+    # Placeholders (como en la carga fila a fila) para claves referenciadas que no están en la OLTP
+    ("dim_categoria",
+     "SELECT DISTINCT p.id_categoria FROM productos p WHERE p.id_categoria IS NOT NULL "
+     "AND NOT EXISTS (SELECT 1 FROM categoria c WHERE c.id_categoria = p.id_categoria)",
+     "INSERT INTO dim_categoria (id_categoria) VALUES %s ON CONFLICT (id_categoria) DO NOTHING;"),
+    ("dim_cliente",
+     "SELECT DISTINCT o.id_cliente FROM orden o WHERE o.id_cliente IS NOT NULL "
+     "AND NOT EXISTS (SELECT 1 FROM clientes c WHERE c.id_cliente = o.id_cliente)",
+     "INSERT INTO dim_cliente (id_cliente) VALUES %s ON CONFLICT (id_cliente) DO NOTHING;"),
+)
+
+
+def procesos_por_defecto() -> int:
+    return max(1, int(os.getenv('SYNC_PROCESOS', str(os.cpu_count() or 1))))
+
+
+@dataclass(frozen=True)
+class Particion:
+    nombre: str
+    filtro: str
+    params: Tuple[Any, ...]
+
+
+def particiones_por_mes(desde: date, hasta: date) -> List[Particion]:
+    """Un mes calendario por partición, de `desde` a `hasta` inclusive."""
+    particiones = []
+    inicio = date(desde.year, desde.month, 1)
+    while inicio <= hasta:
+        fin = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+        particiones.append(Particion(
+            f"{inicio:%Y-%m}", " WHERE v.fecha_venta >= %s AND v.fecha_venta < %s", (inicio, fin)))
+        inicio = fin
+    return particiones
+
+
+def particiones_por_id(minimo: int, maximo: int, cantidad: int) -> List[Particion]:
+    """`cantidad` rangos contiguos de `id_venta` que cubren [minimo, maximo]."""
+    cantidad = max(1, min(cantidad, maximo - minimo + 1))
+    ancho = -(-(maximo - minimo + 1) // cantidad)
+    particiones = []
+    for desde in range(minimo, maximo + 1, ancho):
+        hasta = min(desde + ancho - 1, maximo)
+        particiones.append(Particion(
+            f"id {desde}-{hasta}", " WHERE v.id_venta BETWEEN %s AND %s", (desde, hasta)))
+    return particiones
+
+
+def _como_fecha(valor: Any) -> date:
+    return valor.date() if isinstance(valor, datetime) else valor
+
+
+def calcular_particiones(oltp_conn, por: str = "mes", procesos: int = 1) -> List[Particion]:
+    if por not in MODOS_PARTICION:
+        raise ValueError(f"por debe ser uno de {MODOS_PARTICION}")
+    cur = oltp_conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    if por == "mes":
+        cur.execute("SELECT min(fecha_venta), max(fecha_venta) FROM ventas;")
+        minimo, maximo = cur.fetchone()
+        return particiones_por_mes(_como_fecha(minimo), _como_fecha(maximo)) if minimo is not None else []
+    cur.execute("SELECT min(id_venta), max(id_venta) FROM ventas;")
+    minimo, maximo = cur.fetchone()
+    # Más particiones que procesos: las rápidas no dejan núcleos ociosos
+    return particiones_por_id(minimo, maximo, procesos * 4) if minimo is not None else []
+
+
+def preparar_dimensiones(oltp_conn, olap_conn, reporte: ReporteCarga, tamano: Optional[int] = None) -> None:
+    """Fase 1: todas las dimensiones que referencian los hechos, con un solo commit."""
+    olap_cur = olap_conn.cursor()
+    cargar_dimensiones(oltp_conn, olap_cur, reporte, tamano)
+    oltp_cur = oltp_conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+
+    etapa = reporte.etapa("dim_tiempo:calendario")
+    inicio = time.perf_counter()
+    oltp_cur.execute("SELECT min(fecha_venta), max(fecha_venta) FROM ventas;")
+    minimo, maximo = oltp_cur.fetchone()
+    desde, hasta = calendario.rango_calendario()
+    if minimo is not None:
+        desde, hasta = min(desde, _como_fecha(minimo)), max(hasta, _como_fecha(maximo))
+    etapa.filas += calendario.poblar_calendario(olap_cur, desde, hasta)
+    etapa.segundos += time.perf_counter() - inicio
+
+    for tabla, consulta, insert in _DERIVADAS:
+        etapa = reporte.etapa(f"{tabla}:derivada")
+        inicio = time.perf_counter()
+        oltp_cur.execute(consulta)
+        valores = oltp_cur.fetchall()
+        if valores:
+            psycopg2.extras.execute_values(olap_cur, insert, valores, page_size=tamano or tamano_lote_sync())
+        etapa.filas += len(valores)
+        etapa.segundos += time.perf_counter() - inicio
+    olap_conn.commit()
+
+
+def cargar_particion(oltp_config: Dict[str, Any], olap_config: Dict[str, Any], particion: Particion,
+                     tamano: Optional[int] = None,
+                     conectar: Callable[..., Any] = psycopg2.connect) -> ReporteCarga:
+    """Fase 2 (en un proceso del pool): hechos de una partición, con conexiones y commit propios."""
+    for intento in range(1, _REINTENTOS + 1):
+        reporte = ReporteCarga()
+        oltp_conn = olap_conn = None
+        try:
+            oltp_conn = conectar(**oltp_config)
+            oltp_conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            olap_conn = conectar(**olap_config)
+            cargar_hechos(oltp_conn, olap_conn.cursor(), reporte, tamano,
+                          filtro=particion.filtro, params=particion.params, dimensiones_derivadas=False)
+            olap_conn.commit()
+            return reporte
+        except (errors.DeadlockDetected, errors.SerializationFailure) as e:
+            if olap_conn:
+                olap_conn.rollback()
+            if intento == _REINTENTOS:
+                raise
+            logger.warning(f"sync_paralelo: {particion.nombre} intento {intento} falló ({e}); reintentando")
+        except Exception:
+            if olap_conn:
+                olap_conn.rollback()
+            raise
+        finally:
+            for conn in (oltp_conn, olap_conn):
+                if conn:
+                    conn.close()
+
+
+def sincronizar_paralelo(oltp_conn, olap_conn, oltp_config: Dict[str, Any], olap_config: Dict[str, Any],
+                         procesos: Optional[int] = None, por: str = "mes", tamano: Optional[int] = None,
+                         ejecutor: Optional[Executor] = None) -> Tuple[ReporteCarga, List[str]]:
+    """Full sync en dos fases. Retorna el reporte sumado y las particiones que fallaron.
+
+    `oltp_conn`/`olap_conn` se usan para la fase 1 (la OLTP en autocommit);
+    cada partición abre las suyas con `oltp_config`/`olap_config`.
+    """
+    procesos = procesos or procesos_por_defecto()
+    reporte = ReporteCarga()
+    inicio = time.perf_counter()
+    preparar_dimensiones(oltp_conn, olap_conn, reporte, tamano)
+    particiones = calcular_particiones(oltp_conn, por, procesos)
+    logger.info(f"sync_paralelo: dimensiones listas en {time.perf_counter() - inicio:.2f}s; "
+                f"{len(particiones)} particiones por {por} en {procesos} procesos")
+
+    fallidas = []
+    propio = ejecutor is None
+    ejecutor = ejecutor or ProcessPoolExecutor(max_workers=procesos)
+    try:
+        futuros = {ejecutor.submit(cargar_particion, oltp_config, olap_config, p, tamano): p
+                   for p in particiones}
+        for futuro in as_completed(futuros):
+            particion = futuros[futuro]
+            try:
+                reporte.sumar(futuro.result())
+            except Exception as e:
+                logger.exception(f"sync_paralelo: falló la partición {particion.nombre}: {e}")
+                fallidas.append(particion.nombre)
+    finally:
+        if propio:
+            ejecutor.shutdown()
+    etapa = reporte.etapa("total:pared")
+    etapa.filas = reporte.etapa("hecho_ventas:copy").filas
+    etapa.segundos = time.perf_counter() - inicio
+    return reporte, fallidas
@@ -1,54 +1,286 @@
+"""Worker de sincronización OLTP → OLAP (LISTEN/NOTIFY) en un solo proceso.
+
+Antes se lanzaba `python sync_oltp_to_olap.py` con `subprocess.run` por cada
+NOTIFY: un intérprete nuevo y dos conexiones nuevas (una al host OLAP remoto)
+por evento, procesados de a uno. Aquí el worker:
+
+- mantiene abiertas la conexión de LISTEN y las de datos OLTP/OLAP
+  (reconecta si se caen);
+- agrupa los eventos por (tabla, id) durante `SYNC_DEBOUNCE_SEGUNDOS`: diez
+  UPDATE seguidos del mismo producto se sincronizan una sola vez;
+- procesa los eventos vencidos en micro-lotes de hasta `SYNC_WORKER_LOTE`,
+  llamando a `sync_registro` en proceso y con un commit por lote (si el lote
+  falla, se reintenta evento por evento para aislar al culpable);
+- reporta profundidad de la cola, eventos agrupados y el lag de punta a punta
+  (de la recepción del NOTIFY al commit en la OLAP).
+
+Uso: python infrastructure/sync/worker_sync.py
+"""
+
+import logging
 import os
-import sys
 import select
-import subprocess
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from dotenv import load_dotenv
-import psycopg2
 
 # Cargar variables de entorno desde el root del repo
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
 
-# Conexión simple y listener; la implementación original funcionaba correctamente anoche
-conn = psycopg2.connect(
-    host=os.getenv('DB_HOST', 'localhost'),
-    user=os.getenv('DB_USER', 'postgres'),
-    password=os.getenv('DB_PASSWORD', ''),
-    dbname=os.getenv('DB_NAME', 'postgres'),
-    port=int(os.getenv('DB_PORT', 5432))
-)
-conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-cur = conn.cursor()
+_project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if _project_root not in sys.path:
+    sys.path.append(_project_root)
+
+from infrastructure.sync.calendario import MapaCalendario
+from infrastructure.sync.dimensiones_lote import ContextoSync
+
+logger = logging.getLogger('sync')
 
 # Lista de tablas a escuchar
-tablas = ["ventas", "productos", "clientes", "categoria", "orden", "orden_producto"]
-for tabla in tablas:
-    cur.execute(f"LISTEN {tabla}_sync;")
-
-print("Esperando notificaciones de todas las tablas clave...")
-
-while True:
-    # use select to wait for notifications
-    if select.select([conn], [], [], 5) == ([], [], []):
-        continue
-    conn.poll()
-    while conn.notifies:
-        notify = conn.notifies.pop(0)
-        canal = notify.channel
-        tabla = canal.replace('_sync', '')
-        payload = notify.payload or ''
-        if ':' in payload:
-            operacion, id_registro = payload.split(':', 1)
-        else:
-            operacion, id_registro = 'unknown', payload
-        print(f"Notificación recibida | Tabla: {tabla} | Operación: {operacion} | ID: {id_registro}")
-        cmd = [
-            sys.executable, "infrastructure/sync/sync_oltp_to_olap.py",
-            "--table", tabla,
-            "--op", operacion,
-        ]
+TABLAS = ["ventas", "productos", "clientes", "categoria", "orden", "orden_producto"]
+
+
+def debounce_por_defecto() -> float:
+    return float(os.getenv('SYNC_DEBOUNCE_SEGUNDOS', '0.5'))
+
+
+def lote_por_defecto() -> int:
+    return max(1, int(os.getenv('SYNC_WORKER_LOTE', '500')))
+
+
+@dataclass
+class Evento:
+    tabla: str
+    operacion: str
+    id_registro: Optional[int]
+    recibido: float
+    repeticiones: int = 1
+
+    @property
+    def clave(self) -> Tuple[str, Optional[int]]:
+        return self.tabla, self.id_registro
+
+
+def parsear_notificacion(canal: str, payload: Optional[str], recibido: float) -> Evento:
+    """`<tabla>_sync` + `operacion:id` → Evento (id None si el payload no trae un entero)."""
+    tabla = canal.replace('_sync', '')
+    payload = payload or ''
+    if ':' in payload:
+        operacion, id_texto = payload.split(':', 1)
+    else:
+        operacion, id_texto = 'unknown', payload
+    try:
+        id_registro = int(id_texto)
+    except (TypeError, ValueError):
+        id_registro = None
+    return Evento(tabla, operacion, id_registro, recibido)
+
+
+class Coalescedor:
+    """Eventos pendientes, uno por (tabla, id), en orden de llegada.
+
+    Un evento queda listo `debounce` segundos después de su primera aparición;
+    las repeticiones dentro de esa ventana se funden con él (conserva la hora
+    de recepción original para medir el lag y se queda con la última operación).
+    """
+
+    def __init__(self, debounce: float) -> None:
+        self.debounce = debounce
+        self._pendientes: "OrderedDict[Tuple[str, Optional[int]], Evento]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pendientes)
+
+    def agregar(self, evento: Evento) -> bool:
+        """Encola el evento; retorna False si se fundió con uno pendiente."""
+        existente = self._pendientes.get(evento.clave)
+        if existente is None:
+            self._pendientes[evento.clave] = evento
+            return True
+        existente.operacion = evento.operacion
+        existente.repeticiones += 1
+        return False
+
+    def listos(self, ahora: float, maximo: int) -> List[Evento]:
+        lote = []
+        for clave, evento in list(self._pendientes.items()):
+            # En orden de llegada: el primero que no venció corta la búsqueda
+            if len(lote) >= maximo or evento.recibido + self.debounce > ahora:
+                break
+            lote.append(self._pendientes.pop(clave))
+        return lote
+
+    def proximo_vencimiento(self) -> Optional[float]:
+        for evento in self._pendientes.values():
+            return evento.recibido + self.debounce
+        return None
+
+
+class SyncWorker:
+    """Sincroniza micro-lotes de eventos reutilizando las conexiones OLTP/OLAP.
+
+    `sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto)` aplica un
+    evento sin commit; por defecto es `sync_oltp_to_olap.sync_registro`.
+    """
+
+    def __init__(self, conectar_oltp: Callable[[], Any], conectar_olap: Callable[[], Any],
+                 sincronizar: Callable[..., None], debounce: Optional[float] = None,
+                 lote: Optional[int] = None, reloj: Callable[[], float] = time.monotonic) -> None:
+        self._conectar_oltp = conectar_oltp
+        self._conectar_olap = conectar_olap
+        self._sincronizar = sincronizar
+        self.cola = Coalescedor(debounce_por_defecto() if debounce is None else debounce)
+        self.lote = lote or lote_por_defecto()
+        self._reloj = reloj
+        self._oltp = None
+        self._olap = None
+        # Mapa confirmado de dim_tiempo: solo fechas ya commiteadas; sirve para toda la vida del worker
+        self._calendario: Optional[MapaCalendario] = None
+        self._stats: Dict[str, Any] = {"recibidos": 0, "agrupados": 0, "procesados": 0, "fallidos": 0,
+                                       "lotes": 0, "reconexiones": 0, "lag_ultimo": 0.0,
+                                       "lag_max": 0.0, "lag_total": 0.0}
+
+    def recibir(self, canal: str, payload: Optional[str]) -> None:
+        evento = parsear_notificacion(canal, payload, self._reloj())
+        self._stats["recibidos"] += 1
+        if not self.cola.agregar(evento):
+            self._stats["agrupados"] += 1
+
+    def _conexiones(self):
+        if self._oltp is None or self._oltp.closed:
+            self._oltp = self._conectar_oltp()
+            self._stats["reconexiones"] += 1
+        if self._olap is None or self._olap.closed:
+            self._olap = self._conectar_olap()
+            self._stats["reconexiones"] += 1
+        return self._oltp, self._olap
+
+    def _aplicar(self, eventos: List[Evento]) -> None:
+        oltp, olap = self._conexiones()
+        contexto = ContextoSync()
+        # Copia por lote: las fechas insertadas en un lote que termina en rollback no deben quedar en el mapa
+        contexto.calendario = self._calendario.copia() if self._calendario is not None else None
+        olap_cur = olap.cursor()
+        oltp_cur = oltp.cursor()
+        for evento in eventos:
+            self._sincronizar(oltp_cur, olap_cur, evento.tabla, evento.id_registro, contexto)
+        olap.commit()
+        # Solo tras el commit el mapa del lote pasa a ser el del worker
+        self._calendario = contexto.calendario
+
+    def _descartar_olap(self) -> None:
+        try:
+            self._olap.rollback()
+        except Exception:
+            # Conexión perdida: se reabre en el próximo lote
+            try:
+                self._olap.close()
+            except Exception:
+                pass
+            self._olap = None
+
+    def drenar(self) -> int:
+        """Procesa los eventos vencidos (un micro-lote). Retorna cuántos se sincronizaron."""
+        eventos = self.cola.listos(self._reloj(), self.lote)
+        if not eventos:
+            return 0
+        self._stats["lotes"] += 1
         try:
-            id_int = int(id_registro)
-            cmd += ["--id", str(id_int)]
-        except (TypeError, ValueError):
-            pass
-        subprocess.run(cmd)
+            self._aplicar(eventos)
+            ok = eventos
+        except Exception:
+            logger.exception(f"worker_sync: falló el lote de {len(eventos)} eventos; reintento uno por uno")
+            self._descartar_olap()
+            ok = []
+            for evento in eventos:
+                try:
+                    self._aplicar([evento])
+                    ok.append(evento)
+                except Exception:
+                    logger.exception(f"worker_sync: evento fallido {evento}")
+                    self._stats["fallidos"] += 1
+                    self._descartar_olap()
+        fin = self._reloj()
+        for evento in ok:
+            lag = fin - evento.recibido
+            self._stats["lag_ultimo"] = lag
+            self._stats["lag_max"] = max(self._stats["lag_max"], lag)
+            self._stats["lag_total"] += lag
+        self._stats["procesados"] += len(ok)
+        return len(ok)
+
+    def stats(self) -> Dict[str, Any]:
+        data = dict(self._stats)
+        data["profundidad"] = len(self.cola)
+        data["lag_promedio"] = data["lag_total"] / data["procesados"] if data["procesados"] else 0.0
+        return data
+
+    def espera(self, maximo: float = 5.0) -> float:
+        """Segundos que el loop puede bloquearse en `select` sin retrasar un evento vencido."""
+        vencimiento = self.cola.proximo_vencimiento()
+        if vencimiento is None:
+            return maximo
+        return min(maximo, max(0.0, vencimiento - self._reloj()))
+
+    def cerrar(self) -> None:
+        for conn in (self._oltp, self._olap):
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        self._oltp = self._olap = None
+
+    def escuchar(self, conn_listen, intervalo_stats: float = 60.0) -> None:
+        """Loop principal: LISTEN en las tablas clave y drenado por micro-lotes."""
+        cur = conn_listen.cursor()
+        for tabla in TABLAS:
+            cur.execute(f"LISTEN {tabla}_sync;")
+        print("Esperando notificaciones de todas las tablas clave...")
+        ultimo_reporte = self._reloj()
+        try:
+            while True:
+                select.select([conn_listen], [], [], self.espera())
+                conn_listen.poll()
+                while conn_listen.notifies:
+                    notify = conn_listen.notifies.pop(0)
+                    self.recibir(notify.channel, notify.payload)
+                # Mientras haya lotes vencidos, se drenan antes de volver a esperar
+                while self.drenar():
+                    pass
+                if self._reloj() - ultimo_reporte >= intervalo_stats:
+                    ultimo_reporte = self._reloj()
+                    stats = self.stats()
+                    print(f"worker_sync | cola={stats['profundidad']} recibidos={stats['recibidos']} "
+                          f"agrupados={stats['agrupados']} procesados={stats['procesados']} "
+                          f"fallidos={stats['fallidos']} lag_prom={stats['lag_promedio']:.2f}s "
+                          f"lag_max={stats['lag_max']:.2f}s")
+        finally:
+            self.cerrar()
+
+
+def main() -> None:
+    import psycopg2
+
+    from infrastructure.sync.sync_oltp_to_olap import OLAP_CONFIG, OLTP_CONFIG, get_pg_conn, sync_registro
+
+    def conectar_oltp():
+        conn = get_pg_conn(OLTP_CONFIG)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    conn_listen = psycopg2.connect(**OLTP_CONFIG)
+    conn_listen.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    worker = SyncWorker(conectar_oltp, lambda: get_pg_conn(OLAP_CONFIG), sync_registro)
+    try:
+        worker.escuchar(conn_listen)
+    finally:
+        conn_listen.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Control de admisión por clase de ruta (load shedding).
+
+Cada clase de ruta tiene su propio límite de peticiones concurrentes y una
+cola de espera acotada, así un pico en una ruta pesada (IA, exportaciones o un
+listado grande) no deja sin hilos ni conexiones a las lecturas baratas:
+
+- `lectura`: GET/HEAD del CRUD acotados (por id, `?ids=` o con `limit`).
+- `listado`: GET de una colección sin `limit` y reportes (recorren la tabla).
+- `escritura`: POST/PUT/PATCH/DELETE del CRUD y el checkout.
+- `export`: `/export/...` (la plaza se ocupa mientras dura el streaming).
+- `ia`: `/ia/...` (corre en el threadpool y usa su propia conexión OLAP).
+
+Las cuatro primeras comparten el pool de conexiones y el executor de base de
+datos: sus límites por defecto se reparten `min(DB_POOL_MAX,
+DB_EXECUTOR_WORKERS)` de modo que la suma no lo supere (con un pool de menos
+de 4 conexiones, el mínimo de 1 por clase puede pasarse). Así una avalancha de
+listados o escrituras no encola las lecturas por id detrás de ella.
+
+Si la cola está llena, o la espera supera el máximo de la clase, la petición
+se rechaza al momento con 503 y `Retry-After`. Health, métricas y docs no
+pasan por aquí. Configuración por `ADMISSION_<CLASE>_LIMIT`, `_QUEUE`,
+`_TIMEOUT` y `_RETRY_AFTER` (p. ej. `ADMISSION_IA_LIMIT=2`); un `_LIMIT`
+explícito no se ajusta al pool.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+from urllib.parse import parse_qs
+
+_EXENTAS = ("/health", "/metrics", "/docs", "/redoc", "/openapi.json")
+_METODOS_LECTURA = ("GET", "HEAD", "OPTIONS")
+
+# Fracción del presupuesto de conexiones por clase (las que usan el pool)
+_CUOTAS_DB = {"lectura": 0.5, "listado": 0.2, "escritura": 0.2, "export": 0.1}
+_LIMITE_IA = 2
+
+# clase: (cola máxima, espera máxima en s, Retry-After en s)
+_POR_DEFECTO = {
+    "lectura": (64, 2.0, 1),
+    "listado": (8, 5.0, 2),
+    "escritura": (32, 5.0, 1),
+    "export": (2, 1.0, 5),
+    "ia": (4, 10.0, 5),
+}
+
+
+def admision_habilitada() -> bool:
+    return os.getenv("ADMISSION_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def presupuesto_db() -> int:
+    """Conexiones/hilos de base de datos a repartir: el menor entre el pool y el executor."""
+    pool = int(os.getenv("DB_POOL_MAX", "10"))
+    executor = int(os.getenv("DB_EXECUTOR_WORKERS") or pool)
+    return max(1, min(pool, executor))
+
+
+def limites_por_defecto(presupuesto: Optional[int] = None) -> Dict[str, int]:
+    """Límite de concurrencia por clase; las clases de base de datos suman a lo sumo `presupuesto`."""
+    total = presupuesto or presupuesto_db()
+    limites = {clase: max(1, int(total * cuota)) for clase, cuota in _CUOTAS_DB.items()}
+    # Con un pool chico el mínimo de 1 por clase puede pasarse: se descuenta de lectura
+    exceso = sum(limites.values()) - total
+    if exceso > 0:
+        limites["lectura"] = max(1, limites["lectura"] - exceso)
+    limites["ia"] = _LIMITE_IA
+    return limites
+
+
+def _es_listado(ruta: str, query: str) -> bool:
+    segmentos = [s for s in ruta.split("/") if s]
+    if "reportes" in segmentos:
+        return True
+    if len(segmentos) != 1:
+        return False
+    params = parse_qs(query)
+    return "limit" not in params and "ids" not in params
+
+
+def clasificar(metodo: str, ruta: str, query: str = "") -> Optional[str]:
+    """Clase de admisión de la petición, o None si no se limita."""
+    if ruta == "/" or ruta.startswith(_EXENTAS):
+        return None
+    if ruta.startswith("/ia/") or ruta == "/ia":
+        return "ia"
+    if ruta.startswith("/export/") or ruta == "/export":
+        return "export"
+    if metodo not in _METODOS_LECTURA:
+        return "escritura"
+    return "listado" if _es_listado(ruta, query) else "lectura"
+
+
+class Compuerta:
+    """Semáforo con cola FIFO acotada y espera máxima para una clase de ruta.
+
+    Solo se usa desde el event loop, así que no necesita locks. Al liberar,
+    la plaza pasa directamente al primero de la cola.
+    """
+
+    def __init__(self, clase: str, limite: int, cola: int, espera: float, retry_after: int) -> None:
+        if limite < 1:
+            raise ValueError("limite debe ser >= 1")
+        self.clase = clase
+        self.limite = limite
+        self.cola_max = max(0, cola)
+        self.espera = espera
+        self.retry_after = retry_after
+        self.en_curso = 0
+        self._cola: Deque[asyncio.Future] = deque()
+        self._stats = {"admitidas": 0, "encoladas": 0, "rechazadas_cola": 0,
+                       "rechazadas_espera": 0, "espera_total": 0.0, "espera_max": 0.0}
+
+    @classmethod
+    def desde_entorno(cls, clase: str) -> "Compuerta":
+        cola, espera, retry_after = _POR_DEFECTO[clase]
+        limite = limites_por_defecto()[clase]
+        prefijo = f"ADMISSION_{clase.upper()}_"
+        return cls(
+            clase,
+            int(os.getenv(prefijo + "LIMIT", str(limite))),
+            int(os.getenv(prefijo + "QUEUE", str(cola))),
+            float(os.getenv(prefijo + "TIMEOUT", str(espera))),
+            int(os.getenv(prefijo + "RETRY_AFTER", str(retry_after))),
+        )
+
+    @property
+    def esperando(self) -> int:
+        return len(self._cola)
+
+    async def adquirir(self) -> bool:
+        """Ocupa una plaza; retorna False si la petición debe rechazarse."""
+        if self.en_curso < self.limite and not self._cola:
+            self.en_curso += 1
+            self._stats["admitidas"] += 1
+            return True
+        if len(self._cola) >= self.cola_max:
+            self._stats["rechazadas_cola"] += 1
+            return False
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._cola.append(futuro)
+        self._stats["encoladas"] += 1
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(futuro, self.espera)
+        except asyncio.TimeoutError:
+            self._quitar(futuro)
+            self._stats["rechazadas_espera"] += 1
+            return False
+        except asyncio.CancelledError:
+            # El cliente se fue: si la plaza ya era suya, devolverla
+            self._quitar(futuro)
+            if futuro.done() and not futuro.cancelled():
+                self.liberar()
+            raise
+        esperado = time.perf_counter() - inicio
+        self._stats["admitidas"] += 1
+        self._stats["espera_total"] += esperado
+        self._stats["espera_max"] = max(self._stats["espera_max"], esperado)
+        return True
+
+    def liberar(self) -> None:
+        while self._cola:
+            futuro = self._cola.popleft()
+            if not futuro.done():
+                # La plaza se transfiere: en_curso no cambia
+                futuro.set_result(True)
+                return
+        self.en_curso -= 1
+
+    def _quitar(self, futuro: asyncio.Future) -> None:
+        try:
+            self._cola.remove(futuro)
+        except ValueError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        data = dict(self._stats)
+        data.update(clase=self.clase, limite=self.limite, cola_max=self.cola_max,
+                    en_curso=self.en_curso, esperando=self.esperando)
+        return data
+
+
+_compuertas: Dict[str, Compuerta] = {}
+
+
+def compuerta(clase: str) -> Compuerta:
+    """Compuerta de la clase, creada desde el entorno la primera vez."""
+    actual = _compuertas.get(clase)
+    if actual is None:
+        actual = _compuertas[clase] = Compuerta.desde_entorno(clase)
+    return actual
+
+
+def estadisticas() -> Dict[str, Dict[str, Any]]:
+    """Por clase: límite, en curso, profundidad de la cola, admitidas, rechazos y espera."""
+    return {clase: compuerta(clase).stats() for clase in _POR_DEFECTO}
+
+
+class AdmisionMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def _rechazar(self, send, puerta: Compuerta) -> None:
+        cuerpo = json.dumps(
+            {"detail": f"Servidor saturado ({puerta.clase}); reintente en {puerta.retry_after}s"},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(cuerpo)).encode()),
+                (b"retry-after", str(puerta.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": cuerpo})
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not admision_habilitada():
+            await self.app(scope, receive, send)
+            return
+        query = scope.get("query_string", b"").decode("latin-1")
+        clase = clasificar(scope.get("method", "GET"), scope.get("path", ""), query)
+        if clase is None:
+            await self.app(scope, receive, send)
+            return
+        puerta = compuerta(clase)
+        if not await puerta.adquirir():
+            await self._rechazar(send, puerta)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            puerta.liberar()
@@ -0,0 +1,55 @@
+"""Respuestas parciales con `?fields=a,b,c` (sparse fieldsets).
+
+Los campos pedidos se validan contra el DTO de respuesta y se pasan al
+repositorio, que los empuja a la lista de columnas del SELECT
+(`MapeoFila.proyeccion`). La respuesta se serializa con un DTO recortado a esos
+campos, así que se ahorra a la vez transferencia desde la base, entidades en
+Python y tamaño del JSON.
+"""
+
+from functools import lru_cache
+from typing import Any, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, create_model
+
+from interfaces.api.json_rapido import respuesta_lista
+
+
+def parsear_campos(texto: Optional[str], dto: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """Convierte `"precio,id_producto"` en los campos del DTO, en el orden del DTO.
+    Retorna None si no se pidió nada; 400 si algún campo no existe."""
+    if texto is None:
+        return None
+    pedidos = {c.strip() for c in texto.split(",") if c.strip()}
+    if not pedidos:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'fields' no puede estar vacío")
+    desconocidos = pedidos.difference(dto.model_fields)
+    if desconocidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos desconocidos en 'fields': {', '.join(sorted(desconocidos))}",
+        )
+    return tuple(c for c in dto.model_fields if c in pedidos)
+
+
+@lru_cache(maxsize=256)
+def dto_parcial(dto: Type[BaseModel], campos: Tuple[str, ...]) -> Type[BaseModel]:
+    """DTO con solo `campos` (mismos tipos y validaciones que en `dto`)."""
+    definiciones = {c: (dto.model_fields[c].annotation, dto.model_fields[c]) for c in campos}
+    return create_model(f"{dto.__name__}Parcial", **definiciones)
+
+
+def respuesta_parcial_lista(response: Response, dto: Type[BaseModel], campos: Tuple[str, ...], items: Sequence[Any]) -> Response:
+    return respuesta_lista(response, dto_parcial(dto, campos), items)
+
+
+def respuesta_parcial(response: Response, dto: Type[BaseModel], campos: Tuple[str, ...], entidad: Any) -> Response:
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    modelo = dto_parcial(dto, campos).model_validate(entidad, from_attributes=True)
+    return Response(
+        modelo.model_dump_json(),
+        status_code=response.status_code or 200,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,257 @@
+"""Middleware ASGI de compresión de respuestas (gzip y, si está instalado, brotli).
+
+- La codificación se negocia con `Accept-Encoding` (se respeta `q=0`).
+- Solo se comprimen tipos de texto (JSON, NDJSON, CSV, texto) y respuestas de
+  al menos `minimo` bytes; por debajo la compresión cuesta más de lo que ahorra.
+- Las respuestas en streaming (`StreamingResponse`, exportación) se comprimen
+  por bloques con flush en cada uno, así el cliente recibe datos sin esperar
+  al final. Se acumula hasta `minimo` antes de decidir.
+- El tiempo de CPU de compresión se mide por petición: va en `Server-Timing`
+  (`comp;dur=<ms>`) cuando la respuesta no es streaming, y siempre en
+  `estadisticas()`.
+"""
+
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+_TIPOS_COMPRIMIBLES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+_lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    "comprimidas": 0,
+    "streaming": 0,
+    "bajo_minimo": 0,
+    "bytes_entrada": 0,
+    "bytes_salida": 0,
+    "cpu_segundos": 0.0,
+    "por_codificacion": {"gzip": 0, "br": 0},
+}
+
+
+def compresion_habilitada() -> bool:
+    return os.getenv("COMPRESSION_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def _registrar(codificacion: str, entrada: int, salida: int, cpu: float, streaming: bool) -> None:
+    with _lock:
+        _stats["comprimidas"] += 1
+        _stats["streaming"] += int(streaming)
+        _stats["bytes_entrada"] += entrada
+        _stats["bytes_salida"] += salida
+        _stats["cpu_segundos"] += cpu
+        _stats["por_codificacion"][codificacion] += 1
+
+
+def estadisticas() -> Dict[str, Any]:
+    """Respuestas comprimidas, bytes antes/después, ratio y CPU total de compresión."""
+    with _lock:
+        data = dict(_stats)
+        data["por_codificacion"] = dict(_stats["por_codificacion"])
+    data["ratio"] = data["bytes_salida"] / data["bytes_entrada"] if data["bytes_entrada"] else 0.0
+    data["brotli_disponible"] = brotli is not None
+    return data
+
+
+class _Compresor:
+    def __init__(self, codificacion: str, nivel_gzip: int, nivel_brotli: int) -> None:
+        self.codificacion = codificacion
+        if codificacion == "br":
+            self._br = brotli.Compressor(quality=nivel_brotli)
+        else:
+            # wbits=31: cabecera y checksum gzip
+            self._gz = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)
+        self.entrada = 0
+        self.salida = 0
+        self.cpu = 0.0
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        inicio = time.thread_time()
+        if self.codificacion == "br":
+            salida = self._br.process(datos) + (self._br.finish() if final else self._br.flush())
+        else:
+            salida = self._gz.compress(datos) + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.cpu += time.thread_time() - inicio
+        self.entrada += len(datos)
+        self.salida += len(salida)
+        return salida
+
+
+def _aceptadas(accept_encoding: str) -> Dict[str, float]:
+    aceptadas: Dict[str, float] = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, params = parte.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if nombre:
+            aceptadas[nombre.strip().lower()] = q
+    return aceptadas
+
+
+def negociar(accept_encoding: str) -> Optional[str]:
+    """Elige "br" o "gzip" según `Accept-Encoding`; None si ninguna es aceptable."""
+    aceptadas = _aceptadas(accept_encoding)
+    comodin = aceptadas.get("*", 0.0)
+    candidatas = ["br", "gzip"] if brotli is not None else ["gzip"]
+    mejor, mejor_q = None, 0.0
+    for codificacion in candidatas:
+        q = aceptadas.get(codificacion, comodin)
+        if q > mejor_q:
+            mejor, mejor_q = codificacion, q
+    return mejor
+
+
+class CompresionMiddleware:
+    def __init__(
+        self,
+        app,
+        minimo: Optional[int] = None,
+        nivel_gzip: Optional[int] = None,
+        nivel_brotli: Optional[int] = None,
+    ) -> None:
+        self.app = app
+        self.minimo = minimo if minimo is not None else int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.nivel_gzip = nivel_gzip if nivel_gzip is not None else int(os.getenv("COMPRESSION_LEVEL", "6"))
+        self.nivel_brotli = (
+            nivel_brotli if nivel_brotli is not None else int(os.getenv("COMPRESSION_BROTLI_LEVEL", "4"))
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not compresion_habilitada():
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for nombre, valor in scope.get("headers", []):
+            if nombre == b"accept-encoding":
+                accept = valor.decode("latin-1")
+                break
+        codificacion = negociar(accept) if accept else None
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Respuesta(self, codificacion, send).send)
+
+
+class _Respuesta:
+    """Estado de compresión de una respuesta: decide en el primer cuerpo y comprime el resto."""
+
+    def __init__(self, middleware: CompresionMiddleware, codificacion: str, send) -> None:
+        self.mw = middleware
+        self.codificacion = codificacion
+        self._send = send
+        self.inicio: Optional[dict] = None
+        self.pendiente: List[bytes] = []
+        self.tam_pendiente = 0
+        self.compresor: Optional[_Compresor] = None
+        self.directo = False
+
+    async def send(self, message) -> None:
+        tipo = message["type"]
+        if tipo == "http.response.start":
+            self.inicio = message
+            self.directo = not self._comprimible(message)
+            if self.directo:
+                await self._send(message)
+            return
+        if tipo != "http.response.body" or self.directo:
+            await self._send(message)
+            return
+
+        cuerpo = message.get("body", b"")
+        mas = message.get("more_body", False)
+        if self.compresor is not None:
+            await self._send({"type": "http.response.body", "body": self.compresor.comprimir(cuerpo, not mas),
+                              "more_body": mas})
+            if not mas:
+                self._cerrar(streaming=True)
+            return
+
+        self.pendiente.append(cuerpo)
+        self.tam_pendiente += len(cuerpo)
+        if self.tam_pendiente < self.mw.minimo:
+            if mas:
+                return
+            # Terminó por debajo del mínimo: se envía tal cual
+            with _lock:
+                _stats["bajo_minimo"] += 1
+            await self._enviar_inicio(self._cabeceras(vary=True))
+            await self._send({"type": "http.response.body", "body": b"".join(self.pendiente)})
+            return
+
+        datos = b"".join(self.pendiente)
+        self.pendiente = []
+        self.compresor = _Compresor(self.codificacion, self.mw.nivel_gzip, self.mw.nivel_brotli)
+        if not mas:
+            comprimido = self.compresor.comprimir(datos, True)
+            cabeceras = self._cabeceras(vary=True, codificada=True, largo=len(comprimido))
+            cabeceras.append((b"server-timing", f"comp;dur={self.compresor.cpu * 1000:.2f}".encode()))
+            await self._enviar_inicio(cabeceras)
+            await self._send({"type": "http.response.body", "body": comprimido})
+            self._cerrar(streaming=False)
+            return
+        await self._enviar_inicio(self._cabeceras(vary=True, codificada=True))
+        await self._send({"type": "http.response.body", "body": self.compresor.comprimir(datos, False),
+                          "more_body": True})
+
+    def _comprimible(self, inicio: dict) -> bool:
+        status = inicio.get("status", 200)
+        if status < 200 or status in (204, 206, 304):
+            return False
+        tipo = b""
+        for nombre, valor in inicio.get("headers", []):
+            nombre = nombre.lower()
+            if nombre == b"content-encoding":
+                return False
+            if nombre == b"content-type":
+                tipo = valor
+        tipo_str = tipo.decode("latin-1").lower()
+        return any(tipo_str.startswith(t) for t in _TIPOS_COMPRIMIBLES)
+
+    def _cabeceras(self, vary: bool, codificada: bool = False, largo: Optional[int] = None) -> List[Tuple[bytes, bytes]]:
+        cabeceras = []
+        vary_actual = None
+        for nombre, valor in self.inicio.get("headers", []):
+            clave = nombre.lower()
+            if codificada and clave == b"content-length":
+                continue
+            if clave == b"vary":
+                vary_actual = valor
+                continue
+            cabeceras.append((nombre, valor))
+        if vary:
+            valor = b"Accept-Encoding"
+            if vary_actual and b"accept-encoding" not in vary_actual.lower():
+                valor = vary_actual + b", Accept-Encoding"
+            elif vary_actual:
+                valor = vary_actual
+            cabeceras.append((b"vary", valor))
+        if codificada:
+            cabeceras.append((b"content-encoding", self.codificacion.encode()))
+            if largo is not None:
+                cabeceras.append((b"content-length", str(largo).encode()))
+        return cabeceras
+
+    async def _enviar_inicio(self, cabeceras) -> None:
+        await self._send({**self.inicio, "headers": cabeceras})
+
+    def _cerrar(self, streaming: bool) -> None:
+        c = self.compresor
+        _registrar(self.codificacion, c.entrada, c.salida, c.cpu, streaming)
@@ -0,0 +1,47 @@
+"""ETags débiles y respuestas 304 para los GET de listados y detalles.
+
+El ETag combina la versión de cambio de las tablas que lee el endpoint con un
+hash de la ruta y la query. Se calcula antes de consultar la base de datos: si
+coincide con `If-None-Match`, el endpoint retorna el 304 sin ejecutar la
+consulta ni serializar DTOs.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from infrastructure.cache.versiones import etag_habilitado, versiones
+
+
+def _coincide(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    objetivo = etag.removeprefix("W/")
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == objetivo:
+            return True
+    return False
+
+
+def verificar_etag(request: Request, response: Response, *tablas: str) -> Optional[Response]:
+    """Publica el ETag en `response` o retorna un 304 listo para devolver.
+
+    La versión se lee antes de la consulta: si hay una escritura concurrente,
+    el cliente recibe un ETag viejo y la siguiente petición simplemente trae
+    los datos nuevos (nunca al revés).
+    """
+    if not etag_habilitado():
+        return None
+    version = versiones.version(*tablas)
+    if version is None:
+        return None
+    recurso = f"{request.url.path}?{request.url.query}".encode()
+    etag = f'W/"{version}-{hashlib.blake2b(recurso, digest_size=6).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
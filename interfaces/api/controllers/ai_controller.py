@@ -10,22 +10,24 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-# Configuración de logging a archivo
-log_dir = os.path.join(project_root, 'logs')
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, 'olap_analysis.log')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s %(levelname)s %(message)s',
-    handlers=[logging.FileHandler(log_file, encoding='utf-8')]
-)
-
 from scripts import grok_client
-from application.use_cases.ia_cases.analyze_olap_use_case import AnalyzeOlapUseCase
-from application.use_cases.ia_cases.ai_response_verifier import verify_ai_response
 
 router = APIRouter(prefix="/ia", tags=["ia"])
 
+logger = logging.getLogger("olap_analysis")
+
+
+def _log_analisis() -> logging.Logger:
+    """Logger a logs/olap_analysis.log, configurado en el primer uso (no al importar)."""
+    if not logger.handlers:
+        log_dir = os.path.join(project_root, 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+        handler = logging.FileHandler(os.path.join(log_dir, 'olap_analysis.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
 
 class PromptRequest(BaseModel):
     prompt: str
@@ -33,6 +35,11 @@ class PromptRequest(BaseModel):
 
 @router.post("/analizar")
 async def analyze_prompt(request: PromptRequest):
+    # pandas y el repositorio OLAP se cargan recién con la primera petición
+    from application.use_cases.ia_cases.analyze_olap_use_case import AnalyzeOlapUseCase
+    from application.use_cases.ia_cases.ai_response_verifier import verify_ai_response
+
+    log = _log_analisis()
     use_case = AnalyzeOlapUseCase()
     try:
         uc_result = use_case.run(request.prompt)
@@ -53,15 +60,15 @@ async def analyze_prompt(request: PromptRequest):
         log_lines.append("--- FIN DEL CONTEXTO ---\n")
 
         # Escribir log
-        logging.info('\n'.join(log_lines))
+        log.info('\n'.join(log_lines))
 
         # Llamar al cliente Grok con el contexto
         ai_response = grok_client.analyze_prompt(request.prompt, context_text=context_text)
         # Registrar la respuesta completa recibida del cliente Grok
         try:
-            logging.info("AI raw response: %s", ai_response)
+            log.info("AI raw response: %s", ai_response)
         except Exception:
-            logging.exception("Error logueando respuesta AI")
+            log.exception("Error logueando respuesta AI")
         # Si la respuesta es estructura (dict), verificar heurísticamente contra olap_data
         re_evaluations = []
         if isinstance(ai_response, dict):
@@ -82,7 +89,7 @@ async def analyze_prompt(request: PromptRequest):
                         "Responde primero con el análisis textual y al final agrega un bloque JSON con la misma estructura que antes (resumen, tendencias, recomendaciones, analysis_by_category, missing_fields, note)."
                     ) % (verification.get('issues') or [])
 
-                    logging.info("Re-evaluación intento %d: enviando follow-up a la IA", attempt)
+                    log.info("Re-evaluación intento %d: enviando follow-up a la IA", attempt)
                     follow_resp = grok_client.analyze_prompt(follow_up_prompt, context_text=context_text)
                     # Volver a verificar
                     follow_ver = verify_ai_response(follow_resp if isinstance(follow_resp, dict) else {}, olap_data)
@@ -93,7 +100,7 @@ async def analyze_prompt(request: PromptRequest):
                         verification = follow_ver
                         break
                 except Exception as e:
-                    logging.exception("Error durante re-evaluación automática: %s", e)
+                    log.exception("Error durante re-evaluación automática: %s", e)
                     re_evaluations.append({"attempt": attempt, "error": str(e)})
 
             return {"ai_response": ai_response, "verification": verification, "re_evaluations": re_evaluations}
@@ -101,5 +108,5 @@ async def analyze_prompt(request: PromptRequest):
         # En caso contrario, envolver en campo texto y marcar como no verificado
         return {"respuesta": ai_response, "verification": {"verified": False, "issues": ["response_not_structured"]}, "context_summary": context_text[:1000]}
     except Exception as e:
-        logging.error(f"Error en análisis OLAP: {e}")
+        log.error(f"Error en análisis OLAP: {e}")
         raise HTTPException(status_code=500, detail=str(e))
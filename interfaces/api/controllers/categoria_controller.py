@@ -9,25 +9,29 @@ project_root = current_file.parent.parent.parent.parent
 # Agregar el directorio raíz al path de Python
 sys.path.append(str(project_root))
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from application.use_cases.categoria_cases.crear_categoria import CrearCategoriaUseCase
 from application.use_cases.categoria_cases.obtener_categoria import ObtenerCategoriaUseCase
 from application.use_cases.categoria_cases.listar_categorias import ListarCategoriasUseCase
 from application.use_cases.categoria_cases.actualizar_categoria import ActualizarCategoriaUseCase
 from application.use_cases.categoria_cases.eliminar_categoria import EliminarCategoriaUseCase
 from infrastructure.repositories.postgres_categoria_repository import PostgresCategoriaRepository
+from infrastructure.cache.catalogo import con_cache_categorias
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from interfaces.api.dtos.categoria_dto import CategoriaCreateDTO, CategoriaUpdateDTO, CategoriaResponseDTO
 
 router = APIRouter(prefix="/categorias", tags=["categorias"])
 
 # Inyección de dependencias
-categoria_repository = PostgresCategoriaRepository()
+categoria_repository = con_cache_categorias(PostgresCategoriaRepository())
 
 @router.post("/", response_model=CategoriaResponseDTO, status_code=status.HTTP_201_CREATED)
 async def crear_categoria(categoria_dto: CategoriaCreateDTO):
     try:
         use_case = CrearCategoriaUseCase(categoria_repository)
-        categoria = use_case.execute(categoria_dto.nombre_categoria, categoria_dto.descripcion)
+        categoria = await run_in_db_executor(use_case.execute, categoria_dto.nombre_categoria, categoria_dto.descripcion)
         return categoria
     except Exception as e:
         raise HTTPException(
@@ -36,9 +40,12 @@ async def crear_categoria(categoria_dto: CategoriaCreateDTO):
         )
 
 @router.get("/{id_categoria}", response_model=CategoriaResponseDTO)
-async def obtener_categoria(id_categoria: int):
+async def obtener_categoria(id_categoria: int, request: Request, response: Response):
+    no_modificado = verificar_etag(request, response, "categoria")
+    if no_modificado is not None:
+        return no_modificado
     use_case = ObtenerCategoriaUseCase(categoria_repository)
-    categoria = use_case.execute(id_categoria)
+    categoria = await run_in_db_executor(use_case.execute, id_categoria)
     
     if not categoria:
         raise HTTPException(
@@ -49,9 +56,13 @@ async def obtener_categoria(id_categoria: int):
     return categoria
 
 @router.get("/", response_model=list[CategoriaResponseDTO])
-async def listar_categorias():
+async def listar_categorias(request: Request, response: Response, rapido: bool = False):
+    no_modificado = verificar_etag(request, response, "categoria")
+    if no_modificado is not None:
+        return no_modificado
     use_case = ListarCategoriasUseCase(categoria_repository)
-    return use_case.execute()
+    categorias = await run_in_db_executor(use_case.execute)
+    return respuesta_lista(response, CategoriaResponseDTO, categorias) if rapido else categorias
 
 @router.put("/{id_categoria}", response_model=CategoriaResponseDTO)
 async def actualizar_categoria(id_categoria: int, categoria_dto: CategoriaUpdateDTO):
@@ -63,7 +74,8 @@ async def actualizar_categoria(id_categoria: int, categoria_dto: CategoriaUpdate
         )
     
     use_case = ActualizarCategoriaUseCase(categoria_repository)
-    categoria_actualizada = use_case.execute(
+    categoria_actualizada = await run_in_db_executor(
+        use_case.execute,
         id_categoria, 
         categoria_dto.nombre_categoria or "",
         categoria_dto.descripcion or ""
@@ -80,7 +92,7 @@ async def actualizar_categoria(id_categoria: int, categoria_dto: CategoriaUpdate
 @router.delete("/{id_categoria}", status_code=status.HTTP_200_OK)
 async def eliminar_categoria(id_categoria: int):
     use_case = EliminarCategoriaUseCase(categoria_repository)
-    eliminada = use_case.execute(id_categoria)
+    eliminada = await run_in_db_executor(use_case.execute, id_categoria)
     
     if not eliminada:
         raise HTTPException(
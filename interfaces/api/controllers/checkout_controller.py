@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, status
+from application.use_cases.checkout_cases.realizar_checkout import RealizarCheckoutUseCase
+from domain.entities.checkout import LineaCheckout
+from domain.entities.orden import Orden
+from domain.exceptions import StockInsuficienteError
+from infrastructure.repositories.postgres_orden_repository import PostgresOrdenRepository
+from infrastructure.repositories.postgres_orden_producto_repository import PostgresOrdenProductoRepository
+from infrastructure.repositories.postgres_producto_repository import PostgresProductoRepository
+from infrastructure.cache.catalogo import con_cache_productos
+from infrastructure.repositories.postgres_venta_repository import PostgresVentaRepository
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.dtos.checkout_dto import CheckoutCreateDTO, CheckoutResponseDTO
+from interfaces.api.errores import detalle_stock_insuficiente
+
+router = APIRouter(prefix="/checkout", tags=["checkout"])
+
+# Inyección de dependencias
+orden_repository = PostgresOrdenRepository()
+orden_producto_repository = PostgresOrdenProductoRepository()
+producto_repository = con_cache_productos(PostgresProductoRepository())
+venta_repository = PostgresVentaRepository()
+
+
+@router.post("/", response_model=CheckoutResponseDTO, status_code=status.HTTP_201_CREATED)
+async def realizar_checkout(dto: CheckoutCreateDTO):
+    """Crea la orden con sus líneas y la venta, descontando stock, en una sola transacción."""
+    orden = Orden(
+        id_cliente=dto.id_cliente,
+        fecha_orden=dto.fecha_orden,
+        estado_orden="pendiente",
+        direccion_envio=dto.direccion_envio,
+        ciudad_envio=dto.ciudad_envio,
+        codigo_postal_envio=dto.codigo_postal_envio,
+        pais_envio=dto.pais_envio,
+        metodo_envio=dto.metodo_envio,
+        costo_envio=dto.costo_envio,
+        estado_envio=dto.estado_envio
+    )
+    lineas = [LineaCheckout(**linea.model_dump()) for linea in dto.lineas]
+    try:
+        use_case = RealizarCheckoutUseCase(
+            orden_repository, orden_producto_repository, producto_repository, venta_repository
+        )
+        return await run_in_db_executor(use_case.execute, orden, lineas, dto.metodo_pago)
+    except StockInsuficienteError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detalle_stock_insuficiente(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al realizar checkout: {str(e)}"
+        )
@@ -6,18 +6,26 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from application.use_cases.cliente_cases.crear_cliente import CrearClienteUseCase
 from application.use_cases.cliente_cases.obtener_cliente import ObtenerClienteUseCase
 from application.use_cases.cliente_cases.listar_clientes import ListarClientesUseCase
+from application.use_cases.cliente_cases.obtener_clientes_por_ids import ObtenerClientesPorIdsUseCase
 from application.use_cases.cliente_cases.actualizar_cliente import ActualizarClienteUseCase
 from application.use_cases.cliente_cases.eliminar_cliente import EliminarClienteUseCase
 from infrastructure.repositories.postgres_cliente_repository import PostgresClienteRepository
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from interfaces.api.dtos.cliente_dto import (
     ClienteCreateDTO,
     ClienteUpdateDTO,
     ClienteResponseDTO
 )
+from interfaces.api.paginacion import MAX_LIMIT, aplicar_pagina, decodificar_cursor
+from interfaces.api.por_ids import aplicar_resultado, parsear_ids
+from interfaces.api.campos import parsear_campos, respuesta_parcial, respuesta_parcial_lista
 
 router = APIRouter(prefix="/clientes", tags=["clientes"])
 
@@ -29,7 +37,8 @@ cliente_repository = PostgresClienteRepository()
 async def crear_cliente(cliente_dto: ClienteCreateDTO):
     try:
         use_case = CrearClienteUseCase(cliente_repository)
-        cliente = use_case.execute(
+        cliente = await run_in_db_executor(
+            use_case.execute,
             cliente_dto.nombre,
             cliente_dto.apellido,
             cliente_dto.edad,
@@ -43,18 +52,48 @@ async def crear_cliente(cliente_dto: ClienteCreateDTO):
 
 
 @router.get("/{id_cliente}", response_model=ClienteResponseDTO)
-async def obtener_cliente(id_cliente: int):
+async def obtener_cliente(id_cliente: int, request: Request, response: Response, fields: Optional[str] = None):
+    no_modificado = verificar_etag(request, response, "clientes")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, ClienteResponseDTO)
     use_case = ObtenerClienteUseCase(cliente_repository)
-    cliente = use_case.execute(id_cliente)
+    cliente = await run_in_db_executor(use_case.execute, id_cliente, campos)
     if not cliente:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente no encontrado")
+    if campos:
+        return respuesta_parcial(response, ClienteResponseDTO, campos, cliente)
     return cliente
 
 
 @router.get("/", response_model=list[ClienteResponseDTO])
-async def listar_clientes():
+async def listar_clientes(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    rapido: bool = False
+):
+    no_modificado = verificar_etag(request, response, "clientes")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, ClienteResponseDTO)
+    lote = parsear_ids(ids)
+    if lote is not None:
+        # Con `ids` se ignora la paginación
+        resultado = await run_in_db_executor(ObtenerClientesPorIdsUseCase(cliente_repository).execute, lote)
+        items = aplicar_resultado(response, resultado)
+        if campos:
+            return respuesta_parcial_lista(response, ClienteResponseDTO, campos, items)
+        return respuesta_lista(response, ClienteResponseDTO, items) if rapido else items
     use_case = ListarClientesUseCase(cliente_repository)
-    return use_case.execute()
+    pagina = await run_in_db_executor(use_case.execute, limit=limit, after=decodificar_cursor(after), campos=campos)
+    items = aplicar_pagina(response, pagina)
+    if campos:
+        return respuesta_parcial_lista(response, ClienteResponseDTO, campos, items)
+    return respuesta_lista(response, ClienteResponseDTO, items) if rapido else items
 
 
 @router.put("/{id_cliente}", response_model=ClienteResponseDTO)
@@ -67,7 +106,8 @@ async def actualizar_cliente(id_cliente: int, cliente_dto: ClienteUpdateDTO):
     ):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Se debe proporcionar al menos un campo para actualizar")
     use_case = ActualizarClienteUseCase(cliente_repository)
-    cliente_actualizado = use_case.execute(
+    cliente_actualizado = await run_in_db_executor(
+        use_case.execute,
         id_cliente,
         cliente_dto.nombre or "",
         cliente_dto.apellido or "",
@@ -84,7 +124,7 @@ async def actualizar_cliente(id_cliente: int, cliente_dto: ClienteUpdateDTO):
 @router.delete("/{id_cliente}", status_code=status.HTTP_200_OK)
 async def eliminar_cliente(id_cliente: int):
     use_case = EliminarClienteUseCase(cliente_repository)
-    eliminado = use_case.execute(id_cliente)
+    eliminado = await run_in_db_executor(use_case.execute, id_cliente)
     if not eliminado:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cliente no encontrado")
     return {"mensaje": "Cliente eliminado exitosamente"}
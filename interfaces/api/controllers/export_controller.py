@@ -0,0 +1,93 @@
+import csv
+import io
+import os
+from enum import Enum
+from typing import Iterator, List, Tuple
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+from application.use_cases.export_cases.exportar_entidad import ExportarEntidadUseCase
+from infrastructure.repositories.postgres_export_repository import PostgresExportRepository
+from interfaces.api.json_rapido import dumps
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+export_repository = PostgresExportRepository()
+
+# Tamaño aproximado de cada bloque que se envía al cliente
+_CHUNK_BYTES = 64 * 1024
+_DEFAULT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", "2000"))
+
+
+class EntidadExport(str, Enum):
+    orden = "orden"
+    orden_producto = "orden_producto"
+    ventas = "ventas"
+
+
+class FormatoExport(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+def _lineas_ndjson(columnas: List[str], filas: Iterator[Tuple]) -> Iterator[str]:
+    for fila in filas:
+        yield dumps(dict(zip(columnas, fila))).decode("utf-8") + "\n"
+
+
+def _lineas_csv(columnas: List[str], filas: Iterator[Tuple]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    for fila in filas:
+        writer.writerow(fila)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # La cabecera sale aunque la tabla esté vacía
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _en_bloques(lineas: Iterator[str], filas: Iterator[Tuple]) -> Iterator[bytes]:
+    """Agrupa líneas en bloques de ~64 KiB para no emitir un chunk HTTP por fila."""
+    partes: List[str] = []
+    tam = 0
+    try:
+        for linea in lineas:
+            partes.append(linea)
+            tam += len(linea)
+            if tam >= _CHUNK_BYTES:
+                yield "".join(partes).encode("utf-8")
+                partes, tam = [], 0
+        if partes:
+            yield "".join(partes).encode("utf-8")
+    finally:
+        # Si el cliente corta la descarga, cerrar el cursor y devolver la conexión ya
+        for gen in (lineas, filas):
+            close = getattr(gen, "close", None)
+            if close:
+                close()
+
+
+@router.get("/{entidad}")
+def exportar(
+    entidad: EntidadExport,
+    formato: FormatoExport = FormatoExport.ndjson,
+    itersize: int = Query(_DEFAULT_ITERSIZE, ge=1, le=100000),
+):
+    """Exporta todas las filas de la entidad como NDJSON o CSV en streaming."""
+    use_case = ExportarEntidadUseCase(export_repository)
+    columnas, filas = use_case.execute(entidad.value, itersize)
+    if formato == FormatoExport.csv:
+        lineas = _lineas_csv(columnas, filas)
+        media_type = "text/csv; charset=utf-8"
+    else:
+        lineas = _lineas_ndjson(columnas, filas)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        _en_bloques(lineas, filas),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{entidad.value}.{formato.value}"'},
+    )
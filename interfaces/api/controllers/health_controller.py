@@ -0,0 +1,37 @@
+from fastapi import APIRouter
+from infrastructure.cache.catalogo import estadisticas_cache
+from infrastructure.database import prepared_statements
+from infrastructure.database.postgres_connection import get_pool_stats
+from interfaces.api import admision, compresion
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/db")
+async def estado_pool_db():
+    """Estado en vivo del pool de conexiones: en uso, libres, esperas y latencia de checkout."""
+    return get_pool_stats()
+
+
+@router.get("/cache")
+async def estado_cache():
+    """Aciertos/fallos de la caché del catálogo y estado del listener de invalidación."""
+    return estadisticas_cache()
+
+
+@router.get("/prepared")
+async def estado_sentencias_preparadas():
+    """Sentencias preparadas: PREPARE enviados, ejecuciones con plan reutilizado y re-preparaciones."""
+    return prepared_statements.estadisticas()
+
+
+@router.get("/compresion")
+async def estado_compresion():
+    """Respuestas comprimidas por codificación, bytes antes/después y CPU de compresión."""
+    return compresion.estadisticas()
+
+
+@router.get("/admision")
+async def estado_admision():
+    """Por clase de ruta: límite de concurrencia, en curso, cola de espera y peticiones rechazadas."""
+    return admision.estadisticas()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 import sys
 import os
 from pathlib import Path
@@ -10,9 +11,8 @@ project_root = current_file.parent.parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
+# grok_client es liviano; el caso de uso OLAP (pandas) se importa en el primer uso
 from scripts import grok_client
-from application.use_cases.ia_cases.analyze_olap_use_case import AnalyzeOlapUseCase
-import pandas as pd
 import logging
 
 # Configurar logger para IA
@@ -21,6 +21,24 @@ logger.setLevel(logging.INFO)
 
 router = APIRouter(prefix="/ia", tags=["ia"])
 
+
+def __getattr__(name):
+    # Importación diferida: pandas y el repositorio OLAP no se cargan al arrancar la API
+    if name == "AnalyzeOlapUseCase":
+        from application.use_cases.ia_cases.analyze_olap_use_case import AnalyzeOlapUseCase
+        globals()[name] = AnalyzeOlapUseCase
+        return AnalyzeOlapUseCase
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _analyze_use_case():
+    return globals().get("AnalyzeOlapUseCase") or __getattr__("AnalyzeOlapUseCase")
+
+
+def _construir_contexto(prompt: str) -> dict:
+    # Bloqueante (import de pandas, consultas OLAP): se ejecuta en el threadpool, no en el event loop
+    return _analyze_use_case()().run(prompt)
+
 class PromptRequest(BaseModel):
     prompt: str
 
@@ -41,12 +59,12 @@ async def analyze_prompt(request: PromptRequest):
         # Construir contexto desde la BD OLAP
         try:
             print("📊 EXTRAYENDO DATOS OLAP...")
-            uc = AnalyzeOlapUseCase()
-            uc_result = uc.run(request.prompt)
+            uc_result = await run_in_threadpool(_construir_contexto, request.prompt)
             context_text = uc_result.get('context_text')
             missing = uc_result.get('missing') or []
             olap_data = uc_result.get('olap_data') or {}
-            
+            import pandas as pd
+
             # Contar tablas exitosas
             for name, val in olap_data.items():
                 if isinstance(val, pd.DataFrame) and len(val) > 0:
@@ -67,7 +85,7 @@ async def analyze_prompt(request: PromptRequest):
 
         # Llamar al modelo con prompt + contexto
         print("🧠 ENVIANDO A IA CON CONTEXTO...")
-        result = grok_client.analyze_prompt(request.prompt, context_text=context_text)
+        result = await run_in_threadpool(grok_client.analyze_prompt, request.prompt, context_text=context_text)
         
         final_response = {
             "result": result,
@@ -98,11 +116,11 @@ async def get_context(prompt: str | None = None):
     
     try:
         print("📊 EXTRAYENDO DATOS OLAP PARA DEBUG...")
-        uc = AnalyzeOlapUseCase()
-        uc_result = uc.run(prompt)
+        uc_result = await run_in_threadpool(_construir_contexto, prompt)
         context_text = uc_result.get('context_text') or ''
         olap_data = uc_result.get('olap_data') or {}
         missing = uc_result.get('missing') or []
+        import pandas as pd
 
         # Resumen por tabla
         tables_summary = {}
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from interfaces.api.metricas import exponer
+
+router = APIRouter(tags=["metricas"])
+
+CONTENT_TYPE_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metricas():
+    """Métricas del proceso en formato de texto de Prometheus."""
+    return PlainTextResponse(exponer(), media_type=CONTENT_TYPE_PROMETHEUS)
@@ -6,21 +6,38 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent.parent
 sys.path.append(str(project_root))
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
+from typing import Any, List, Optional
 from infrastructure.repositories.postgres_orden_repository import PostgresOrdenRepository
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from application.use_cases.orden_cases.crear_orden import CrearOrdenUseCase
+from application.use_cases.orden_cases.crear_ordenes_lote import CrearOrdenesLoteUseCase
 from application.use_cases.orden_cases.obtener_orden import ObtenerOrdenUseCase
 from application.use_cases.orden_cases.listar_por_cliente import ListarOrdenesPorClienteUseCase
 from application.use_cases.orden_cases.listar_ordenes import ListarOrdenesUseCase
+from application.use_cases.orden_cases.obtener_ordenes_por_ids import ObtenerOrdenesPorIdsUseCase
 from application.use_cases.orden_cases.actualizar_orden import ActualizarOrdenUseCase
 from application.use_cases.orden_cases.eliminar_orden import EliminarOrdenUseCase
 from application.use_cases.orden_cases.listar_por_fecha import ListarOrdenesPorFechaUseCase
+from application.use_cases.orden_cases.reporte_agregado import ReporteOrdenesAgregadoUseCase
 from datetime import datetime
 from interfaces.api.dtos.orden_dto import (
     OrdenCreateDTO,
+    OrdenEstado,
     OrdenUpdateDTO,
-    OrdenResponseDTO
+    OrdenResponseDTO,
+    PeriodoReporte,
+    AgrupacionReporte,
+    ReporteOrdenesDTO
 )
+from interfaces.api.dtos.lote_dto import LoteResultadoDTO
+from interfaces.api.lotes import rechazar_si_hay_errores, respuesta_lote, validar_filas
+from interfaces.api.paginacion import MAX_LIMIT, aplicar_pagina, decodificar_cursor
+from interfaces.api.por_ids import aplicar_resultado, parsear_ids
+from interfaces.api.campos import parsear_campos, respuesta_parcial, respuesta_parcial_lista
+from domain.entities.orden import Orden
 
 router = APIRouter(prefix="/ordenes", tags=["ordenes"])
 
@@ -32,7 +49,8 @@ orden_repository = PostgresOrdenRepository()
 async def crear_orden(orden_dto: OrdenCreateDTO):
     try:
         use_case = CrearOrdenUseCase(orden_repository)
-        orden = use_case.execute(
+        orden = await run_in_db_executor(
+            use_case.execute,
             orden_dto.id_cliente,
             orden_dto.fecha_orden,
             orden_dto.estado_orden,
@@ -50,35 +68,135 @@ async def crear_orden(orden_dto: OrdenCreateDTO):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
+@router.post("/bulk", response_model=LoteResultadoDTO, status_code=status.HTTP_201_CREATED)
+async def crear_ordenes_lote(filas: List[Any] = Body(...), partial: bool = False):
+    """Crea muchas órdenes en una transacción. `ids` sigue el orden de la entrada.
+
+    Con `partial=true` las filas inválidas se reportan en `errores` y el resto se inserta;
+    sin él, cualquier fila inválida responde 422 y no se inserta ninguna.
+    """
+    indices, dtos, errores = validar_filas(filas, OrdenCreateDTO)
+    if not partial:
+        rechazar_si_hay_errores(errores)
+    try:
+        use_case = CrearOrdenesLoteUseCase(orden_repository)
+        resultado = await run_in_db_executor(use_case.execute, [Orden(**dto.model_dump()) for dto in dtos], partial)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if not partial:
+        rechazar_si_hay_errores({indices[p]: msg for p, msg in resultado.errores.items()})
+    return respuesta_lote(len(filas), indices, resultado, errores, lambda orden: orden.id_orden)
+
+
+# Las rutas fijas van antes de /{id_orden}; si no, "reportes" se toma como id
+@router.get("/reportes", response_model=list[OrdenResponseDTO])
+async def reportes_ordenes(fecha_inicio: datetime, fecha_fin: datetime, request: Request, response: Response):
+    no_modificado = verificar_etag(request, response, "orden")
+    if no_modificado is not None:
+        return no_modificado
+    # Ambos parámetros son obligatorios y FastAPI los parseará como datetime
+    if fecha_inicio is None or fecha_fin is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fecha_inicio y fecha_fin son requeridos")
+
+    use_case = ListarOrdenesPorFechaUseCase(orden_repository)
+    return await run_in_db_executor(use_case.execute, fecha_inicio, fecha_fin)
+
+
+@router.get("/reportes/agregado", response_model=list[ReporteOrdenesDTO])
+async def reporte_ordenes_agregado(
+    request: Request,
+    response: Response,
+    fecha_inicio: datetime,
+    fecha_fin: datetime,
+    periodo: Optional[PeriodoReporte] = None,
+    agrupar_por: Optional[AgrupacionReporte] = None,
+    rellenar: bool = False
+):
+    """Agrega en SQL (conteo, total vendido, total de envío y ticket promedio) por
+    día/semana/mes y/o por estado, país o método de envío; `rellenar` completa con
+    ceros los periodos sin órdenes."""
+    no_modificado = verificar_etag(request, response, "orden")
+    if no_modificado is not None:
+        return no_modificado
+    use_case = ReporteOrdenesAgregadoUseCase(orden_repository)
+    try:
+        return await run_in_db_executor(
+            use_case.execute,
+            fecha_inicio,
+            fecha_fin,
+            periodo=periodo.value if periodo else None,
+            agrupar_por=agrupar_por.value if agrupar_por else None,
+            rellenar=rellenar
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/{id_orden}", response_model=OrdenResponseDTO)
-async def obtener_orden(id_orden: int):
+async def obtener_orden(id_orden: int, request: Request, response: Response, fields: Optional[str] = None):
+    no_modificado = verificar_etag(request, response, "orden")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, OrdenResponseDTO)
     use_case = ObtenerOrdenUseCase(orden_repository)
-    orden = use_case.execute(id_orden)
+    orden = await run_in_db_executor(use_case.execute, id_orden, campos)
     if not orden:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada")
+    if campos:
+        return respuesta_parcial(response, OrdenResponseDTO, campos, orden)
     return orden
 
 
 @router.get("/cliente/{id_cliente}", response_model=list[OrdenResponseDTO])
-async def listar_ordenes_por_cliente(id_cliente: int):
+async def listar_ordenes_por_cliente(id_cliente: int, request: Request, response: Response):
+    no_modificado = verificar_etag(request, response, "orden")
+    if no_modificado is not None:
+        return no_modificado
     use_case = ListarOrdenesPorClienteUseCase(orden_repository)
-    return use_case.execute(id_cliente)
+    return await run_in_db_executor(use_case.execute, id_cliente)
 
 
 @router.get("/", response_model=list[OrdenResponseDTO])
-async def listar_ordenes():
+async def listar_ordenes(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = None,
+    estado_orden: Optional[OrdenEstado] = None,
+    id_cliente: Optional[int] = None,
+    fecha_desde: Optional[datetime] = None,
+    fecha_hasta: Optional[datetime] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    rapido: bool = False
+):
+    no_modificado = verificar_etag(request, response, "orden")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, OrdenResponseDTO)
+    lote = parsear_ids(ids)
+    if lote is not None:
+        # Con `ids` se ignoran paginación y filtros
+        resultado = await run_in_db_executor(ObtenerOrdenesPorIdsUseCase(orden_repository).execute, lote)
+        items = aplicar_resultado(response, resultado)
+        if campos:
+            return respuesta_parcial_lista(response, OrdenResponseDTO, campos, items)
+        return respuesta_lista(response, OrdenResponseDTO, items) if rapido else items
     use_case = ListarOrdenesUseCase(orden_repository)
-    return use_case.execute()
-
-
-@router.get("/reportes", response_model=list[OrdenResponseDTO])
-async def reportes_ordenes(fecha_inicio: datetime, fecha_fin: datetime):
-    # Ambos parámetros son obligatorios y FastAPI los parseará como datetime
-    if fecha_inicio is None or fecha_fin is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fecha_inicio y fecha_fin son requeridos")
-
-    use_case = ListarOrdenesPorFechaUseCase(orden_repository)
-    return use_case.execute(fecha_inicio, fecha_fin)
+    pagina = await run_in_db_executor(
+        use_case.execute,
+        limit=limit,
+        after=decodificar_cursor(after),
+        estado_orden=estado_orden.value if estado_orden else None,
+        id_cliente=id_cliente,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        campos=campos
+    )
+    items = aplicar_pagina(response, pagina)
+    if campos:
+        return respuesta_parcial_lista(response, OrdenResponseDTO, campos, items)
+    return respuesta_lista(response, OrdenResponseDTO, items) if rapido else items
 
 
 @router.put("/{id_orden}", response_model=OrdenResponseDTO)
@@ -91,7 +209,8 @@ async def actualizar_orden(id_orden: int, orden_dto: OrdenUpdateDTO):
     ):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Se debe proporcionar al menos un campo para actualizar")
     use_case = ActualizarOrdenUseCase(orden_repository)
-    orden_actualizada = use_case.execute(
+    orden_actualizada = await run_in_db_executor(
+        use_case.execute,
         id_orden,
         id_cliente=orden_dto.id_cliente,
         fecha_orden=orden_dto.fecha_orden,
@@ -113,7 +232,7 @@ async def actualizar_orden(id_orden: int, orden_dto: OrdenUpdateDTO):
 @router.delete("/{id_orden}", status_code=status.HTTP_200_OK)
 async def eliminar_orden(id_orden: int):
     use_case = EliminarOrdenUseCase(orden_repository)
-    eliminado = use_case.execute(id_orden)
+    eliminado = await run_in_db_executor(use_case.execute, id_orden)
     if not eliminado:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Orden no encontrada")
     return {"mensaje": "Orden cancelada exitosamente (borrado lógico)"}
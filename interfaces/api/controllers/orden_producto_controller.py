@@ -1,12 +1,20 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, HTTPException, Query, Request, Response, status
 from application.use_cases.orden_producto_cases.crear_orden_producto import CrearOrdenProductoUseCase
+from application.use_cases.orden_producto_cases.crear_orden_producto_lote import CrearOrdenProductoLoteUseCase
 from application.use_cases.orden_producto_cases.obtener_orden_producto import ObtenerOrdenProductoUseCase
 from application.use_cases.orden_producto_cases.listar_orden_producto import ListarOrdenProductosPorOrdenUseCase
 from application.use_cases.orden_producto_cases.listar_todos_orden_producto import ListarTodosOrdenProductoUseCase
 from application.use_cases.orden_producto_cases.actualizar_orden_producto import ActualizarOrdenProductoUseCase
 from application.use_cases.orden_producto_cases.eliminar_orden_producto import EliminarOrdenProductoUseCase
 from infrastructure.repositories.postgres_orden_producto_repository import PostgresOrdenProductoRepository
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from interfaces.api.dtos.orden_producto_dto import OrdenProductoCreateDTO, OrdenProductoResponseDTO
+from interfaces.api.dtos.lote_dto import LoteResultadoDTO
+from interfaces.api.lotes import rechazar_si_hay_errores, respuesta_lote, validar_filas
+from interfaces.api.paginacion import MAX_LIMIT, aplicar_pagina, decodificar_cursor
 from domain.entities.orden_producto import OrdenProducto
 
 router = APIRouter(prefix="/orden-producto", tags=["orden-producto"])
@@ -14,15 +22,37 @@ router = APIRouter(prefix="/orden-producto", tags=["orden-producto"])
 orden_producto_repository = PostgresOrdenProductoRepository()
 
 @router.get("/", response_model=list[OrdenProductoResponseDTO])
-async def listar_todos_orden_producto():
+async def listar_todos_orden_producto(
+	request: Request,
+	response: Response,
+	limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+	after: Optional[str] = None,
+	id_orden: Optional[int] = None,
+	id_producto: Optional[int] = None,
+	id_categoria: Optional[int] = None,
+	rapido: bool = False
+):
+	no_modificado = verificar_etag(request, response, "orden_producto", "productos")
+	if no_modificado is not None:
+		return no_modificado
 	use_case = ListarTodosOrdenProductoUseCase(orden_producto_repository)
-	return use_case.execute()
+	pagina = await run_in_db_executor(
+		use_case.execute,
+		limit=limit,
+		after=decodificar_cursor(after),
+		id_orden=id_orden,
+		id_producto=id_producto,
+		id_categoria=id_categoria
+	)
+	items = aplicar_pagina(response, pagina)
+	return respuesta_lista(response, OrdenProductoResponseDTO, items) if rapido else items
 
 @router.post("/", response_model=OrdenProductoResponseDTO, status_code=status.HTTP_201_CREATED)
 async def crear_orden_producto(dto: OrdenProductoCreateDTO):
 	try:
 		use_case = CrearOrdenProductoUseCase(orden_producto_repository)
-		orden_producto = use_case.execute(
+		orden_producto = await run_in_db_executor(
+			use_case.execute,
 			dto.id_producto,
 			dto.cantidad,
 			dto.precio_unitario,
@@ -35,10 +65,35 @@ async def crear_orden_producto(dto: OrdenProductoCreateDTO):
 			detail=f"Error al crear orden-producto: {str(e)}"
 		)
 
+@router.post("/bulk", response_model=LoteResultadoDTO, status_code=status.HTTP_201_CREATED)
+async def crear_orden_producto_lote(filas: List[Any] = Body(...), partial: bool = False):
+	"""Crea muchas líneas de orden en una transacción. `ids` sigue el orden de la entrada."""
+	indices, dtos, errores = validar_filas(filas, OrdenProductoCreateDTO)
+	if not partial:
+		rechazar_si_hay_errores(errores)
+	try:
+		use_case = CrearOrdenProductoLoteUseCase(orden_producto_repository)
+		resultado = await run_in_db_executor(
+			use_case.execute,
+			[OrdenProducto(**dto.model_dump()) for dto in dtos],
+			partial
+		)
+	except Exception as e:
+		raise HTTPException(
+			status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+			detail=f"Error al crear orden-producto en lote: {str(e)}"
+		)
+	if not partial:
+		rechazar_si_hay_errores({indices[p]: msg for p, msg in resultado.errores.items()})
+	return respuesta_lote(len(filas), indices, resultado, errores, lambda linea: linea.id_ordenProd)
+
 @router.get("/{id_ordenProd}", response_model=OrdenProductoResponseDTO)
-async def obtener_orden_producto(id_ordenProd: int):
+async def obtener_orden_producto(id_ordenProd: int, request: Request, response: Response):
+	no_modificado = verificar_etag(request, response, "orden_producto")
+	if no_modificado is not None:
+		return no_modificado
 	use_case = ObtenerOrdenProductoUseCase(orden_producto_repository)
-	orden_producto = use_case.execute(id_ordenProd)
+	orden_producto = await run_in_db_executor(use_case.execute, id_ordenProd)
 	if not orden_producto:
 		raise HTTPException(
 			status_code=status.HTTP_404_NOT_FOUND,
@@ -47,9 +102,12 @@ async def obtener_orden_producto(id_ordenProd: int):
 	return orden_producto
 
 @router.get("/orden/{id_orden}", response_model=list[OrdenProductoResponseDTO])
-async def listar_orden_productos(id_orden: int):
+async def listar_orden_productos(id_orden: int, request: Request, response: Response):
+	no_modificado = verificar_etag(request, response, "orden_producto")
+	if no_modificado is not None:
+		return no_modificado
 	use_case = ListarOrdenProductosPorOrdenUseCase(orden_producto_repository)
-	return use_case.execute(id_orden)
+	return await run_in_db_executor(use_case.execute, id_orden)
 
 @router.put("/{id_ordenProd}", response_model=OrdenProductoResponseDTO)
 async def actualizar_orden_producto(id_ordenProd: int, dto: OrdenProductoCreateDTO):
@@ -61,7 +119,7 @@ async def actualizar_orden_producto(id_ordenProd: int, dto: OrdenProductoCreateD
 		precio_unitario=dto.precio_unitario,
 		id_orden=dto.id_orden
 	)
-	actualizado = use_case.execute(id_ordenProd, orden_producto)
+	actualizado = await run_in_db_executor(use_case.execute, id_ordenProd, orden_producto)
 	if not actualizado:
 		raise HTTPException(
 			status_code=status.HTTP_404_NOT_FOUND,
@@ -72,7 +130,7 @@ async def actualizar_orden_producto(id_ordenProd: int, dto: OrdenProductoCreateD
 @router.delete("/{id_ordenProd}", status_code=status.HTTP_200_OK)
 async def eliminar_orden_producto(id_ordenProd: int):
 	use_case = EliminarOrdenProductoUseCase(orden_producto_repository)
-	eliminado = use_case.execute(id_ordenProd)
+	eliminado = await run_in_db_executor(use_case.execute, id_ordenProd)
 	if not eliminado:
 		raise HTTPException(
 			status_code=status.HTTP_404_NOT_FOUND,
@@ -9,25 +9,35 @@ project_root = current_file.parent.parent.parent.parent
 # Agregar el directorio raíz al path de Python
 sys.path.append(str(project_root))
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from application.use_cases.producto_cases.crear_producto import CrearProductoUseCase
 from application.use_cases.producto_cases.obtener_producto import ObtenerProductoUseCase
 from application.use_cases.producto_cases.listar_producto import ListarProductosUseCase
+from application.use_cases.producto_cases.obtener_productos_por_ids import ObtenerProductosPorIdsUseCase
 from application.use_cases.producto_cases.actualizar_producto import ActualizarProductoUseCase
 from application.use_cases.producto_cases.eliminar_producto import EliminarProductoUseCase
 from infrastructure.repositories.postgres_producto_repository import PostgresProductoRepository
+from infrastructure.cache.catalogo import con_cache_productos
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from interfaces.api.dtos.producto_dto import ProductoCreateDTO, ProductoUpdateDTO, ProductoResponseDTO
+from interfaces.api.paginacion import MAX_LIMIT, aplicar_pagina, decodificar_cursor
+from interfaces.api.por_ids import aplicar_resultado, parsear_ids
+from interfaces.api.campos import parsear_campos, respuesta_parcial, respuesta_parcial_lista
 
 router = APIRouter(prefix="/productos", tags=["productos"])
 
 # Inyección de dependencias
-producto_repository = PostgresProductoRepository()
+producto_repository = con_cache_productos(PostgresProductoRepository())
 
 @router.post("/", response_model=ProductoResponseDTO, status_code=status.HTTP_201_CREATED)
 async def crear_producto(producto_dto: ProductoCreateDTO):
     try:
         use_case = CrearProductoUseCase(producto_repository)
-        producto = use_case.execute(
+        producto = await run_in_db_executor(
+            use_case.execute,
             producto_dto.nombre_producto,
             producto_dto.precio,
             producto_dto.costo,
@@ -44,22 +54,52 @@ async def crear_producto(producto_dto: ProductoCreateDTO):
         )
 
 @router.get("/{id_producto}", response_model=ProductoResponseDTO)
-async def obtener_producto(id_producto: int):
+async def obtener_producto(id_producto: int, request: Request, response: Response, fields: Optional[str] = None):
+    no_modificado = verificar_etag(request, response, "productos")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, ProductoResponseDTO)
     use_case = ObtenerProductoUseCase(producto_repository)
-    producto = use_case.execute(id_producto)
+    producto = await run_in_db_executor(use_case.execute, id_producto, campos)
     
     if not producto:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Producto no encontrado"
         )
-    
+    if campos:
+        return respuesta_parcial(response, ProductoResponseDTO, campos, producto)
     return producto
 
 @router.get("/", response_model=list[ProductoResponseDTO])
-async def listar_productos():
+async def listar_productos(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = None,
+    id_categoria: Optional[int] = None,
+    ids: Optional[str] = None,
+    fields: Optional[str] = None,
+    rapido: bool = False
+):
+    no_modificado = verificar_etag(request, response, "productos")
+    if no_modificado is not None:
+        return no_modificado
+    campos = parsear_campos(fields, ProductoResponseDTO)
+    lote = parsear_ids(ids)
+    if lote is not None:
+        # Con `ids` se ignoran paginación y filtros
+        resultado = await run_in_db_executor(ObtenerProductosPorIdsUseCase(producto_repository).execute, lote)
+        items = aplicar_resultado(response, resultado)
+        if campos:
+            return respuesta_parcial_lista(response, ProductoResponseDTO, campos, items)
+        return respuesta_lista(response, ProductoResponseDTO, items) if rapido else items
     use_case = ListarProductosUseCase(producto_repository)
-    return use_case.execute()
+    pagina = await run_in_db_executor(use_case.execute, limit=limit, after=decodificar_cursor(after), id_categoria=id_categoria, campos=campos)
+    items = aplicar_pagina(response, pagina)
+    if campos:
+        return respuesta_parcial_lista(response, ProductoResponseDTO, campos, items)
+    return respuesta_lista(response, ProductoResponseDTO, items) if rapido else items
 
 @router.put("/{id_producto}", response_model=ProductoResponseDTO)
 async def actualizar_producto(id_producto: int, producto_dto: ProductoUpdateDTO):
@@ -74,7 +114,8 @@ async def actualizar_producto(id_producto: int, producto_dto: ProductoUpdateDTO)
             detail="Se debe proporcionar al menos un campo para actualizar"
         )
     use_case = ActualizarProductoUseCase(producto_repository)
-    producto_actualizado = use_case.execute(
+    producto_actualizado = await run_in_db_executor(
+        use_case.execute,
         id_producto,
         producto_dto.nombre_producto or "",
         producto_dto.precio if producto_dto.precio is not None else 0.0,
@@ -94,7 +135,7 @@ async def actualizar_producto(id_producto: int, producto_dto: ProductoUpdateDTO)
 @router.delete("/{id_producto}", status_code=status.HTTP_200_OK)
 async def eliminar_producto(id_producto: int):
     use_case = EliminarProductoUseCase(producto_repository)
-    eliminado = use_case.execute(id_producto)
+    eliminado = await run_in_db_executor(use_case.execute, id_producto)
     
     if not eliminado:
         raise HTTPException(
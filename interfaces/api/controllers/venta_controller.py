@@ -2,7 +2,9 @@
 import sys
 import os
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from application.use_cases.venta_cases.crear_venta import CrearVentaUseCase
 from application.use_cases.venta_cases.obtener_venta import ObtenerVentaUseCase
 from application.use_cases.venta_cases.listar_ventas import ListarVentasUseCase
@@ -11,26 +13,36 @@ from application.use_cases.venta_cases.eliminar_venta import EliminarVentaUseCas
 from infrastructure.repositories.postgres_venta_repository import PostgresVentaRepository
 from infrastructure.repositories.postgres_orden_producto_repository import PostgresOrdenProductoRepository
 from infrastructure.repositories.postgres_producto_repository import PostgresProductoRepository
+from infrastructure.cache.catalogo import con_cache_productos
+from infrastructure.database.db_executor import run_in_db_executor
+from interfaces.api.condicional import verificar_etag
+from interfaces.api.json_rapido import respuesta_lista
 from interfaces.api.dtos.venta_dto import VentaCreateDTO, VentaUpdateDTO, VentaResponseDTO
+from domain.exceptions import StockInsuficienteError
+from interfaces.api.errores import detalle_stock_insuficiente
+from interfaces.api.paginacion import MAX_LIMIT, aplicar_pagina, decodificar_cursor
 
 router = APIRouter(prefix="/ventas", tags=["ventas"])
 
 # Inyección de dependencias
 venta_repository = PostgresVentaRepository()
 orden_producto_repository = PostgresOrdenProductoRepository()
-producto_repository = PostgresProductoRepository()
+producto_repository = con_cache_productos(PostgresProductoRepository())
 
 @router.post("/", response_model=VentaResponseDTO, status_code=status.HTTP_201_CREATED)
 async def crear_venta(venta_dto: VentaCreateDTO):
     try:
         use_case = CrearVentaUseCase(venta_repository, orden_producto_repository, producto_repository)
-        venta = use_case.execute(
+        venta = await run_in_db_executor(
+            use_case.execute,
             venta_dto.id_orden,
             venta_dto.fecha_venta,
             venta_dto.total_venta,
             venta_dto.metodo_pago
         )
         return venta
+    except StockInsuficienteError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detalle_stock_insuficiente(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -38,9 +50,12 @@ async def crear_venta(venta_dto: VentaCreateDTO):
         )
 
 @router.get("/{id_venta}", response_model=VentaResponseDTO)
-async def obtener_venta(id_venta: int):
+async def obtener_venta(id_venta: int, request: Request, response: Response):
+    no_modificado = verificar_etag(request, response, "ventas")
+    if no_modificado is not None:
+        return no_modificado
     use_case = ObtenerVentaUseCase(venta_repository)
-    venta = use_case.execute(id_venta)
+    venta = await run_in_db_executor(use_case.execute, id_venta)
     if not venta:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,9 +64,32 @@ async def obtener_venta(id_venta: int):
     return venta
 
 @router.get("/", response_model=list[VentaResponseDTO])
-async def listar_ventas():
+async def listar_ventas(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = None,
+    id_orden: Optional[int] = None,
+    id_cliente: Optional[int] = None,
+    fecha_desde: Optional[datetime] = None,
+    fecha_hasta: Optional[datetime] = None,
+    rapido: bool = False
+):
+    no_modificado = verificar_etag(request, response, "ventas", "orden")
+    if no_modificado is not None:
+        return no_modificado
     use_case = ListarVentasUseCase(venta_repository)
-    return use_case.execute()
+    pagina = await run_in_db_executor(
+        use_case.execute,
+        limit=limit,
+        after=decodificar_cursor(after),
+        id_orden=id_orden,
+        id_cliente=id_cliente,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta
+    )
+    items = aplicar_pagina(response, pagina)
+    return respuesta_lista(response, VentaResponseDTO, items) if rapido else items
 
 @router.put("/{id_venta}", response_model=VentaResponseDTO)
 async def actualizar_venta(id_venta: int, venta_dto: VentaUpdateDTO):
@@ -65,7 +103,8 @@ async def actualizar_venta(id_venta: int, venta_dto: VentaUpdateDTO):
             detail="Se debe proporcionar al menos un campo para actualizar"
         )
     use_case = ActualizarVentaUseCase(venta_repository)
-    venta_actualizada = use_case.execute(
+    venta_actualizada = await run_in_db_executor(
+        use_case.execute,
         id_venta,
         venta_dto.dict(exclude_unset=True)
     )
@@ -79,7 +118,7 @@ async def actualizar_venta(id_venta: int, venta_dto: VentaUpdateDTO):
 @router.delete("/{id_venta}", status_code=status.HTTP_200_OK)
 async def eliminar_venta(id_venta: int):
     use_case = EliminarVentaUseCase(venta_repository)
-    eliminado = use_case.execute(id_venta)
+    eliminado = await run_in_db_executor(use_case.execute, id_venta)
     if not eliminado:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
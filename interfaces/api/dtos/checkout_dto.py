@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from interfaces.api.dtos.orden_dto import OrdenResponseDTO
+from interfaces.api.dtos.orden_producto_dto import OrdenProductoResponseDTO
+from interfaces.api.dtos.venta_dto import VentaResponseDTO
+
+class LineaCheckoutDTO(BaseModel):
+    id_producto: int
+    cantidad: int = Field(gt=0)
+    # Opcional: por defecto se toma el precio actual del producto
+    precio_unitario: Optional[float] = None
+
+class CheckoutCreateDTO(BaseModel):
+    id_cliente: int
+    fecha_orden: Optional[datetime] = None
+    direccion_envio: str
+    ciudad_envio: str
+    codigo_postal_envio: str
+    pais_envio: str
+    metodo_envio: str
+    costo_envio: float = 0.0
+    estado_envio: str = "pendiente"
+    metodo_pago: str
+    lineas: List[LineaCheckoutDTO] = Field(min_length=1)
+
+class CheckoutResponseDTO(BaseModel):
+    orden: OrdenResponseDTO
+    lineas: List[OrdenProductoResponseDTO]
+    venta: VentaResponseDTO
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class ErrorFilaDTO(BaseModel):
+    indice: int
+    error: str
+
+class LoteResultadoDTO(BaseModel):
+    # ids en el mismo orden que la entrada; None para las filas rechazadas
+    ids: List[Optional[int]]
+    creados: int
+    errores: List[ErrorFilaDTO]
@@ -14,6 +14,16 @@ class OrdenEstado(str, Enum):
     CANCELADA = "cancelada"
     ENVIADA = "enviada"
 
+class PeriodoReporte(str, Enum):
+    DIA = "dia"
+    SEMANA = "semana"
+    MES = "mes"
+
+class AgrupacionReporte(str, Enum):
+    ESTADO_ORDEN = "estado_orden"
+    PAIS_ENVIO = "pais_envio"
+    METODO_ENVIO = "metodo_envio"
+
 class OrdenCreateDTO(BaseModel):
     id_cliente: int
     fecha_orden: Optional[datetime] = None
@@ -52,4 +62,13 @@ class OrdenResponseDTO(BaseModel):
     pais_envio: str
     metodo_envio: str
     costo_envio: float
-    estado_envio: str
\ No newline at end of file
+    estado_envio: str
+
+class ReporteOrdenesDTO(BaseModel):
+    # periodo: inicio del día/semana/mes; grupo: valor de la dimensión agrupada
+    periodo: Optional[datetime] = None
+    grupo: Optional[str] = None
+    ordenes: int
+    total_ventas: float
+    total_envio: float
+    ticket_promedio: Optional[float] = None
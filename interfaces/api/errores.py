@@ -0,0 +1,13 @@
+"""Traducción de excepciones de dominio a cuerpos de error HTTP."""
+
+from domain.exceptions import StockInsuficienteError
+
+
+def detalle_stock_insuficiente(error: StockInsuficienteError) -> dict:
+    """Cuerpo del 409: mensaje más el detalle por producto (solicitado vs disponible)."""
+    return {
+        "mensaje": str(error),
+        "faltantes": [
+            {"id_producto": id_producto, **detalle} for id_producto, detalle in sorted(error.faltantes.items())
+        ],
+    }
@@ -0,0 +1,64 @@
+"""Serialización JSON rápida para listados grandes (opt-in con `?rapido=true`).
+
+La ruta normal de FastAPI convierte cada entidad a dict, la valida contra el
+DTO, la pasa por `jsonable_encoder` y la codifica con `json` de la stdlib: para
+miles de filas cuesta más que la consulta. Aquí la lista completa se valida y
+se serializa en una sola llamada a pydantic-core (`TypeAdapter` cacheado por
+DTO), con el mismo contrato de salida que `response_model`.
+
+`dumps` usa orjson si está instalado y cae a `json` si no.
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, List, Sequence, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, default=_default, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def adaptador_lista(dto: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[dto])
+
+
+def serializar_lista(dto: Type[BaseModel], items: Sequence[Any]) -> bytes:
+    """Valida las entidades contra `List[dto]` (por atributos) y retorna el JSON."""
+    adaptador = adaptador_lista(dto)
+    return adaptador.dump_json(adaptador.validate_python(items, from_attributes=True))
+
+
+def respuesta_lista(response: Response, dto: Type[BaseModel], items: Sequence[Any]) -> Response:
+    """Respuesta JSON de `items` que conserva las cabeceras ya puestas en `response`."""
+    headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(
+        serializar_lista(dto, items),
+        status_code=response.status_code or 200,
+        media_type="application/json",
+        headers=headers,
+    )
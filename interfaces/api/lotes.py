@@ -0,0 +1,62 @@
+"""Validación por fila y armado de la respuesta de los endpoints `/bulk`."""
+
+import os
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from domain.entities.resultado_lote import ResultadoLote
+
+BULK_MAX_FILAS = int(os.getenv("BULK_MAX_FILAS", "10000"))
+
+
+def validar_filas(filas: List[Any], dto: Type[BaseModel]) -> Tuple[List[int], List[BaseModel], Dict[int, str]]:
+    """Valida cada fila contra `dto`; retorna índices válidos, DTOs y errores por índice."""
+    if len(filas) > BULK_MAX_FILAS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {BULK_MAX_FILAS} filas por lote",
+        )
+    indices, dtos, errores = [], [], {}
+    for indice, fila in enumerate(filas):
+        try:
+            dtos.append(dto.model_validate(fila))
+            indices.append(indice)
+        except ValidationError as e:
+            errores[indice] = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'fila'}: {err['msg']}" for err in e.errors()
+            )
+    return indices, dtos, errores
+
+
+def rechazar_si_hay_errores(errores: Dict[int, str]) -> None:
+    """Sin `partial`, cualquier error invalida el lote completo (no se inserta nada)."""
+    if errores:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"errores": [{"indice": i, "error": errores[i]} for i in sorted(errores)]},
+        )
+
+
+def respuesta_lote(
+    total: int,
+    indices: List[int],
+    resultado: ResultadoLote,
+    errores: Dict[int, str],
+    clave: Callable[[Any], int],
+) -> dict:
+    """Reubica el resultado del repositorio (sobre las filas válidas) en los índices de la entrada."""
+    ids: List[Any] = [None] * total
+    errores = dict(errores)
+    for posicion, indice in enumerate(indices):
+        creado = resultado.creados[posicion] if posicion < len(resultado.creados) else None
+        if creado is not None:
+            ids[indice] = clave(creado)
+        if posicion in resultado.errores:
+            errores[indice] = resultado.errores[posicion]
+    return {
+        "ids": ids,
+        "creados": sum(1 for i in ids if i is not None),
+        "errores": [{"indice": i, "error": errores[i]} for i in sorted(errores)],
+    }
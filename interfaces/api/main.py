@@ -23,7 +23,16 @@ from interfaces.api.controllers.orden_controller import router as ordenes_router
 from interfaces.api.controllers.venta_controller import router as ventas_router
 from interfaces.api.controllers.orden_producto_controller import router as orden_producto_router
 from interfaces.api.controllers.ia_controller import router as ia_router
-from infrastructure.database.postgres_connection import get_db_connection
+from interfaces.api.controllers.health_controller import router as health_router
+from interfaces.api.controllers.export_controller import router as export_router
+from interfaces.api.controllers.checkout_controller import router as checkout_router
+from interfaces.api.controllers.metricas_controller import router as metricas_router
+from infrastructure.database.postgres_connection import close_pool, precalentar_pool
+from infrastructure.database.db_executor import get_db_executor, shutdown_db_executor
+from infrastructure.cache.catalogo import iniciar_invalidacion, detener_invalidacion
+from interfaces.api.admision import AdmisionMiddleware
+from interfaces.api.compresion import CompresionMiddleware
+from interfaces.api.metricas import MetricasMiddleware
 
 
 app = FastAPI(
@@ -32,6 +41,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# gzip/brotli según Accept-Encoding (umbral y nivel por COMPRESSION_*)
+app.add_middleware(CompresionMiddleware)
+# Límite de concurrencia y cola por clase de ruta (lectura/escritura/export/ia): 503 + Retry-After al desbordar
+app.add_middleware(AdmisionMiddleware)
+# Latencia, estados y consultas SQL por ruta en /metrics (la más externa: incluye la compresión)
+app.add_middleware(MetricasMiddleware)
+
 # Incluir rutas
 app.include_router(categorias_router)
 app.include_router(productos_router)
@@ -40,6 +56,10 @@ app.include_router(ordenes_router)
 app.include_router(ventas_router)
 app.include_router(orden_producto_router)
 app.include_router(ia_router)
+app.include_router(health_router)
+app.include_router(export_router)
+app.include_router(checkout_router)
+app.include_router(metricas_router)
 @app.get("/")
 async def root():
     return {"mensaje": "API de KI09 funcionando correctamente"}
@@ -52,15 +72,17 @@ def startup_event():
     db_host = os.getenv('DB_HOST')
     print('Startup: DATABASE_URL=', db_url)
     print('Startup: DB_HOST=', db_host)
-    # Probar conexión rápida para verificar origen de datos
-    try:
-        conn = get_db_connection()
-        conn.close()
-        print('Startup: conexión a DB OK')
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        print('Startup: advertencia — no se pudo conectar a la DB (la app seguirá funcionando)')
+    # Abrir las conexiones mínimas del pool en segundo plano: el arranque no espera a la DB
+    get_db_executor().submit(precalentar_pool)
+    # Invalidación de la caché del catálogo por LISTEN/NOTIFY (se reconecta sola)
+    iniciar_invalidacion()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    detener_invalidacion()
+    shutdown_db_executor()
+    close_pool()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,154 @@
+"""Métricas HTTP por ruta y colectores de pool, caché, compresión, admisión y sentencias preparadas.
+
+`MetricasMiddleware` (ASGI puro) mide cada petición: latencia por ruta,
+conteo por código de estado y peticiones en curso. También abre el estado de
+la petición para el acceso a datos, así que las consultas, el tiempo en
+`cursor.execute` y las conexiones abiertas quedan atribuidas a la ruta. La
+ruta se etiqueta con su plantilla (`/ordenes/{id_orden}`), nunca con la URL
+concreta, para no disparar la cardinalidad.
+"""
+
+import time
+
+from infrastructure.cache.catalogo import estadisticas_cache
+from infrastructure.database import prepared_statements
+from infrastructure.database.postgres_connection import get_pool_stats
+from infrastructure.metricas.consultas import BUCKETS_CONSULTA, iniciar_peticion, terminar_peticion
+from infrastructure.metricas.registro import registro
+from interfaces.api import admision, compresion
+
+RUTA_DESCONOCIDA = "sin_ruta"
+
+peticiones_total = registro.contador(
+    "http_requests_total", "Peticiones HTTP atendidas.", ("method", "route", "status")
+)
+duracion_peticion = registro.histograma(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP.", ("method", "route")
+)
+en_curso = registro.gauge("http_requests_in_flight", "Peticiones HTTP en curso.")
+consultas_por_peticion = registro.histograma(
+    "http_request_db_queries", "Consultas SQL por petición.", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+tiempo_db_peticion = registro.histograma(
+    "http_request_db_seconds", "Tiempo en cursor.execute por petición.", ("route",), buckets=BUCKETS_CONSULTA
+)
+conexiones_peticion = registro.contador(
+    "http_request_db_connections_opened_total", "Conexiones físicas abiertas durante peticiones.", ("route",)
+)
+
+
+def _ruta(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or RUTA_DESCONOCIDA
+
+
+class MetricasMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_medido(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = iniciar_peticion()
+        en_curso.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_medido)
+        finally:
+            transcurrido = time.perf_counter() - inicio
+            en_curso.dec()
+            estado = terminar_peticion(token)
+            ruta = _ruta(scope)
+            metodo = scope.get("method", "")
+            peticiones_total.inc(metodo, ruta, str(status))
+            duracion_peticion.observar(transcurrido, metodo, ruta)
+            consultas_por_peticion.observar(estado.consultas, ruta)
+            tiempo_db_peticion.observar(estado.segundos_db, ruta)
+            if estado.conexiones:
+                conexiones_peticion.inc(ruta, valor=estado.conexiones)
+
+
+@registro.colector
+def _pool():
+    stats = get_pool_stats()
+    if not stats.get("initialized"):
+        return []
+    return [
+        ("db_pool_connections", "gauge", "Conexiones del pool por estado.", {"state": "in_use"}, stats["in_use"]),
+        ("db_pool_connections", "gauge", "Conexiones del pool por estado.", {"state": "idle"}, stats["idle"]),
+        ("db_pool_max_size", "gauge", "Tamaño máximo del pool.", {}, stats["max_size"]),
+        ("db_pool_waiting", "gauge", "Hilos esperando una conexión.", {}, stats["waiting"]),
+        ("db_pool_checkouts_total", "counter", "Conexiones entregadas por el pool.", {}, stats["checkouts"]),
+        ("db_pool_timeouts_total", "counter", "Esperas de conexión agotadas.", {}, stats["timeouts"]),
+        ("db_pool_wait_seconds_total", "counter", "Tiempo total esperando conexión.", {}, stats["wait_time_total"]),
+    ]
+
+
+@registro.colector
+def _caches():
+    data = estadisticas_cache()
+    muestras = []
+    for clave, ayuda in (("hits", "Aciertos de caché."), ("misses", "Fallos de caché."), ("evictions", "Expulsiones LRU.")):
+        for nombre in ("productos", "categoria"):
+            muestras.append((f"cache_{clave}_total", "counter", ayuda, {"cache": nombre}, data[nombre][clave]))
+    for nombre in ("productos", "categoria"):
+        muestras.append(("cache_entries", "gauge", "Entradas en caché.", {"cache": nombre}, data[nombre]["entries"]))
+    return muestras
+
+
+@registro.colector
+def _compresion():
+    data = compresion.estadisticas()
+    return [
+        ("http_compressed_responses_total", "counter", "Respuestas comprimidas.", {}, data["comprimidas"]),
+        ("http_compression_bytes_in_total", "counter", "Bytes antes de comprimir.", {}, data["bytes_entrada"]),
+        ("http_compression_bytes_out_total", "counter", "Bytes después de comprimir.", {}, data["bytes_salida"]),
+        ("http_compression_cpu_seconds_total", "counter", "CPU usada comprimiendo.", {}, data["cpu_segundos"]),
+    ]
+
+
+# (nombre, tipo, ayuda, etiquetas extra, campo de admision.estadisticas())
+_FAMILIAS_ADMISION = (
+    ("http_admission_in_flight", "gauge", "Peticiones admitidas en curso por clase.", {}, "en_curso"),
+    ("http_admission_limit", "gauge", "Límite de concurrencia por clase.", {}, "limite"),
+    ("http_admission_queue_depth", "gauge", "Peticiones esperando plaza por clase.", {}, "esperando"),
+    ("http_admission_admitted_total", "counter", "Peticiones admitidas por clase.", {}, "admitidas"),
+    ("http_admission_rejected_total", "counter", "Peticiones rechazadas con 503.",
+     {"reason": "queue_full"}, "rechazadas_cola"),
+    ("http_admission_rejected_total", "counter", "Peticiones rechazadas con 503.",
+     {"reason": "timeout"}, "rechazadas_espera"),
+    ("http_admission_wait_seconds_total", "counter", "Tiempo total en cola por clase.", {}, "espera_total"),
+)
+
+
+@registro.colector
+def _admision():
+    estadisticas = admision.estadisticas()
+    # Familia por familia: el formato de texto exige que las muestras de cada una vayan juntas
+    return [(nombre, tipo, ayuda, {"class": clase, **extra}, data[campo])
+            for nombre, tipo, ayuda, extra, campo in _FAMILIAS_ADMISION
+            for clase, data in estadisticas.items()]
+
+
+@registro.colector
+def _sentencias_preparadas():
+    data = prepared_statements.estadisticas()
+    return [
+        ("db_prepared_executions_total", "counter", "Ejecuciones de sentencias preparadas.", {"result": "hit"}, data["hits"]),
+        ("db_prepared_executions_total", "counter", "Ejecuciones de sentencias preparadas.", {"result": "prepare"}, data["prepares"]),
+        ("db_prepared_executions_total", "counter", "Ejecuciones de sentencias preparadas.", {"result": "reprepare"}, data["reprepares"]),
+    ]
+
+
+def exponer() -> str:
+    return registro.exponer()
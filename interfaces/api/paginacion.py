@@ -0,0 +1,44 @@
+"""Cursor opaco para la paginación por clave (keyset) de los endpoints de listado.
+
+El cliente recibe el token de la página siguiente en la cabecera `X-Next-Cursor`
+y lo envía como `?after=<token>`; el cuerpo de la respuesta sigue siendo la lista.
+"""
+
+import base64
+import binascii
+import json
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, status
+
+from domain.entities.pagina import Pagina
+
+MAX_LIMIT = 1000
+HEADER_SIGUIENTE = "X-Next-Cursor"
+
+
+def codificar_cursor(clave: int) -> str:
+    payload = json.dumps({"k": clave}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode()
+
+
+def decodificar_cursor(token: Optional[str]) -> Optional[int]:
+    """Convierte el token recibido en `after` a la clave; 400 si el token no es válido."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        clave = data["k"]
+        if not isinstance(clave, int):
+            raise ValueError(clave)
+        return clave
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor 'after' inválido")
+
+
+def aplicar_pagina(response: Response, pagina: Pagina) -> List:
+    """Publica el cursor de la página siguiente (si existe) y retorna los items."""
+    if pagina.siguiente is not None:
+        response.headers[HEADER_SIGUIENTE] = codificar_cursor(pagina.siguiente)
+    return pagina.items
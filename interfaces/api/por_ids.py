@@ -0,0 +1,38 @@
+"""Consulta por lote de ids (`?ids=3,1,7`) en los endpoints de listado.
+
+Evita que el cliente haga una petición por entidad: el repositorio resuelve el
+lote con una sola consulta `= ANY(...)`. El cuerpo sigue siendo la lista, en el
+orden pedido; los ids inexistentes se informan en la cabecera `X-Ids-Faltantes`.
+"""
+
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, status
+
+from domain.entities.resultado_por_ids import ResultadoPorIds
+from interfaces.api.paginacion import MAX_LIMIT
+
+HEADER_FALTANTES = "X-Ids-Faltantes"
+
+
+def parsear_ids(texto: Optional[str]) -> Optional[List[int]]:
+    """Convierte `"3,1,7"` en `[3, 1, 7]`; 400 si algún id no es entero o son demasiados."""
+    if texto is None:
+        return None
+    partes = [p.strip() for p in texto.split(",") if p.strip()]
+    try:
+        ids = [int(p) for p in partes]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'ids' debe ser una lista de enteros separados por coma")
+    if not ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'ids' no puede estar vacío")
+    if len(ids) > MAX_LIMIT:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Se permiten como máximo {MAX_LIMIT} ids por petición")
+    return ids
+
+
+def aplicar_resultado(response: Response, resultado: ResultadoPorIds) -> List:
+    """Publica los ids faltantes (si hay) y retorna las entidades encontradas."""
+    if resultado.faltantes:
+        response.headers[HEADER_FALTANTES] = ",".join(str(i) for i in resultado.faltantes)
+    return resultado.encontrados
@@ -0,0 +1,79 @@
+"""Micro-benchmark de serialización de listados (sin base de datos).
+
+Compara, para N órdenes ya mapeadas a entidades:
+- fastapi: la ruta actual de `response_model=list[OrdenResponseDTO]`
+  (`serialize_response` + `JSONResponse`, json de la stdlib);
+- rapido: `json_rapido.serializar_lista` (TypeAdapter cacheado, validación y
+  JSON en pydantic-core), lo que usan los listados con `?rapido=true`;
+- orjson: `json_rapido.dumps` directo sobre las entidades, sin validar contra
+  el DTO (referencia del límite inferior; es lo que hace la exportación NDJSON).
+
+Uso: python scripts/benchmark_json.py [filas]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from domain.entities.orden import Orden
+from interfaces.api.dtos.orden_dto import OrdenResponseDTO
+from interfaces.api.json_rapido import dumps, serializar_lista
+
+_CAMPO = create_response_field(name="benchmark", type_=list[OrdenResponseDTO])
+
+
+def _ordenes(n):
+    fecha = datetime(2024, 1, 1, 12, 30)
+    return [
+        Orden(i, i % 500, fecha, "pendiente", "Calle 1", 99.5, "Tegucigalpa", "11101", "HN", "dhl", 5.0, "pendiente")
+        for i in range(n)
+    ]
+
+
+def ruta_fastapi(items):
+    contenido = asyncio.run(serialize_response(field=_CAMPO, response_content=items))
+    return JSONResponse(contenido).body
+
+
+def ruta_rapida(items):
+    return serializar_lista(OrdenResponseDTO, items)
+
+
+def ruta_orjson(items):
+    return dumps(items)
+
+
+def _medir(fn, items, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        cuerpo = fn(items)
+        mejor = min(mejor, time.process_time() - inicio)
+    return mejor, len(cuerpo)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    items = _ordenes(n)
+    print(f"{n} órdenes (mejor de 5, tiempo de CPU)")
+    base = None
+    for nombre, fn in (("fastapi", ruta_fastapi), ("rapido", ruta_rapida), ("orjson", ruta_orjson)):
+        t, tam = _medir(fn, items)
+        base = base or t
+        print(
+            f"{nombre:8s} {t * 1000:8.1f} ms  {n / t:10.0f} filas/s  "
+            f"{tam / 1024:8.0f} KiB  x{base / t:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
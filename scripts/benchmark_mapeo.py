@@ -0,0 +1,137 @@
+"""Micro-benchmark del mapeo fila -> entidad (sin base de datos).
+
+Compara, para N filas de `orden` y `productos`:
+- antes: RealDictRow por fila (como RealDictCursor) + constructor por nombre
+  sobre un dataclass sin __slots__;
+- ahora: tupla por fila (cursor estándar) + `MapeoFila.todos` sobre el
+  dataclass con __slots__.
+
+Uso: python scripts/benchmark_mapeo.py [filas]
+"""
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from psycopg2.extras import RealDictRow
+
+from infrastructure.repositories.mappers import ORDEN, PRODUCTO
+
+
+@dataclass
+class OrdenSinSlots:
+    id_orden: Optional[int] = None
+    id_cliente: int = 0
+    fecha_orden: datetime = None
+    estado_orden: str = "pendiente"
+    direccion_envio: str = ""
+    total_orden: float = 0.0
+    ciudad_envio: str = ""
+    codigo_postal_envio: str = ""
+    pais_envio: str = ""
+    metodo_envio: str = ""
+    costo_envio: float = 0.0
+    estado_envio: str = ""
+
+
+@dataclass
+class ProductoSinSlots:
+    id_producto: Optional[int] = None
+    nombre_producto: str = ""
+    precio: float = 0.0
+    costo: float = 0.0
+    id_categoria: int = 0
+    descripcion: str = ""
+    stock: int = 0
+    imagen_url: str = ""
+
+
+def _filas_orden(n):
+    fecha = datetime(2024, 1, 1)
+    return [(i, i % 500, fecha, 1 + i % 4, "Calle 1", 99.5, "Tegucigalpa", "11101", "HN", "dhl", 5.0, "pendiente")
+            for i in range(n)]
+
+
+def _filas_producto(n):
+    return [(i, f"Producto {i}", 10.0, 6.0, i % 20, "desc", 100, "http://img") for i in range(n)]
+
+
+def _como_dicts(filas, columnas):
+    # Lo que hace RealDictCursor: un RealDictRow por fila, llenado clave a clave
+    resultado = []
+    for fila in filas:
+        row = RealDictRow()
+        for columna, valor in zip(columnas, fila):
+            row[columna] = valor
+        resultado.append(row)
+    return resultado
+
+
+_ESTADOS = {1: 'pendiente', 2: 'completada', 3: 'cancelada', 4: 'enviada'}
+
+
+def antes_orden(filas):
+    rows = _como_dicts(filas, ORDEN.columnas)
+    return [
+        OrdenSinSlots(
+            id_orden=row['id_orden'], id_cliente=row['id_cliente'], fecha_orden=row['fecha_orden'],
+            estado_orden=_ESTADOS.get(row['estado_orden'], row['estado_orden']),
+            direccion_envio=row['direccion_envio'], total_orden=row['total_orden'],
+            ciudad_envio=row['ciudad_envio'], codigo_postal_envio=row['codigo_postal_envio'],
+            pais_envio=row['pais_envio'], metodo_envio=row['metodo_envio'],
+            costo_envio=row['costo_envio'], estado_envio=row['estado_envio'],
+        ) for row in rows
+    ]
+
+
+def antes_producto(filas):
+    rows = _como_dicts(filas, PRODUCTO.columnas)
+    return [
+        ProductoSinSlots(
+            id_producto=row['id_producto'], nombre_producto=row['nombre_producto'], precio=row['precio'],
+            costo=row['costo'], id_categoria=row['id_categoria'], descripcion=row['descripcion'],
+            stock=row['stock'], imagen_url=row['imagen_url'],
+        ) for row in rows
+    ]
+
+
+def _medir(fn, filas, repeticiones=5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.process_time()
+        fn(filas)
+        mejor = min(mejor, time.process_time() - inicio)
+    tracemalloc.start()
+    resultado = fn(filas)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return mejor, pico
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    casos = [
+        ("orden", _filas_orden(n), antes_orden, ORDEN.todos),
+        ("productos", _filas_producto(n), antes_producto, PRODUCTO.todos),
+    ]
+    print(f"{n} filas por caso (mejor de 5, tiempo de CPU)")
+    for nombre, filas, antes, ahora in casos:
+        t_antes, m_antes = _medir(antes, filas)
+        t_ahora, m_ahora = _medir(ahora, filas)
+        print(
+            f"{nombre:10s} antes: {t_antes / n * 1e6:6.2f} us/fila {m_antes / n:6.0f} B/fila | "
+            f"ahora: {t_ahora / n * 1e6:6.2f} us/fila {m_ahora / n:6.0f} B/fila | "
+            f"CPU -{(1 - t_ahora / t_antes) * 100:.0f}%  memoria -{(1 - m_ahora / m_antes) * 100:.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Crea en la base OLTP los índices que usa el reporte agregado de órdenes.
+
+`GET /ordenes/reportes/agregado` filtra por rango de `fecha_orden` sobre las
+órdenes no eliminadas y agrega `total_orden`/`costo_envio` por periodo y por
+estado, país o método de envío. Con el índice parcial y cubriente de abajo la
+consulta se resuelve con un index-only scan del rango pedido, sin leer la
+tabla. El predicado del índice es idéntico al de las consultas para que el
+planificador pueda usarlo.
+
+Se crean con CONCURRENTLY (no bloquea escrituras) y son idempotentes.
+Uso: python scripts/crear_indices_reportes.py [--dry-run]
+"""
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+project_root = Path(__file__).resolve().parent.parent
+load_dotenv(dotenv_path=project_root / '.env')
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from infrastructure.database.postgres_connection import get_dedicated_connection
+
+INDICES = [
+    # Rango de fechas + columnas agregadas/agrupadas en INCLUDE (index-only scan)
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orden_fecha_reporte
+        ON orden (fecha_orden)
+        INCLUDE (estado_orden, pais_envio, metodo_envio, total_orden, costo_envio)
+        WHERE (eliminado IS NULL OR eliminado = FALSE)
+    """,
+]
+
+
+def crear_indices(conn, dry_run: bool = False) -> None:
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    conn.autocommit = True
+    cursor = conn.cursor()
+    for sql in INDICES:
+        print(sql.strip())
+        if not dry_run:
+            cursor.execute(sql)
+    if not dry_run:
+        cursor.execute("ANALYZE orden;")
+
+
+if __name__ == '__main__':
+    dry_run = '--dry-run' in sys.argv
+    conn = get_dedicated_connection()
+    try:
+        crear_indices(conn, dry_run=dry_run)
+        print('Índices listos' if not dry_run else 'Dry-run: no se ejecutó nada')
+    finally:
+        conn.close()
@@ -2,27 +2,38 @@
 import os
 import re
 import json
-import requests
 import logging
-from dotenv import load_dotenv
 
-# Cargar .env si existe
-load_dotenv()
+# Importar este módulo no tiene efectos secundarios: el .env lo carga quien
+# arranca el proceso (interfaces/api/main.py) y el log a archivo se configura
+# en la primera petición. `requests` también se importa recién ahí.
 
 API_URL = os.getenv('GROK_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
-API_KEY = os.getenv('GROKIA_API_KEY') or os.getenv('GROK_API_KEY')
 
 # Logging local de peticiones/respuestas (no incluir claves)
-log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
-os.makedirs(log_dir, exist_ok=True)
-log_file = os.path.join(log_dir, 'grok_requests.log')
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s', handlers=[logging.FileHandler(log_file, encoding='utf-8')])
+logger = logging.getLogger("grok_client")
+_log_configurado = False
 
-HEADERS = {
-    "Content-Type": "application/json"
-}
-if API_KEY:
-    HEADERS["Authorization"] = f"Bearer {API_KEY}"
+
+def _configurar_log() -> None:
+    global _log_configurado
+    if _log_configurado:
+        return
+    log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    handler = logging.FileHandler(os.path.join(log_dir, 'grok_requests.log'), encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    _log_configurado = True
+
+
+def _api_key():
+    return os.getenv('GROKIA_API_KEY') or os.getenv('GROK_API_KEY')
+
+
+def _headers(api_key: str) -> dict:
+    return {"Content-Type": "application/json", "Authorization": f"Bearer {api_key}"}
 
 
 def analyze_prompt(prompt: str, context_text: str = None) -> str:
@@ -31,6 +42,8 @@ def analyze_prompt(prompt: str, context_text: str = None) -> str:
     Si no hay API key disponible, devuelve una respuesta mock para pruebas locales.
     Registra la petición y la respuesta (sin keys) en `logs/grok_requests.log`.
     """
+    _configurar_log()
+    api_key = _api_key()
     # Preparar instrucciones claras para forzar el uso del contexto
     system_instructions = (
         "Usa exclusivamente la información proporcionada en el bloque CONTEXT para responder. "
@@ -74,23 +87,24 @@ def analyze_prompt(prompt: str, context_text: str = None) -> str:
         log_payload = {"model": data["model"], "messages": [messages[1]]}
         if len(full_content) > 5000:
             log_payload["messages"][0]["content"] = full_content[:5000] + '...'
-        logging.info("Grok request payload: %s", json.dumps(log_payload, ensure_ascii=False))
+        logger.info("Grok request payload: %s", json.dumps(log_payload, ensure_ascii=False))
     except Exception:
-        logging.exception("Error logueando payload")
+        logger.exception("Error logueando payload")
 
     # Si no hay API key, devolver mock para permitir pruebas locales
-    if not API_KEY:
+    if not api_key:
         mock_resp = f"MOCK_RESPONSE: recibí contexto de {len(context_text) if context_text else 0} chars; pregunta: {prompt[:200]}"
-        logging.info("Grok mock response: %s", mock_resp)
+        logger.info("Grok mock response: %s", mock_resp)
         return mock_resp
 
     # Realizar la petición real
     try:
-        response = requests.post(API_URL, headers=HEADERS, json=data, timeout=30)
+        import requests
+        response = requests.post(API_URL, headers=_headers(api_key), json=data, timeout=30)
         # Loggear la respuesta completa (texto), truncando si es muy larga
         resp_text = response.text
         to_log = resp_text if len(resp_text) < 5000 else resp_text[:5000] + '...'
-        logging.info("Grok response (truncated): %s", to_log)
+        logger.info("Grok response (truncated): %s", to_log)
 
         result = response.json()
         if "choices" in result and len(result["choices"]) > 0:
@@ -127,20 +141,20 @@ def analyze_prompt(prompt: str, context_text: str = None) -> str:
             if json_text:
                 try:
                     parsed = json.loads(json_text)
-                    logging.info("Grok parsed JSON response (extracted): %s", parsed)
+                    logger.info("Grok parsed JSON response (extracted): %s", parsed)
                     return parsed
                 except Exception:
-                    logging.exception("Error parseando JSON extraído, intentando parseo directo...")
+                    logger.exception("Error parseando JSON extraído, intentando parseo directo...")
             # Fallback: intentar parseo directo del content tal cual
             try:
                 parsed = json.loads(content)
-                logging.info("Grok parsed JSON response: %s", parsed)
+                logger.info("Grok parsed JSON response: %s", parsed)
                 return parsed
             except Exception:
-                logging.warning("Grok response no es JSON válido, retornando texto crudo.")
+                logger.warning("Grok response no es JSON válido, retornando texto crudo.")
                 return content
-        logging.error("Grok API estructura inesperada: %s", result)
+        logger.error("Grok API estructura inesperada: %s", result)
         return result
     except Exception as e:
-        logging.exception("Error llamando a Grok API: %s", e)
+        logger.exception("Error llamando a Grok API: %s", e)
         return {"error": str(e)}
\ No newline at end of file
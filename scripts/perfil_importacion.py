@@ -0,0 +1,99 @@
+"""Perfil del tiempo de importación de la API (arranque en frío).
+
+Ejecuta `python -X importtime -c "import <módulo>"` en un proceso nuevo y
+resume el resultado: tiempo total, los paquetes de primer nivel más caros y
+los módulos pesados que no deberían cargarse al arrancar (pandas, numpy,
+requests: el stack de IA/OLAP se importa recién en su primer uso).
+
+Sale con código 1 si se cargó algún módulo prohibido o si el total supera
+`--max-ms`, de modo que sirve como chequeo en CI.
+
+Uso: python scripts/perfil_importacion.py [--modulo interfaces.api.main] [--top 15] [--max-ms 1500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+project_root = Path(__file__).resolve().parent.parent
+
+PROHIBIDOS_POR_DEFECTO = ("pandas", "numpy", "requests")
+
+
+class Importacion(NamedTuple):
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    nivel: int
+
+
+def parsear_importtime(texto: str) -> List[Importacion]:
+    """Convierte la salida de `-X importtime` (stderr) en registros."""
+    importaciones = []
+    for linea in texto.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        _, _, resto = linea.partition(":")
+        try:
+            propio, acumulado, nombre = resto.split("|", 2)
+            nivel = (len(nombre) - len(nombre.lstrip(" ")) - 1) // 2
+            importaciones.append(Importacion(nombre.strip(), int(propio), int(acumulado), nivel))
+        except ValueError:
+            continue
+    return importaciones
+
+
+def perfilar(modulo: str) -> List[Importacion]:
+    env = dict(os.environ, PYTHONPATH=str(project_root))
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=project_root, env=env, capture_output=True, text=True,
+    )
+    if proceso.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{proceso.stderr[-2000:]}")
+    return parsear_importtime(proceso.stderr)
+
+
+def resumen_por_paquete(importaciones: List[Importacion]) -> Dict[str, int]:
+    """Suma el tiempo propio por paquete de primer nivel (en microsegundos)."""
+    totales: Dict[str, int] = defaultdict(int)
+    for imp in importaciones:
+        totales[imp.modulo.split(".")[0]] += imp.propio_us
+    return dict(totales)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modulo", default="interfaces.api.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=None, help="falla si el total supera este valor")
+    parser.add_argument("--prohibidos", default=",".join(PROHIBIDOS_POR_DEFECTO),
+                        help="módulos que no deben importarse (separados por coma)")
+    args = parser.parse_args()
+
+    importaciones = perfilar(args.modulo)
+    total_ms = sum(i.propio_us for i in importaciones) / 1000
+    cargados = {i.modulo for i in importaciones}
+
+    print(f"Importar {args.modulo}: {total_ms:.0f} ms en {len(importaciones)} módulos")
+    print("\nPaquetes más caros (tiempo propio acumulado):")
+    for paquete, us in sorted(resumen_por_paquete(importaciones).items(), key=lambda x: -x[1])[:args.top]:
+        print(f"  {paquete:30s} {us / 1000:8.1f} ms")
+
+    fallos = []
+    prohibidos = [p.strip() for p in args.prohibidos.split(",") if p.strip()]
+    presentes = [p for p in prohibidos if p in cargados]
+    if presentes:
+        fallos.append(f"módulos pesados importados al arrancar: {', '.join(presentes)}")
+    if args.max_ms is not None and total_ms > args.max_ms:
+        fallos.append(f"tiempo total {total_ms:.0f} ms > {args.max_ms:.0f} ms")
+    for fallo in fallos:
+        print(f"\nFALLO: {fallo}")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,13 @@ import sys
 project_root = Path(__file__).resolve().parent.parent
 sys.path.append(str(project_root))
 
+from dotenv import load_dotenv
+
 from application.use_cases.ia_cases.analyze_olap_use_case import AnalyzeOlapUseCase
 from scripts import grok_client
 
 if __name__ == '__main__':
+    load_dotenv(dotenv_path=project_root / '.env')
     use_case = AnalyzeOlapUseCase()
     try:
         uc = use_case.run('Genera un resumen de tendencias y problemas en mis ventas')
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+
+from interfaces.api import admision
+from interfaces.api.admision import AdmisionMiddleware, Compuerta, clasificar
+
+
+def test_clasificar_por_ruta_y_metodo():
+    assert clasificar("GET", "/productos/3") == "lectura"
+    assert clasificar("GET", "/productos/", "limit=50") == "lectura"
+    assert clasificar("GET", "/productos/", "ids=1,2") == "lectura"
+    assert clasificar("GET", "/ordenes/") == "listado"
+    assert clasificar("GET", "/ordenes/reportes/agregado", "limit=10") == "listado"
+    assert clasificar("POST", "/ordenes/") == "escritura"
+    assert clasificar("GET", "/export/ordenes") == "export"
+    assert clasificar("POST", "/ia/analizar") == "ia"
+    assert clasificar("GET", "/health/db") is None
+    assert clasificar("GET", "/metrics") is None
+
+
+def test_cola_llena_rechaza_y_la_plaza_pasa_al_primero_en_espera():
+    async def main():
+        puerta = Compuerta("ia", limite=1, cola=1, espera=1.0, retry_after=5)
+        assert await puerta.adquirir()
+        esperando = asyncio.ensure_future(puerta.adquirir())
+        await asyncio.sleep(0)
+        assert puerta.esperando == 1
+        assert await puerta.adquirir() is False  # cola llena
+        puerta.liberar()
+        assert await esperando is True
+        assert puerta.en_curso == 1
+        puerta.liberar()
+        return puerta.stats()
+
+    stats = asyncio.run(main())
+    assert stats["en_curso"] == 0
+    assert stats["rechazadas_cola"] == 1
+    assert stats["admitidas"] == 2
+
+
+def test_espera_maxima_agotada_rechaza():
+    async def main():
+        puerta = Compuerta("export", limite=1, cola=5, espera=0.01, retry_after=5)
+        await puerta.adquirir()
+        return await puerta.adquirir(), puerta.stats()
+
+    admitida, stats = asyncio.run(main())
+    assert admitida is False
+    assert stats["rechazadas_espera"] == 1
+    assert stats["esperando"] == 0
+
+
+def test_middleware_responde_503_con_retry_after(monkeypatch):
+    monkeypatch.setitem(admision._compuertas, "ia", Compuerta("ia", limite=1, cola=0, espera=0, retry_after=7))
+    liberar = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/ia/lenta":
+            await liberar.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def main():
+        transport = httpx.ASGITransport(app=AdmisionMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            lenta = asyncio.ensure_future(client.get("/ia/lenta"))
+            await asyncio.sleep(0.01)
+            rechazada = await client.get("/ia/otra")
+            # Las demás clases no se ven afectadas
+            lectura = await client.get("/productos/1")
+            liberar.set()
+            return await lenta, rechazada, lectura
+
+    lenta, rechazada, lectura = asyncio.run(main())
+    assert lenta.status_code == 200
+    assert rechazada.status_code == 503
+    assert rechazada.headers["Retry-After"] == "7"
+    assert lectura.status_code == 200
+    assert admision.estadisticas()["ia"]["en_curso"] == 0
+
+
+def test_limites_de_base_de_datos_caben_en_el_pool(monkeypatch):
+    monkeypatch.delenv("DB_EXECUTOR_WORKERS", raising=False)
+    monkeypatch.setenv("DB_POOL_MAX", "10")
+    limites = admision.limites_por_defecto()
+    assert limites == {"lectura": 5, "listado": 2, "escritura": 2, "export": 1, "ia": 2}
+    for total in (4, 7, 20, 50):
+        limites = admision.limites_por_defecto(total)
+        assert sum(v for c, v in limites.items() if c != "ia") <= total
+    monkeypatch.setenv("DB_EXECUTOR_WORKERS", "6")
+    assert admision.presupuesto_db() == 6
+    monkeypatch.setenv("ADMISSION_LECTURA_LIMIT", "9")
+    assert Compuerta.desde_entorno("lectura").limite == 9
+
+
+def test_listado_sin_limit_no_ocupa_plazas_de_lectura(monkeypatch):
+    monkeypatch.setitem(admision._compuertas, "listado", Compuerta("listado", limite=1, cola=0, espera=0, retry_after=2))
+    monkeypatch.setitem(admision._compuertas, "lectura", Compuerta("lectura", limite=1, cola=0, espera=0, retry_after=1))
+    liberar = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] == "/ordenes/":
+            await liberar.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def main():
+        transport = httpx.ASGITransport(app=AdmisionMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            grande = asyncio.ensure_future(client.get("/ordenes/"))
+            await asyncio.sleep(0.01)
+            otro_listado = await client.get("/productos/")
+            por_id = await client.get("/ordenes/1")
+            liberar.set()
+            return await grande, otro_listado, por_id
+
+    grande, otro_listado, por_id = asyncio.run(main())
+    assert grande.status_code == 200
+    assert otro_listado.status_code == 503
+    assert por_id.status_code == 200
@@ -0,0 +1,59 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from scripts.perfil_importacion import parsear_importtime
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_importar_la_api_no_carga_el_stack_ia_ni_configura_logging():
+    codigo = (
+        "import logging, sys\n"
+        "import interfaces.api.main\n"
+        "pesados = [m for m in ('pandas', 'numpy', 'requests') if m in sys.modules]\n"
+        "print(pesados, len(logging.getLogger().handlers))\n"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    assert salida == "[] 0"
+
+
+def test_ia_controller_importa_el_caso_de_uso_en_el_primer_uso():
+    from interfaces.api.controllers import ia_controller
+
+    assert ia_controller._analyze_use_case().__name__ == "AnalyzeOlapUseCase"
+
+
+def test_startup_no_espera_al_precalentado(monkeypatch):
+    from interfaces.api import main
+
+    liberar = threading.Event()
+
+    def precalentar_lento():
+        liberar.wait(2)
+        return 0
+
+    monkeypatch.setattr(main, "precalentar_pool", precalentar_lento)
+    monkeypatch.setattr(main, "iniciar_invalidacion", lambda: None)
+
+    inicio = time.perf_counter()
+    main.startup_event()
+    assert time.perf_counter() - inicio < 0.5
+    liberar.set()
+
+
+def test_parsear_importtime():
+    texto = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   encodings.utf_8\n"
+        "import time:      3000 |       5000 | fastapi\n"
+    )
+    importaciones = parsear_importtime(texto)
+    assert [(i.modulo, i.propio_us, i.acumulado_us, i.nivel) for i in importaciones] == [
+        ("encodings.utf_8", 120, 120, 1),
+        ("fastapi", 3000, 5000, 0),
+    ]
@@ -0,0 +1,123 @@
+import psycopg2.extras
+from fastapi.testclient import TestClient
+
+from domain.entities.orden import Orden
+from domain.entities.resultado_lote import ResultadoLote
+from infrastructure.repositories import postgres_orden_repository
+from infrastructure.repositories.postgres_orden_repository import PostgresOrdenRepository
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.queries.append((query, params))
+
+    def fetchall(self):
+        return [{"id": i} for i in self.conn.clientes]
+
+
+class FakeConnection:
+    def __init__(self, clientes):
+        self.clientes = clientes
+        self.queries = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+
+def _patch_db(monkeypatch, clientes):
+    conn = FakeConnection(clientes)
+    inserts = []
+
+    def fake_execute_values(cursor, query, valores, page_size=None, fetch=False):
+        inserts.append(valores)
+        # Filas de RETURNING en el orden de las columnas del mapeo (id_orden primero)
+        return [(100 + n,) + tuple(v) for n, v in enumerate(valores)]
+
+    monkeypatch.setattr(postgres_orden_repository, "get_db_connection", lambda: conn)
+    monkeypatch.setattr(psycopg2.extras, "execute_values", fake_execute_values)
+    return conn, inserts
+
+
+def test_crear_many_partial_inserts_valid_rows_in_one_statement(monkeypatch):
+    conn, inserts = _patch_db(monkeypatch, clientes=[1])
+    ordenes = [Orden(id_cliente=1), Orden(id_cliente=99), Orden(id_cliente=1)]
+
+    resultado = PostgresOrdenRepository().crear_many(ordenes, partial=True)
+
+    assert [o.id_orden if o else None for o in resultado.creados] == [100, None, 101]
+    assert list(resultado.errores) == [1]
+    assert len(inserts) == 1 and len(inserts[0]) == 2
+    assert conn.commits == 1
+
+
+def test_crear_many_without_partial_inserts_nothing_on_error(monkeypatch):
+    conn, inserts = _patch_db(monkeypatch, clientes=[1])
+
+    resultado = PostgresOrdenRepository().crear_many([Orden(id_cliente=1), Orden(id_cliente=99)])
+
+    assert resultado.creados == [None, None]
+    assert 1 in resultado.errores
+    assert inserts == []
+    assert conn.commits == 0
+
+
+def _orden_payload(**overrides):
+    payload = {
+        "id_cliente": 1, "direccion_envio": "Calle 1", "total_orden": 10.0, "ciudad_envio": "X",
+        "codigo_postal_envio": "1000", "pais_envio": "HN", "metodo_envio": "dhl",
+        "costo_envio": 1.0, "estado_envio": "pendiente",
+    }
+    payload.update(overrides)
+    return payload
+
+
+def _client(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import orden_controller
+
+    calls = []
+
+    def fake_crear_many(ordenes, partial=False):
+        calls.append((ordenes, partial))
+        return ResultadoLote(creados=[Orden(id_orden=10 + n) for n in range(len(ordenes))])
+
+    monkeypatch.setattr(orden_controller.orden_repository, "crear_many", fake_crear_many)
+    return TestClient(app), calls
+
+
+def test_bulk_endpoint_reports_invalid_rows_by_input_index(monkeypatch):
+    client, calls = _client(monkeypatch)
+    filas = [_orden_payload(), {"id_cliente": "x"}, _orden_payload()]
+
+    response = client.post("/ordenes/bulk", params={"partial": "true"}, json=filas)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["ids"] == [10, None, 11]
+    assert body["creados"] == 2
+    assert [e["indice"] for e in body["errores"]] == [1]
+    assert len(calls[0][0]) == 2
+
+
+def test_bulk_endpoint_without_partial_rejects_whole_batch(monkeypatch):
+    client, calls = _client(monkeypatch)
+
+    response = client.post("/ordenes/bulk", json=[_orden_payload(), {"id_cliente": "x"}])
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["errores"][0]["indice"] == 1
+    assert calls == []
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from domain.entities.producto import Producto
+from infrastructure.cache.cached_repositories import CachedProductoRepository
+from infrastructure.cache.catalogo import CANALES, procesar_notificacion
+from infrastructure.cache.ttl_cache import TTLCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_entries=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_concurrent_misses_load_once():
+    cache = TTLCache(max_entries=10, ttl=60)
+    llamadas = []
+
+    def loader():
+        llamadas.append(1)
+        time.sleep(0.1)
+        return "valor"
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.get_or_load("k", loader))) for _ in range(5)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert resultados == ["valor"] * 5
+    assert len(llamadas) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_invalidation_during_load_discards_stale_value():
+    cache = TTLCache(max_entries=10, ttl=60)
+
+    def loader():
+        cache.invalidate("k")
+        return "viejo"
+
+    assert cache.get_or_load("k", loader) == "viejo"
+    assert cache.get("k") is None
+
+
+class FakeProductoRepository:
+    def __init__(self):
+        self.lecturas = 0
+
+    def obtener_por_id(self, id_producto):
+        self.lecturas += 1
+        return Producto(id_producto=id_producto, nombre_producto=f"v{self.lecturas}")
+
+    def actualizar(self, id_producto, producto):
+        return producto
+
+
+def test_cached_repository_reads_through_and_invalidates_on_write():
+    inner = FakeProductoRepository()
+    repo = CachedProductoRepository(inner, TTLCache(max_entries=10, ttl=60))
+
+    assert repo.obtener_por_id(1).nombre_producto == "v1"
+    assert repo.obtener_por_id(1).nombre_producto == "v1"
+    repo.actualizar(1, Producto(id_producto=1))
+    assert repo.obtener_por_id(1).nombre_producto == "v2"
+    assert inner.lecturas == 2
+
+
+def test_notification_invalidates_entity_and_lists():
+    cache = CANALES["productos_sync"]
+    cache.set(("id", 5), "p5")
+    cache.set(("id", 6), "p6")
+    cache.set(("lista", None, None, None), ["p5", "p6"])
+
+    procesar_notificacion("productos_sync", "UPDATE:5")
+
+    assert cache.get(("id", 5)) is None
+    assert cache.get(("lista", None, None, None)) is None
+    assert cache.get(("id", 6)) == "p6"
+    cache.clear()
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+
+import pytest
+from psycopg2 import errors
+
+from infrastructure.sync import calendario
+from infrastructure.sync.calendario import MapaCalendario, poblar_calendario, rango_calendario
+
+
+class _Cursor:
+    def __init__(self, columnas=(), fechas=None, falla_insert=None):
+        self.sql = []
+        self.columnas = list(columnas)
+        self.fechas = dict(fechas or {})
+        self.falla_insert = falla_insert
+        self.rowcount = 0
+        self._filas = []
+
+    def execute(self, sql, params=None):
+        self.sql.append(sql.strip())
+        self.rowcount = 0
+        if "information_schema" in sql:
+            self._filas = [{"column_name": c} for c in self.columnas]
+        elif sql.startswith("SELECT fecha, id_tiempo"):
+            self._filas = [{"fecha": f, "id_tiempo": i} for f, i in self.fechas.items()]
+        elif "INSERT INTO dim_tiempo" in sql:
+            if self.falla_insert:
+                self.fechas[params[0]] = 99
+                raise self.falla_insert
+            self.fechas.setdefault(params[0], 50)
+            self.rowcount = 1
+        elif "WHERE fecha = CAST" in sql:
+            self._filas = [{"id_tiempo": self.fechas[params[0]]}] if params[0] in self.fechas else []
+
+    def fetchall(self):
+        return self._filas
+
+    def fetchone(self):
+        return self._filas[0] if self._filas else None
+
+
+def test_rango_por_entorno(monkeypatch):
+    monkeypatch.setenv("SYNC_CALENDARIO_DESDE", "2022-03-01")
+    monkeypatch.setenv("SYNC_CALENDARIO_ANIOS_FUTUROS", "1")
+    assert rango_calendario(date(2026, 5, 1)) == (date(2022, 3, 1), date(2027, 12, 31))
+
+
+def test_poblar_agrega_columnas_faltantes_y_usa_un_insert():
+    cur = _Cursor(columnas=["dia_semana", "semana_iso"])
+    poblar_calendario(cur, date(2024, 1, 1), date(2024, 12, 31))
+    alter = [s for s in cur.sql if s.startswith("ALTER TABLE")]
+    assert alter == ["ALTER TABLE dim_tiempo ADD COLUMN IF NOT EXISTS es_fin_de_semana BOOLEAN, "
+                     "ADD COLUMN IF NOT EXISTS es_fin_de_mes BOOLEAN;"]
+    inserts = [s for s in cur.sql if "INSERT INTO dim_tiempo" in s]
+    assert len(inserts) == 1 and "generate_series" in inserts[0]
+
+
+def test_mapa_resuelve_en_memoria_sin_consultar_por_fila():
+    columnas = [c for c, _ in calendario.COLUMNAS_CALENDARIO]
+    cur = _Cursor(columnas=columnas, fechas={date(2024, 1, 1): 1, date(2024, 1, 2): 2})
+    mapa = MapaCalendario.cargar(cur)
+    consultas = len(cur.sql)
+    for _ in range(100):
+        assert mapa.id_tiempo(cur, datetime(2024, 1, 2, 10, 30)) == 2
+    assert len(cur.sql) == consultas
+    assert mapa.aciertos == 100
+
+
+def test_fecha_fuera_del_calendario_se_inserta_bajo_savepoint():
+    cur = _Cursor()
+    mapa = MapaCalendario({})
+    assert mapa.id_tiempo(cur, date(2030, 6, 1)) == 50
+    assert cur.sql[0] == "SAVEPOINT calendario_fecha;"
+    assert "RELEASE SAVEPOINT calendario_fecha;" in cur.sql
+    assert mapa.insertadas == 1
+    assert mapa.id_tiempo(cur, date(2030, 6, 1)) == 50 and mapa.aciertos == 1
+
+
+def test_carrera_solo_revierte_el_savepoint():
+    cur = _Cursor(falla_insert=errors.UniqueViolation())
+    mapa = MapaCalendario({})
+    assert mapa.id_tiempo(cur, date(2030, 6, 1)) == 99
+    assert "ROLLBACK TO SAVEPOINT calendario_fecha;" in cur.sql
+    assert not any(s == "ROLLBACK;" for s in cur.sql)
+
+
+def test_otros_errores_se_propagan():
+    cur = _Cursor(falla_insert=RuntimeError("caída"))
+    with pytest.raises(RuntimeError):
+        MapaCalendario({}).id_tiempo(cur, date(2030, 6, 1))
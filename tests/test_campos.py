@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from domain.entities.pagina import Pagina
+from domain.entities.producto import Producto
+from infrastructure.repositories import postgres_producto_repository
+from infrastructure.repositories.mappers import ORDEN, PRODUCTO
+from interfaces.api.campos import parsear_campos
+from interfaces.api.dtos.producto_dto import ProductoResponseDTO
+
+
+def test_proyeccion_incluye_siempre_la_clave():
+    mapeo = PRODUCTO.proyeccion(["precio", "nombre_producto"])
+
+    assert mapeo.select == "id_producto, nombre_producto, precio"
+    assert mapeo.uno((1, "Mouse", 10.0)) == Producto(id_producto=1, nombre_producto="Mouse", precio=10.0)
+    assert PRODUCTO.proyeccion(["precio", "nombre_producto"]) is mapeo
+    assert PRODUCTO.proyeccion(None) is PRODUCTO
+
+
+def test_proyeccion_conserva_el_ajuste_de_la_entidad():
+    assert ORDEN.proyeccion(["estado_orden"]).uno((1, 3)).estado_orden == "cancelada"
+
+
+def test_parsear_campos_valida_contra_el_dto():
+    assert parsear_campos("precio, id_producto", ProductoResponseDTO) == ("id_producto", "precio")
+    assert parsear_campos(None, ProductoResponseDTO) is None
+    with pytest.raises(HTTPException) as e:
+        parsear_campos("precio,eliminado", ProductoResponseDTO)
+    assert e.value.status_code == 400
+
+
+class _Cursor:
+    def __init__(self, consultas):
+        self.consultas = consultas
+
+    def execute(self, query, params=None):
+        self.consultas.append(query)
+
+    def fetchall(self):
+        return [(1, "Mouse", 10.0, "m.png")]
+
+
+class _Conexion:
+    def __init__(self):
+        self.consultas = []
+
+    def cursor(self, *args, **kwargs):
+        return _Cursor(self.consultas)
+
+    def close(self):
+        pass
+
+
+def test_repositorio_empuja_los_campos_al_select(monkeypatch):
+    conn = _Conexion()
+    monkeypatch.setattr(postgres_producto_repository, "get_db_connection", lambda: conn)
+
+    pagina = postgres_producto_repository.PostgresProductoRepository().listar_pagina(
+        campos=("id_producto", "nombre_producto", "precio", "imagen_url")
+    )
+
+    assert conn.consultas[0].startswith("SELECT id_producto, nombre_producto, precio, imagen_url FROM productos")
+    assert pagina.items[0].imagen_url == "m.png"
+
+
+def test_endpoint_recorta_la_respuesta(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import producto_controller
+
+    pedidos = []
+
+    def listar_pagina(**kwargs):
+        pedidos.append(kwargs["campos"])
+        return Pagina(items=[Producto(id_producto=1, nombre_producto="Mouse", precio=10.0, descripcion="larga")])
+
+    monkeypatch.setattr(producto_controller.producto_repository, "listar_pagina", listar_pagina)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get("/productos/?fields=precio,nombre_producto"),
+                    await client.get("/productos/?fields=secreto"))
+
+    parcial, invalida = asyncio.run(main())
+
+    assert parcial.json() == [{"nombre_producto": "Mouse", "precio": 10.0}]
+    assert pedidos == [("nombre_producto", "precio")]
+    assert invalida.status_code == 400
@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+
+from infrastructure.sync import carga_masiva
+from infrastructure.sync.carga_masiva import DIM_CLIENTE, ReporteCarga, serializar_copy
+
+
+def test_serializar_copy_escapa_y_marca_nulos():
+    payload = serializar_copy([(1, None, "a\tb\\c\nd", date(2024, 1, 2), Decimal("1.50"), True)])
+    assert payload == b"1\t\\N\ta\\tb\\\\c\\nd\t2024-01-02\t1.50\tt\n"
+
+
+def test_merge_de_dimension_deduplica_por_clave():
+    sql = DIM_CLIENTE.sql_merge()
+    assert "SELECT DISTINCT ON (id_cliente)" in sql
+    # Varias filas por cliente (una por orden): gana la última leída, no una cualquiera
+    assert "ORDER BY id_cliente, n DESC" in sql
+    assert "ORDER BY c.id_cliente, o.id_orden" in DIM_CLIENTE.consulta_oltp
+    assert "ON CONFLICT (id_cliente) DO UPDATE SET nombre=EXCLUDED.nombre" in sql
+    assert "id_cliente=EXCLUDED" not in sql
+
+
+class _CursorOltp:
+    def __init__(self, filas):
+        self.filas = list(filas)
+        self.itersize = None
+        self.cerrado = False
+
+    def execute(self, query, params=None):
+        self.query = query
+
+    def fetchmany(self, n):
+        lote, self.filas = self.filas[:n], self.filas[n:]
+        return lote
+
+    def close(self):
+        self.cerrado = True
+
+
+class _ConexionOltp:
+    def __init__(self, filas_por_nombre):
+        self.filas_por_nombre = filas_por_nombre
+        self.cursores = []
+        self.autocommit = True
+        self.sql = []
+        self.cierres = 0
+
+    def cursor(self, name=None, cursor_factory=None):
+        if name is None:
+            conexion = self
+
+            class _Plano:
+                def execute(self, sql, params=None):
+                    assert conexion.autocommit is False
+                    conexion.sql.append(sql)
+            return _Plano()
+        # Un cursor de servidor sin WITH HOLD exige una transacción abierta
+        assert self.autocommit is False
+        cur = _CursorOltp(self.filas_por_nombre.get(name.replace("sync_", ""), []))
+        self.cursores.append(cur)
+        return cur
+
+    def rollback(self):
+        self.cierres += 1
+
+
+class _CursorOlap:
+    def __init__(self):
+        self.sql = []
+        self.copias = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.sql.append(sql)
+        self.rowcount = 3
+
+    def copy_expert(self, sql, archivo):
+        self.copias.append((sql, archivo.read()))
+
+
+def test_hechos_se_copian_por_lotes_y_se_mezclan_una_vez():
+    fila = (date(2024, 1, 1), 1, 2, 3, "tarjeta", "enviado", "dhl", 2, Decimal("20"), Decimal("5"), Decimal("8"))
+    oltp = _ConexionOltp({"hecho_ventas": [fila] * 5})
+    olap = _CursorOlap()
+    reporte = ReporteCarga()
+
+    carga_masiva.cargar_hechos(oltp, olap, reporte, tamano=2)
+
+    assert len(olap.copias) == 3
+    assert olap.copias[0][0].startswith("COPY stg_ventas (n, fecha,")
+    # La numeración sigue entre lotes para que gane la última fila leída
+    assert olap.copias[2][1].startswith(b"4\t2024-01-01")
+    assert sum("INSERT INTO hecho_ventas" in s for s in olap.sql) == 1
+    assert all(c.cerrado for c in oltp.cursores)
+    # Extracción en una transacción de solo lectura, cerrada al terminar
+    assert oltp.sql == ["SET TRANSACTION READ ONLY;"]
+    assert oltp.cierres == 1 and oltp.autocommit is True
+    etapas = {e.etapa: e for e in reporte.etapas}
+    assert etapas["hecho_ventas:copy"].filas == 5
+    assert etapas["hecho_ventas:copy"].bytes == sum(len(p) for _, p in olap.copias)
+    assert etapas["hecho_ventas:merge"].filas == 3
+    assert "hecho_ventas:copy" in reporte.resumen()
+
+
+def test_dimensiones_numeran_las_filas_del_staging():
+    filas = [(1, "Ana", None, None, None, None, None, "Quito", "EC"),
+             (1, "Ana", None, None, None, None, None, "Lima", "PE")]
+    oltp = _ConexionOltp({"dim_cliente": filas})
+    olap = _CursorOlap()
+
+    carga_masiva.cargar_dimensiones(oltp, olap, ReporteCarga(), tamano=1, dimensiones=(DIM_CLIENTE,))
+
+    assert "SELECT 0::bigint AS n, id_cliente" in olap.sql[0]
+    assert [sql.split(" FROM")[0] for sql, _ in olap.copias] == ["COPY stg_dim_cliente (n, id_cliente, nombre, "
+                                                                  "apellido, edad, email, telefono, direccion, "
+                                                                  "ciudad, pais)"] * 2
+    assert olap.copias[1][1].startswith(b"1\t1\tAna") and olap.copias[1][1].endswith(b"Lima\tPE\n")
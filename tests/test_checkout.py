@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from application.use_cases.checkout_cases import realizar_checkout
+from application.use_cases.checkout_cases.realizar_checkout import RealizarCheckoutUseCase
+from domain.entities.checkout import LineaCheckout
+from domain.entities.orden import Orden
+from domain.entities.orden_producto import OrdenProducto
+from domain.entities.venta import Venta
+from domain.exceptions import StockInsuficienteError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeProductoRepository:
+    def __init__(self, precios, stock):
+        self.precios = precios
+        self.stock = stock
+        self.llamadas = []
+
+    def reservar_stock(self, cantidades, conn):
+        self.llamadas.append(cantidades)
+        faltantes = {i: {"solicitado": c, "disponible": None} for i, c in cantidades.items() if self.stock.get(i, 0) < c}
+        if faltantes:
+            raise StockInsuficienteError(faltantes)
+        return {i: self.precios[i] for i in cantidades}
+
+
+class FakeOrdenRepository:
+    def crear(self, orden, conn=None):
+        assert conn is not None
+        orden.id_orden = 50
+        return orden
+
+
+class FakeOrdenProductoRepository:
+    def insertar_lote(self, items, conn):
+        for n, item in enumerate(items):
+            item.id_ordenProd = 900 + n
+        return items
+
+
+class FakeVentaRepository:
+    def crear(self, venta, conn=None):
+        assert conn is not None
+        venta.id_venta = 7
+        return venta
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    conn = FakeConnection()
+    monkeypatch.setattr(realizar_checkout, "get_db_connection", lambda: conn)
+    return conn
+
+
+def _use_case(producto_repository):
+    return RealizarCheckoutUseCase(
+        FakeOrdenRepository(), FakeOrdenProductoRepository(), producto_repository, FakeVentaRepository()
+    )
+
+
+def test_checkout_creates_aggregate_in_one_transaction(conn):
+    productos = FakeProductoRepository(precios={1: 10.0, 2: 5.0}, stock={1: 10, 2: 10})
+    orden = Orden(id_cliente=3, fecha_orden=None, costo_envio=2.0)
+    lineas = [LineaCheckout(1, 2), LineaCheckout(2, 1, precio_unitario=4.0), LineaCheckout(1, 1)]
+
+    checkout = _use_case(productos).execute(orden, lineas, "tarjeta")
+
+    assert productos.llamadas == [{1: 3, 2: 1}]
+    assert [l.id_orden for l in checkout.lineas] == [50, 50, 50]
+    assert [l.precio_unitario for l in checkout.lineas] == [10.0, 4.0, 10.0]
+    assert checkout.orden.total_orden == 36.0
+    assert checkout.venta.total_venta == 36.0 and checkout.venta.id_orden == 50
+    assert conn.commits == 1 and conn.rollbacks == 0 and conn.closed
+
+
+def test_checkout_rolls_back_when_stock_is_short(conn):
+    productos = FakeProductoRepository(precios={1: 10.0}, stock={1: 1})
+
+    with pytest.raises(StockInsuficienteError) as exc:
+        _use_case(productos).execute(Orden(id_cliente=3), [LineaCheckout(1, 2)], "efectivo")
+
+    assert exc.value.faltantes == {1: {"solicitado": 2, "disponible": None}}
+    assert conn.commits == 0 and conn.rollbacks == 1
+
+
+def test_checkout_endpoint_maps_short_stock_to_409(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import checkout_controller
+
+    def fake_execute(self, orden, lineas, metodo_pago):
+        raise StockInsuficienteError({4: {"solicitado": 3, "disponible": 1}})
+
+    monkeypatch.setattr(RealizarCheckoutUseCase, "execute", fake_execute)
+    payload = {
+        "id_cliente": 1, "direccion_envio": "Calle 1", "ciudad_envio": "X", "codigo_postal_envio": "1000",
+        "pais_envio": "HN", "metodo_envio": "dhl", "metodo_pago": "tarjeta",
+        "lineas": [{"id_producto": 4, "cantidad": 3}],
+    }
+
+    response = TestClient(app).post("/checkout/", json=payload)
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["faltantes"] == [{"id_producto": 4, "solicitado": 3, "disponible": 1}]
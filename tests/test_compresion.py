@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from interfaces.api import compresion
+from interfaces.api.compresion import CompresionMiddleware, negociar
+
+app = FastAPI()
+app.add_middleware(CompresionMiddleware, minimo=500, nivel_gzip=6)
+
+FILAS = [{"id": i, "estado": "pendiente", "ciudad": "Tegucigalpa"} for i in range(200)]
+
+
+@app.get("/grande")
+async def grande():
+    return FILAS
+
+
+@app.get("/chica")
+async def chica():
+    return {"ok": True}
+
+
+@app.get("/stream")
+async def stream():
+    def lineas():
+        for fila in FILAS:
+            yield (json.dumps(fila) + "\n").encode()
+    return StreamingResponse(lineas(), media_type="application/x-ndjson")
+
+
+def _get(url, accept="gzip"):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(url, headers={"Accept-Encoding": accept})
+    return asyncio.run(main())
+
+
+def test_comprime_respuestas_grandes():
+    antes = compresion.estadisticas()["comprimidas"]
+    r = _get("/grande")
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["server-timing"].startswith("comp;dur=")
+    assert int(r.headers["content-length"]) < len(json.dumps(FILAS))
+    assert r.json() == FILAS  # httpx descomprime
+    assert compresion.estadisticas()["comprimidas"] == antes + 1
+
+
+def test_no_comprime_bajo_el_minimo_ni_sin_accept_encoding():
+    chica = _get("/chica")
+    assert "content-encoding" not in chica.headers
+    assert chica.json() == {"ok": True}
+
+    identidad = _get("/grande", accept="identity")
+    assert "content-encoding" not in identidad.headers
+
+
+def test_streaming_se_comprime_por_bloques():
+    r = _get("/stream")
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    lineas = r.text.strip().split("\n")
+    assert [json.loads(l) for l in lineas] == FILAS
+
+
+def test_negociacion_respeta_q():
+    assert negociar("gzip;q=0, deflate") is None
+    assert negociar("*") in ("br", "gzip")
+    assert negociar("gzip, br;q=0") == "gzip"
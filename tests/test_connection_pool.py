@@ -0,0 +1,126 @@
+import threading
+
+import pytest
+from psycopg2 import extensions
+
+from infrastructure.database.connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise Exception("server closed the connection unexpectedly")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def _make_pool(**kwargs):
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), created
+
+
+def test_close_returns_connection_to_pool():
+    pool, created = _make_pool(min_size=0, max_size=2)
+
+    conn = pool.getconn()
+    conn.close()
+    again = pool.getconn()
+
+    assert len(created) == 1
+    assert again.raw is created[0]
+    assert pool.stats()["in_use"] == 1
+
+
+def test_aborted_transaction_is_reset_on_release():
+    pool, created = _make_pool(min_size=0, max_size=1)
+
+    conn = pool.getconn()
+    conn.raw.status = extensions.TRANSACTION_STATUS_INERROR
+    conn.close()
+
+    assert created[0].rollbacks == 1
+    assert pool.stats()["resets"] == 1
+    assert pool.getconn().raw is created[0]
+
+
+def test_acquire_timeout_when_exhausted():
+    pool, _ = _make_pool(min_size=0, max_size=1, acquire_timeout=0.05)
+
+    held = pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    held.close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, created = _make_pool(min_size=0, max_size=1, acquire_timeout=2)
+    held = pool.getconn()
+    result = {}
+
+    def waiter():
+        result["conn"] = pool.getconn()
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    threading.Timer(0.05, held.close).start()
+    t.join(2)
+
+    assert result["conn"].raw is created[0]
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["wait_time_max"] > 0
+
+
+def test_failed_health_check_replaces_connection():
+    pool, created = _make_pool(min_size=0, max_size=1, health_check_after=0)
+
+    conn = pool.getconn()
+    conn.close()
+    created[0].broken = True
+
+    fresh = pool.getconn()
+    assert fresh.raw is created[1]
+    assert created[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_prewarm_opens_min_size():
+    pool, created = _make_pool(min_size=3, max_size=5)
+    assert pool.prewarm() == 3
+    assert len(created) == 3
+    assert pool.stats()["idle"] == 3
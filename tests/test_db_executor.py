@@ -0,0 +1,49 @@
+import asyncio
+import contextvars
+import time
+
+import httpx
+
+from domain.entities.pagina import Pagina
+from infrastructure.database.db_executor import run_in_db_executor
+
+
+def test_blocking_calls_overlap():
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(run_in_db_executor(time.sleep, 0.2) for _ in range(4)))
+        return time.perf_counter() - started
+
+    assert asyncio.run(main()) < 0.6
+
+
+def test_contextvars_are_propagated():
+    request_id = contextvars.ContextVar("request_id", default=None)
+
+    async def main():
+        request_id.set("abc")
+        return await run_in_db_executor(request_id.get)
+
+    assert asyncio.run(main()) == "abc"
+
+
+def test_slow_list_does_not_block_other_requests(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import producto_controller
+
+    def slow_listar_pagina(**kwargs):
+        time.sleep(0.3)
+        return Pagina(items=[])
+
+    monkeypatch.setattr(producto_controller.producto_repository, "listar_pagina", slow_listar_pagina)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.get("/productos/") for _ in range(3)))
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = asyncio.run(main())
+    assert all(r.status_code == 200 for r in responses)
+    assert elapsed < 0.8
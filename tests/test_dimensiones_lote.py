@@ -0,0 +1,68 @@
+from infrastructure.sync import dimensiones_lote
+from infrastructure.sync.dimensiones_lote import ContextoSync, asegurar_dimensiones
+
+
+class _CursorOltp:
+    def __init__(self, tablas):
+        self.tablas = tablas
+        self.consultas = []
+
+    def execute(self, query, params=None):
+        tabla = query.split(" FROM ")[1].split()[0]
+        self.consultas.append((tabla, list(params[0])))
+        clave = query.split(" WHERE ")[1].split()[0]
+        self._filas = [f for f in self.tablas[tabla] if f[clave] in params[0]]
+
+    def fetchall(self):
+        return self._filas
+
+
+def _fila(id_cliente, id_producto, id_categoria):
+    return {"id_cliente": id_cliente, "id_producto": id_producto, "id_categoria": id_categoria}
+
+
+def test_dimensiones_se_leen_una_vez_por_lote_y_corrida(monkeypatch):
+    subidas = []
+    monkeypatch.setattr(dimensiones_lote.psycopg2.extras, "execute_values",
+                        lambda cur, sql, valores, page_size: subidas.append((sql.split()[2], valores)))
+    oltp = _CursorOltp({
+        "categoria": [{"id_categoria": 1, "nombre_categoria": "A", "descripcion": None}],
+        "clientes": [{"id_cliente": 7, "nombre": "Ana", "apellido": "P", "edad": 30, "email": "a@x",
+                      "telefono": None, "direccion": None}],
+        "productos": [{"id_producto": 10, "nombre_producto": "P10", "descripcion": None,
+                       "precio": 5, "costo": 3, "id_categoria": 1}],
+    })
+    contexto = ContextoSync()
+
+    asegurar_dimensiones(oltp, object(), [_fila(7, 10, 1)] * 500 + [_fila(7, 11, 1)], contexto)
+    asegurar_dimensiones(oltp, object(), [_fila(7, 10, 1)] * 100, contexto)
+
+    assert oltp.consultas == [("categoria", [1]), ("clientes", [7]), ("productos", [10, 11])]
+    assert [tabla for tabla, _ in subidas] == ["dim_categoria", "dim_cliente", "dim_producto"]
+    # Producto 11 no existe en la OLTP: placeholder con la categoría de la fila
+    assert subidas[2][1][1] == (11, None, None, None, None, 1)
+    assert subidas[1][1][0][-2:] == (None, None)
+    assert contexto.filas == 601
+    assert contexto.consultas_oltp == 3 and contexto.upserts_olap == 3
+    assert contexto.consultas_evitadas == 3 * 601 - 3
+
+
+def test_claves_marcadas_no_se_vuelven_a_subir(monkeypatch):
+    monkeypatch.setattr(dimensiones_lote.psycopg2.extras, "execute_values",
+                        lambda *a, **k: (_ for _ in ()).throw(AssertionError("no debía subir")))
+    contexto = ContextoSync()
+    contexto.marcar("categoria", [1])
+    contexto.marcar("cliente", [7])
+    contexto.marcar("producto", [10])
+    asegurar_dimensiones(_CursorOltp({}), object(), [_fila(7, 10, 1)], contexto)
+    assert contexto.consultas_oltp == 0
+
+
+def test_id_memorizado_hace_un_upsert_por_valor():
+    contexto = ContextoSync()
+    llamadas = []
+    for _ in range(3):
+        assert contexto.id_memorizado(contexto.ids_metodo_pago, "tarjeta",
+                                      lambda: llamadas.append(1) or 4) == 4
+    assert len(llamadas) == 1
+    assert contexto.upserts_olap == 1 and contexto.upserts_evitados == 2
@@ -0,0 +1,92 @@
+import asyncio
+
+import httpx
+import pytest
+
+from domain.entities.pagina import Pagina
+from domain.entities.producto import Producto
+from infrastructure.cache import versiones as versiones_mod
+from infrastructure.cache.catalogo import procesar_notificacion
+from interfaces.api import condicional
+
+
+@pytest.fixture
+def versiones(monkeypatch):
+    nuevas = versiones_mod.VersionesTablas()
+    nuevas.marcar_confiable(True)
+    monkeypatch.setattr(versiones_mod, "versiones", nuevas)
+    monkeypatch.setattr(condicional, "versiones", nuevas)
+    monkeypatch.setattr("infrastructure.cache.catalogo.versiones", nuevas)
+    return nuevas
+
+
+@pytest.fixture
+def consultas(monkeypatch):
+    from interfaces.api.controllers import producto_controller
+
+    llamadas = []
+
+    def listar_pagina(**kwargs):
+        llamadas.append(kwargs)
+        return Pagina(items=[Producto(id_producto=1, nombre_producto="Mouse", precio=10.0, stock=3)])
+
+    monkeypatch.setattr(producto_controller.producto_repository, "listar_pagina", listar_pagina)
+    return llamadas
+
+
+def _get(*peticiones):
+    from interfaces.api.main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get(url, headers=headers) for url, headers in peticiones]
+
+    return asyncio.run(main())
+
+
+def test_if_none_match_responde_304_sin_consultar(versiones, consultas):
+    (primera,) = _get(("/productos/", {}))
+    etag = primera.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert primera.headers["Cache-Control"] == "no-cache"
+
+    (segunda,) = _get(("/productos/", {"If-None-Match": etag}))
+
+    assert segunda.status_code == 304
+    assert segunda.content == b""
+    assert segunda.headers["ETag"] == etag
+    assert len(consultas) == 1
+
+
+def test_escritura_o_notificacion_cambian_el_etag(versiones, consultas):
+    (primera,) = _get(("/productos/", {}))
+    etag = primera.headers["ETag"]
+
+    versiones_mod.registrar_escritura("productos")
+    (tras_escritura,) = _get(("/productos/", {"If-None-Match": etag}))
+    assert tras_escritura.status_code == 200
+    assert tras_escritura.headers["ETag"] != etag
+
+    etag = tras_escritura.headers["ETag"]
+    procesar_notificacion("productos_sync", "UPDATE:1")
+    (tras_notify,) = _get(("/productos/", {"If-None-Match": etag}))
+    assert tras_notify.status_code == 200
+
+    # Otra tabla no afecta el ETag de productos
+    etag = tras_notify.headers["ETag"]
+    procesar_notificacion("ventas_sync", "INSERT:9")
+    (sin_cambios,) = _get(("/productos/", {"If-None-Match": etag}))
+    assert sin_cambios.status_code == 304
+
+
+def test_etag_distinto_por_query(versiones, consultas):
+    a, b = _get(("/productos/", {}), ("/productos/?id_categoria=2", {}))
+    assert a.headers["ETag"] != b.headers["ETag"]
+
+
+def test_sin_listener_conectado_no_hay_etag(versiones, consultas):
+    versiones.marcar_confiable(False)
+    (respuesta,) = _get(("/productos/", {"If-None-Match": "*"}))
+    assert respuesta.status_code == 200
+    assert "ETag" not in respuesta.headers
@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from infrastructure.repositories import postgres_export_repository
+from infrastructure.repositories.postgres_export_repository import PostgresExportRepository
+
+
+class FakeNamedCursor:
+    def __init__(self, rows, name):
+        self.rows = rows
+        self.name = name
+        self.itersize = None
+        self.query = None
+        self.closed = False
+
+    def execute(self, query, params=None):
+        self.query = query
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.closed = False
+
+    def cursor(self, name=None, cursor_factory=None):
+        cursor = FakeNamedCursor(self.rows, name)
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_repository_uses_named_cursor_and_releases_connection(monkeypatch):
+    conn = FakeConnection([(1, 10, datetime(2024, 5, 1), Decimal("9.50"), "tarjeta")])
+    monkeypatch.setattr(postgres_export_repository, "get_db_connection", lambda: conn)
+
+    filas = list(PostgresExportRepository().iterar_filas("ventas", itersize=500))
+
+    cursor = conn.cursors[0]
+    assert cursor.name.startswith("export_ventas_")
+    assert cursor.itersize == 500
+    assert "FROM ventas" in cursor.query and "ORDER BY id_venta" in cursor.query
+    assert len(filas) == 1
+    assert cursor.closed and conn.closed
+
+
+def _client_with_rows(monkeypatch, rows):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import export_controller
+
+    monkeypatch.setattr(
+        export_controller.export_repository, "iterar_filas", lambda entidad, itersize: iter(rows)
+    )
+    return TestClient(app)
+
+
+def test_export_ndjson_streams_one_object_per_line(monkeypatch):
+    rows = [(i, 10, datetime(2024, 5, 1), Decimal("9.50"), "tarjeta") for i in range(3)]
+    client = _client_with_rows(monkeypatch, rows)
+
+    response = client.get("/export/ventas")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lineas = [json.loads(l) for l in response.text.splitlines()]
+    assert [l["id_venta"] for l in lineas] == [0, 1, 2]
+    assert lineas[0]["fecha_venta"] == "2024-05-01T00:00:00"
+    assert lineas[0]["total_venta"] == 9.5
+
+
+def test_export_csv_includes_header(monkeypatch):
+    client = _client_with_rows(monkeypatch, [(1, 2, 3, 4, 5.0)])
+
+    response = client.get("/export/orden_producto", params={"formato": "csv"})
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "id_ordenProd,id_producto,cantidad,precio_unitario,id_orden",
+        "1,2,3,4,5.0",
+    ]
+
+
+def test_export_rejects_unknown_entity(monkeypatch):
+    client = _client_with_rows(monkeypatch, [])
+    assert client.get("/export/clientes").status_code == 422
@@ -117,3 +117,33 @@ def test_get_context_endpoint(monkeypatch):
     assert 'tables' in body
     assert 'hecho_ventas' in body['tables']
     assert body['tables']['hecho_ventas']['rows'] == 2
+
+
+def test_ia_no_bloquea_el_event_loop(monkeypatch):
+    import asyncio
+
+    def sin_loop():
+        # En el threadpool no hay event loop corriendo en el hilo
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return True
+        return False
+
+    fuera_del_loop = {}
+
+    class FakeUC:
+        def run(self, prompt: str):
+            fuera_del_loop['uc'] = sin_loop()
+            return { 'context_text': 'ctx', 'olap_data': {}, 'missing': [] }
+
+    def fake_analyze_prompt(prompt: str, context_text: str = None):
+        fuera_del_loop['grok'] = sin_loop()
+        return { 'ok': True }
+
+    monkeypatch.setattr('interfaces.api.controllers.ia_controller.AnalyzeOlapUseCase', lambda: FakeUC())
+    monkeypatch.setattr('scripts.grok_client.analyze_prompt', fake_analyze_prompt)
+
+    resp = TestClient(app).post('/ia/analizar', json={ 'prompt': 'x' })
+    assert resp.status_code == 200
+    assert fuera_del_loop == { 'uc': True, 'grok': True }
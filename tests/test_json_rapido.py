@@ -0,0 +1,50 @@
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from domain.entities.orden import Orden
+from domain.entities.pagina import Pagina
+from interfaces.api.dtos.orden_dto import OrdenResponseDTO
+from interfaces.api.json_rapido import dumps, serializar_lista
+
+
+def _orden(i):
+    return Orden(i, 7, datetime(2024, 5, 1, 8, 0), "pendiente", "Calle 1", 10.5, "Tegucigalpa",
+                 "11101", "HN", "dhl", 2.0, "pendiente")
+
+
+def test_rapido_produce_el_mismo_json_y_cabeceras(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import orden_controller
+
+    monkeypatch.setattr(
+        orden_controller.orden_repository,
+        "listar_pagina",
+        lambda **kwargs: Pagina(items=[_orden(1), _orden(2)], siguiente=2),
+    )
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/ordenes/?limit=2"), await client.get("/ordenes/?limit=2&rapido=true")
+
+    normal, rapida = asyncio.run(main())
+
+    assert rapida.status_code == 200
+    assert rapida.headers["content-type"] == "application/json"
+    assert rapida.json() == normal.json()
+    assert rapida.headers["X-Next-Cursor"] == normal.headers["X-Next-Cursor"]
+
+
+def test_serializar_lista_valida_contra_el_dto():
+    # id_orden es obligatorio en OrdenResponseDTO
+    with pytest.raises(ValidationError):
+        serializar_lista(OrdenResponseDTO, [_orden(None)])
+
+
+def test_dumps_admite_dataclasses_y_fechas():
+    assert json.loads(dumps([_orden(3)]))[0]["fecha_orden"] == "2024-05-01T08:00:00"
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+from domain.entities.orden import Orden
+from domain.entities.orden_producto import OrdenProducto
+from infrastructure.repositories.mappers import ORDEN, ORDEN_PRODUCTO, PRODUCTO
+
+
+def test_select_lists_columns_in_field_order():
+    assert ORDEN_PRODUCTO.select == '"id_ordenProd", id_producto, cantidad, precio_unitario, id_orden'
+    assert PRODUCTO.select.startswith("id_producto, nombre_producto")
+
+
+def test_positional_rows_become_entities():
+    lineas = ORDEN_PRODUCTO.todos([(1, 2, 3, 4.5, 6), (7, 8, 9, 1.0, 6)])
+
+    assert lineas[0] == OrdenProducto(id_ordenProd=1, id_producto=2, cantidad=3, precio_unitario=4.5, id_orden=6)
+    assert [l.id_ordenProd for l in lineas] == [1, 7]
+    assert ORDEN_PRODUCTO.uno(None) is None
+
+
+def test_orden_numeric_state_is_normalized():
+    fila = (1, 2, datetime(2024, 1, 1), 3, "dir", 10.0, "c", "cp", "p", "m", 1.0, "e")
+    assert ORDEN.uno(fila).estado_orden == "cancelada"
+
+
+def test_entities_use_slots():
+    with pytest.raises(AttributeError):
+        Orden().atributo_inexistente = 1
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import httpx
+
+from domain.entities.pagina import Pagina
+from infrastructure.metricas import consultas
+from infrastructure.metricas.registro import Registro
+
+
+def test_histograma_en_formato_prometheus():
+    registro = Registro()
+    h = registro.histograma("latencia_seconds", "Latencia.", ("route",), buckets=(0.1, 1.0))
+    h.observar(0.05, "/a")
+    h.observar(0.5, "/a")
+    h.observar(3.0, "/a")
+    registro.contador("hits_total", "Hits.").inc()
+
+    texto = registro.exponer()
+
+    assert "# TYPE latencia_seconds histogram" in texto
+    assert 'latencia_seconds_bucket{route="/a",le="0.1"} 1' in texto
+    assert 'latencia_seconds_bucket{route="/a",le="1.0"} 2' in texto
+    assert 'latencia_seconds_bucket{route="/a",le="+Inf"} 3' in texto
+    assert 'latencia_seconds_count{route="/a"} 3' in texto
+    assert "hits_total 1" in texto
+
+
+def _consulta_simulada(segundos):
+    # Lo que hace CursorMedido.execute alrededor del execute real de psycopg2
+    consultas._medir(lambda cursor, query, vars: time.sleep(segundos), None, "SELECT 1", None)
+
+
+def test_metricas_por_ruta_con_consultas(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import cliente_controller
+
+    def listar_pagina(**kwargs):
+        consultas.registrar_conexion()
+        _consulta_simulada(0.01)
+        _consulta_simulada(0.01)
+        return Pagina(items=[])
+
+    monkeypatch.setattr(cliente_controller.cliente_repository, "listar_pagina", listar_pagina)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/clientes/")
+            await client.get("/clientes/abc")  # 422
+            return await client.get("/metrics")
+
+    respuesta = asyncio.run(main())
+    texto = respuesta.text
+
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/clientes/",status="200"}' in texto
+    assert 'http_requests_total{method="GET",route="/clientes/{id_cliente}",status="422"}' in texto
+    assert 'http_request_db_queries_bucket{route="/clientes/",le="2"}' in texto
+    assert 'http_request_db_connections_opened_total{route="/clientes/"}' in texto
+    assert "http_requests_in_flight" in texto
+
+    conteo = [l for l in texto.splitlines() if l.startswith('http_request_db_queries_count{route="/clientes/"}')]
+    sumas = [l for l in texto.splitlines() if l.startswith('http_request_db_queries_sum{route="/clientes/"}')]
+    assert float(sumas[0].split()[-1]) >= 2 * float(conteo[0].split()[-1]) > 0
+
+
+def test_familias_de_admision_contiguas():
+    from interfaces.api import metricas
+
+    familias = [l.split("{")[0].split()[0] for l in metricas.exponer().splitlines()
+                if l.startswith("http_admission_")]
+    assert len(familias) > len(set(familias))
+    # Cada familia aparece en un solo bloque de líneas consecutivas
+    bloques = [f for i, f in enumerate(familias) if i == 0 or familias[i - 1] != f]
+    assert len(bloques) == len(set(bloques))
@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from domain.entities.orden import Orden
+from domain.entities.pagina import Pagina
+from interfaces.api.paginacion import HEADER_SIGUIENTE, codificar_cursor, decodificar_cursor
+
+
+def test_desde_filas_sets_next_key_only_when_more_rows():
+    assert Pagina.desde_filas([1, 2, 3], 3, lambda x: x).siguiente is None
+
+    pagina = Pagina.desde_filas([1, 2, 3, 4], 3, lambda x: x)
+    assert pagina.items == [1, 2, 3]
+    assert pagina.siguiente == 3
+
+
+def test_cursor_round_trip_and_invalid_token():
+    assert decodificar_cursor(codificar_cursor(42)) == 42
+    assert decodificar_cursor(None) is None
+
+    with pytest.raises(HTTPException) as exc:
+        decodificar_cursor("no-es-un-cursor")
+    assert exc.value.status_code == 400
+
+
+def test_list_endpoint_passes_filters_and_sets_cursor_header(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import orden_controller
+
+    calls = []
+    orden = Orden(id_orden=7, id_cliente=1, fecha_orden=datetime(2024, 1, 1), total_orden=10.0)
+
+    def fake_listar_pagina(**kwargs):
+        calls.append(kwargs)
+        return Pagina(items=[orden], siguiente=7)
+
+    monkeypatch.setattr(orden_controller.orden_repository, "listar_pagina", fake_listar_pagina)
+
+    client = TestClient(app)
+    response = client.get("/ordenes/", params={"limit": 1, "estado_orden": "pendiente", "id_cliente": 1})
+
+    assert response.status_code == 200
+    assert [o["id_orden"] for o in response.json()] == [7]
+    assert decodificar_cursor(response.headers[HEADER_SIGUIENTE]) == 7
+    assert calls[0]["limit"] == 1
+    assert calls[0]["estado_orden"] == "pendiente"
+    assert calls[0]["id_cliente"] == 1
+    assert calls[0]["after"] is None
+
+    next_response = client.get("/ordenes/", params={"limit": 1, "after": response.headers[HEADER_SIGUIENTE]})
+    assert next_response.status_code == 200
+    assert calls[1]["after"] == 7
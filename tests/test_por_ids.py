@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from application.use_cases.producto_cases.obtener_productos_por_ids import ObtenerProductosPorIdsUseCase
+from domain.entities.orden import Orden
+from domain.entities.producto import Producto
+from infrastructure.cache.cached_repositories import CachedProductoRepository
+from infrastructure.cache.ttl_cache import TTLCache
+
+
+class RepoFalso:
+    def __init__(self, existentes):
+        self.existentes = set(existentes)
+        self.llamadas = []
+
+    def obtener_por_ids(self, ids):
+        self.llamadas.append(list(ids))
+        # La base los devuelve en cualquier orden
+        return [Producto(id_producto=i, nombre_producto=f"p{i}") for i in sorted(ids, reverse=True) if i in self.existentes]
+
+
+def test_respeta_el_orden_pedido_y_reporta_faltantes():
+    repo = RepoFalso(existentes={1, 2, 3})
+
+    resultado = ObtenerProductosPorIdsUseCase(repo).execute([3, 9, 1, 3])
+
+    assert [p.id_producto for p in resultado.encontrados] == [3, 1]
+    assert resultado.faltantes == [9]
+    assert repo.llamadas == [[3, 9, 1]]
+
+
+def test_cache_solo_consulta_los_ids_que_faltan():
+    inner = RepoFalso(existentes={1, 2})
+    repo = CachedProductoRepository(inner, TTLCache(max_entries=10, ttl=60))
+
+    repo.obtener_por_ids([1, 5])
+    segundo = ObtenerProductosPorIdsUseCase(repo).execute([2, 1, 5])
+
+    assert inner.llamadas == [[1, 5], [2]]
+    assert [p.id_producto for p in segundo.encontrados] == [2, 1]
+    assert segundo.faltantes == [5]
+
+
+def test_cache_no_guarda_si_hubo_invalidacion_durante_la_carga():
+    cache = TTLCache(max_entries=10, ttl=60)
+    generacion = cache.generacion_actual()
+    cache.invalidate(("id", 1))
+
+    assert cache.set(("id", 1), "viejo", generacion=generacion) is False
+    assert cache.get(("id", 1)) is None
+
+
+def _orden(i):
+    return Orden(i, 7, datetime(2024, 5, 1, 8, 0), "pendiente", "Calle 1", 10.5, "Tegucigalpa",
+                 "11101", "HN", "dhl", 2.0, "pendiente")
+
+
+def test_endpoint_ids_una_sola_consulta(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import orden_controller
+
+    llamadas = []
+
+    def obtener_por_ids(ids):
+        llamadas.append(ids)
+        return [_orden(i) for i in ids if i != 4]
+
+    def listar_pagina(**kwargs):
+        raise AssertionError("con ids no se pagina")
+
+    monkeypatch.setattr(orden_controller.orden_repository, "obtener_por_ids", obtener_por_ids)
+    monkeypatch.setattr(orden_controller.orden_repository, "listar_pagina", listar_pagina)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get("/ordenes/?ids=5,4,2&limit=1"),
+                    await client.get("/ordenes/?ids=5,4,2&rapido=true"),
+                    await client.get("/ordenes/?ids=5,x"))
+
+    normal, rapida, invalida = asyncio.run(main())
+
+    assert [o["id_orden"] for o in normal.json()] == [5, 2]
+    assert normal.headers["X-Ids-Faltantes"] == "4"
+    assert rapida.json() == normal.json()
+    assert rapida.headers["X-Ids-Faltantes"] == "4"
+    assert llamadas == [[5, 4, 2], [5, 4, 2]]
+    assert invalida.status_code == 400
@@ -0,0 +1,100 @@
+import pytest
+from psycopg2 import errors, extensions
+
+from infrastructure.database import prepared_statements
+
+
+class FakeConnection:
+    def __init__(self):
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.servidor = set()
+        self.rollbacks = 0
+        self.ejecutadas = []
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+
+    def execute(self, query, params=None):
+        conn = self.connection
+        conn.ejecutadas.append((query, params))
+        conn.status = extensions.TRANSACTION_STATUS_INTRANS
+        nombre = query.split()[1].split("(")[0]
+        if query.startswith("PREPARE"):
+            conn.servidor.add(nombre)
+        elif query.startswith("EXECUTE") and nombre not in conn.servidor:
+            raise errors.InvalidSqlStatementName(f'prepared statement "{nombre}" does not exist')
+
+
+@pytest.fixture
+def sentencia():
+    return prepared_statements.registrar(
+        "test_por_rango", "SELECT id FROM t WHERE a BETWEEN $1 AND $2 AND b = $1"
+    )
+
+
+def test_prepara_una_vez_por_conexion(sentencia):
+    conn = FakeConnection()
+    antes = prepared_statements.estadisticas()["por_sentencia"]["test_por_rango"]
+
+    for _ in range(3):
+        prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 5))
+        conn.status = extensions.TRANSACTION_STATUS_IDLE
+
+    consultas = [q for q, _ in conn.ejecutadas]
+    assert consultas[0] == "PREPARE test_por_rango AS SELECT id FROM t WHERE a BETWEEN $1 AND $2 AND b = $1"
+    assert consultas[1:] == ["EXECUTE test_por_rango(%s, %s)"] * 3
+    despues = prepared_statements.estadisticas()["por_sentencia"]["test_por_rango"]
+    assert despues["prepares"] - antes["prepares"] == 1
+    assert despues["hits"] - antes["hits"] == 2
+
+    # Otra conexión física prepara la suya
+    otra = FakeConnection()
+    prepared_statements.ejecutar(FakeCursor(otra), sentencia, (1, 5))
+    assert otra.ejecutadas[0][0].startswith("PREPARE")
+
+
+def test_reprepara_si_el_servidor_perdio_la_sentencia(sentencia):
+    conn = FakeConnection()
+    prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 2))
+    conn.status = extensions.TRANSACTION_STATUS_IDLE
+    conn.servidor.clear()  # p. ej. DISCARD ALL en un pooler externo
+
+    prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 2))
+
+    assert conn.rollbacks == 1
+    assert [q.split()[0] for q, _ in conn.ejecutadas] == ["PREPARE", "EXECUTE", "EXECUTE", "PREPARE", "EXECUTE"]
+
+
+def test_no_reintenta_dentro_de_una_transaccion_con_trabajo(sentencia):
+    conn = FakeConnection()
+    prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 2))
+    conn.servidor.clear()  # la transacción sigue abierta
+
+    with pytest.raises(errors.InvalidSqlStatementName):
+        prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 2))
+    assert conn.rollbacks == 0
+
+
+def test_desactivadas_usa_sql_directo(sentencia, monkeypatch):
+    monkeypatch.setenv("DB_PREPARED_STATEMENTS", "false")
+    conn = FakeConnection()
+
+    prepared_statements.ejecutar(FakeCursor(conn), sentencia, (1, 2))
+
+    assert conn.ejecutadas == [
+        ("SELECT id FROM t WHERE a BETWEEN %(p1)s AND %(p2)s AND b = %(p1)s", {"p1": 1, "p2": 2})
+    ]
+
+
+def test_registrar_rechaza_nombre_duplicado_con_otro_sql(sentencia):
+    with pytest.raises(ValueError):
+        prepared_statements.registrar("test_por_rango", "SELECT 1")
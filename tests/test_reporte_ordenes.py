@@ -0,0 +1,98 @@
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from domain.entities.reporte_ordenes import FilaReporteOrdenes
+from infrastructure.repositories import postgres_orden_repository
+from infrastructure.repositories.postgres_orden_repository import sql_reporte_ordenes
+
+
+def test_sql_agrupa_por_periodo_y_dimension():
+    sql = sql_reporte_ordenes("semana", "pais_envio", rellenar=False)
+
+    assert "date_trunc('week', fecha_orden) AS periodo, pais_envio AS grupo" in sql
+    assert "GROUP BY 1, 2" in sql
+    assert "generate_series" not in sql
+
+
+def test_sql_rellena_huecos_con_generate_series():
+    sql = sql_reporte_ordenes("dia", None, rellenar=True)
+
+    assert "generate_series" in sql
+    assert "interval '1 day'" in sql
+    assert "SELECT NULL::text AS grupo" in sql
+
+
+def test_sql_rechaza_valores_fuera_de_la_lista():
+    with pytest.raises(ValueError):
+        sql_reporte_ordenes("anio; DROP TABLE orden", None, rellenar=False)
+    with pytest.raises(ValueError):
+        sql_reporte_ordenes(None, "id_cliente", rellenar=False)
+
+
+class _Cursor:
+    def __init__(self, log):
+        self.log = log
+
+    def execute(self, query, params=None):
+        self.log.append(params)
+
+    def fetchall(self):
+        return [(datetime(2024, 1, 1), "HN", 4, Decimal("100.00"), Decimal("10.00"), Decimal("25.00")),
+                (datetime(2024, 2, 1), "HN", 0, 0, 0, None)]
+
+
+class _Conexion:
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, *args, **kwargs):
+        return _Cursor(self.log)
+
+    def close(self):
+        pass
+
+
+def test_repositorio_convierte_decimales(monkeypatch):
+    conn = _Conexion()
+    monkeypatch.setattr(postgres_orden_repository, "get_db_connection", lambda: conn)
+    desde, hasta = datetime(2024, 1, 1), datetime(2024, 2, 28)
+
+    filas = postgres_orden_repository.PostgresOrdenRepository().reporte_agregado(desde, hasta, "mes", "pais_envio", True)
+
+    assert conn.log == [{"desde": desde, "hasta": hasta}]
+    assert filas[0] == FilaReporteOrdenes(datetime(2024, 1, 1), "HN", 4, 100.0, 10.0, 25.0)
+    assert filas[1].ticket_promedio is None
+
+
+def test_endpoint_no_choca_con_id_orden(monkeypatch):
+    from interfaces.api.main import app
+    from interfaces.api.controllers import orden_controller
+
+    llamadas = []
+
+    def reporte_agregado(fecha_inicio, fecha_fin, periodo=None, agrupar_por=None, rellenar=False):
+        llamadas.append((periodo, agrupar_por, rellenar))
+        return [FilaReporteOrdenes(datetime(2024, 1, 1), "pendiente", 2, 50.0, 5.0, 25.0)]
+
+    monkeypatch.setattr(orden_controller.orden_repository, "reporte_agregado", reporte_agregado)
+    monkeypatch.setattr(orden_controller.orden_repository, "listar_por_fecha", lambda desde, hasta: [])
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            rango = "fecha_inicio=2024-01-01T00:00:00&fecha_fin=2024-12-31T23:59:59"
+            return (await client.get(f"/ordenes/reportes/agregado?{rango}&periodo=mes&agrupar_por=estado_orden&rellenar=true"),
+                    await client.get(f"/ordenes/reportes?{rango}"),
+                    await client.get("/ordenes/reportes/agregado?fecha_inicio=2024-12-31T00:00:00&fecha_fin=2024-01-01T00:00:00"))
+
+    agregado, crudo, invertido = asyncio.run(main())
+
+    assert agregado.json() == [{"periodo": "2024-01-01T00:00:00", "grupo": "pendiente", "ordenes": 2,
+                                "total_ventas": 50.0, "total_envio": 5.0, "ticket_promedio": 25.0}]
+    assert llamadas == [("mes", "estado_orden", True)]
+    assert crudo.status_code == 200
+    assert invertido.status_code == 400
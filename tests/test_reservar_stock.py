@@ -0,0 +1,94 @@
+import psycopg2.extras
+import pytest
+
+from domain.exceptions import StockInsuficienteError
+from infrastructure.database.retry import con_reintentos
+from infrastructure.repositories.postgres_producto_repository import PostgresProductoRepository
+
+
+class FakeCursor:
+    def __init__(self, filas):
+        self.filas = filas
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+
+    def fetchall(self):
+        return self.filas
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, filas):
+        self.cursor_ = FakeCursor(filas)
+
+    def cursor(self, *args, **kwargs):
+        return self.cursor_
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    updates = []
+    monkeypatch.setattr(
+        psycopg2.extras, "execute_values", lambda cursor, query, valores, **kw: updates.append(valores)
+    )
+    return updates
+
+
+def test_reservar_stock_locks_in_id_order_and_updates_once(updates):
+    conn = FakeConnection([
+        {"id_producto": 2, "stock": 5, "precio": 3.0},
+        {"id_producto": 9, "stock": 1, "precio": 7.5},
+    ])
+
+    precios = PostgresProductoRepository().reservar_stock({9: 1, 2: 4}, conn)
+
+    query, params = conn.cursor_.queries[0]
+    assert "ORDER BY id_producto" in query and "FOR UPDATE" in query
+    assert params == ([2, 9],)
+    assert updates == [[(2, 4), (9, 1)]]
+    assert precios == {2: 3.0, 9: 7.5}
+
+
+def test_reservar_stock_reports_every_short_product_without_updating(updates):
+    conn = FakeConnection([{"id_producto": 2, "stock": 1, "precio": 3.0}])
+
+    with pytest.raises(StockInsuficienteError) as exc:
+        PostgresProductoRepository().reservar_stock({2: 4, 5: 1}, conn)
+
+    assert exc.value.faltantes == {
+        2: {"solicitado": 4, "disponible": 1},
+        5: {"solicitado": 1, "disponible": None},
+    }
+    assert updates == []
+
+
+class PgError(Exception):
+    def __init__(self, pgcode):
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def test_con_reintentos_retries_deadlocks_only():
+    intentos = []
+
+    def flaky():
+        intentos.append(1)
+        if len(intentos) < 3:
+            raise PgError("40P01")
+        return "ok"
+
+    assert con_reintentos(flaky, espera_base=0) == "ok"
+    assert len(intentos) == 3
+
+    def unique_violation():
+        intentos.append(1)
+        raise PgError("23505")
+
+    intentos.clear()
+    with pytest.raises(PgError):
+        con_reintentos(unique_violation, espera_base=0)
+    assert len(intentos) == 1
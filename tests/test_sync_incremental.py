@@ -0,0 +1,150 @@
+import pytest
+
+from infrastructure.sync import incremental
+from infrastructure.sync.incremental import instalar_registro_cambios, sincronizar_incremental
+
+
+class _Oltp:
+    """Log de cambios en memoria: (id, tabla, id_registro, xid).
+
+    Las filas de transacciones en `abiertas` todavía no son visibles; el xmin
+    del snapshot es la más vieja de ellas (o la próxima xid si no hay ninguna).
+    """
+
+    def __init__(self, cambios, abiertas=()):
+        self.cambios = [c if len(c) == 4 else (*c, c[0]) for c in cambios]
+        self.abiertas = set(abiertas)
+        self.sql = []
+
+    def cursor(self):
+        return self
+
+    def commit_transaccion(self, xid):
+        self.abiertas.discard(xid)
+
+    def execute(self, sql, params=None):
+        self.sql.append(sql)
+        visibles = [c for c in self.cambios if c[3] not in self.abiertas]
+        if sql.startswith("SELECT txid_snapshot_xmin"):
+            xmin = min(self.abiertas) if self.abiertas else max((c[3] for c in self.cambios), default=0) + 1
+            self._fila = {"xmin": xmin}
+        elif sql.strip().startswith("SELECT id, xid, id_registro"):
+            tabla, xid, marca, xmin, limite = params
+            filas = sorted((c for c in visibles if c[1] == tabla and (c[3], c[0]) > (xid, marca) and c[3] < xmin),
+                           key=lambda c: (c[3], c[0]))[:limite]
+            self._filas = [{"id": c[0], "xid": c[3], "id_registro": c[2]} for c in filas]
+        elif sql.startswith("DELETE FROM sync_cambios"):
+            tabla, xid, marca = params
+            borrar = {c for c in visibles if c[1] == tabla and (c[3], c[0]) <= (xid, marca)}
+            self.cambios = [c for c in self.cambios if c not in borrar]
+
+    def fetchone(self):
+        return self._fila
+
+    def fetchall(self):
+        return self._filas
+
+
+class _Olap:
+    def __init__(self, checkpoints=None):
+        self.checkpoints = dict(checkpoints or {})
+        self.pendientes = {}
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        if sql.startswith("SELECT xid, marca"):
+            marca = self.checkpoints.get(params[0])
+            self._fila = {"xid": marca[0], "marca": marca[1]} if marca is not None else None
+        elif "INSERT INTO sync_checkpoint" in sql:
+            self.pendientes[params[0]] = (params[1], params[2])
+
+    def fetchone(self):
+        return self._fila
+
+    def commit(self):
+        self.checkpoints.update(self.pendientes)
+        self.pendientes = {}
+        self.commits += 1
+
+    def rollback(self):
+        self.pendientes = {}
+
+
+def test_solo_aplica_cambios_posteriores_a_la_marca_en_lotes():
+    cambios = [(1, "productos", 10), (2, "productos", 11), (3, "ventas", 5),
+               (4, "productos", 10), (5, "productos", 12), (6, "productos", 10), (7, "productos", 13)]
+    oltp, olap = _Oltp(cambios), _Olap({"productos": (1, 1)})
+    aplicados = []
+
+    avances = sincronizar_incremental(
+        oltp, olap, lambda oc, ac, tabla, id_, ctx: aplicados.append((tabla, id_)), tamano=2)
+
+    assert aplicados == [("productos", 11), ("productos", 10), ("productos", 12),
+                         ("productos", 10), ("productos", 13), ("ventas", 5)]
+    assert olap.checkpoints == {"productos": (7, 7), "ventas": (3, 3)}
+    productos = avances["productos"]
+    assert (productos.desde, productos.hasta, productos.cambios, productos.lotes) == ((1, 1), (7, 7), 5, 3)
+    assert avances["categoria"].lotes == 0
+    # Lo confirmado se purga del log
+    assert oltp.cambios == []
+
+
+def test_fallo_en_un_lote_conserva_los_anteriores():
+    oltp = _Oltp([(1, "clientes", 1), (2, "clientes", 2), (3, "clientes", 3)])
+    olap = _Olap()
+
+    def sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto):
+        if id_registro == 3:
+            raise RuntimeError("caída")
+
+    with pytest.raises(RuntimeError):
+        sincronizar_incremental(oltp, olap, sincronizar, tamano=2)
+    assert olap.checkpoints == {"clientes": (2, 2)}
+
+
+def test_id_menor_visible_despues_de_la_marca_no_se_pierde():
+    # La transacción 51 tomó el id 100 y sigue abierta; la 50 tomó el 101 y ya hizo commit
+    oltp = _Oltp([(100, "productos", 1, 51), (101, "productos", 2, 50)], abiertas={51})
+    olap = _Olap()
+    aplicados = []
+
+    def sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto):
+        aplicados.append(id_registro)
+
+    sincronizar_incremental(oltp, olap, sincronizar, tamano=10)
+    assert aplicados == [2]
+    assert olap.checkpoints == {"productos": (50, 101)}
+    # La purga de la marca (50, 101) no toca el id 100
+    assert [c[0] for c in oltp.cambios] == [100]
+
+    oltp.commit_transaccion(51)
+    sincronizar_incremental(oltp, olap, sincronizar, tamano=10)
+    assert aplicados == [2, 1]
+    assert olap.checkpoints == {"productos": (51, 100)}
+    assert oltp.cambios == []
+
+
+def test_transaccion_abierta_retiene_los_cambios_posteriores():
+    # xid 60 abierta: lo de la 61 ya es visible pero queda detrás del xmin
+    oltp = _Oltp([(1, "ventas", 7, 59), (2, "ventas", 8, 60), (3, "ventas", 9, 61)], abiertas={60})
+    olap = _Olap()
+    aplicados = []
+
+    sincronizar_incremental(oltp, olap, lambda oc, ac, tabla, id_, ctx: aplicados.append(id_), tamano=10)
+    assert aplicados == [7]
+    assert olap.checkpoints == {"ventas": (59, 1)}
+
+    oltp.commit_transaccion(60)
+    sincronizar_incremental(oltp, olap, lambda oc, ac, tabla, id_, ctx: aplicados.append(id_), tamano=10)
+    assert aplicados == [7, 8, 9]
+
+
+def test_instalar_crea_trigger_por_tabla():
+    oltp = _Oltp([])
+    instalar_registro_cambios(oltp)
+    triggers = [s for s in oltp.sql if "CREATE TRIGGER" in s]
+    assert len(triggers) == len(incremental.TABLAS_INCREMENTAL)
+    assert "sync_registrar_cambio('id_ordenProd')" in triggers[4]
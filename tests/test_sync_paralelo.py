@@ -0,0 +1,119 @@
+from concurrent.futures import Future
+from datetime import date, datetime
+
+import pytest
+from psycopg2 import errors
+
+from infrastructure.sync import sync_paralelo
+from infrastructure.sync.carga_masiva import ReporteCarga
+from infrastructure.sync.sync_paralelo import Particion, particiones_por_id, particiones_por_mes
+
+
+def test_particiones_por_mes_cubren_el_rango():
+    particiones = particiones_por_mes(date(2023, 11, 15), date(2024, 2, 3))
+    assert [p.nombre for p in particiones] == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert particiones[1].params == (date(2023, 12, 1), date(2024, 1, 1))
+    assert "v.fecha_venta >= %s" in particiones[0].filtro
+
+
+def test_particiones_por_id_contiguas_y_sin_huecos():
+    particiones = particiones_por_id(1, 10, 3)
+    assert [p.params for p in particiones] == [(1, 4), (5, 8), (9, 10)]
+    assert [p.params for p in particiones_por_id(5, 6, 8)] == [(5, 5), (6, 6)]
+
+
+class _Cursor:
+    def __init__(self, respuestas):
+        self.respuestas = respuestas
+
+    def execute(self, sql, params=None):
+        self._fila = next((r for clave, r in self.respuestas.items() if clave in sql), None)
+
+    def fetchone(self):
+        return self._fila
+
+
+class _Conexion:
+    def __init__(self, respuestas=None):
+        self.respuestas = respuestas or {}
+        self.commits = self.rollbacks = 0
+        self.cerrada = False
+
+    def cursor(self, **kwargs):
+        return _Cursor(self.respuestas)
+
+    def set_isolation_level(self, nivel):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.cerrada = True
+
+
+class _EjecutorEnLinea:
+    def submit(self, fn, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(fn(*args))
+        except Exception as e:
+            futuro.set_exception(e)
+        return futuro
+
+
+def test_dimensiones_primero_y_una_carga_por_particion(monkeypatch):
+    orden = []
+    monkeypatch.setattr(sync_paralelo, "preparar_dimensiones", lambda *a, **k: orden.append("dimensiones"))
+
+    def cargar(oltp_config, olap_config, particion, tamano):
+        orden.append(particion.nombre)
+        if particion.nombre == "2024-02":
+            raise RuntimeError("caída")
+        reporte = ReporteCarga()
+        reporte.etapa("hecho_ventas:copy").filas = 10
+        return reporte
+
+    monkeypatch.setattr(sync_paralelo, "cargar_particion", cargar)
+    oltp = _Conexion({"min(fecha_venta)": (datetime(2024, 1, 5), datetime(2024, 3, 1))})
+
+    reporte, fallidas = sync_paralelo.sincronizar_paralelo(
+        oltp, _Conexion(), {}, {}, procesos=2, ejecutor=_EjecutorEnLinea())
+
+    assert orden == ["dimensiones", "2024-01", "2024-02", "2024-03"]
+    assert fallidas == ["2024-02"]
+    assert reporte.etapa("hecho_ventas:copy").filas == 20
+
+
+def test_particion_con_deadlock_se_reintenta(monkeypatch):
+    intentos = []
+
+    def cargar_hechos(oltp_conn, olap_cur, reporte, tamano, filtro, params, dimensiones_derivadas):
+        assert dimensiones_derivadas is False and params == (1, 5)
+        intentos.append(1)
+        if len(intentos) == 1:
+            raise errors.DeadlockDetected()
+        reporte.etapa("hecho_ventas:merge").filas = 5
+
+    monkeypatch.setattr(sync_paralelo, "cargar_hechos", cargar_hechos)
+    conexiones = []
+
+    def conectar(**config):
+        conexiones.append(_Conexion())
+        return conexiones[-1]
+
+    particion = Particion("id 1-5", " WHERE v.id_venta BETWEEN %s AND %s", (1, 5))
+    reporte = sync_paralelo.cargar_particion({}, {}, particion, conectar=conectar)
+
+    assert len(intentos) == 2
+    assert reporte.etapa("hecho_ventas:merge").filas == 5
+    assert conexiones[1].rollbacks == 1 and conexiones[3].commits == 1
+    assert all(c.cerrada for c in conexiones)
+
+
+def test_modo_de_particion_invalido():
+    with pytest.raises(ValueError):
+        sync_paralelo.calcular_particiones(_Conexion(), por="semana")
@@ -0,0 +1,152 @@
+from datetime import date
+
+from infrastructure.sync.calendario import MapaCalendario
+from infrastructure.sync.worker_sync import Coalescedor, SyncWorker, parsear_notificacion
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class _CursorOlap:
+    """Solo lo que usa `MapaCalendario` para insertar una fecha suelta."""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        c = self.conexion
+        if "INSERT INTO dim_tiempo" in sql:
+            c.ultimo_id += 1
+            c.fechas_pendientes[params[0]] = c.ultimo_id
+            self.rowcount = 1
+        elif "WHERE fecha = CAST" in sql:
+            fecha = params[0]
+            id_ = c.fechas_pendientes.get(fecha, c.fechas.get(fecha))
+            self._fila = {"id_tiempo": id_} if id_ is not None else None
+
+    def fetchone(self):
+        return self._fila
+
+
+class _Conexion:
+    def __init__(self):
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.fechas = {}
+        self.fechas_pendientes = {}
+        self.ultimo_id = 0
+
+    def cursor(self):
+        return _CursorOlap(self)
+
+    def commit(self):
+        self.fechas.update(self.fechas_pendientes)
+        self.fechas_pendientes = {}
+        self.commits += 1
+
+    def rollback(self):
+        self.fechas_pendientes = {}
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def _worker(sincronizar, reloj, conexiones):
+    def conectar():
+        conn = _Conexion()
+        conexiones.append(conn)
+        return conn
+    return SyncWorker(conectar, conectar, sincronizar, debounce=0.5, lote=100, reloj=reloj)
+
+
+def test_parsear_notificacion():
+    evento = parsear_notificacion("productos_sync", "update:42", 1.0)
+    assert (evento.tabla, evento.operacion, evento.id_registro) == ("productos", "update", 42)
+    assert parsear_notificacion("orden_sync", "x", 0).id_registro is None
+
+
+def test_coalescedor_agrupa_y_respeta_debounce():
+    cola = Coalescedor(0.5)
+    assert cola.agregar(parsear_notificacion("productos_sync", "update:1", 0.0))
+    assert not cola.agregar(parsear_notificacion("productos_sync", "delete:1", 0.3))
+    cola.agregar(parsear_notificacion("productos_sync", "update:2", 0.4))
+    assert cola.listos(0.4, 10) == []
+    listos = cola.listos(0.5, 10)
+    assert [(e.id_registro, e.operacion, e.repeticiones) for e in listos] == [(1, "delete", 2)]
+    assert len(cola) == 1
+
+
+def test_worker_agrupa_eventos_y_reusa_conexiones():
+    reloj, conexiones, llamadas = _Reloj(), [], []
+    worker = _worker(lambda oc, ac, tabla, id_, ctx: llamadas.append((tabla, id_, ctx)), reloj, conexiones)
+    for _ in range(10_000):
+        worker.recibir("productos_sync", "update:7")
+    worker.recibir("ventas_sync", "insert:3")
+    assert worker.stats()["profundidad"] == 2
+    assert worker.drenar() == 0
+
+    reloj.t = 0.8
+    assert worker.drenar() == 2
+    assert [(t, i) for t, i, _ in llamadas] == [("productos", 7), ("ventas", 3)]
+    # Un contexto compartido por lote: dimensiones y calendario se reutilizan
+    assert llamadas[0][2] is llamadas[1][2]
+    worker.recibir("clientes_sync", "update:1")
+    reloj.t = 2.0
+    worker.drenar()
+
+    stats = worker.stats()
+    assert stats["agrupados"] == 9_999 and stats["procesados"] == 3 and stats["lotes"] == 2
+    assert stats["profundidad"] == 0
+    assert abs(stats["lag_max"] - 1.2) < 1e-9
+    assert len(conexiones) == 2 and conexiones[1].commits == 2
+
+
+def test_lote_fallido_se_reintenta_evento_por_evento():
+    reloj, conexiones = _Reloj(), []
+    fuera_de_rango = date(2031, 1, 1)
+    usados = []
+
+    def sincronizar(oltp_cur, olap_cur, tabla, id_registro, contexto):
+        if contexto.calendario is None:
+            contexto.calendario = MapaCalendario({})
+        if id_registro >= 10:
+            # Fecha fuera del calendario: se inserta en la transacción del lote
+            usados.append((id_registro, contexto.calendario.id_tiempo(olap_cur, fuera_de_rango)))
+        if id_registro in (2, 12):
+            raise RuntimeError("fila rota")
+
+    worker = _worker(sincronizar, reloj, conexiones)
+    for i in (1, 2, 3):
+        worker.recibir("productos_sync", f"update:{i}")
+    reloj.t = 1.0
+    assert worker.drenar() == 2
+    olap = conexiones[1]
+    assert olap.commits == 2 and olap.rollbacks == 2
+    assert worker.stats()["fallidos"] == 1
+
+    # Con el mapa del worker ya cargado, un lote que inserta una fecha y falla
+    # no debe dejar en el mapa un id_tiempo que el rollback deshizo
+    for i in (10, 12, 13):
+        worker.recibir("ventas_sync", f"insert:{i}")
+    reloj.t = 2.0
+    assert worker.drenar() == 2
+    confirmados = [(i, id_) for i, id_ in usados if i in (10, 13)][-2:]
+    assert all(id_ == olap.fechas[fuera_de_rango] for _, id_ in confirmados)
+    assert worker.stats()["fallidos"] == 2
+
+
+def test_espera_no_retrasa_eventos_vencidos():
+    reloj = _Reloj()
+    worker = _worker(lambda *a: None, reloj, [])
+    assert worker.espera(5.0) == 5.0
+    worker.recibir("orden_sync", "update:1")
+    reloj.t = 0.2
+    assert abs(worker.espera(5.0) - 0.3) < 1e-9